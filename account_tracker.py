@@ -1,15 +1,34 @@
 import time
 from datetime import datetime, timedelta
 from typing import List, Dict
-from hyperliquid_api import HyperliquidAPI
+from hyperliquid_api import HyperliquidAPI, split_batch_results
 from database import Database
 from analytics import PerformanceAnalytics
+from fills import Fill, as_fills
+from online_analytics import PerformanceAccumulator
+from fill_frame import FillFrame
+from parallel_analytics import AnalyticsPool
+from equity_curve import daily_equity_curves
+from coin_cube import CoinDayCube
+from analytics_memo import AnalyticsMemo, Watermark, get_shared_memo
+from quantile_sketch import MetricSketches
+
+def _account_value(state) -> float:
+    """marginSummary account value from a clearinghouse state, or None"""
+    if not isinstance(state, dict) or 'marginSummary' not in state:
+        return None
+    return float(state['marginSummary'].get('accountValue', 0))
+
 
 class AccountTracker:
-    def __init__(self, use_testnet=False):
+    def __init__(self, use_testnet=False, workers: int = 1, memo: AnalyticsMemo = None):
         self.api = HyperliquidAPI(use_testnet=use_testnet)
         self.db = Database()
         self.analytics = PerformanceAnalytics()
+        # workers > 1 folds fills into the accumulators on a process pool
+        self.pool = AnalyticsPool(workers)
+        # Accounts whose fills and funding have not moved reuse their last metrics
+        self.memo = memo if memo is not None else get_shared_memo()
 
     def discover_top_accounts(self) -> List[str]:
         """Discover top trading accounts from leaderboard or config"""
@@ -41,39 +60,68 @@ class AccountTracker:
         print(f"Found {len(top_addresses)} accounts to track")
         return top_addresses
 
-    def analyze_account(self, address: str) -> Dict:
-        """Analyze a single account's trading performance"""
+    def analyze_account(self, address: str, state: Dict = None, fills: List[Fill] = None,
+                        accumulator: PerformanceAccumulator = None) -> Dict:
+        """Analyze a single account's trading performance
+
+        state/fills/accumulator can be passed in when they were already fetched
+        in a batch. Metrics come from the account's persisted accumulator, so
+        only fills newer than its cursor cost any work.
+        """
         print(f"Analyzing account: {address}")
 
         # Get user state
-        state = self.api.get_user_state(address)
+        if state is None:
+            state = self.api.get_user_state(address)
 
-        # Get fill history (last 30 days)
-        thirty_days_ago = int((datetime.now() - timedelta(days=30)).timestamp() * 1000)
-        fills = self.api.get_user_fills(address, start_time=thirty_days_ago)
+        if accumulator is None:
+            accumulator = self._load_accumulator(address)
 
-        if not fills:
+        # First run: last 30 days of fills; afterwards every fill since the cursor
+        if fills is None:
+            fills = self.api.get_all_user_fills(address, start_time=self._fetch_start(accumulator), typed=True)
+            self.sync_funding([address])
+            cached = self._cached_performance(address, accumulator, fills)
+            if cached is not None:
+                print(f"Account {address}: unchanged since its last analysis (cached)")
+                return cached
+
+        if not fills and not accumulator.fills_seen:
             print(f"No fills found for {address}")
             return None
+        fills = as_fills(fills or [])
 
-        # Analyze performance
-        performance = self.analytics.calculate_performance(fills, state)
-
-        # Store trades in database
-        for fill in fills:
-            trade_data = {
-                'account_address': address,
-                'trade_id': fill.get('tid', ''),
-                'symbol': fill.get('coin', ''),
-                'side': fill.get('side', ''),
-                'entry_price': float(fill.get('px', 0)),
-                'size': float(fill.get('sz', 0)),
-                'opened_at': datetime.fromtimestamp(fill.get('time', 0) / 1000),
-            }
-            try:
-                self.db.add_trade(trade_data)
-            except:
-                pass  # Skip duplicates
+        # Fold in the new fills (round trips spanning cycles stay one trade)
+        closed_trips = accumulator.update(fills)
+        return self._record_account(address, fills, accumulator, closed_trips)
+
+    def _record_account(self, address: str, fills: List[Fill], accumulator: PerformanceAccumulator,
+                        closed_trips: List[Dict]) -> Dict:
+        """Persist an account's new fills, round trips, accumulator and stats
+
+        Returns None when the fills could not be stored: the saved cursor then
+        stays put, so the same fills are refetched and retried next cycle.
+        """
+        performance = accumulator.metrics()
+
+        # Raw fills (so FillFrame.from_db() can rebuild history), round trips, then the
+        # advanced accumulator. The cursor is saved last; the writes skip rows already
+        # stored, so a cycle that failed part-way is safe to repeat.
+        try:
+            self.db.add_fills(address, fills)
+            self.db.add_round_trips(address, closed_trips)
+            self.db.save_analytics_state(address, accumulator.to_dict())
+        except Exception as e:
+            self.db.session.rollback()
+            print(f"Warning: could not store fills for {address}, retrying next cycle: {e}")
+            return None
+
+        # Fold the same fills and trips into the coin x day cube
+        try:
+            self._update_coin_cube(address, fills, closed_trips)
+        except Exception as e:
+            self.db.session.rollback()
+            print(f"Warning: could not update coin breakdown for {address}: {e}")
 
         # Update account stats
         account_data = {
@@ -90,24 +138,212 @@ class AccountTracker:
         }
 
         self.db.add_tracked_account(account_data)
+        self.memo.put('performance', address, self._watermark(address, accumulator), performance)
 
         print(f"Account {address}: Win Rate: {performance['win_rate']:.2%}, ROI: {performance['roi']:.2%}, Total Trades: {performance['total_trades']}")
 
         return performance
 
+    def _update_coin_cube(self, address: str, fills: List[Fill], closed_trips: List[Dict]):
+        """Advance the account's saved CoinDayCube from the stored fills and funding"""
+        # add_fills() and sync_funding() already stored this cycle's fills and payments
+        cube = CoinDayCube.from_bytes(self.db.get_coin_cube(address))
+        if cube is None:
+            cube = CoinDayCube.from_frame(FillFrame.from_db(self.db, address))
+        else:
+            # Each from its own cursor: fills from the last fill time, funding after the last payment
+            frame = FillFrame.from_db(self.db, address, start_time=cube.last_time,
+                                      funding_start_time=cube.last_funding_time + 1)
+            cube.update(frame, closed_trips)
+        self.db.save_coin_cube(address, cube.to_bytes(), cube.VERSION, cube.last_time)
+
+    def _load_coin_cube(self, address: str) -> CoinDayCube:
+        """The account's saved CoinDayCube, or one rebuilt from its stored fills and funding"""
+        cube = CoinDayCube.from_bytes(self.db.get_coin_cube(address))
+        return cube if cube is not None else CoinDayCube.from_frame(FillFrame.from_db(self.db, address))
+
+    def _watermark(self, address: str, accumulator: PerformanceAccumulator) -> Watermark:
+        """Memo key for an account: the accumulator's fill cursor plus its last stored funding time"""
+        last_funding = self.db.get_last_funding_time(address)
+        return (accumulator.last_time, max(accumulator.last_tids, default=-1),
+                -1 if last_funding is None else last_funding)
+
+    def _cached_performance(self, address: str, accumulator: PerformanceAccumulator, fills) -> Dict:
+        """The memoised metrics when no fill or funding payment arrived since they were recorded, else None"""
+        try:
+            mark = None if accumulator.has_new(fills or []) else self._watermark(address, accumulator)
+            hit, performance = self.memo.get('performance', address, mark)
+        except Exception as e:
+            self.db.session.rollback()
+            print(f"Warning: could not read analytics memo for {address}: {e}")
+            return None
+        return performance if hit else None
+
+    def _load_accumulator(self, address: str) -> PerformanceAccumulator:
+        """The account's saved accumulator, or a fresh one"""
+        try:
+            return PerformanceAccumulator.from_dict(self.db.get_analytics_state(address))
+        except Exception as e:
+            self.db.session.rollback()
+            print(f"Warning: could not load analytics state for {address}: {e}")
+            return PerformanceAccumulator()
+
+    def _fetch_start(self, accumulator: PerformanceAccumulator) -> int:
+        """Where the next fill fetch starts: the cursor, or 30 days back on first sight"""
+        if accumulator.fills_seen:
+            return accumulator.last_time
+        return int((datetime.now() - timedelta(days=30)).timestamp() * 1000)
+
+    def _funding_start(self, address: str) -> int:
+        """Where the next funding fetch starts: the last stored payment, or 30 days back"""
+        try:
+            last = self.db.get_last_funding_time(address)
+        except Exception:
+            self.db.session.rollback()
+            last = None
+        if last is not None:
+            return last
+        return int((datetime.now() - timedelta(days=30)).timestamp() * 1000)
+
+    def sync_funding(self, addresses: List[str]):
+        """Fetch funding payments since each account's last stored one and store the new ones
+
+        Funding feeds the net-of-funding metrics, equity curves and coin cubes
+        built from FillFrame.from_db(). A failed fetch is retried next cycle.
+        """
+        start_times = {address: self._funding_start(address) for address in addresses}
+        for address, payments in self.api.get_user_funding_many(addresses, start_time=start_times).items():
+            if isinstance(payments, Exception):
+                print(f"Warning: could not fetch funding for {address}: {payments}")
+                continue
+            try:
+                self.db.add_funding(address, payments)
+            except Exception as e:
+                self.db.session.rollback()
+                print(f"Warning: could not store funding for {address}: {e}")
+
     def track_accounts(self, addresses: List[str] = None):
         """Track multiple accounts"""
         if not addresses:
             addresses = self.discover_top_accounts()
 
+        # Snapshot every account concurrently, each paged from its own cursor until caught up
+        print(f"Fetching state and fills for {len(addresses)} accounts...")
+        accumulators = {address: self._load_accumulator(address) for address in addresses}
+        start_times = {address: self._fetch_start(acc) for address, acc in accumulators.items()}
+        states, state_errors = split_batch_results(self.api.get_user_states_many(addresses))
+        fills, fill_errors = split_batch_results(self.api.get_user_fills_since_many(start_times, typed=True))
+        self.sync_funding(addresses)
+
+        # Unchanged accounts skip the analysis, the writes and the risk metrics entirely
+        performances = {}
+        for address in addresses:
+            if address not in state_errors and address not in fill_errors:
+                cached = self._cached_performance(address, accumulators[address], fills[address])
+                if cached is not None:
+                    performances[address] = cached
+        changed = [address for address in addresses if address not in performances]
+        if performances:
+            print(f"{len(performances)} accounts unchanged since their last analysis (cached)")
+
+        if self.pool.workers > 1:
+            performances.update(self._track_parallel(changed, accumulators, fills, state_errors, fill_errors))
+        else:
+            performances.update(self._track_serial(changed, accumulators, states, fills, state_errors, fill_errors))
+
+        self.update_risk_metrics([a for a in changed if a not in state_errors], states)
+        self.update_population(performances)
+        memo = self.memo.stats()
+        print(f"Analytics memo: {memo['hits']} hits, {memo['misses']} misses ({memo['hit_ratio']:.0%} hit ratio)")
+
+    def _track_serial(self, addresses: List[str], accumulators: Dict[str, PerformanceAccumulator],
+                      states: Dict[str, Dict], fills: Dict[str, List[Fill]], state_errors: Dict,
+                      fill_errors: Dict) -> Dict[str, Dict]:
+        """track_accounts() one account at a time, in-process; returns {address: performance}"""
+        performances = {}
         for i, address in enumerate(addresses):
             try:
                 print(f"\n[{i+1}/{len(addresses)}] Processing {address}...")
-                self.analyze_account(address)
-                time.sleep(1)  # Rate limiting
+                error = state_errors.get(address) or fill_errors.get(address)
+                if error:
+                    print(f"Skipping {address}: {error}")
+                    continue
+                performance = self.analyze_account(address, state=states[address], fills=fills[address],
+                                                   accumulator=accumulators[address])
+                if performance:
+                    performances[address] = performance
             except Exception as e:
                 print(f"Error analyzing {address}: {e}")
                 continue
+        return performances
+
+    def _track_parallel(self, addresses: List[str], accumulators: Dict[str, PerformanceAccumulator],
+                        fills: Dict[str, List[Fill]], state_errors: Dict, fill_errors: Dict) -> Dict[str, Dict]:
+        """track_accounts() with the accumulator updates run on the process pool; returns {address: performance}"""
+        ready, performances = [], {}
+        for address in addresses:
+            error = state_errors.get(address) or fill_errors.get(address)
+            if error:
+                print(f"Skipping {address}: {error}")
+            elif not fills[address] and not accumulators[address].fills_seen:
+                print(f"No fills found for {address}")
+            else:
+                ready.append(address)
+
+        print(f"Analyzing {len(ready)} accounts on {self.pool.workers} workers...")
+        frames = [FillFrame.from_fills(fills[address]) for address in ready]
+        results = self.pool.analyze_many(frames, 'accumulate', [accumulators[address] for address in ready])
+
+        for i, (address, result) in enumerate(zip(ready, results)):
+            try:
+                print(f"\n[{i+1}/{len(ready)}] Processing {address}...")
+                if isinstance(result, Exception):
+                    raise result
+                accumulator, closed_trips = result
+                performance = self._record_account(address, as_fills(fills[address]), accumulator, closed_trips)
+                if performance:
+                    performances[address] = performance
+            except Exception as e:
+                print(f"Error analyzing {address}: {e}")
+                continue
+        return performances
+
+    def update_risk_metrics(self, addresses: List[str], states: Dict[str, Dict] = None):
+        """Replace the stored Sharpe ratio and max drawdown with equity-curve ones
+
+        One batch over every address: each account's daily flows come from its
+        saved coin x day cube (already advanced this cycle), so no fill history is
+        reloaded. The curves are anchored on each current account value.
+        """
+        states = states or {}
+        if not addresses:
+            return
+        try:
+            cubes = [self._load_coin_cube(address) for address in addresses]
+            values = [_account_value(states.get(address)) for address in addresses]
+            risk = daily_equity_curves(cubes, values).risk_metrics()
+            for address, cube, metrics in zip(addresses, cubes, risk):
+                if cube.last_time >= 0:
+                    self.db.update_account_stats(address, {'sharpe_ratio': metrics['sharpe_ratio'],
+                                                           'max_drawdown': metrics['max_drawdown']})
+        except Exception as e:
+            self.db.session.rollback()
+            print(f"Warning: could not update risk metrics: {e}")
+
+    def update_population(self, performances: Dict[str, Dict]):
+        """Replace the stored 'tracked' population sketches with this cycle's performances
+
+        Every tracked account contributes its current metrics once, so the
+        sketches answer "which percentile is this account in" for the dashboard.
+        """
+        if not performances:
+            return
+        try:
+            sketches = MetricSketches().add_rows('tracked', performances.values())
+            self.db.save_metric_sketches('tracked', sketches.to_bytes(), sketches.VERSION, sketches.count)
+        except Exception as e:
+            self.db.session.rollback()
+            print(f"Warning: could not update population sketches: {e}")
 
     def get_best_performers(self, limit=10):
         """Get the best performing accounts based on criteria"""
@@ -147,6 +383,7 @@ class AccountTracker:
                 time.sleep(interval)
             except KeyboardInterrupt:
                 print("\nStopping tracker...")
+                self.pool.close()
                 break
             except Exception as e:
                 print(f"Error in tracking cycle: {e}")
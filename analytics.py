@@ -1,16 +1,107 @@
 import numpy as np
-from typing import Dict, List
-from collections import defaultdict
+from typing import Dict, List, Optional, Union
+from fills import Fill
+from fill_frame import FillFrame, as_frame
+from equity_curve import build_equity_curves
+from ranking import DEFAULT_RANKER, FeatureMatrix, Ranker, rank_indices
+from quantile_sketch import MetricSketches, sketch_values
+from round_trips import RoundTrips, reconstruct_round_trips, replay_fill
+
+
+def _sequential_sum(values: np.ndarray):
+    """Left-to-right sum, bit-identical to builtin sum() over the same floats (Python 3.11)"""
+    return float(np.cumsum(values)[-1]) if len(values) else 0
+
+
+def _longest_run(mask: np.ndarray) -> int:
+    """Length of the longest run of True values"""
+    if not mask.any():
+        return 0
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], mask, [False])).astype(np.int8)))
+    return int((edges[1::2] - edges[::2]).max())
+
 
 class PerformanceAnalytics:
-    def calculate_performance(self, fills: List[Dict], state: Dict = None) -> Dict:
-        """Calculate comprehensive performance metrics from fill history"""
+    def calculate_performance(self, fills: Union[FillFrame, List[Fill]], state: Dict = None,
+                              trips: RoundTrips = None) -> Dict:
+        """Calculate comprehensive performance metrics from fill history (Fills, raw dicts or a FillFrame)
+
+        A trade is a closed round trip (flat -> position -> flat), see round_trips.py;
+        pass trips when they were already reconstructed. total_pnl and total_volume
+        cover every fill, including partial exits of positions still open.
+
+        Vectorised: every metric comes from a fixed number of array passes.
+        Outputs match _calculate_performance_loop exactly.
+        """
+        if not len(fills):
+            return self._empty_performance()
+
+        frame = as_frame(fills)
+        if trips is None:
+            trips = reconstruct_round_trips(frame).closed()
+        # Contiguous copy (in close-time order): strided input changes np.mean's summation order
+        pnl = np.ascontiguousarray(trips.pnl)
+        total_trades = len(pnl)
+
+        win_mask = pnl > 0
+        wins = pnl[win_mask]
+        losses = pnl[pnl < 0]
+        winning_trades = len(wins)
+        losing_trades = len(losses)
+        win_rate = winning_trades / total_trades if total_trades > 0 else 0
+
+        total_pnl = _sequential_sum(frame.closed_pnl)
+        total_volume = _sequential_sum(frame.notional)
+
+        avg_win = np.mean(wins) if winning_trades else 0
+        avg_loss = abs(np.mean(losses)) if losing_trades else 0
+        profit_factor = _sequential_sum(wins) / abs(_sequential_sum(losses)) if losing_trades else float('inf')
+
+        # ROI against a volume-based capital estimate
+        estimated_capital = total_volume / 10 if total_volume > 0 else 1
+        roi = (total_pnl / estimated_capital) if estimated_capital > 0 else 0
+
+        sharpe_ratio = 0.0
+        if total_trades >= 2:
+            std = np.std(pnl)
+            if std != 0:
+                sharpe_ratio = np.mean(pnl) / std * np.sqrt(365)
+
+        max_drawdown = 0.0
+        if total_trades:
+            cumulative = np.cumsum(pnl)
+            peak = np.maximum.accumulate(cumulative)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                drawdown = np.where(peak != 0, (peak - cumulative) / np.abs(peak), 0.0)
+            max_drawdown = max(0, float(drawdown.max()))
+
+        return {
+            'total_trades': total_trades,
+            'winning_trades': winning_trades,
+            'losing_trades': losing_trades,
+            'win_rate': win_rate,
+            'total_pnl': total_pnl,
+            'total_volume': total_volume,
+            'avg_win': avg_win,
+            'avg_loss': avg_loss,
+            'profit_factor': profit_factor,
+            'roi': roi,
+            'sharpe_ratio': sharpe_ratio,
+            'max_drawdown': max_drawdown,
+            'max_consecutive_wins': _longest_run(win_mask),
+            'max_consecutive_losses': _longest_run(~win_mask),
+        }
 
-        if not fills:
+    def _calculate_performance_loop(self, fills: Union[FillFrame, List[Fill]], state: Dict = None) -> Dict:
+        """Pure-Python reference for calculate_performance (kept for parity tests and benchmarks)"""
+
+        if not len(fills):
             return self._empty_performance()
 
-        # Group fills by position
-        positions = self._group_fills_by_position(fills)
+        frame = as_frame(fills)
+
+        # Group fills into round trips
+        positions = self._group_fills_by_position(frame)
 
         # Calculate metrics
         total_trades = len(positions)
@@ -18,8 +109,8 @@ class PerformanceAnalytics:
         losing_trades = sum(1 for p in positions if p['pnl'] < 0)
         win_rate = winning_trades / total_trades if total_trades > 0 else 0
 
-        total_pnl = sum(p['pnl'] for p in positions)
-        total_volume = sum(abs(p['volume']) for p in positions)
+        total_pnl = sum(frame.closed_pnl.tolist())
+        total_volume = sum(px * sz for px, sz in zip(frame.px.tolist(), frame.sz.tolist()))
 
         # Calculate average win/loss
         wins = [p['pnl'] for p in positions if p['pnl'] > 0]
@@ -62,34 +153,33 @@ class PerformanceAnalytics:
             'max_consecutive_losses': max_consecutive_losses
         }
 
-    def _group_fills_by_position(self, fills: List[Dict]) -> List[Dict]:
-        """Group fills into complete positions (entry + exit)"""
+    def _group_fills_by_position(self, fills: Union[FillFrame, List[Fill]]) -> List[Dict]:
+        """Group fills into closed round trips by replaying each coin's position, in close order"""
+        frame = as_frame(fills)
+        open_trips = {}
         positions = []
-        position_tracker = defaultdict(list)
-
-        for fill in fills:
-            coin = fill.get('coin', '')
-            side = fill.get('side', '')
-            price = float(fill.get('px', 0))
-            size = float(fill.get('sz', 0))
-            time = fill.get('time', 0)
-
-            # Determine if this is opening or closing
-            # This is simplified - in reality, you'd need to track running position
-            pnl = fill.get('closedPnl', 0)
-
-            if pnl != 0:  # Position was closed
-                positions.append({
-                    'coin': coin,
-                    'pnl': float(pnl),
-                    'volume': price * size,
-                    'time': time
-                })
+
+        for row in zip(frame.coin_labels(frame.coin_id), frame.time.tolist(), frame.tid.tolist(),
+                       frame.side.tolist(), frame.px.tolist(), frame.sz.tolist(),
+                       frame.closed_pnl.tolist(), frame.fee.tolist(), frame.start_position.tolist()):
+            trip = replay_fill(open_trips, *row)
+            if trip is not None:
+                positions.append({'coin': trip['coin'], 'pnl': trip['pnl'], 'time': trip['close_time']})
 
         return positions
 
+    def calculate_risk_metrics(self, fills: Union[FillFrame, List[Fill]], account_value: float = None,
+                               bucket: str = '1d', funding: List[Dict] = None) -> Dict:
+        """Time-based Sharpe/Sortino/Calmar and drawdown depth/duration from a daily (or hourly) equity curve
+
+        See equity_curve.py; use build_equity_curves() directly to batch many accounts.
+        funding defaults to the payments merged into a FillFrame (FillFrame.with_funding()).
+        """
+        funding = [funding] if funding is not None else None
+        return build_equity_curves([fills], [account_value], bucket, funding).risk_metrics()[0]
+
     def _calculate_sharpe_ratio(self, returns: List[float], risk_free_rate: float = 0.0) -> float:
-        """Calculate Sharpe Ratio"""
+        """Calculate Sharpe Ratio (per round trip; see calculate_risk_metrics for a time-based one)"""
         if not returns or len(returns) < 2:
             return 0.0
 
@@ -176,32 +266,32 @@ class PerformanceAnalytics:
             'max_consecutive_losses': 0
         }
 
-    def rank_accounts(self, accounts: List[Dict]) -> List[Dict]:
-        """Rank accounts based on multiple criteria"""
+    def rank_accounts(self, accounts: List[Dict], limit: Optional[int] = None,
+                      ranker: Optional[Ranker] = None) -> List[Dict]:
+        """Rank accounts based on multiple criteria
+
+        Scores every account (stored in account['score']) with ranker, by
+        default win rate, capped ROI, Sharpe, profit factor and trade count,
+        and returns the best limit accounts (all when None).
+        """
         if not accounts:
             return []
 
-        # Scoring weights
-        weights = {
-            'win_rate': 0.3,
-            'roi': 0.3,
-            'sharpe_ratio': 0.2,
-            'profit_factor': 0.1,
-            'total_trades': 0.1
-        }
-
-        scored_accounts = []
+        ranker = ranker or DEFAULT_RANKER
+        scores = ranker.scores(FeatureMatrix.from_dicts(accounts, ranker.metrics))
+        for account, score in zip(accounts, scores.tolist()):
+            account['score'] = score
 
-        for account in accounts:
-            score = 0
-            score += account.get('win_rate', 0) * weights['win_rate'] * 100
-            score += min(account.get('roi', 0), 2) * weights['roi'] * 50  # Cap ROI at 200%
-            score += min(max(account.get('sharpe_ratio', 0), 0), 3) * weights['sharpe_ratio'] * 33
-            score += min(account.get('profit_factor', 0), 5) * weights['profit_factor'] * 20
-            score += min(account.get('total_trades', 0) / 100, 1) * weights['total_trades'] * 100
+        return [accounts[i] for i in rank_indices(scores, limit).tolist()]
 
-            account['score'] = score
-            scored_accounts.append(account)
+    def population_percentiles(self, metrics: Dict, population: MetricSketches,
+                               timeframe: str = 'tracked') -> Dict[str, float]:
+        """Where an account stands in a population: {metric: percentile 0-100}
 
-        # Sort by score
-        return sorted(scored_accounts, key=lambda x: x['score'], reverse=True)
+        metrics is a performance dict (or one timeframe of a multi-timeframe
+        analysis); population holds the sketched distributions, so the
+        lookup never sorts the other accounts.
+        """
+        if not metrics or population is None:
+            return {}
+        return population.percentiles(timeframe, sketch_values(metrics))
@@ -0,0 +1,242 @@
+"""
+Memoised analytics results keyed by fill-history watermark
+
+An account's metrics only change when its history does. Each computed bundle
+(multi-timeframe analysis, tracker performance, ...) is stored under
+
+    (kind, address) -> (watermark, ANALYTICS_VERSION, value)
+
+where the watermark is (last fill time, highest tid at that time, last
+funding payment time). A lookup with the same watermark and version is a hit.
+
+Two tiers: a size-bounded in-memory LRU in front of a local SQLite file
+(ANALYTICS_MEMO_DB), so results survive restarts and are shared by the
+dashboard, tracker and CLI processes. Only the newest watermark per account
+is kept: older ones can never be asked for again.
+
+lookup() answers "is this account unchanged?" before any history is fetched,
+by asking the API for fills and funding at or after the stored watermark
+(one small page each) instead of paging through the whole history.
+
+Windows relative to now (7d, 30d) drift even when the history does not, so
+entries also expire after ANALYTICS_MEMO_TTL seconds. Cached values are
+shared between callers and must be treated as read-only.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Optional, Tuple
+
+from config import Config
+from fill_frame import as_frame
+
+# Bump when any memoised bundle's keys or definitions change; older entries become misses
+ANALYTICS_VERSION = 1
+
+# (last fill time, highest tid at that time, last funding time); -1 where there is none
+Watermark = Tuple[int, int, int]
+
+_MISSING = object()
+
+
+def watermark(fills) -> Watermark:
+    """Watermark of a FillFrame (fills and merged funding), Fills or raw API dicts"""
+    frame = as_frame(fills)
+    last_time = last_tid = -1
+    if len(frame):
+        last_time = int(frame.time[-1])
+        last_tid = int(frame.tid[frame.time == last_time].max())
+    last_funding = int(frame.funding_time[-1]) if len(frame.funding) else -1
+    return (last_time, last_tid, last_funding)
+
+
+def probe_unchanged(api, address: str, mark: Watermark) -> bool:
+    """True when the API has no fill or funding payment past the watermark
+
+    Costs one userFillsByTime and one userFunding page starting at the
+    watermark, whatever the length of the history.
+    """
+    last_time, last_tid, last_funding = mark
+    fills = next(iter(api.iter_user_fills(address, start_time=max(last_time, 0))), [])
+    for fill in fills:
+        tid = fill.get('tid')
+        if fill.get('time', 0) > last_time or (tid is not None and tid > last_tid):
+            return False
+    funding = next(iter(api.iter_user_funding(address, start_time=last_funding + 1)), [])
+    return not funding
+
+
+class AnalyticsMemo:
+    """Two-tier (LRU memory, SQLite disk) store of analytics results by watermark"""
+
+    def __init__(self, max_entries: int = None, db_path: str = None, ttl: float = None,
+                 version: int = ANALYTICS_VERSION):
+        self.max_entries = max_entries or Config.ANALYTICS_MEMO_SIZE
+        self.ttl = ttl if ttl is not None else Config.ANALYTICS_MEMO_TTL
+        self.version = version
+        self._entries = OrderedDict()  # (kind, address) -> (watermark, stored_at, value)
+        self._lock = threading.Lock()
+
+        self.path = db_path if db_path is not None else Config.ANALYTICS_MEMO_DB
+        self._conn = None
+        if self.path:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS analytics_memo "
+                "(kind TEXT NOT NULL, address TEXT NOT NULL, version INTEGER NOT NULL, "
+                "watermark TEXT NOT NULL, stored_at REAL NOT NULL, value BLOB NOT NULL, "
+                "PRIMARY KEY (kind, address))"
+            )
+            self._conn.commit()
+
+        self.hits = defaultdict(int)
+        self.disk_reads = defaultdict(int)
+        self.misses = defaultdict(int)
+        self.evictions = 0
+        self.expirations = 0
+
+    # ---- tiers -----------------------------------------------------------
+
+    def _fresh(self, stored_at: float) -> bool:
+        return not self.ttl or time.time() - stored_at < self.ttl
+
+    def _remember(self, key, entry):
+        """Insert into the LRU tier (caller holds the lock)"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self, key) -> Optional[Tuple[Watermark, float, object]]:
+        """The newest entry for (kind, address): memory first, then disk (promoted on read)"""
+        entry = self._entries.get(key, _MISSING)
+        if entry is not _MISSING:
+            self._entries.move_to_end(key)
+            return entry
+        if self._conn is None:
+            return None
+        row = self._conn.execute(
+            "SELECT version, watermark, stored_at, value FROM analytics_memo WHERE kind = ? AND address = ?", key
+        ).fetchone()
+        if row is None or row[0] != self.version:
+            return None
+        entry = (tuple(int(x) for x in row[1].split(',')), row[2], pickle.loads(row[3]))
+        self._remember(key, entry)
+        self.disk_reads[key[0]] += 1
+        return entry
+
+    # ---- lookups ---------------------------------------------------------
+
+    def latest(self, kind: str, address: str) -> Optional[Tuple[Watermark, object]]:
+        """(watermark, value) of the newest unexpired entry, without counting a hit or miss"""
+        with self._lock:
+            entry = self._load((kind, address))
+            if entry is None or not self._fresh(entry[1]):
+                return None
+            return entry[0], entry[2]
+
+    def get(self, kind: str, address: str, mark: Optional[Watermark]) -> Tuple[bool, object]:
+        """(hit, value) for an account whose current watermark is already known
+
+        mark=None counts a miss without a lookup, for callers that already
+        know the history moved.
+        """
+        with self._lock:
+            entry = self._load((kind, address)) if mark is not None else None
+            if entry is not None and tuple(entry[0]) == tuple(mark):
+                if self._fresh(entry[1]):
+                    self.hits[kind] += 1
+                    return True, entry[2]
+                self.expirations += 1
+            self.misses[kind] += 1
+            return False, None
+
+    def lookup(self, kind: str, address: str, api) -> Tuple[bool, object]:
+        """(hit, value) without fetching the history: probes the API past the stored watermark"""
+        latest = self.latest(kind, address)
+        unchanged = False
+        if latest is not None:
+            try:
+                unchanged = probe_unchanged(api, address, latest[0])
+            except Exception:
+                unchanged = False
+        with self._lock:
+            if unchanged:
+                self.hits[kind] += 1
+                return True, latest[1]
+            self.misses[kind] += 1
+            return False, None
+
+    def put(self, kind: str, address: str, mark: Watermark, value):
+        """Store a result computed at mark, replacing the account's previous one"""
+        mark = tuple(int(x) for x in mark)
+        entry = (mark, time.time(), value)
+        with self._lock:
+            self._remember((kind, address), entry)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO analytics_memo (kind, address, version, watermark, stored_at, value) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (kind, address, self.version, ','.join(map(str, mark)), entry[1],
+                     pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+                )
+                self._conn.commit()
+
+    def invalidate(self, address: str = None):
+        """Forget one account's results, or everything when address is None"""
+        with self._lock:
+            if address is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[1] == address]:
+                    del self._entries[key]
+            if self._conn is not None:
+                if address is None:
+                    self._conn.execute("DELETE FROM analytics_memo")
+                else:
+                    self._conn.execute("DELETE FROM analytics_memo WHERE address = ?", (address,))
+                self._conn.commit()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = sum(self.hits.values())
+            misses = sum(self.misses.values())
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': hits,
+                'disk_reads': sum(self.disk_reads.values()),
+                'misses': misses,
+                'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'by_kind': {
+                    kind: {'hits': self.hits[kind], 'misses': self.misses[kind]}
+                    for kind in set(self.hits) | set(self.misses)
+                },
+            }
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+_shared_memo = None
+_shared_memo_lock = threading.Lock()
+
+
+def get_shared_memo() -> AnalyticsMemo:
+    """Process-wide analytics memo shared by the trackers and the dashboard"""
+    global _shared_memo
+    with _shared_memo_lock:
+        if _shared_memo is None:
+            _shared_memo = AnalyticsMemo()
+        return _shared_memo
@@ -0,0 +1,305 @@
+"""
+Async Hyperliquid Info API client built on aiohttp
+
+Mirrors HyperliquidAPI method-for-method so many accounts can be fetched
+concurrently under a semaphore cap instead of one at a time with sleeps.
+Requests go through the same layers as the sync client (shared rate
+limiter, response cache, coalescing of identical in-flight requests,
+retries with backoff and per-request-type circuit breakers), and failures
+raise the same classified APIError. fetch_many() returns the error per
+address, like HyperliquidAPI's *_many batch methods.
+"""
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Iterable
+
+import aiohttp
+
+from config import Config
+from hyperliquid_api import (APIError, CircuitOpenError, HyperliquidAPI, NetworkError, REQUEST_TIMEOUTS,
+                             ServerError, _error_for, _fills_request)
+from fills import parse_fills
+from rate_limiter import TokenBucket, get_shared_rate_limiter, request_weight, response_weight
+from response_cache import TTLCache, get_shared_cache
+from resilience import (CircuitBreakers, RequestMetrics, RetryBudget, RetryPolicy,
+                        get_shared_circuit_breakers, get_shared_request_metrics, get_shared_retry_budget)
+
+
+class AsyncHyperliquidAPI:
+    def __init__(self, use_testnet=False, max_concurrency: int = None, pool_size: int = None,
+                 rate_limiter: TokenBucket = None, cache: TTLCache = None, retry_policy: RetryPolicy = None,
+                 circuit_breakers: CircuitBreakers = None, metrics: RequestMetrics = None,
+                 retry_budget: RetryBudget = None):
+        self.base_url = Config.TESTNET_API_URL if use_testnet else Config.MAINNET_API_URL
+        self.info_url = f"{self.base_url}/info"
+        self.leaderboard_url = Config.LEADERBOARD_URL
+        self.max_concurrency = max_concurrency or Config.API_MAX_CONCURRENCY
+        self.pool_size = pool_size or Config.HTTP_POOL_SIZE
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.cache = cache or get_shared_cache()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breakers = circuit_breakers or get_shared_circuit_breakers()
+        self.metrics = metrics or get_shared_request_metrics()
+        self.retry_budget = retry_budget or get_shared_retry_budget()
+
+        self._semaphore = None
+        self._session = None
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+
+    @classmethod
+    def from_client(cls, client: HyperliquidAPI, max_concurrency: int = None) -> 'AsyncHyperliquidAPI':
+        """Async twin of a sync client: same URLs, rate limiter, cache, retries, breakers and metrics"""
+        api = cls(max_concurrency=max_concurrency, rate_limiter=client.rate_limiter, cache=client.cache,
+                  retry_policy=client.retry_policy, circuit_breakers=client.circuit_breakers,
+                  metrics=client.metrics, retry_budget=client.retry_budget)
+        api.base_url, api.info_url, api.leaderboard_url = client.base_url, client.info_url, client.leaderboard_url
+        return api
+
+    async def __aenter__(self):
+        await self._ensure_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        # Session and semaphore must be created inside the running event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={'Content-Type': 'application/json'}
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _timeout_for(self, endpoint: str) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(
+            sock_connect=Config.HTTP_CONNECT_TIMEOUT,
+            total=REQUEST_TIMEOUTS.get(endpoint, Config.HTTP_TIMEOUT)
+        )
+
+    async def _request(self, endpoint: str, data: Dict, use_cache: bool = True):
+        """POST to the Info API, raising APIError on failure
+
+        Served from the shared response cache while fresh; identical requests
+        in flight on this client share one upstream call.
+        """
+        request_key = (self.info_url, json.dumps(data, sort_keys=True))
+        cache_key = request_key if self.cache.ttl_for(endpoint) else None
+        if not use_cache:
+            return await self._fetch(endpoint, data, cache_key)
+
+        if cache_key is not None:
+            hit, value = self.cache.get(endpoint, cache_key)
+            if hit:
+                return value
+        task = self._inflight.get(request_key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(endpoint, data, cache_key))
+            self._inflight[request_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(request_key, None))
+        # One waiter being cancelled must not cancel the shared request
+        return await asyncio.shield(task)
+
+    async def _fetch(self, endpoint: str, data: Dict, cache_key=None):
+        """Send one Info API request and cache the result"""
+        result = await self._send(endpoint, 'POST', self.info_url, json=data)
+        # History endpoints cost extra weight per batch of items returned
+        await asyncio.to_thread(self.rate_limiter.charge, response_weight(endpoint, result))
+        if cache_key is not None:
+            self.cache.set(endpoint, cache_key, result)
+        return result
+
+    async def _send(self, endpoint: str, method: str, url: str, **kwargs):
+        """One request's decoded JSON, with rate limiting, retries and the endpoint's circuit breaker
+
+        Same policy as HyperliquidAPI._send(): 429, 5xx and network failures
+        are retried with jittered backoff while the retry budget allows.
+        """
+        session = await self._ensure_session()
+        self.retry_budget.record_request()
+        attempt = 0
+        while True:
+            if not self.circuit_breakers.allow(endpoint):
+                self.metrics.observe(endpoint, 'circuit_open')
+                raise CircuitOpenError(endpoint, "circuit open after repeated failures")
+
+            async with self._semaphore:
+                # SQLite-backed limiters do blocking I/O: reserve off the event loop, wait on it
+                wait = await asyncio.to_thread(self.rate_limiter.reserve, request_weight(endpoint))
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                started = time.perf_counter()
+                result = None
+                try:
+                    async with session.request(method, url, timeout=self._timeout_for(endpoint),
+                                               **kwargs) as response:
+                        error = _error_for(endpoint, response.status, response.reason, response.headers)
+                        if error is None:
+                            result = await response.json(content_type=None)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = NetworkError(endpoint, str(e) or type(e).__name__)
+                except ValueError as e:
+                    error = ServerError(endpoint, f"invalid JSON response: {e}")
+            elapsed = time.perf_counter() - started
+
+            if error is None:
+                self.metrics.observe(endpoint, 'ok', elapsed)
+                self.circuit_breakers.record_success(endpoint)
+                return result
+
+            self.metrics.observe(endpoint, error.outcome, elapsed)
+            if error.retryable:
+                self.circuit_breakers.record_failure(endpoint)
+            else:
+                self.circuit_breakers.record_success(endpoint)  # the service answered
+
+            attempt += 1
+            if (not error.retryable or attempt >= self.retry_policy.max_attempts
+                    or not self.retry_budget.try_spend()):
+                raise error
+            self.metrics.record_retry(endpoint)
+            await asyncio.sleep(self.retry_policy.delay(attempt - 1, getattr(error, 'retry_after', None)))
+
+    async def _post(self, endpoint: str, data: Dict, use_cache: bool = True) -> Dict:
+        """Make a POST request to the Hyperliquid API (raises APIError on failure)"""
+        return await self._request(endpoint, data, use_cache=use_cache)
+
+    async def _post_list(self, endpoint: str, data: Dict) -> List[Dict]:
+        result = await self._post(endpoint, data)
+        return result if isinstance(result, list) else []
+
+    async def get_user_state(self, address: str, use_cache: bool = True) -> Dict:
+        """Get current state for a user address"""
+        return await self._post("clearinghouseState", {"type": "clearinghouseState", "user": address},
+                                use_cache=use_cache)
+
+    async def get_user_fills(self, address: str, start_time: Optional[int] = None, typed: bool = False) -> List:
+        """Get fill history for a user (raw dicts, or Fills with typed=True)"""
+        data = _fills_request(address, start_time)
+        fills = await self._post_list(data["type"], data)
+        return parse_fills(fills) if typed else fills
+
+    async def get_user_fills_by_time(self, address: str, hours: int = 24, typed: bool = False) -> List:
+        """Get recent fills for a user within specified hours"""
+        start_time = int((datetime.now() - timedelta(hours=hours)).timestamp() * 1000)
+        return await self.get_user_fills(address, start_time, typed=typed)
+
+    async def get_user_funding(self, address: str, start_time: Optional[int] = None) -> List[Dict]:
+        """Get funding payment history for a user"""
+        data = {"type": "userFunding", "user": address}
+        if start_time:
+            data["startTime"] = start_time
+        return await self._post_list("userFunding", data)
+
+    async def get_user_non_funding_ledger_updates(self, address: str, start_time: Optional[int] = None) -> List[Dict]:
+        """Get non-funding ledger updates (deposits, withdrawals, etc.)"""
+        data = {"type": "userNonFundingLedgerUpdates", "user": address}
+        if start_time:
+            data["startTime"] = start_time
+        return await self._post_list("userNonFundingLedgerUpdates", data)
+
+    async def get_open_orders(self, address: str) -> List[Dict]:
+        """Get open orders for a user"""
+        return await self._post_list("openOrders", {"type": "openOrders", "user": address})
+
+    async def get_user_token_balances(self, address: str) -> Dict:
+        """Get token balances for a user"""
+        return await self._post("spotClearinghouseState", {"type": "spotClearinghouseState", "user": address})
+
+    async def get_meta(self) -> Dict:
+        """Get exchange metadata including available assets"""
+        return await self._post("meta", {"type": "meta"})
+
+    async def get_all_mids(self) -> Dict:
+        """Get current mid prices for all assets"""
+        return await self._post("allMids", {"type": "allMids"})
+
+    async def get_funding_history(self, coin: str, start_time: Optional[int] = None) -> List[Dict]:
+        """Get funding rate history for a coin"""
+        data = {"type": "fundingHistory", "coin": coin}
+        if start_time:
+            data["startTime"] = start_time
+        return await self._post_list("fundingHistory", data)
+
+    async def get_candles_snapshot(self, coin: str, interval: str, start_time: int, end_time: int) -> List[Dict]:
+        """Get historical candles"""
+        data = {
+            "type": "candleSnapshot",
+            "req": {"coin": coin, "interval": interval, "startTime": start_time, "endTime": end_time}
+        }
+        return await self._post_list("candleSnapshot", data)
+
+    async def get_leaderboard(self) -> List[Dict]:
+        """Get the real Hyperliquid leaderboard from stats API"""
+        data = await self._send('leaderboard', 'GET', self.leaderboard_url)
+        if not isinstance(data, dict) or 'leaderboardRows' not in data:
+            raise ServerError('leaderboard', "unexpected leaderboard format")
+        return data['leaderboardRows']
+
+    parse_leaderboard_entry = HyperliquidAPI.parse_leaderboard_entry
+
+    async def fetch_many(self, method: str, addresses: Iterable[str], **kwargs) -> Dict[str, object]:
+        """Call a per-address method for many addresses concurrently
+
+        Concurrency is bounded by the client's semaphore; results are keyed by
+        address, and failed addresses map to their APIError.
+        """
+        addresses = list(dict.fromkeys(addresses))
+        func = getattr(self, method)
+
+        async def call(address):
+            try:
+                return await func(address, **kwargs)
+            except APIError as e:
+                return e
+
+        results = await asyncio.gather(*(call(address) for address in addresses))
+        return dict(zip(addresses, results))
+
+
+def run_sync(coro):
+    """Run a coroutine to completion from synchronous code
+
+    Uses asyncio.run() normally; if the caller is already inside an event loop
+    the coroutine runs on a private loop in a helper thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+def fetch_many_sync(method: str, addresses: Iterable[str], use_testnet=False,
+                    max_concurrency: int = None, client: HyperliquidAPI = None, **kwargs) -> Dict[str, object]:
+    """Blocking helper: fetch one API method for many addresses concurrently
+
+    With client, requests share that sync client's URLs and resilience layers.
+
+    Example:
+        states = fetch_many_sync('get_user_state', addresses, max_concurrency=16)
+    """
+    addresses = list(addresses)
+    if not addresses:
+        return {}
+
+    async def _run():
+        api = (AsyncHyperliquidAPI.from_client(client, max_concurrency) if client is not None
+               else AsyncHyperliquidAPI(use_testnet=use_testnet, max_concurrency=max_concurrency))
+        async with api:
+            return await api.fetch_many(method, addresses, **kwargs)
+
+    return run_sync(_run())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: raw fill dicts re-parsed per consumer vs Fills parsed once
+
+Generates a synthetic userFills payload (100k fills by default) with
+SyntheticMarket and compares two ways of holding and consuming it:
+
+  dict  - keep the decoded dicts; every consumer pass does float(fill.get(...))
+          (what analytics, multi-timeframe analytics, the copy worker and the
+          dashboard each used to do)
+  fill  - parse_fills() once at ingestion, then consumer passes read attributes
+
+Memory is the Python heap retained per fill once the raw payload is dropped
+(tracemalloc). CPU is ns per fill for a single consumer pass, then totals for
+1-10 passes with the one-off parse charged to the fill path (a multi-timeframe
+run made 6: PnL metrics twice for each of three windows).
+
+Usage:
+    python benchmarks/bench_fill_parse.py [--fills 100000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_hyperliquid import SyntheticMarket  # noqa: E402
+from fills import parse_fills  # noqa: E402
+
+PASSES = (1, 3, 6, 10)
+REPEATS = 3
+
+
+def synthetic_payload(n: int) -> bytes:
+    market = SyntheticMarket(seed=7, fills_per_user=n)
+    fills = market._user(market.address(0))['fills']
+    return json.dumps(fills).encode()
+
+
+def dict_pass(fills) -> float:
+    total = 0.0
+    for fill in fills:
+        px = float(fill.get('px', 0))
+        sz = float(fill.get('sz', 0))
+        pnl = float(fill.get('closedPnl', 0))
+        fee = float(fill.get('fee', 0))
+        if pnl != 0 and fill.get('coin', '') and fill.get('time', 0):
+            total += pnl
+        total += px * sz - fee
+    return total
+
+
+def fill_pass(fills) -> float:
+    total = 0.0
+    for fill in fills:
+        pnl = fill.closed_pnl
+        if pnl != 0 and fill.coin and fill.time:
+            total += pnl
+        total += fill.px * fill.sz - fill.fee
+    return total
+
+
+def retained_bytes(payload: bytes, typed: bool) -> int:
+    """Heap still held by the fills after the wire payload is gone"""
+    gc.collect()
+    tracemalloc.start()
+    fills = json.loads(payload)
+    if typed:
+        fills = parse_fills(fills)
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del fills
+    return held
+
+
+def best_time(func) -> float:
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fill parse benchmark')
+    parser.add_argument('--fills', type=int, default=100000)
+    args = parser.parse_args()
+
+    payload = synthetic_payload(args.fills)
+    raw = json.loads(payload)
+    n = len(raw)
+    print(f"Synthetic userFills: {n:,} fills, {len(payload) / 1e6:.1f} MB\n")
+
+    dict_mem = retained_bytes(payload, typed=False) / n
+    fill_mem = retained_bytes(payload, typed=True) / n
+    print(f"retained heap per fill: dict {dict_mem:,.0f} B, Fill {fill_mem:,.0f} B "
+          f"({dict_mem / fill_mem:.1f}x smaller)\n")
+
+    parse_s = best_time(lambda: parse_fills(raw))
+    typed = parse_fills(raw)
+    dict_pass_s = best_time(lambda: dict_pass(raw))
+    fill_pass_s = best_time(lambda: fill_pass(typed))
+    print(f"one-off parse_fills: {parse_s / n * 1e9:,.0f} ns/fill")
+    print(f"one consumer pass:   dict {dict_pass_s / n * 1e9:,.0f} ns/fill, "
+          f"Fill {fill_pass_s / n * 1e9:,.0f} ns/fill ({dict_pass_s / fill_pass_s:.1f}x faster)\n")
+
+    print(f"{'passes':>6} {'dict ns/fill':>14} {'fill ns/fill':>14} {'speedup':>9}")
+    for passes in PASSES:
+        dict_s = dict_pass_s * passes
+        fill_s = parse_s + fill_pass_s * passes
+        print(f"{passes:>6} {dict_s / n * 1e9:>14,.0f} {fill_s / n * 1e9:>14,.0f} {dict_s / fill_s:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-cycle cost of incremental vs full-recompute account analytics
+
+For an account with H fills of history and K new fills per tracking cycle:
+
+  full         - calculate_performance over all H + K fills (previous cycle cost)
+  incremental  - PerformanceAccumulator.update(K new fills) + metrics()
+  restore      - the same, plus loading the accumulator from its JSON state
+
+Usage:
+    python benchmarks/bench_incremental.py [--history 10000 100000] [--new 10 100 1000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from analytics import PerformanceAnalytics  # noqa: E402
+from online_analytics import PerformanceAccumulator  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_performance import best_time, synthetic_frame  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='incremental analytics benchmark')
+    parser.add_argument('--history', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--new', type=int, nargs='+', default=[10, 100, 1_000])
+    args = parser.parse_args()
+
+    analytics = PerformanceAnalytics()
+    print(f"{'history':>10} {'new':>6} {'full':>10} {'incremental':>12} {'restore':>10} {'speedup':>8}")
+    for history in args.history:
+        for new in args.new:
+            frame = synthetic_frame(history + new)
+            old, fresh = frame._view(frame.data[:history]), frame._view(frame.data[history:])
+
+            base = PerformanceAccumulator()
+            base.update(old)
+            state = json.dumps(base.to_dict())
+
+            def incremental():
+                acc = PerformanceAccumulator.from_dict(json.loads(state))
+                acc.update(fresh)
+                return acc.metrics()
+
+            full_s = best_time(lambda: analytics.calculate_performance(frame), 5)
+            restore_s = best_time(incremental, 5)
+            acc = PerformanceAccumulator.from_dict(json.loads(state))
+            start = time.perf_counter()
+            acc.update(fresh)
+            acc.metrics()
+            inc_s = time.perf_counter() - start
+            print(f"{history:>10,} {new:>6,} {full_s * 1e3:>8.2f}ms {inc_s * 1e3:>10.3f}ms "
+                  f"{restore_s * 1e3:>8.3f}ms {full_s / restore_s:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full-load vs streaming leaderboard parsing
+
+Builds a synthetic stats-data leaderboard (50k rows by default), then parses
+it in a fresh subprocess per path so each peak RSS is measured in isolation:
+
+  json    - response.json() + parse_leaderboard_entry() per row (current path)
+  stream  - parse_leaderboard_stream() over 64 KB chunks into LeaderboardRecords
+
+Peak RSS is reported above an imports-only baseline process. Parse time is
+taken from an untraced run; the Python heap peak from a tracemalloc run.
+
+Usage:
+    python benchmarks/bench_leaderboard_parse.py [--rows 50000]
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WINDOWS = ('day', 'week', 'month', 'allTime')
+
+
+def synthetic_leaderboard(rows: int, seed: int = 7) -> bytes:
+    rng = random.Random(seed)
+    entries = []
+    for i in range(rows):
+        entries.append({
+            'ethAddress': '0x' + format(rng.getrandbits(160), '040x'),
+            'accountValue': f"{rng.uniform(1e3, 1e8):.6f}",
+            'displayName': f"trader{i}" if rng.random() < 0.1 else None,
+            'prize': 0,
+            'windowPerformances': [
+                [window, {'pnl': f"{rng.uniform(-1e6, 1e6):.6f}",
+                          'roi': f"{rng.uniform(-1, 5):.8f}",
+                          'vlm': f"{rng.uniform(0, 1e9):.2f}"}]
+                for window in WINDOWS
+            ],
+        })
+    return json.dumps({'leaderboardRows': entries}).encode()
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _parse(mode: str, path: str) -> list:
+    from hyperliquid_api import HyperliquidAPI
+    from leaderboard_stream import parse_leaderboard_stream, STREAM_CHUNK_SIZE
+
+    if mode == 'imports':
+        return []
+    with open(path, 'rb') as f:
+        if mode == 'json':
+            # response.json() reads the whole body, then decodes it in one go
+            rows = json.loads(f.read())['leaderboardRows']
+            # parse_leaderboard_entry does not touch self; skip building a client
+            return [HyperliquidAPI.parse_leaderboard_entry(None, row) for row in rows]
+        return list(parse_leaderboard_stream(iter(lambda: f.read(STREAM_CHUNK_SIZE), b'')))
+
+
+def run_path(mode: str, path: str, trace: bool):
+    """Parse the payload one way and print JSON stats (runs in a subprocess)"""
+    import hyperliquid_api  # noqa: F401  (imports are part of the baseline, not the parse)
+
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    parsed = _parse(mode, path)
+    elapsed = time.perf_counter() - start
+    heap_peak = tracemalloc.get_traced_memory()[1] / 1e6 if trace else None
+    print(json.dumps({
+        'mode': mode,
+        'rows': len(parsed),
+        'seconds': elapsed,
+        'peak_rss_mb': _peak_rss_mb(),
+        'heap_peak_mb': heap_peak,
+    }))
+
+
+def _run_subprocess(mode: str, path: str, trace: bool = False) -> dict:
+    cmd = [sys.executable, __file__, '--run', mode, '--payload', path]
+    if trace:
+        cmd.append('--trace')
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Leaderboard parse benchmark')
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--run', choices=['imports', 'json', 'stream'], help=argparse.SUPPRESS)
+    parser.add_argument('--payload', help=argparse.SUPPRESS)
+    parser.add_argument('--trace', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_path(args.run, args.payload, args.trace)
+        return
+
+    payload = synthetic_leaderboard(args.rows)
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+        f.write(payload)
+    try:
+        print(f"Synthetic leaderboard: {args.rows:,} rows, {len(payload) / 1e6:.1f} MB\n")
+        baseline = _run_subprocess('imports', f.name)['peak_rss_mb']
+        print(f"Imports-only baseline peak RSS: {baseline:.1f} MB\n")
+        print(f"{'path':<8} {'parse time':>12} {'peak RSS +':>12} {'heap peak':>12}")
+        results = {}
+        for mode in ('json', 'stream'):
+            result = _run_subprocess(mode, f.name)
+            result['heap_peak_mb'] = _run_subprocess(mode, f.name, trace=True)['heap_peak_mb']
+            result['rss_over_baseline_mb'] = max(result['peak_rss_mb'] - baseline, 0.0)
+            results[mode] = result
+            print(f"{mode:<8} {result['seconds']:>11.2f}s {result['rss_over_baseline_mb']:>10.1f}MB "
+                  f"{result['heap_peak_mb']:>10.1f}MB")
+
+        json_run, stream_run = results['json'], results['stream']
+        print(f"\nheap peak json/stream: {json_run['heap_peak_mb'] / stream_run['heap_peak_mb']:.1f}x, "
+              f"parse time json/stream: {json_run['seconds'] / stream_run['seconds']:.2f}x")
+    finally:
+        os.unlink(f.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark: batch analytics across accounts, serial vs the process pool
+
+Each account gets its own synthetic FillFrame. The pool column includes
+packing the frames into shared memory; the pool itself is started once and
+reused, as a tracker reuses it across cycles.
+
+Usage:
+    python benchmarks/bench_parallel.py [--accounts 32] [--fills 50000] [--workers 2 4 8]
+"""
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from parallel_analytics import AnalyticsPool  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_performance import best_time, synthetic_frame  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='parallel analytics benchmark')
+    parser.add_argument('--accounts', type=int, default=32)
+    parser.add_argument('--fills', type=int, default=50_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 8])
+    parser.add_argument('--analysis', default='multi_timeframe', choices=['performance', 'multi_timeframe'])
+    args = parser.parse_args()
+
+    frames = [synthetic_frame(args.fills, seed=i) for i in range(args.accounts)]
+    print(f"{args.accounts} accounts x {args.fills:,} fills, {args.analysis}, {os.cpu_count()} CPUs")
+
+    with AnalyticsPool(workers=1) as serial:
+        serial_s = best_time(lambda: serial.analyze_many(frames, args.analysis), 1)
+    print(f"{'workers':>8} {'time':>10} {'speedup':>8}")
+    print(f"{1:>8} {serial_s:>9.2f}s {1:>7.1f}x")
+    for workers in args.workers:
+        with AnalyticsPool(workers) as pool:
+            pool.analyze_many(frames[:workers], args.analysis)  # start the workers
+            pool_s = best_time(lambda: pool.analyze_many(frames, args.analysis), 2)
+        print(f"{workers:>8} {pool_s:>9.2f}s {serial_s / pool_s:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vectorised calculate_performance vs the Python reference loop
+
+Builds N synthetic fills (1k, 100k and 1M by default; open/close pairs, so
+N/2 round trips) and times:
+
+  loop    - _calculate_performance_loop over a list of Fills (per-fill position replay)
+  list    - calculate_performance over the same list (includes array build)
+  frame   - calculate_performance over a FillFrame (columnar input)
+  trips   - reconstruct_round_trips alone over the FillFrame
+
+Each size also checks that all three return identical metrics.
+
+Usage:
+    python benchmarks/bench_performance.py [--sizes 1000 100000 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from analytics import PerformanceAnalytics  # noqa: E402
+from fill_frame import FILL_DTYPE, FillFrame  # noqa: E402
+from fills import Fill  # noqa: E402
+from round_trips import reconstruct_round_trips  # noqa: E402
+
+COINS = ['BTC', 'ETH', 'SOL', 'HYPE']
+
+
+def synthetic_frame(n: int, seed: int = 7) -> FillFrame:
+    rng = np.random.default_rng(seed)
+    data = np.empty(n, dtype=FILL_DTYPE)
+    data['time'] = 1_700_000_000_000 + np.sort(rng.integers(0, 90 * 86_400_000, n))
+    data['tid'] = np.arange(n)
+    # Consecutive fills pair up: open a position, then close it in full
+    pair = np.arange(n) // 2
+    closing = np.arange(n) % 2 == 1
+    direction = rng.choice([-1, 1], n // 2 + 1)[pair]
+    size = rng.uniform(0.001, 10, n // 2 + 1)[pair]
+    data['coin'] = rng.integers(0, len(COINS), n // 2 + 1)[pair]
+    data['side'] = np.where(closing, -direction, direction)
+    data['px'] = rng.uniform(1, 1e5, n)
+    data['sz'] = size
+    pnl = np.round(rng.normal(5, 200, n), 4)
+    pnl[pnl == 0] = 0.01
+    data['closed_pnl'] = np.where(closing, pnl, 0.0)
+    data['fee'] = data['px'] * data['sz'] * 0.00035
+    data['start_position'] = np.where(closing, direction * size, 0.0)
+    return FillFrame(data, COINS, _sorted=True)
+
+
+def as_fill_list(frame: FillFrame):
+    coins = frame.coins
+    return [Fill(t, coins[c], 'B' if s > 0 else 'A', px, sz, pnl, fee, sp, '', tid)
+            for t, tid, c, s, px, sz, pnl, fee, sp in frame.data.tolist()]
+
+
+def best_time(func, repeats: int) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='calculate_performance benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    analytics = PerformanceAnalytics()
+    print(f"{'fills':>10} {'loop':>10} {'list':>10} {'frame':>10} {'trips':>10} {'loop/frame':>11}")
+    for n in args.sizes:
+        frame = synthetic_frame(n)
+        fills = as_fill_list(frame)
+        repeats = 5 if n <= 100_000 else 2
+
+        expected = analytics._calculate_performance_loop(fills)
+        assert analytics.calculate_performance(fills) == expected, "list results differ"
+        assert analytics.calculate_performance(frame) == expected, "frame results differ"
+
+        loop_s = best_time(lambda: analytics._calculate_performance_loop(fills), repeats)
+        list_s = best_time(lambda: analytics.calculate_performance(fills), repeats)
+        frame_s = best_time(lambda: analytics.calculate_performance(frame), repeats)
+        trips_s = best_time(lambda: reconstruct_round_trips(frame), repeats)
+        print(f"{n:>10,} {loop_s * 1e3:>8.1f}ms {list_s * 1e3:>8.1f}ms {frame_s * 1e3:>8.2f}ms "
+              f"{trips_s * 1e3:>8.2f}ms {loop_s / frame_s:>10.0f}x")
+    print("\nall engines returned identical metrics")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cross-account ranking over a synthetic leaderboard
+
+  sort      - previous behaviour: to_dict() every record, filter, full sort, slice
+  features  - building the FeatureMatrix from records (once per leaderboard snapshot)
+  top-k     - top_records() on a cached matrix (the dashboard /api/top path)
+  score     - rank_accounts() on analysed account dicts, legacy loop vs Ranker
+
+Usage:
+    python benchmarks/bench_ranking.py [--accounts 30000] [--k 10 100]
+"""
+
+import argparse
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from analytics import PerformanceAnalytics  # noqa: E402
+from leaderboard_stream import LeaderboardRecord, WINDOWS  # noqa: E402
+from ranking import FeatureMatrix, top_records  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_performance import best_time  # noqa: E402
+
+
+def synthetic_records(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        windows = []
+        for _ in WINDOWS:
+            if rng.random() < 0.1:
+                windows += [None, None, None]
+            else:
+                windows += [rng.gauss(0, 1e5), rng.gauss(0, 0.5), abs(rng.gauss(0, 1e7))]
+        records.append(LeaderboardRecord(f'0x{i:040x}', None, abs(rng.gauss(0, 1e6)), *windows))
+    return records
+
+
+def legacy_top(records, timeframe, metric, k):
+    parsed = [record.to_dict() for record in records]
+    valid = [a for a in parsed if timeframe in a and a[timeframe].get(metric) is not None]
+    valid.sort(key=lambda x: x[timeframe].get(metric, 0), reverse=True)
+    return valid[:k]
+
+
+def legacy_rank_accounts(accounts):
+    for account in accounts:
+        score = 0
+        score += account.get('win_rate', 0) * 0.3 * 100
+        score += min(account.get('roi', 0), 2) * 0.3 * 50
+        score += min(max(account.get('sharpe_ratio', 0), 0), 3) * 0.2 * 33
+        score += min(account.get('profit_factor', 0), 5) * 0.1 * 20
+        score += min(account.get('total_trades', 0) / 100, 1) * 0.1 * 100
+        account['score'] = score
+    return sorted(accounts, key=lambda x: x['score'], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ranking benchmark')
+    parser.add_argument('--accounts', type=int, default=30_000)
+    parser.add_argument('--k', type=int, nargs='+', default=[10, 100])
+    args = parser.parse_args()
+
+    records = synthetic_records(args.accounts)
+    features_s = best_time(lambda: FeatureMatrix.from_records(records), 3)
+    print(f"{args.accounts:,} accounts, FeatureMatrix build {features_s * 1e3:.1f}ms")
+
+    print(f"{'k':>6} {'sort':>10} {'top-k':>10} {'speedup':>8}")
+    for k in args.k:
+        assert [r.to_dict() for r in top_records(records, 'week', 'pnl', k)] == legacy_top(records, 'week', 'pnl', k)
+        sort_s = best_time(lambda: legacy_top(records, 'week', 'pnl', k), 3)
+        topk_s = best_time(lambda: top_records(records, 'week', 'pnl', k), 20)
+        print(f"{k:>6,} {sort_s * 1e3:>8.1f}ms {topk_s * 1e3:>8.2f}ms {sort_s / topk_s:>7.0f}x")
+
+    rng = random.Random(1)
+    accounts = [{'win_rate': rng.random(), 'roi': rng.gauss(0, 1), 'sharpe_ratio': rng.gauss(1, 1),
+                 'profit_factor': rng.expovariate(0.5), 'total_trades': rng.randrange(500)}
+                 for _ in range(args.accounts)]
+    analytics = PerformanceAnalytics()
+    loop_s = best_time(lambda: legacy_rank_accounts(accounts), 3)
+    ranker_s = best_time(lambda: analytics.rank_accounts(accounts, limit=args.k[0]), 3)
+    print(f"rank_accounts: loop {loop_s * 1e3:.1f}ms, ranker {ranker_s * 1e3:.1f}ms ({loop_s / ranker_s:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
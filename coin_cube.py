@@ -0,0 +1,231 @@
+"""
+Per-trader coin x day aggregate cube
+
+CoinDayCube keeps one float64 array of shape (fields, coins, days):
+
+    pnl        realized PnL of the day's fills (closedPnl)
+    volume     traded notional (px * |sz|)
+    fees       fees paid (negative for maker rebates)
+    fills      number of fills
+    trades     round trips closed that day
+    trade_pnl  PnL of those round trips (what best/worst coin ranks by)
+    funding    funding received (negative when paid), from FillFrame.funding
+
+Fills fold in incrementally behind a cursor (last fill time and the tids seen
+at it), the same way PerformanceAccumulator de-duplicates overlapping
+fetches; funding payments behind their own last-payment-time cursor. The
+cube is persisted as a compressed .npz blob. Per-coin or per-period roll-ups
+are slices and sums over the day axis, so per-coin breakdowns, coin
+leaderboards, "best coin over any window" queries and daily equity curves
+never rescan fills. Windows are whole UTC days.
+"""
+
+import io
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from fill_frame import as_frame
+from ranking import rank_indices
+from round_trips import RoundTrips, reconstruct_round_trips
+
+DAY_MS = 86_400_000
+
+FIELDS = ('pnl', 'volume', 'fees', 'fills', 'trades', 'trade_pnl', 'funding')
+_FIELD = {name: i for i, name in enumerate(FIELDS)}
+
+
+class CoinDayCube:
+    """coin x day PnL, volume, fees and trade counts for one trader"""
+
+    # Bump when FIELDS or their definitions change; older blobs are rebuilt
+    VERSION = 3
+
+    def __init__(self):
+        self.coins: List[str] = []
+        self._coin_ids: Dict[str, int] = {}
+        self.first_day = 0
+        self.values = np.zeros((len(FIELDS), 0, 0))
+        self.last_time = -1
+        self.last_tids: List[int] = []
+        self.last_funding_time = -1
+
+    @classmethod
+    def from_frame(cls, fills, trips: RoundTrips = None) -> 'CoinDayCube':
+        """Cube over a full fill history (round trips reconstructed unless given)"""
+        frame = as_frame(fills)
+        cube = cls()
+        cube.update(frame, trips if trips is not None else reconstruct_round_trips(frame).closed())
+        return cube
+
+    # ---- updates ---------------------------------------------------------
+
+    @property
+    def days(self) -> int:
+        return self.values.shape[2]
+
+    def _grow(self, coins: Sequence[str], first_day: int, last_day: int):
+        """Make room for new coins and days outside the current range"""
+        for coin in coins:
+            if coin not in self._coin_ids:
+                self._coin_ids[coin] = len(self.coins)
+                self.coins.append(coin)
+        if not self.days:
+            self.first_day = first_day
+        before = max(self.first_day - first_day, 0)
+        after = max(last_day - (self.first_day + self.days - 1), 0)
+        extra_coins = len(self.coins) - self.values.shape[1]
+        if before or after or extra_coins:
+            self.values = np.pad(self.values, ((0, 0), (0, extra_coins), (before, after)))
+            self.first_day -= before
+
+    def _add(self, field: str, coin_ids: np.ndarray, days: np.ndarray, weights: np.ndarray):
+        flat = coin_ids * self.days + (days - self.first_day)
+        np.add.at(self.values[_FIELD[field]].reshape(-1), flat, weights)
+
+    def update(self, fills, closed_trips: Union[RoundTrips, List[Dict], None] = None) -> int:
+        """Fold in fills newer than the cursor and the round trips they closed; returns fills added
+
+        closed_trips are taken as new (PerformanceAccumulator.update() returns
+        each closed trip once). Funding payments merged into the frame are
+        folded in when newer than the last one seen.
+        """
+        frame = as_frame(fills)
+        funding = frame.funding[frame.funding_time > self.last_funding_time]
+        frame = frame.between(self.last_time)
+        if len(frame) and self.last_tids:
+            # Fills without a tid (-1) cannot be told apart, so they are never dropped
+            fresh = ~((frame.time == self.last_time) & (frame.tid >= 0) & np.isin(frame.tid, self.last_tids))
+            frame = frame._view(frame.data[fresh])
+
+        trips = closed_trips.to_dicts() if isinstance(closed_trips, RoundTrips) else (closed_trips or [])
+        trip_coins = [trip['coin'] for trip in trips]
+        trip_days = np.array([trip['close_time'] for trip in trips], dtype=np.int64) // DAY_MS
+
+        if not len(frame) and not trips and not len(funding):
+            return 0
+        fill_days = frame.time // DAY_MS
+        funding_days = funding['time'] // DAY_MS
+        day_bounds = np.concatenate((fill_days, trip_days, funding_days))
+        self._grow(frame.coins + trip_coins, int(day_bounds.min()), int(day_bounds.max()))
+        remap = np.array([self._coin_ids[coin] for coin in frame.coins], dtype=np.int64)
+
+        if len(frame):
+            coin_ids = remap[frame.coin_id]
+            self._add('pnl', coin_ids, fill_days, frame.closed_pnl)
+            self._add('volume', coin_ids, fill_days, frame.px * np.abs(frame.sz))
+            self._add('fees', coin_ids, fill_days, frame.fee)
+            self._add('fills', coin_ids, fill_days, np.ones(len(frame)))
+
+            last_time = int(frame.time[-1])
+            tids = frame.tid[frame.time == last_time].tolist()
+            self.last_tids = sorted(set(tids) | set(self.last_tids)) if last_time == self.last_time else sorted(tids)
+            self.last_time = last_time
+
+        if trips:
+            coin_ids = np.array([self._coin_ids[coin] for coin in trip_coins], dtype=np.int64)
+            self._add('trades', coin_ids, trip_days, np.ones(len(trips)))
+            self._add('trade_pnl', coin_ids, trip_days, np.array([trip['pnl'] for trip in trips], dtype=np.float64))
+
+        if len(funding):
+            self._add('funding', remap[funding['coin']], funding_days, funding['usdc'])
+            self.last_funding_time = int(funding['time'][-1])
+        return len(frame)
+
+    # ---- queries ---------------------------------------------------------
+
+    def _day_slice(self, start_ms: Optional[float], end_ms: Optional[float]) -> slice:
+        """Day columns overlapping [start_ms, end_ms]"""
+        lo = 0 if start_ms is None else int(start_ms // DAY_MS) - self.first_day
+        hi = self.days if end_ms is None else int(end_ms // DAY_MS) - self.first_day + 1
+        return slice(min(max(lo, 0), self.days), min(max(hi, 0), self.days))
+
+    def totals(self, start_ms: Optional[float] = None, end_ms: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """{field: per-coin totals over the window}, indexed like self.coins"""
+        summed = self.values[:, :, self._day_slice(start_ms, end_ms)].sum(axis=2)
+        return {name: summed[i] for i, name in enumerate(FIELDS)}
+
+    def by_coin(self, start_ms: Optional[float] = None, end_ms: Optional[float] = None) -> List[Dict]:
+        """Per-coin breakdown rows for coins active in the window, best PnL first"""
+        totals = self.totals(start_ms, end_ms)
+        active = (totals['fills'] > 0) | (totals['trades'] > 0) | (totals['funding'] != 0)
+        rows = []
+        for i in rank_indices(totals['pnl'], mask=active).tolist():
+            row = {'coin': self.coins[i] or 'UNKNOWN'}
+            row.update((name, float(totals[name][i])) for name in FIELDS)
+            row['fills'], row['trades'] = int(row['fills']), int(row['trades'])
+            rows.append(row)
+        return rows
+
+    def daily(self, coin: Optional[str] = None, start_ms: Optional[float] = None,
+              end_ms: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """Per-day series ('time' = UTC day start) for one coin, or summed over all coins"""
+        days = self._day_slice(start_ms, end_ms)
+        if coin is None:
+            values = self.values[:, :, days].sum(axis=1)
+        elif coin in self._coin_ids:
+            values = self.values[:, self._coin_ids[coin], days]
+        else:
+            values = np.zeros((len(FIELDS), days.stop - days.start))
+        series = {'time': (self.first_day + np.arange(days.start, days.stop, dtype=np.int64)) * DAY_MS}
+        series.update((name, values[i]) for i, name in enumerate(FIELDS))
+        return series
+
+    def best_coin(self, start_ms: Optional[float] = None, end_ms: Optional[float] = None,
+                  field: str = 'trade_pnl') -> Tuple[str, float]:
+        """(coin, total) with the highest field total among coins traded in the window, or ("N/A", 0)"""
+        return self._extreme_coin(start_ms, end_ms, field, 1)
+
+    def worst_coin(self, start_ms: Optional[float] = None, end_ms: Optional[float] = None,
+                   field: str = 'trade_pnl') -> Tuple[str, float]:
+        return self._extreme_coin(start_ms, end_ms, field, -1)
+
+    def _extreme_coin(self, start_ms, end_ms, field: str, sign: int) -> Tuple[str, float]:
+        totals = self.totals(start_ms, end_ms)
+        top = rank_indices(sign * totals[field], 1, mask=totals['trades'] > 0)
+        if not len(top):
+            return ("N/A", 0)
+        i = int(top[0])
+        return (self.coins[i] or 'UNKNOWN', float(totals[field][i]))
+
+    # ---- persistence -----------------------------------------------------
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, version=self.VERSION, values=self.values, coins=np.array(self.coins, dtype=str),
+                            first_day=self.first_day, last_time=self.last_time,
+                            last_tids=np.array(self.last_tids, dtype=np.int64),
+                            last_funding_time=self.last_funding_time)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: Optional[bytes]) -> Optional['CoinDayCube']:
+        """Restore a saved cube; None when there is none or it is from another VERSION"""
+        if not data:
+            return None
+        with np.load(io.BytesIO(data)) as saved:
+            if int(saved['version']) != cls.VERSION:
+                return None
+            cube = cls()
+            cube.coins = saved['coins'].tolist()
+            cube._coin_ids = {coin: i for i, coin in enumerate(cube.coins)}
+            cube.values = saved['values']
+            cube.first_day = int(saved['first_day'])
+            cube.last_time = int(saved['last_time'])
+            cube.last_tids = saved['last_tids'].tolist()
+            cube.last_funding_time = int(saved['last_funding_time'])
+        return cube
+
+    def __repr__(self) -> str:
+        return f"CoinDayCube({len(self.coins)} coins x {self.days} days)"
+
+
+def coin_leaderboard(cubes: Dict[str, CoinDayCube], coin: str, field: str = 'pnl',
+                     start_ms: Optional[float] = None, end_ms: Optional[float] = None,
+                     limit: Optional[int] = None) -> List[Tuple[str, float]]:
+    """(address, total) for traders active in coin over the window, best first"""
+    addresses = list(cubes)
+    days = [cubes[a].daily(coin, start_ms, end_ms) for a in addresses]
+    values = np.array([d[field].sum() for d in days])
+    active = np.array([d['fills'].sum() + d['trades'].sum() > 0 for d in days], dtype=bool)
+    return [(addresses[i], float(values[i])) for i in rank_indices(values, limit, active).tolist()]
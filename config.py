@@ -12,9 +12,29 @@ class Config:
     # Tracked Addresses
     TRACKED_ADDRESSES = [addr.strip() for addr in os.getenv('TRACKED_ADDRESSES', '').split(',') if addr.strip()]
 
-    # Hyperliquid API endpoints
-    MAINNET_API_URL = "https://api.hyperliquid.xyz"
-    TESTNET_API_URL = "https://api.hyperliquid-testnet.xyz"
+    # Hyperliquid API endpoints (override to point at a local stand-in such as fake_hyperliquid.py)
+    MAINNET_API_URL = os.getenv('HYPERLIQUID_MAINNET_URL', 'https://api.hyperliquid.xyz')
+    TESTNET_API_URL = os.getenv('HYPERLIQUID_TESTNET_URL', 'https://api.hyperliquid-testnet.xyz')
+    LEADERBOARD_URL = os.getenv('HYPERLIQUID_LEADERBOARD_URL', 'https://stats-data.hyperliquid.xyz/Mainnet/leaderboard')
+
+    # HTTP transport (pooled keep-alive sessions)
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '20'))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+    HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '10'))
+    API_MAX_CONCURRENCY = int(os.getenv('API_MAX_CONCURRENCY', '8'))
+    API_CACHE_SIZE = int(os.getenv('API_CACHE_SIZE', '2048'))
+
+    # Info API rate limit (request weight per minute per IP, shared by all processes via RATE_LIMIT_DB)
+    RATE_LIMIT_WEIGHT_PER_MINUTE = float(os.getenv('RATE_LIMIT_WEIGHT_PER_MINUTE', '1200'))
+    RATE_LIMIT_BURST = float(os.getenv('RATE_LIMIT_BURST', '100'))
+    RATE_LIMIT_DB = os.getenv('RATE_LIMIT_DB', '')
+
+    # Retries (429/5xx/network, jittered exponential backoff) and per-request-type circuit breakers
+    API_MAX_RETRIES = int(os.getenv('API_MAX_RETRIES', '2'))
+    API_RETRY_BASE_DELAY = float(os.getenv('API_RETRY_BASE_DELAY', '0.25'))
+    API_RETRY_MAX_DELAY = float(os.getenv('API_RETRY_MAX_DELAY', '4'))
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+    CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', '30'))
 
     # Trading Configuration
     COPY_TRADE_ENABLED = os.getenv('COPY_TRADE_ENABLED', 'false').lower() == 'true'
@@ -26,6 +46,12 @@ class Config:
     # Database
     DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///hyperliquid_tracker.db')
 
+    # Analytics memo (results keyed by fill-history watermark): LRU size, SQLite file ('' = memory only),
+    # and max age in seconds so now-relative windows (7d/30d) roll forward (0 = never expire)
+    ANALYTICS_MEMO_SIZE = int(os.getenv('ANALYTICS_MEMO_SIZE', '512'))
+    ANALYTICS_MEMO_DB = os.getenv('ANALYTICS_MEMO_DB', 'analytics_memo.db')
+    ANALYTICS_MEMO_TTL = float(os.getenv('ANALYTICS_MEMO_TTL', '3600'))
+
     # Tracking Configuration
     TOP_ACCOUNTS_LIMIT = 100
     REFRESH_INTERVAL = 300  # seconds
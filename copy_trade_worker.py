@@ -14,9 +14,12 @@ Key Logic:
 import time
 import json
 import os
+import queue
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-from hyperliquid_api import HyperliquidAPI
+from hyperliquid_api import HyperliquidAPI, APIError
+from hyperliquid_ws import WebSocketSubscriptionManager
+from fills import Fill, as_fills
 from database import Database, CopyTradeConfig, CopyTradePerformance
 from config import Config
 
@@ -32,13 +35,18 @@ except ImportError:
 
 
 class CopyTradeWorker:
-    def __init__(self, use_testnet=True):
+    def __init__(self, use_testnet=True, use_websocket=False):
         """Initialize the copy trade worker"""
         self.api = HyperliquidAPI(use_testnet=use_testnet)
         self.db = Database()
         self.use_testnet = use_testnet
         self.exchange = None
 
+        # WebSocket push of trader fills (polling remains as reconciliation)
+        self.use_websocket = use_websocket
+        self.ws_manager = None
+        self.ws_events = queue.Queue()     # (trader_address, fills) from the WS thread
+
         # Initialize exchange if credentials available
         self._init_exchange()
 
@@ -88,9 +96,14 @@ class CopyTradeWorker:
         configs = self.db.get_all_copy_trade_configs(active_only=True)
         return [c for c in configs if not c.is_paused]
 
-    def get_trader_positions(self, address: str) -> Dict[str, dict]:
-        """Get current positions for a trader"""
-        user_state = self.api.get_user_state(address)
+    def get_trader_positions(self, address: str, user_state: Dict = None) -> Dict[str, dict]:
+        """Get current positions for a trader (from user_state if already fetched)
+
+        Raises APIError if the state cannot be fetched: a failed request must
+        never read as "no positions" and trigger exit signals.
+        """
+        if user_state is None:
+            user_state = self.api.get_user_state(address, use_cache=False, raise_on_error=True)
         positions = {}
 
         if user_state and 'assetPositions' in user_state:
@@ -109,34 +122,28 @@ class CopyTradeWorker:
         return positions
 
     def get_trader_open_orders(self, address: str) -> Dict[str, dict]:
-        """Get open orders for a trader"""
+        """Get open orders for a trader (raises APIError if they cannot be fetched)"""
         orders = {}
-        try:
-            data = {"type": "openOrders", "user": address}
-            result = self.api._post("openOrders", data)
-            if isinstance(result, list):
-                for order in result:
-                    oid = str(order.get('oid', ''))
-                    orders[oid] = {
-                        'oid': oid,
-                        'coin': order.get('coin', ''),
-                        'side': order.get('side', ''),
-                        'price': float(order.get('limitPx', 0)),
-                        'size': float(order.get('sz', 0)),
-                        'order_type': order.get('orderType', ''),
-                        'reduce_only': order.get('reduceOnly', False),
-                    }
-        except Exception as e:
-            print(f"  ⚠️  Error fetching orders for {address[:10]}: {e}")
+        for order in self.api.get_open_orders(address, raise_on_error=True):
+            oid = str(order.get('oid', ''))
+            orders[oid] = {
+                'oid': oid,
+                'coin': order.get('coin', ''),
+                'side': order.get('side', ''),
+                'price': float(order.get('limitPx', 0)),
+                'size': float(order.get('sz', 0)),
+                'order_type': order.get('orderType', ''),
+                'reduce_only': order.get('reduceOnly', False),
+            }
 
         return orders
 
-    def get_recent_fills(self, address: str, minutes: int = 1) -> List[dict]:
+    def get_recent_fills(self, address: str, minutes: int = 1) -> List[Fill]:
         """Get recent fills for a trader"""
         start_time = int((datetime.now() - timedelta(minutes=minutes)).timestamp() * 1000)
-        return self.api.get_user_fills(address, start_time=start_time)
+        return self.api.get_user_fills(address, start_time=start_time, typed=True)
 
-    def analyze_fill(self, fill: dict, prev_positions: Dict[str, dict],
+    def analyze_fill(self, fill: Fill, prev_positions: Dict[str, dict],
                      curr_positions: Dict[str, dict]) -> dict:
         """
         Analyze a fill to determine if it's an entry, exit, or position adjustment
@@ -153,11 +160,11 @@ class CopyTradeWorker:
                 'new_size': float,
             }
         """
-        coin = fill.get('coin', '')
-        fill_side = fill.get('side', '')  # 'B' = buy, 'A' = sell
-        fill_size = float(fill.get('sz', 0))
-        fill_price = float(fill.get('px', 0))
-        direction = fill.get('dir', '')  # 'Open Long', 'Close Long', etc.
+        coin = fill.coin
+        fill_side = fill.side  # 'B' = buy, 'A' = sell
+        fill_size = fill.sz
+        fill_price = fill.px
+        direction = fill.dir  # 'Open Long', 'Close Long', etc.
 
         prev_pos = prev_positions.get(coin, {})
         curr_pos = curr_positions.get(coin, {})
@@ -267,7 +274,7 @@ class CopyTradeWorker:
 
         try:
             # Get current price for slippage calculation
-            mids = self.api.get_all_mids()
+            mids = self.api.get_all_mids(use_cache=False)
             if coin not in mids:
                 print(f"  ❌ Cannot find price for {coin}")
                 return None
@@ -347,7 +354,7 @@ class CopyTradeWorker:
             print(f"  ❌ Close position failed: {e}")
             return None
 
-    def handle_new_fill(self, config: CopyTradeConfig, fill: dict,
+    def handle_new_fill(self, config: CopyTradeConfig, fill: Fill,
                        analysis: dict, trader_account_value: float):
         """Handle a new fill from the trader we're copying"""
 
@@ -414,7 +421,7 @@ class CopyTradeWorker:
         # Record the trade
         if result:
             trade_data = {
-                'original_trade_id': fill.get('tid', ''),
+                'original_trade_id': fill.tid,
                 'source_account': config.trader_address,
                 'symbol': coin,
                 'side': side,
@@ -502,19 +509,35 @@ class CopyTradeWorker:
         except Exception as e:
             print(f"  ⚠️  Error updating our positions: {e}")
 
-    def monitor_trader(self, config: CopyTradeConfig) -> int:
+    def monitor_trader(self, config: CopyTradeConfig, user_state: Dict = None,
+                       recent_fills: List[Fill] = None) -> int:
         """
         Monitor a single trader for new activity
 
+        user_state / recent_fills come from the per-iteration batch snapshot;
+        they are fetched individually when not supplied.
+
         Returns: number of new trades detected
         """
         address = config.trader_address
         new_trade_count = 0
 
-        # Get current state
-        curr_positions = self.get_trader_positions(address)
-        curr_orders = self.get_trader_open_orders(address)
-        curr_fills = self.get_recent_fills(address, minutes=2)
+        if address not in self.trader_positions:
+            # Never diffed against a baseline yet (initialization failed earlier)
+            self.initialize_trader_state(config)
+            return 0
+
+        # Get current state; on a failed fetch skip this cycle rather than diff against nothing
+        try:
+            if user_state is None:
+                user_state = self.api.get_user_state(address, use_cache=False, raise_on_error=True)
+            curr_positions = self.get_trader_positions(address, user_state)
+            curr_orders = self.get_trader_open_orders(address)
+        except APIError as e:
+            print(f"  ⚠️  Skipping {address[:10]} this cycle: {e}")
+            return 0
+        # WebSocket pushes arrive as raw dicts; batch/REST fills are already typed
+        curr_fills = as_fills(recent_fills) if recent_fills is not None else self.get_recent_fills(address, minutes=2)
 
         # Get previous state (or initialize)
         prev_positions = self.trader_positions.get(address, {})
@@ -524,14 +547,13 @@ class CopyTradeWorker:
             self.last_seen_fills[address] = set()
 
         # Get trader's account value for proportional sizing
-        user_state = self.api.get_user_state(address)
         trader_account_value = 0
         if user_state and 'marginSummary' in user_state:
             trader_account_value = float(user_state['marginSummary'].get('accountValue', 0))
 
         # Process new fills
         for fill in curr_fills:
-            fill_id = fill.get('tid', '')
+            fill_id = fill.tid
 
             if fill_id in self.last_seen_fills[address]:
                 continue
@@ -568,13 +590,20 @@ class CopyTradeWorker:
         address = config.trader_address
         print(f"  📥 Initializing state for {config.trader_name or address[:15]}...")
 
-        # Get current positions and orders
-        self.trader_positions[address] = self.get_trader_positions(address)
-        self.trader_orders[address] = self.get_trader_open_orders(address)
+        # Get current positions, orders and recent fills (to avoid copying old trades).
+        # If any fetch fails the trader stays uninitialized and is retried next cycle.
+        start_time = int((datetime.now() - timedelta(hours=1)).timestamp() * 1000)
+        try:
+            positions = self.get_trader_positions(address)
+            orders = self.get_trader_open_orders(address)
+            fills = self.api.get_user_fills(address, start_time=start_time, raise_on_error=True, typed=True)
+        except APIError as e:
+            print(f"     ⚠️  Could not initialize {address[:10]}: {e}")
+            return
 
-        # Load recent fills to avoid copying old trades
-        fills = self.api.get_user_fills_by_time(address, hours=1)
-        self.last_seen_fills[address] = set(f.get('tid', '') for f in fills)
+        self.trader_positions[address] = positions
+        self.trader_orders[address] = orders
+        self.last_seen_fills[address] = set(f.tid for f in fills)
 
         pos_count = len(self.trader_positions[address])
         order_count = len(self.trader_orders[address])
@@ -582,6 +611,46 @@ class CopyTradeWorker:
 
         print(f"     Positions: {pos_count}, Orders: {order_count}, Recent fills: {fill_count}")
 
+    def _on_ws_fills(self, event):
+        """WebSocket callback (runs on the WS thread): hand new fills to the main loop"""
+        # Snapshots replay history on (re)subscribe; those fills were seen at init
+        if not event.is_snapshot:
+            self.ws_events.put((event.user, event.data))
+
+    def start_websocket(self, configs: List[CopyTradeConfig]):
+        """Subscribe to userFills for every watched trader"""
+        self.ws_manager = WebSocketSubscriptionManager(api=self.api)
+        for config in configs:
+            self.ws_manager.subscribe_user_fills(config.trader_address, self._on_ws_fills)
+        self.ws_manager.start_in_thread()
+        print(f"🔌 WebSocket connected - streaming fills for {len(configs)} trader(s)")
+
+    def wait_for_activity(self, configs: List[CopyTradeConfig], timeout: float):
+        """Sleep until the next poll, handling pushed fills as soon as they arrive"""
+        if self.ws_manager is None:
+            time.sleep(timeout)
+            return
+
+        by_address = {c.trader_address.lower(): c for c in configs}
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return
+            try:
+                address, fills = self.ws_events.get(timeout=remaining)
+            except queue.Empty:
+                return
+
+            config = by_address.get(address.lower())
+            if config is None:
+                continue
+            state = self.api.get_user_state(config.trader_address, use_cache=False)
+            if not state:
+                continue  # the next poll reconciles
+            if self.monitor_trader(config, user_state=state, recent_fills=fills) > 0:
+                self.update_our_positions()
+
     def run(self):
         """Main monitoring loop"""
         print(f"🚀 Starting copy trade worker...")
@@ -595,6 +664,9 @@ class CopyTradeWorker:
             self.initialize_trader_state(config)
         print()
 
+        if self.use_websocket:
+            self.start_websocket(configs)
+
         # Update our own positions
         self.update_our_positions()
 
@@ -611,14 +683,31 @@ class CopyTradeWorker:
                     for config in configs:
                         if config.trader_address not in self.trader_positions:
                             self.initialize_trader_state(config)
+                            if self.ws_manager is not None:
+                                self.ws_manager.subscribe_user_fills(config.trader_address, self._on_ws_fills)
 
                 if not configs:
                     if iteration % 100 == 1:
                         print(f"[{datetime.now().strftime('%H:%M:%S')}] No active copy trades configured")
                 else:
+                    # Snapshot all watched traders in one concurrent round trip
+                    addresses = [c.trader_address for c in configs]
+                    start_time = int((datetime.now() - timedelta(minutes=2)).timestamp() * 1000)
+                    # Latency-critical: bypass the response cache
+                    states = self.api.get_user_states_many(addresses, use_cache=False)
+                    fills = self.api.get_user_fills_many(addresses, start_time=start_time, typed=True)
+
                     # Monitor each trader
                     for config in configs:
-                        new_trades = self.monitor_trader(config)
+                        state = states.get(config.trader_address)
+                        recent_fills = fills.get(config.trader_address)
+                        if isinstance(state, APIError) or isinstance(recent_fills, APIError):
+                            # A failed snapshot must not look like "no positions"
+                            print(f"  ⚠️  Skipping {config.trader_address[:10]} this cycle: "
+                                  f"{state if isinstance(state, APIError) else recent_fills}")
+                            continue
+
+                        new_trades = self.monitor_trader(config, user_state=state, recent_fills=recent_fills)
 
                         if new_trades > 0:
                             # Update our positions after executing trades
@@ -626,9 +715,13 @@ class CopyTradeWorker:
 
                 # Status update every 2 minutes
                 if iteration % 40 == 0:
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] 💓 Worker alive - monitoring {len(configs)} trader(s)")
+                    stats = self.api.transport_stats()
+                    limits = self.api.rate_limit_stats()
+                    print(f"[{datetime.now().strftime('%H:%M:%S')}] 💓 Worker alive - monitoring {len(configs)} trader(s) "
+                          f"| API requests: {stats['requests']}, connections reused: {stats['reuse_ratio']:.0%}, "
+                          f"throttled: {limits['throttled']}")
 
-                time.sleep(self.poll_interval)
+                self.wait_for_activity(configs, self.poll_interval)
 
             except KeyboardInterrupt:
                 print("\n\n🛑 Stopping copy trade worker...")
@@ -640,6 +733,8 @@ class CopyTradeWorker:
                 print("   Retrying in 10 seconds...")
                 time.sleep(10)
 
+        if self.ws_manager is not None:
+            self.ws_manager.stop_in_thread()
         self.db.close()
         print("👋 Copy trade worker stopped")
 
@@ -649,12 +744,15 @@ def main():
 
     parser = argparse.ArgumentParser(description='Hyperliquid Copy Trade Worker')
     parser.add_argument('--mainnet', action='store_true', help='Run on mainnet (default: testnet)')
-    parser.add_argument('--interval', type=int, default=3, help='Polling interval in seconds (default: 3)')
+    parser.add_argument('--interval', type=int, default=None,
+                        help='Polling interval in seconds (default: 3, or 15 with --ws)')
+    parser.add_argument('--ws', action='store_true',
+                        help='Stream trader fills over WebSocket; polling only reconciles')
 
     args = parser.parse_args()
 
-    worker = CopyTradeWorker(use_testnet=not args.mainnet)
-    worker.poll_interval = args.interval
+    worker = CopyTradeWorker(use_testnet=not args.mainnet, use_websocket=args.ws)
+    worker.poll_interval = args.interval or (15 if args.ws else 3)
     worker.run()
 
 
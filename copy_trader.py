@@ -3,6 +3,7 @@ import json
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from hyperliquid_api import HyperliquidAPI
+from fills import Fill
 from database import Database
 from config import Config
 
@@ -27,16 +28,16 @@ class CopyTrader:
             min_trades=Config.MIN_TRADES
         )
 
-    def monitor_account_trades(self, address: str) -> List[Dict]:
+    def monitor_account_trades(self, address: str) -> List[Fill]:
         """Monitor an account for new trades"""
         # Get recent fills (last 5 minutes)
         five_min_ago = int((datetime.now() - timedelta(minutes=5)).timestamp() * 1000)
 
-        fills = self.api.get_user_fills(address, start_time=five_min_ago)
+        fills = self.api.get_user_fills(address, start_time=five_min_ago, typed=True)
 
         new_trades = []
         for fill in fills:
-            trade_id = fill.get('tid', '')
+            trade_id = fill.tid
 
             # Check if we've already seen this trade
             if trade_id not in self.tracked_positions.get(address, set()):
@@ -61,7 +62,7 @@ class CopyTrader:
         copy_size = copy_value / original_price
         return copy_size
 
-    def should_copy_trade(self, fill: Dict, account_stats: Dict) -> bool:
+    def should_copy_trade(self, fill: Fill, account_stats: Dict) -> bool:
         """Determine if a trade should be copied based on criteria"""
 
         # Check if account meets minimum criteria
@@ -72,28 +73,26 @@ class CopyTrader:
             return False
 
         # Check if trade size is reasonable
-        size = float(fill.get('sz', 0))
-        price = float(fill.get('px', 0))
-        trade_value = size * price
+        trade_value = fill.notional
 
         if trade_value < 10:  # Ignore very small trades
             return False
 
         return True
 
-    def execute_copy_trade(self, fill: Dict, source_account: str) -> Optional[Dict]:
+    def execute_copy_trade(self, fill: Fill, source_account: str) -> Optional[Dict]:
         """Execute a copy trade (SIMULATION ONLY by default)"""
 
-        coin = fill.get('coin', '')
-        side = fill.get('side', '')
-        original_price = float(fill.get('px', 0))
-        original_size = float(fill.get('sz', 0))
+        coin = fill.coin
+        side = fill.side
+        original_price = fill.px
+        original_size = fill.sz
 
         # Calculate copy size
         copy_size = self.calculate_copy_size(original_size, original_price)
 
         trade_data = {
-            'original_trade_id': fill.get('tid', ''),
+            'original_trade_id': fill.tid,
             'source_account': source_account,
             'symbol': coin,
             'side': side,
@@ -160,9 +159,7 @@ class CopyTrader:
                                 if Config.COPY_TRADE_ENABLED:
                                     self.execute_copy_trade(fill, account.address)
                                 else:
-                                    print(f"Would copy trade: {fill.get('coin')} {fill.get('side')} (DISABLED)")
-
-                    time.sleep(1)  # Rate limiting
+                                    print(f"Would copy trade: {fill.coin} {fill.side} (DISABLED)")
 
                 # Wait before next monitoring cycle
                 time.sleep(10)
@@ -1,6 +1,9 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, Text
+from sqlalchemy import (create_engine, Column, Integer, BigInteger, String, Float, DateTime, Boolean, Text,
+                        LargeBinary, UniqueConstraint)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql import func
+import json
 from datetime import datetime
 from config import Config
 
@@ -78,6 +81,71 @@ class Trade(Base):
     is_copied = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class FillRecord(Base):
+    """Raw executed fills per account (the source FillFrame.from_db reads)"""
+    __tablename__ = 'fills'
+    __table_args__ = (UniqueConstraint('account_address', 'fill_key'),)
+
+    id = Column(Integer, primary_key=True)
+    account_address = Column(String, nullable=False, index=True)
+    fill_key = Column(String, nullable=False)  # tid, or hash:oid:time when tid is missing
+    tid = Column(BigInteger)
+    time = Column(BigInteger, nullable=False, index=True)  # ms since epoch
+    coin = Column(String, nullable=False)
+    side = Column(String, nullable=False)  # 'B' or 'A'
+    px = Column(Float, nullable=False)
+    sz = Column(Float, nullable=False)
+    closed_pnl = Column(Float, default=0.0)
+    fee = Column(Float, default=0.0)
+    start_position = Column(Float, default=0.0)
+    dir = Column(String)
+
+class FundingPayment(Base):
+    """userFunding payments per account (merged into FillFrame.from_db beside the fills)"""
+    __tablename__ = 'funding_payments'
+    __table_args__ = (UniqueConstraint('account_address', 'time', 'coin'),)
+
+    id = Column(Integer, primary_key=True)
+    account_address = Column(String, nullable=False, index=True)
+    time = Column(BigInteger, nullable=False, index=True)  # ms since epoch
+    coin = Column(String, nullable=False)
+    usdc = Column(Float, nullable=False)  # signed: positive when the account received funding
+    szi = Column(Float)
+    funding_rate = Column(Float)
+
+class AnalyticsState(Base):
+    """Persisted PerformanceAccumulator per account (JSON), so tracking only folds in new fills"""
+    __tablename__ = 'analytics_state'
+
+    id = Column(Integer, primary_key=True)
+    account_address = Column(String, unique=True, nullable=False)
+    version = Column(Integer, nullable=False)
+    last_fill_time = Column(BigInteger)
+    state = Column(Text, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class CoinCube(Base):
+    """Persisted CoinDayCube per account (compressed .npz blob)"""
+    __tablename__ = 'coin_cubes'
+
+    id = Column(Integer, primary_key=True)
+    account_address = Column(String, unique=True, nullable=False)
+    version = Column(Integer, nullable=False)
+    last_fill_time = Column(BigInteger)
+    data = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class MetricSketch(Base):
+    """Persisted population MetricSketches by name ('tracked', 'analysed'), as a compressed .npz blob"""
+    __tablename__ = 'metric_sketches'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+    version = Column(Integer, nullable=False)
+    population = Column(Integer, default=0)
+    data = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class CopiedTrade(Base):
     __tablename__ = 'copied_trades'
 
@@ -104,8 +172,14 @@ class Database:
         self.session = Session()
 
     def add_tracked_account(self, account_data):
-        account = TrackedAccount(**account_data)
-        self.session.merge(account)
+        """Insert an account, or update the existing row for its address"""
+        account = self.session.query(TrackedAccount).filter_by(address=account_data['address']).first()
+        if account is None:
+            account = TrackedAccount(**account_data)
+            self.session.add(account)
+        else:
+            for key, value in account_data.items():
+                setattr(account, key, value)
         self.session.commit()
         return account
 
@@ -129,6 +203,162 @@ class Database:
         self.session.commit()
         return trade
 
+    def add_fills(self, address, fills):
+        """Store Fills not already stored for this account; returns how many were new"""
+        if not fills:
+            return 0
+        start = min(f.time for f in fills)
+        known = {key for (key,) in self.session.query(FillRecord.fill_key).filter(
+            FillRecord.account_address == address, FillRecord.time >= start)}
+
+        new = {}
+        for fill in fills:
+            key = str(fill.tid) if fill.tid is not None else f"{fill.hash}:{fill.oid}:{fill.time}"
+            if key not in known and key not in new:
+                new[key] = FillRecord(
+                    account_address=address, fill_key=key, tid=fill.tid, time=fill.time,
+                    coin=fill.coin, side=fill.side, px=fill.px, sz=fill.sz,
+                    closed_pnl=fill.closed_pnl, fee=fill.fee,
+                    start_position=fill.start_position, dir=fill.dir,
+                )
+        self.session.add_all(new.values())
+        self.session.commit()
+        return len(new)
+
+    def add_round_trips(self, address, trips):
+        """Store closed round trips as Trade rows, skipping known ones; returns how many were new
+
+        trips is a RoundTrips or a list of its to_dicts() rows. Only complete
+        trips are stored: an incomplete one opened before the fetched history,
+        so its entry price and size are partial.
+        """
+        rows = trips if isinstance(trips, list) else trips.to_dicts()
+        new = {}
+        for trip in rows:
+            if not trip['complete'] or trip['close_time'] is None:
+                continue
+            trade_id = f"{address}:{trip['first_tid']}:{trip['last_tid']}"
+            new[trade_id] = trip
+        if not new:
+            return 0
+        known = {trade_id for (trade_id,) in self.session.query(Trade.trade_id).filter(
+            Trade.account_address == address, Trade.trade_id.in_(list(new)))}
+
+        self.session.add_all(
+            Trade(
+                account_address=address, trade_id=trade_id, symbol=trip['coin'], side=trip['side'],
+                entry_price=trip['entry_px'], exit_price=trip['exit_px'], size=trip['size'],
+                pnl=trip['pnl'], is_winner=trip['pnl'] > 0,
+                opened_at=datetime.fromtimestamp(trip['open_time'] / 1000),
+                closed_at=datetime.fromtimestamp(trip['close_time'] / 1000),
+            )
+            for trade_id, trip in new.items() if trade_id not in known
+        )
+        self.session.commit()
+        return len(new) - len(known)
+
+    def get_fill_rows(self, address, start_time=None, end_time=None):
+        """(time, tid, coin, side, px, sz, closed_pnl, fee, start_position) tuples, oldest first"""
+        query = self.session.query(
+            FillRecord.time, FillRecord.tid, FillRecord.coin, FillRecord.side, FillRecord.px,
+            FillRecord.sz, FillRecord.closed_pnl, FillRecord.fee, FillRecord.start_position
+        ).filter(FillRecord.account_address == address)
+        if start_time is not None:
+            query = query.filter(FillRecord.time >= start_time)
+        if end_time is not None:
+            query = query.filter(FillRecord.time <= end_time)
+        return query.order_by(FillRecord.time, FillRecord.id).all()
+
+    def add_funding(self, address, payments):
+        """Store raw userFunding entries not already stored for this account; returns how many were new"""
+        if not payments:
+            return 0
+        start = min(p.get('time', 0) for p in payments)
+        known = set(self.session.query(FundingPayment.time, FundingPayment.coin).filter(
+            FundingPayment.account_address == address, FundingPayment.time >= start))
+
+        new = {}
+        for payment in payments:
+            delta = payment.get('delta', {})
+            key = (payment.get('time', 0), delta.get('coin', ''))
+            if key not in known and key not in new:
+                new[key] = FundingPayment(
+                    account_address=address, time=key[0], coin=key[1], usdc=float(delta.get('usdc', 0)),
+                    szi=float(delta.get('szi', 0)), funding_rate=float(delta.get('fundingRate', 0)),
+                )
+        self.session.add_all(new.values())
+        self.session.commit()
+        return len(new)
+
+    def get_funding_rows(self, address, start_time=None, end_time=None):
+        """(time, coin, usdc, szi, funding_rate) tuples, oldest first"""
+        query = self.session.query(
+            FundingPayment.time, FundingPayment.coin, FundingPayment.usdc, FundingPayment.szi,
+            FundingPayment.funding_rate
+        ).filter(FundingPayment.account_address == address)
+        if start_time is not None:
+            query = query.filter(FundingPayment.time >= start_time)
+        if end_time is not None:
+            query = query.filter(FundingPayment.time <= end_time)
+        return query.order_by(FundingPayment.time, FundingPayment.id).all()
+
+    def get_last_funding_time(self, address):
+        """Time of the newest stored funding payment for an account, or None"""
+        return self.session.query(func.max(FundingPayment.time)).filter(
+            FundingPayment.account_address == address).scalar()
+
+    def get_analytics_state(self, address):
+        """Saved accumulator state dict for an account, or None"""
+        row = self.session.query(AnalyticsState).filter_by(account_address=address).first()
+        return json.loads(row.state) if row else None
+
+    def save_analytics_state(self, address, state):
+        """Insert or replace an account's accumulator state (a PerformanceAccumulator.to_dict())"""
+        row = self.session.query(AnalyticsState).filter_by(account_address=address).first()
+        if row is None:
+            row = AnalyticsState(account_address=address)
+            self.session.add(row)
+        row.version = state['version']
+        row.last_fill_time = state['last_time']
+        row.state = json.dumps(state)
+        self.session.commit()
+
+    def get_coin_cube(self, address):
+        """Saved CoinDayCube blob for an account, or None"""
+        row = self.session.query(CoinCube).filter_by(account_address=address).first()
+        return row.data if row else None
+
+    def get_coin_cubes(self):
+        """{address: CoinDayCube blob} for every account with a saved cube"""
+        return {address: data for address, data in self.session.query(CoinCube.account_address, CoinCube.data)}
+
+    def save_coin_cube(self, address, data, version, last_fill_time):
+        """Insert or replace an account's CoinDayCube blob (CoinDayCube.to_bytes())"""
+        row = self.session.query(CoinCube).filter_by(account_address=address).first()
+        if row is None:
+            row = CoinCube(account_address=address)
+            self.session.add(row)
+        row.version = version
+        row.last_fill_time = last_fill_time
+        row.data = data
+        self.session.commit()
+
+    def get_metric_sketches(self, name):
+        """Saved MetricSketches blob for a population, or None"""
+        row = self.session.query(MetricSketch).filter_by(name=name).first()
+        return row.data if row else None
+
+    def save_metric_sketches(self, name, data, version, population):
+        """Insert or replace a population's MetricSketches blob (MetricSketches.to_bytes())"""
+        row = self.session.query(MetricSketch).filter_by(name=name).first()
+        if row is None:
+            row = MetricSketch(name=name)
+            self.session.add(row)
+        row.version = version
+        row.population = population
+        row.data = data
+        self.session.commit()
+
     def add_copied_trade(self, trade_data):
         copied_trade = CopiedTrade(**trade_data)
         self.session.add(copied_trade)
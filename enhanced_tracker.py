@@ -8,25 +8,62 @@ import time
 import json
 from datetime import datetime
 from typing import List, Dict
-from hyperliquid_api import HyperliquidAPI
+from hyperliquid_api import APIError, HyperliquidAPI
 from multi_timeframe_analytics import MultiTimeframeAnalytics
+from fill_frame import FillFrame
 from database import Database
+from parallel_analytics import analyze_many
+from analytics_memo import AnalyticsMemo, get_shared_memo, watermark
+from quantile_sketch import MetricSketches
 
 class EnhancedTracker:
-    def __init__(self, use_testnet=False):
+    def __init__(self, use_testnet=False, memo: AnalyticsMemo = None):
         self.api = HyperliquidAPI(use_testnet=use_testnet)
         self.analytics = MultiTimeframeAnalytics()
         self.db = Database()
+        # Unchanged accounts are answered from here without refetching their history
+        self.memo = memo if memo is not None else get_shared_memo()
 
     def analyze_account_comprehensive(self, address: str) -> Dict:
         """Perform comprehensive multi-timeframe analysis of an account"""
+        cached = self._cached_analysis(address)
+        if cached is not None:
+            return cached
+
+        fetched = self._fetch_account(address)
+        if fetched is None:
+            return None
+        all_fills, account_value = fetched
+
+        # Perform multi-timeframe analysis
+        print("Calculating metrics across timeframes...")
+        results = self.analytics.analyze_multi_timeframe(all_fills, account_value)
+        return self._finish_account(address, all_fills, account_value, results)
+
+    def _cached_analysis(self, address: str) -> Dict:
+        """The memoised analysis when no fill or funding payment arrived since it was computed, else None"""
+        hit, results = self.memo.lookup('multi_timeframe', address, self.api)
+        if not hit:
+            return None
+        print(f"\n✓ {address} unchanged since its last analysis (cached)")
+        self._print_results(results)
+        return results
+
+    def _fetch_account(self, address: str):
+        """(all fills as a FillFrame, account value), or None without trading history"""
         print(f"\n{'='*100}")
         print(f"Analyzing: {address}")
         print(f"{'='*100}")
 
-        # Get ALL fills (lifetime)
+        # Get ALL fills (lifetime), paging through the full history into columnar pages
         print("Fetching trade history...")
-        all_fills = self.api.get_user_fills(address)
+        pages = []
+        fetched = 0
+        for chunk in self.api.iter_user_fills(address):
+            pages.append(FillFrame.from_api(chunk))
+            fetched += len(chunk)
+            print(f"  ...{fetched} fills", end='\r')
+        all_fills = FillFrame.concat(pages)
 
         if not all_fills:
             print(f"❌ No trading history found for {address}")
@@ -34,36 +71,55 @@ class EnhancedTracker:
 
         print(f"✓ Found {len(all_fills)} total fills")
 
+        # Merge funding payments so metrics also come net of funding
+        try:
+            funding = [payment for chunk in self.api.iter_user_funding(address) for payment in chunk]
+            all_fills = all_fills.with_funding(funding)
+            print(f"✓ Found {len(funding)} funding payments")
+        except APIError as e:
+            print(f"⚠️  Could not fetch funding for {address}, metrics exclude it: {e}")
+
         # Get account state
         state = self.api.get_user_state(address)
-        account_value = self._extract_account_value(state)
-
-        # Perform multi-timeframe analysis
-        print("Calculating metrics across timeframes...")
-        results = self.analytics.analyze_multi_timeframe(all_fills, account_value)
+        return all_fills, self._extract_account_value(state)
 
+    def _finish_account(self, address: str, all_fills: FillFrame, account_value: float, results: Dict) -> Dict:
+        """Attach metadata to an account's analysis and print it"""
         # Add address and metadata
         results['address'] = address
         results['account_value'] = account_value
         results['analysis_time'] = datetime.now()
         results['total_fills'] = len(all_fills)
+        self.memo.put('multi_timeframe', address, watermark(all_fills), results)
+
+        self._print_results(results)
+        return results
 
+    def _print_results(self, results: Dict):
         # Print comparison table
         print(self.analytics.generate_comparison_table(results))
 
         # Print highlights
         self._print_highlights(results)
 
-        return results
+    def analyze_multiple_accounts(self, addresses: List[str], rate_limit_delay: float = 0.0,
+                                  workers: int = 1) -> List[Dict]:
+        """Analyze multiple accounts
 
-    def analyze_multiple_accounts(self, addresses: List[str], rate_limit_delay: float = 1.0) -> List[Dict]:
-        """Analyze multiple accounts"""
+        API weight limits are enforced by the client's shared rate limiter;
+        rate_limit_delay only adds an optional extra pause between accounts.
+        With workers > 1 every account is fetched first and the analyses then
+        run on a process pool (parallel_analytics).
+        """
         results = []
 
         print(f"\n{'#'*100}")
         print(f"STARTING MULTI-ACCOUNT ANALYSIS - {len(addresses)} accounts")
         print(f"{'#'*100}\n")
 
+        if workers > 1:
+            return self._analyze_parallel(addresses, rate_limit_delay, workers)
+
         for i, address in enumerate(addresses, 1):
             print(f"\n[{i}/{len(addresses)}] Processing {address}...")
 
@@ -73,8 +129,7 @@ class EnhancedTracker:
                     results.append(result)
                     self._save_to_database(result)
 
-                # Rate limiting
-                if i < len(addresses):
+                if rate_limit_delay and i < len(addresses):
                     print(f"\nWaiting {rate_limit_delay}s before next account...")
                     time.sleep(rate_limit_delay)
 
@@ -82,6 +137,61 @@ class EnhancedTracker:
                 print(f"❌ Error analyzing {address}: {e}")
                 continue
 
+        self._print_memo_stats()
+        self._save_population(results)
+        return results
+
+    def _print_memo_stats(self):
+        stats = self.memo.stats()
+        print(f"\nAnalytics memo: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_ratio']:.0%} hit ratio)")
+
+    def _save_population(self, results: List[Dict]):
+        """Replace the stored 'analysed' population sketches (per timeframe) with this run's results"""
+        if not results:
+            return
+        try:
+            sketches = MetricSketches().add_analyses(results)
+            self.db.save_metric_sketches('analysed', sketches.to_bytes(), sketches.VERSION, sketches.count)
+        except Exception as e:
+            self.db.session.rollback()
+            print(f"⚠️  Could not save population sketches: {e}")
+
+    def _analyze_parallel(self, addresses: List[str], rate_limit_delay: float, workers: int) -> List[Dict]:
+        """analyze_multiple_accounts() with the analyses spread over worker processes"""
+        fetched, done = [], {}
+        for i, address in enumerate(addresses, 1):
+            print(f"\n[{i}/{len(addresses)}] Fetching {address}...")
+            try:
+                cached = self._cached_analysis(address)
+                if cached is not None:
+                    done[address] = cached
+                    continue
+                account = self._fetch_account(address)
+                if account:
+                    fetched.append((address, *account))
+            except Exception as e:
+                print(f"❌ Error fetching {address}: {e}")
+
+            if rate_limit_delay and i < len(addresses):
+                print(f"\nWaiting {rate_limit_delay}s before next account...")
+                time.sleep(rate_limit_delay)
+
+        print(f"\nCalculating metrics for {len(fetched)} accounts on {workers} workers...")
+        analyses = analyze_many([frame for _, frame, _ in fetched], 'multi_timeframe', workers,
+                                [account_value for _, _, account_value in fetched])
+
+        for (address, frame, account_value), analysis in zip(fetched, analyses):
+            if isinstance(analysis, Exception):
+                print(f"❌ Error analyzing {address}: {analysis}")
+                continue
+            result = self._finish_account(address, frame, account_value, analysis)
+            done[address] = result
+            self._save_to_database(result)
+
+        self._print_memo_stats()
+        results = [done[address] for address in addresses if address in done]
+        self._save_population(results)
         return results
 
     def generate_leaderboard_report(self, results: List[Dict], timeframe: str = '30d'):
@@ -177,6 +287,7 @@ class EnhancedTracker:
             if tf_data.get('num_trades', 0) > 0:
                 print(f"\n{tf.upper()}:")
                 print(f"  Total PnL: ${tf_data.get('total_pnl', 0):,.2f}")
+                print(f"  Net PnL after Fees & Funding: ${tf_data.get('net_pnl_after_funding', 0):,.2f}")
                 print(f"  ROI: {tf_data.get('roi', 0):.2%}")
                 print(f"  Win Rate: {tf_data.get('win_rate', 0):.2%}")
                 print(f"  Profit Factor: {tf_data.get('profit_factor', 0):.2f}x")
@@ -0,0 +1,274 @@
+"""
+Time-bucketed equity curves and time-based risk metrics
+
+calculate_performance()'s Sharpe ratio treats every round trip as a "daily"
+return and its drawdown is measured against cumulative-PnL peaks. Here the
+account's cash flows are binned by time instead:
+
+    flow = realized PnL - fees + funding, summed per daily/hourly bucket
+
+and the curve is anchored on the account value from marginSummary: equity at
+the end of bucket b is account_value minus every flow after b. Each bucket's
+return is its flow over the equity it started with, so Sharpe, Sortino and
+Calmar are real per-period figures annualised over a 365-day (24/7) year,
+and drawdowns are measured on equity with their depth and duration.
+
+Deposits, withdrawals and unrealised PnL are not in the fills, so they show
+up only through the anchor. Without an account value the curve starts from
+the same estimated capital calculate_performance() uses for ROI.
+
+Every account in a batch shares one time grid: the flows of the whole batch
+go through a single np.bincount into an accounts x buckets matrix and all
+metrics are whole-matrix array operations. Daily curves can also be read
+straight off the accounts' saved CoinDayCubes (daily_equity_curves).
+"""
+
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from coin_cube import DAY_MS, CoinDayCube
+from fill_frame import as_frame
+from multi_timeframe_analytics import parse_duration
+
+YEAR_MS = 365 * 86_400_000
+
+FundingInput = Union[None, Sequence[Dict], Tuple[np.ndarray, np.ndarray]]
+
+
+def funding_arrays(funding: FundingInput) -> Tuple[np.ndarray, np.ndarray]:
+    """(times, usdc amounts) from userFunding entries or an existing (times, amounts) pair"""
+    if funding is None:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    if isinstance(funding, tuple):
+        times, amounts = funding
+        return np.asarray(times, dtype=np.int64), np.asarray(amounts, dtype=np.float64)
+    times = np.fromiter((entry.get('time', 0) for entry in funding), dtype=np.int64, count=len(funding))
+    amounts = np.fromiter((float(entry.get('delta', {}).get('usdc', 0)) for entry in funding),
+                          dtype=np.float64, count=len(funding))
+    return times, amounts
+
+
+class EquityCurves:
+    """accounts x buckets flows and equity on a shared time grid"""
+
+    __slots__ = ('bucket_ms', 'start_ms', 'pnl', 'fees', 'funding', 'start_equity', 'equity',
+                 'returns', 'active')
+
+    def __init__(self, bucket_ms: int, start_ms: int, pnl: np.ndarray, fees: np.ndarray,
+                 funding: np.ndarray, start_equity: np.ndarray, first_bucket: np.ndarray):
+        self.bucket_ms = bucket_ms
+        self.start_ms = start_ms
+        self.pnl = pnl
+        self.fees = fees
+        self.funding = funding
+        self.start_equity = start_equity
+
+        flow = pnl - fees + funding
+        self.equity = start_equity[:, None] + np.cumsum(flow, axis=1)
+        opening = np.concatenate((start_equity[:, None], self.equity[:, :-1]), axis=1)
+
+        # An account's returns start at its first bucket with activity
+        self.active = np.arange(flow.shape[1]) >= first_bucket[:, None]
+        valid = self.active & (opening > 0)
+        self.returns = np.full(flow.shape, np.nan)
+        np.divide(flow, opening, out=self.returns, where=valid)
+
+    def __len__(self) -> int:
+        return len(self.equity)
+
+    @property
+    def times(self) -> np.ndarray:
+        """Start time (ms) of every bucket"""
+        return self.start_ms + np.arange(self.equity.shape[1], dtype=np.int64) * self.bucket_ms
+
+    @property
+    def periods_per_year(self) -> float:
+        return YEAR_MS / self.bucket_ms
+
+    def drawdowns(self) -> np.ndarray:
+        """Fractional distance below the running equity peak, per bucket"""
+        peak = np.maximum.accumulate(np.concatenate((self.start_equity[:, None], self.equity), axis=1), axis=1)[:, 1:]
+        out = np.zeros_like(self.equity)
+        np.divide(peak - self.equity, peak, out=out, where=peak > 0)
+        return out
+
+    def risk_metrics(self) -> List[Dict]:
+        """Per-account Sharpe, Sortino, Calmar and drawdown depth/duration"""
+        returns = self.returns
+        valid = ~np.isnan(returns)
+        periods = valid.sum(axis=1)
+        r = np.where(valid, returns, 0.0)
+        n = np.maximum(periods, 1)
+
+        mean = r.sum(axis=1) / n
+        std = np.sqrt((np.where(valid, returns - mean[:, None], 0.0) ** 2).sum(axis=1) / n)
+        downside = np.sqrt((np.minimum(r, 0.0) ** 2).sum(axis=1) / n)
+        annualize = np.sqrt(self.periods_per_year)
+        enough = periods >= 2
+        sharpe = np.where(enough & (std > 0), mean / np.where(std > 0, std, 1) * annualize, 0.0)
+        sortino = np.where(enough & (downside > 0), mean / np.where(downside > 0, downside, 1) * annualize, 0.0)
+
+        start, end = self.start_equity, self.equity[:, -1]
+        growth = np.divide(end, start, out=np.zeros_like(start), where=start > 0)
+        years = np.maximum(self.active.sum(axis=1), 1) / self.periods_per_year
+        with np.errstate(invalid='ignore', over='ignore'):
+            annual_return = np.where(growth > 0, growth ** (1 / years) - 1, -1.0)
+        annual_return = np.where(start > 0, annual_return, 0.0)
+
+        drawdown = self.drawdowns()
+        max_drawdown = drawdown.max(axis=1)
+        calmar = np.divide(annual_return, max_drawdown, out=np.zeros_like(max_drawdown), where=max_drawdown > 0)
+
+        # Consecutive underwater buckets: running count that resets whenever equity is at a peak
+        underwater = drawdown > 0
+        count = np.cumsum(underwater, axis=1)
+        run = count - np.maximum.accumulate(np.where(underwater, 0, count), axis=1)
+
+        metrics = {
+            'sharpe_ratio': sharpe,
+            'sortino_ratio': sortino,
+            'calmar_ratio': calmar,
+            'max_drawdown': max_drawdown,
+            'max_drawdown_duration_ms': run.max(axis=1) * self.bucket_ms,
+            'current_drawdown': drawdown[:, -1],
+            'current_drawdown_duration_ms': run[:, -1] * self.bucket_ms,
+            'annualized_return': annual_return,
+            'total_return': np.where(start > 0, growth - 1, 0.0),
+            'start_equity': start,
+            'end_equity': end,
+            'periods': periods,
+        }
+        return [dict(zip(metrics, row)) for row in zip(*(column.tolist() for column in metrics.values()))]
+
+    def to_dicts(self, account: int = 0) -> List[Dict]:
+        """One account's curve as rows (time, pnl, fees, funding, equity, return, drawdown)"""
+        drawdown = self.drawdowns()[account]
+        returns = self.returns[account]
+        return [
+            {'time': t, 'pnl': p, 'fees': f, 'funding': fu, 'equity': e,
+             'return': None if r != r else r, 'drawdown': d}
+            for t, p, f, fu, e, r, d in zip(self.times.tolist(), self.pnl[account].tolist(),
+                                            self.fees[account].tolist(), self.funding[account].tolist(),
+                                            self.equity[account].tolist(), returns.tolist(), drawdown.tolist())
+        ]
+
+    def __repr__(self) -> str:
+        return f"EquityCurves({len(self)} accounts x {self.equity.shape[1]} buckets of {self.bucket_ms}ms)"
+
+
+def build_equity_curves(fill_sets: Sequence, account_values: Optional[Sequence[Optional[float]]] = None,
+                        bucket: Union[str, int] = '1d', funding: Optional[Sequence[FundingInput]] = None,
+                        start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> EquityCurves:
+    """Equity curves for a batch of accounts (FillFrames, Fills or raw dicts)
+
+    account_values are the current marginSummary account values (None for
+    unknown); funding gives each account's userFunding entries (default: the
+    payments merged into each FillFrame, FillFrame.funding). The grid runs
+    from start_ms (default: the batch's first flow) to end_ms (default: now),
+    aligned to whole buckets; flows outside it are ignored.
+    """
+    bucket_ms = parse_duration(bucket)
+    frames = [as_frame(fills) for fills in fill_sets]
+    accounts = len(frames)
+    account_values = list(account_values) if account_values is not None else [None] * accounts
+    if funding is not None:
+        funding = [funding_arrays(f) for f in funding]
+    else:
+        funding = [(frame.funding_time, frame.funding_usdc) for frame in frames]
+    if len(account_values) != accounts or len(funding) != accounts:
+        raise ValueError("account_values and funding need one entry per fill set")
+
+    # One flat array of every flow in the batch, tagged with its account row
+    rows = np.concatenate([np.full(len(frame), i, dtype=np.int64) for i, frame in enumerate(frames)]
+                          + [np.empty(0, dtype=np.int64)])
+    times = np.concatenate([frame.time for frame in frames] + [np.empty(0, dtype=np.int64)])
+    pnl = np.concatenate([frame.closed_pnl for frame in frames] + [np.empty(0)])
+    fees = np.concatenate([frame.fee for frame in frames] + [np.empty(0)])
+    notional = np.bincount(rows, weights=np.concatenate([frame.notional for frame in frames] + [np.empty(0)]),
+                           minlength=accounts)
+    funding_rows = np.concatenate([np.full(len(t), i, dtype=np.int64) for i, (t, _) in enumerate(funding)]
+                                  + [np.empty(0, dtype=np.int64)])
+    funding_times = np.concatenate([t for t, _ in funding] + [np.empty(0, dtype=np.int64)])
+    funding_amounts = np.concatenate([a for _, a in funding] + [np.empty(0)])
+
+    if start_ms is None:
+        firsts = [a.min() for a in (times, funding_times) if len(a)]
+        start_ms = int(min(firsts)) if firsts else int(time.time() * 1000)
+    if end_ms is None:
+        end_ms = int(time.time() * 1000)
+    start_ms = start_ms // bucket_ms * bucket_ms
+    buckets = max(int(end_ms - start_ms) // bucket_ms + 1, 1)
+
+    def cells(rows, times):
+        """Flat accounts x buckets cell of every flow, and which flows fall on the grid"""
+        index = (times - start_ms) // bucket_ms
+        keep = (index >= 0) & (index < buckets)
+        return rows[keep] * buckets + index[keep], keep
+
+    def binned(cells, weights):
+        return np.bincount(cells, weights=weights, minlength=accounts * buckets).reshape(accounts, buckets)
+
+    fill_cells, keep = cells(rows, times)
+    pnl_grid = binned(fill_cells, pnl[keep])
+    fee_grid = binned(fill_cells, fees[keep])
+    funding_cells, keep = cells(funding_rows, funding_times)
+    funding_grid = binned(funding_cells, funding_amounts[keep])
+
+    # First bucket with any fill or funding payment, per account (buckets when none)
+    active_cells = np.concatenate((fill_cells, funding_cells))
+    first_bucket = np.full(accounts, buckets, dtype=np.int64)
+    np.minimum.at(first_bucket, active_cells // buckets, active_cells % buckets)
+
+    return _anchored(bucket_ms, start_ms, pnl_grid, fee_grid, funding_grid, first_bucket, notional, account_values)
+
+
+def daily_equity_curves(cubes: Sequence[CoinDayCube], account_values: Optional[Sequence[Optional[float]]] = None,
+                        end_ms: Optional[int] = None) -> EquityCurves:
+    """Daily equity curves from saved CoinDayCubes, without rescanning any fills
+
+    A cube already holds each day's PnL, fees, funding and volume, so this is
+    build_equity_curves(fills, account_values, '1d') over the same fills and
+    funding, with the grid starting at the batch's first day.
+    """
+    accounts = len(cubes)
+    account_values = list(account_values) if account_values is not None else [None] * accounts
+    if len(account_values) != accounts:
+        raise ValueError("account_values need one entry per cube")
+
+    if end_ms is None:
+        end_ms = int(time.time() * 1000)
+    firsts = [cube.first_day for cube in cubes if cube.days]
+    start_day = min(firsts) if firsts else end_ms // DAY_MS
+    buckets = max(end_ms // DAY_MS - start_day + 1, 1)
+
+    pnl_grid, fee_grid, funding_grid = (np.zeros((accounts, buckets)) for _ in range(3))
+    first_bucket = np.full(accounts, buckets, dtype=np.int64)
+    notional = np.zeros(accounts)
+    for i, cube in enumerate(cubes):
+        daily = cube.daily()
+        notional[i] = daily['volume'].sum()
+        offset = cube.first_day - start_day
+        width = min(cube.days, buckets - offset)  # days after end_ms are off the grid
+        if width <= 0:
+            continue
+        for grid, field in ((pnl_grid, 'pnl'), (fee_grid, 'fees'), (funding_grid, 'funding')):
+            grid[i, offset:offset + width] = daily[field][:width]
+        active = np.flatnonzero((daily['fills'][:width] > 0) | (daily['funding'][:width] != 0))
+        if len(active):
+            first_bucket[i] = offset + active[0]
+
+    return _anchored(DAY_MS, start_day * DAY_MS, pnl_grid, fee_grid, funding_grid, first_bucket, notional,
+                     account_values)
+
+
+def _anchored(bucket_ms: int, start_ms: int, pnl_grid: np.ndarray, fee_grid: np.ndarray, funding_grid: np.ndarray,
+              first_bucket: np.ndarray, notional: np.ndarray, account_values: List[Optional[float]]) -> EquityCurves:
+    """Curves over binned flows, anchored on the current account value; else estimated capital"""
+    flows = pnl_grid.sum(axis=1) - fee_grid.sum(axis=1) + funding_grid.sum(axis=1)
+    estimated = np.where(notional > 0, notional / 10, 1.0)
+    anchor = np.array([np.nan if v is None else v for v in account_values], dtype=np.float64)
+    start_equity = np.where(np.isnan(anchor), estimated, anchor - flows)
+
+    return EquityCurves(bucket_ms, start_ms, pnl_grid, fee_grid, funding_grid, start_equity, first_bucket)
@@ -0,0 +1,701 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Hyperliquid Info API and stats-data leaderboard
+
+Answers the request types HyperliquidAPI uses (clearinghouseState,
+userFills/userFillsByTime, userFunding, openOrders, allMids, meta,
+candleSnapshot, ...) plus GET /leaderboard, so the tracker, dashboard and
+copy trade worker can be exercised and benchmarked offline.
+
+Responses come from recorded fixtures when present, otherwise from a
+deterministic synthetic market (the same address always gets the same
+history). Latency and rate limiting (HTTP 429) can be injected.
+
+Usage:
+    python fake_hyperliquid.py --port 8090 --latency-ms 40 --rate-limit 1200
+    python fake_hyperliquid.py --fixtures fixtures/ --record   # proxy + save real responses
+
+Then point the clients at it:
+    HYPERLIQUID_MAINNET_URL=http://127.0.0.1:8090
+    HYPERLIQUID_LEADERBOARD_URL=http://127.0.0.1:8090/leaderboard
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import requests
+
+from rate_limiter import request_weight, response_weight
+
+UPSTREAM_API_URL = "https://api.hyperliquid.xyz"
+UPSTREAM_LEADERBOARD_URL = "https://stats-data.hyperliquid.xyz/Mainnet/leaderboard"
+
+# Max items the real API returns per history response
+FILLS_RESPONSE_LIMIT = 2000
+FUNDING_RESPONSE_LIMIT = 500
+CANDLES_RESPONSE_LIMIT = 5000
+
+# coin -> (reference price, size decimals, max leverage)
+SYNTHETIC_COINS = {
+    'BTC': (65000.0, 5, 50),
+    'ETH': (3200.0, 4, 50),
+    'SOL': (150.0, 2, 20),
+    'ARB': (1.1, 1, 10),
+    'DOGE': (0.15, 0, 10),
+    'AVAX': (35.0, 2, 10),
+    'LINK': (15.0, 1, 10),
+    'HYPE': (25.0, 2, 10),
+}
+
+CANDLE_INTERVALS_MS = {
+    '1m': 60_000, '5m': 300_000, '15m': 900_000, '30m': 1_800_000,
+    '1h': 3_600_000, '4h': 14_400_000, '1d': 86_400_000,
+}
+
+DAY_MS = 86_400_000
+HOUR_MS = 3_600_000
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _seed_for(*parts) -> int:
+    digest = hashlib.sha256('|'.join(str(p).lower() for p in parts).encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+def _money(value: float) -> str:
+    text = f"{value:.6f}".rstrip('0').rstrip('.')
+    return '0' if text in ('', '-0') else text
+
+
+class SyntheticMarket:
+    """Deterministic synthetic exchange data keyed by address"""
+
+    def __init__(self, seed: int = 0, fills_per_user: int = 500, history_days: int = 90,
+                 leaderboard_rows: int = 1000):
+        self.seed = seed
+        self.fills_per_user = fills_per_user
+        self.history_days = history_days
+        self.leaderboard_rows = leaderboard_rows
+        self.anchor_ms = _now_ms()
+
+        self._users: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    # ---- prices ----------------------------------------------------------
+
+    def price(self, coin: str, at_ms: int) -> float:
+        """Smooth deterministic price path around the coin's reference price"""
+        ref = SYNTHETIC_COINS.get(coin, (10.0, 2, 10))[0]
+        phase = _seed_for(self.seed, coin) % 1000
+        days = at_ms / DAY_MS
+        drift = 0.15 * math.sin(days / 9 + phase) + 0.05 * math.sin(days * 3.1 + phase / 7)
+        return ref * (1 + drift)
+
+    def all_mids(self) -> Dict[str, str]:
+        now = _now_ms()
+        return {coin: _money(self.price(coin, now)) for coin in SYNTHETIC_COINS}
+
+    def meta(self) -> Dict:
+        return {'universe': [
+            {'name': coin, 'szDecimals': decimals, 'maxLeverage': leverage}
+            for coin, (_, decimals, leverage) in SYNTHETIC_COINS.items()
+        ]}
+
+    def spot_meta(self) -> Dict:
+        return {
+            'tokens': [{'name': 'USDC', 'index': 0, 'szDecimals': 8, 'weiDecimals': 8},
+                       {'name': 'HYPE', 'index': 1, 'szDecimals': 2, 'weiDecimals': 8}],
+            'universe': [{'name': '@107', 'index': 107, 'tokens': [1, 0]}],
+        }
+
+    def candles(self, coin: str, interval: str, start_ms: int, end_ms: int) -> List[Dict]:
+        step = CANDLE_INTERVALS_MS.get(interval, HOUR_MS)
+        first = (start_ms // step) * step
+        candles = []
+        for t in range(first, min(end_ms, _now_ms()) + 1, step):
+            if len(candles) >= CANDLES_RESPONSE_LIMIT:
+                break
+            o, c = self.price(coin, t), self.price(coin, t + step)
+            wiggle = abs(o - c) * 0.5 + o * 0.001
+            candles.append({
+                't': t, 'T': t + step - 1, 's': coin, 'i': interval,
+                'o': _money(o), 'c': _money(c),
+                'h': _money(max(o, c) + wiggle), 'l': _money(min(o, c) - wiggle),
+                'v': _money(1000 + _seed_for(coin, t) % 100000 / 10), 'n': 100 + t % 997,
+            })
+        return candles
+
+    # ---- per-user history ------------------------------------------------
+
+    def _user(self, address: str) -> Dict:
+        key = address.lower()
+        with self._lock:
+            user = self._users.get(key)
+        if user is None:
+            user = self._generate_user(key)
+            with self._lock:
+                user = self._users.setdefault(key, user)
+        return user
+
+    def _generate_user(self, address: str) -> Dict:
+        rng = random.Random(_seed_for(self.seed, address))
+        coins = rng.sample(list(SYNTHETIC_COINS), k=rng.randint(2, 5))
+        start_ms = self.anchor_ms - self.history_days * DAY_MS
+        step = (self.anchor_ms - start_ms) // max(self.fills_per_user, 1)
+        notional = rng.choice([1e3, 5e3, 2e4, 1e5])
+
+        positions = {coin: [0.0, 0.0] for coin in coins}  # coin -> [size, entry px]
+        fills = []
+        for i in range(self.fills_per_user):
+            t = start_ms + i * step + rng.randint(0, max(step - 1, 0))
+            coin = rng.choice(coins)
+            size, entry = positions[coin]
+            px = self.price(coin, t) * (1 + rng.uniform(-0.002, 0.002))
+            decimals = SYNTHETIC_COINS.get(coin, (0, 2, 0))[1]
+
+            # Open or add to the position about half the time, otherwise reduce or close it
+            if size == 0 or rng.random() < 0.55:
+                is_buy = size > 0 if size != 0 else rng.random() < 0.5
+                sz = round(notional / px * rng.uniform(0.2, 1.0), decimals) or 10 ** -decimals
+            else:
+                is_buy = size < 0
+                sz = round(abs(size) * rng.choice([0.5, 1.0, 1.0]), decimals) or abs(size)
+
+            signed = sz if is_buy else -sz
+            closed_pnl = 0.0
+            if size != 0 and (size > 0) != is_buy:
+                closing = min(abs(size), sz)
+                closed_pnl = closing * (px - entry) * (1 if size > 0 else -1)
+            new_size = round(size + signed, decimals + 2)
+            if size == 0 or (size > 0) == is_buy:
+                entry = (abs(size) * entry + sz * px) / (abs(size) + sz)
+            positions[coin] = [new_size, entry if new_size != 0 else 0.0]
+
+            if size == 0 or (size > 0) == is_buy:
+                direction = 'Open Long' if is_buy else 'Open Short'
+            else:
+                direction = 'Close Short' if is_buy else 'Close Long'
+
+            fills.append({
+                'coin': coin,
+                'px': _money(px),
+                'sz': _money(sz),
+                'side': 'B' if is_buy else 'A',
+                'time': t,
+                'startPosition': _money(size),
+                'dir': direction,
+                'closedPnl': _money(closed_pnl),
+                'hash': '0x' + format(_seed_for(address, 'hash', i), '016x') * 4,
+                'oid': _seed_for(address, 'oid', i) % 10 ** 11,
+                'crossed': rng.random() < 0.7,
+                'fee': _money(sz * px * 0.00035),
+                'tid': _seed_for(address, 'tid', i) % 10 ** 15,
+                'feeToken': 'USDC',
+            })
+
+        realized = sum(float(f['closedPnl']) - float(f['fee']) for f in fills)
+        return {
+            'fills': fills,
+            'positions': {c: p for c, p in positions.items() if p[0] != 0},
+            'deposit': notional * rng.uniform(1.5, 4.0),
+            'realized': realized,
+            'start_ms': start_ms,
+            'rng_seed': rng.random(),
+        }
+
+    def user_fills(self, address: str, start_ms: Optional[int] = None,
+                   end_ms: Optional[int] = None) -> List[Dict]:
+        fills = self._user(address)['fills']
+        if start_ms is None:
+            # userFills: most recent fills first
+            return list(reversed(fills[-FILLS_RESPONSE_LIMIT:]))
+        end_ms = end_ms if end_ms is not None else _now_ms()
+        return [f for f in fills if start_ms <= f['time'] <= end_ms][:FILLS_RESPONSE_LIMIT]
+
+    def clearinghouse_state(self, address: str) -> Dict:
+        user = self._user(address)
+        now = _now_ms()
+        asset_positions = []
+        total_ntl = unrealized_total = margin_total = 0.0
+        for coin, (size, entry) in user['positions'].items():
+            mark = self.price(coin, now)
+            value = abs(size) * mark
+            unrealized = size * (mark - entry)
+            leverage = min(SYNTHETIC_COINS.get(coin, (0, 0, 10))[2], 10)
+            margin = value / leverage
+            total_ntl += value
+            unrealized_total += unrealized
+            margin_total += margin
+            asset_positions.append({'type': 'oneWay', 'position': {
+                'coin': coin,
+                'szi': _money(size),
+                'entryPx': _money(entry),
+                'positionValue': _money(value),
+                'unrealizedPnl': _money(unrealized),
+                'returnOnEquity': _money(unrealized / margin if margin else 0),
+                'leverage': {'type': 'cross', 'value': leverage},
+                'liquidationPx': _money(entry * (1 - 0.9 / leverage) if size > 0 else entry * (1 + 0.9 / leverage)),
+                'marginUsed': _money(margin),
+                'maxLeverage': SYNTHETIC_COINS.get(coin, (0, 0, 10))[2],
+            }})
+
+        account_value = max(user['deposit'] + user['realized'] + unrealized_total, 0.0)
+        summary = {
+            'accountValue': _money(account_value),
+            'totalNtlPos': _money(total_ntl),
+            'totalRawUsd': _money(account_value - unrealized_total),
+            'totalMarginUsed': _money(margin_total),
+        }
+        return {
+            'assetPositions': asset_positions,
+            'marginSummary': summary,
+            'crossMarginSummary': dict(summary),
+            'crossMaintenanceMarginUsed': _money(margin_total / 2),
+            'withdrawable': _money(max(account_value - margin_total, 0.0)),
+            'time': now,
+        }
+
+    def user_funding(self, address: str, start_ms: Optional[int] = None,
+                     end_ms: Optional[int] = None) -> List[Dict]:
+        user = self._user(address)
+        end_ms = min(end_ms or _now_ms(), _now_ms())
+        start_ms = max(start_ms or user['start_ms'], user['start_ms'])
+        payments = []
+        for hour in range(start_ms // HOUR_MS + 1, end_ms // HOUR_MS + 1):
+            t = hour * HOUR_MS
+            for coin, (size, _) in sorted(user['positions'].items()):
+                rate = 0.0000125 * (1 + math.sin(hour / 13 + _seed_for(coin) % 10))
+                payments.append({
+                    'time': t,
+                    'hash': '0x' + '0' * 64,
+                    'delta': {
+                        'type': 'funding', 'coin': coin,
+                        'usdc': _money(-size * self.price(coin, t) * rate),
+                        'szi': _money(size), 'fundingRate': f"{rate:.10f}",
+                        'nSamples': None,
+                    },
+                })
+                if len(payments) >= FUNDING_RESPONSE_LIMIT:
+                    return payments
+        return payments
+
+    def funding_history(self, coin: str, start_ms: Optional[int] = None,
+                        end_ms: Optional[int] = None) -> List[Dict]:
+        end_ms = min(end_ms or _now_ms(), _now_ms())
+        start_ms = start_ms or end_ms - DAY_MS
+        history = []
+        for hour in range(start_ms // HOUR_MS + 1, end_ms // HOUR_MS + 1):
+            rate = 0.0000125 * (1 + math.sin(hour / 13 + _seed_for(coin) % 10))
+            history.append({'coin': coin, 'fundingRate': f"{rate:.10f}", 'premium': '0',
+                            'time': hour * HOUR_MS})
+            if len(history) >= FUNDING_RESPONSE_LIMIT:
+                break
+        return history
+
+    def open_orders(self, address: str) -> List[Dict]:
+        user = self._user(address)
+        rng = random.Random(user['rng_seed'])
+        now = _now_ms()
+        orders = []
+        for i, (coin, (size, entry)) in enumerate(sorted(user['positions'].items())):
+            mark = self.price(coin, now)
+            # A resting take-profit per position plus the odd entry order
+            orders.append({
+                'coin': coin, 'side': 'A' if size > 0 else 'B',
+                'limitPx': _money(mark * (1.05 if size > 0 else 0.95)),
+                'sz': _money(abs(size)), 'origSz': _money(abs(size)),
+                'oid': _seed_for(address, 'order', i) % 10 ** 11,
+                'timestamp': now - rng.randint(60_000, DAY_MS),
+                'reduceOnly': True,
+            })
+            if rng.random() < 0.3:
+                orders.append({
+                    'coin': coin, 'side': 'B' if size > 0 else 'A',
+                    'limitPx': _money(mark * (0.97 if size > 0 else 1.03)),
+                    'sz': _money(abs(size) / 2), 'origSz': _money(abs(size) / 2),
+                    'oid': _seed_for(address, 'entry', i) % 10 ** 11,
+                    'timestamp': now - rng.randint(60_000, DAY_MS),
+                    'reduceOnly': False,
+                })
+        return orders
+
+    def ledger_updates(self, address: str, start_ms: Optional[int] = None) -> List[Dict]:
+        user = self._user(address)
+        updates = [{
+            'time': user['start_ms'],
+            'hash': '0x' + format(_seed_for(address, 'deposit'), '016x') * 4,
+            'delta': {'type': 'deposit', 'usdc': _money(user['deposit'])},
+        }]
+        return [u for u in updates if u['time'] >= (start_ms or 0)]
+
+    def spot_state(self, address: str) -> Dict:
+        return {'balances': [{'coin': 'USDC', 'token': 0, 'total': '0.0', 'hold': '0.0', 'entryNtl': '0.0'}]}
+
+    def address(self, rank: int) -> str:
+        return '0x' + format(_seed_for(self.seed, 'leader', rank), '016x')[:16] + format(rank, '024x')
+
+    def leaderboard(self) -> Dict:
+        rng = random.Random(_seed_for(self.seed, 'leaderboard'))
+        rows = []
+        for rank in range(self.leaderboard_rows):
+            scale = 1e7 / (rank + 1) ** 0.8
+            windows = []
+            for window, factor in (('day', 0.02), ('week', 0.1), ('month', 0.35), ('allTime', 1.0)):
+                pnl = scale * factor * rng.uniform(-0.3, 1.0)
+                windows.append([window, {
+                    'pnl': _money(pnl),
+                    'roi': _money(pnl / (scale * 2)),
+                    'vlm': _money(abs(pnl) * rng.uniform(10, 200)),
+                }])
+            rows.append({
+                'ethAddress': self.address(rank),
+                'accountValue': _money(scale * 2 * rng.uniform(0.5, 1.5)),
+                'windowPerformances': windows,
+                'prize': 0,
+                'displayName': f"synthetic{rank}" if rank % 7 == 0 else None,
+            })
+        return {'leaderboardRows': rows}
+
+    # ---- dispatch --------------------------------------------------------
+
+    def answer(self, payload: Dict):
+        """Response for one Info API payload, or None for unknown types"""
+        kind = payload.get('type')
+        user = payload.get('user', '')
+        start, end = payload.get('startTime'), payload.get('endTime')
+        if kind == 'clearinghouseState':
+            return self.clearinghouse_state(user)
+        if kind == 'userFills':
+            return self.user_fills(user)
+        if kind == 'userFillsByTime':
+            return self.user_fills(user, start or 0, end)
+        if kind == 'userFunding':
+            return self.user_funding(user, start, end)
+        if kind == 'userNonFundingLedgerUpdates':
+            return self.ledger_updates(user, start)
+        if kind == 'openOrders' or kind == 'frontendOpenOrders':
+            return self.open_orders(user)
+        if kind == 'spotClearinghouseState':
+            return self.spot_state(user)
+        if kind == 'allMids':
+            return self.all_mids()
+        if kind == 'meta':
+            return self.meta()
+        if kind == 'spotMeta':
+            return self.spot_meta()
+        if kind == 'fundingHistory':
+            return self.funding_history(payload.get('coin', ''), start, end)
+        if kind == 'candleSnapshot':
+            req = payload.get('req', {})
+            return self.candles(req.get('coin', ''), req.get('interval', '1h'),
+                                req.get('startTime', 0), req.get('endTime', _now_ms()))
+        return None
+
+
+def fixture_name(payload: Dict) -> str:
+    """File name a recorded response is stored under
+
+    Time bounds are not part of the name: time-bounded requests are answered
+    by filtering the recorded history, so one recording serves every window.
+    """
+    kind = payload.get('type', 'unknown')
+    if kind == 'userFillsByTime':
+        kind = 'userFills'
+    parts = [kind]
+    if payload.get('user'):
+        parts.append(payload['user'].lower())
+    if payload.get('coin'):
+        parts.append(payload['coin'])
+    if kind == 'candleSnapshot':
+        req = payload.get('req', {})
+        parts += [req.get('coin', ''), req.get('interval', '')]
+    return '-'.join(parts) + '.json'
+
+
+def _time_of(item) -> int:
+    if isinstance(item, dict):
+        return item.get('time', item.get('t', 0))
+    return 0
+
+
+def _window(items: List, payload: Dict) -> List:
+    """Apply a request's startTime/endTime to recorded history"""
+    req = payload.get('req', payload)
+    start, end = req.get('startTime'), req.get('endTime')
+    if payload.get('type') == 'userFills':
+        return sorted(items, key=_time_of, reverse=True)[:FILLS_RESPONSE_LIMIT]
+    if start is None and end is None:
+        return items
+    end = end if end is not None else float('inf')
+    windowed = sorted((i for i in items if (start or 0) <= _time_of(i) <= end), key=_time_of)
+    if payload.get('type') == 'userFillsByTime':
+        return windowed[:FILLS_RESPONSE_LIMIT]
+    return windowed
+
+
+class FixtureStore:
+    """Recorded responses on disk, one JSON file per request identity"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def load(self, payload: Dict):
+        path = self._path(fixture_name(payload))
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            recorded = json.load(f)
+        return _window(recorded, payload) if isinstance(recorded, list) else recorded
+
+    def load_leaderboard(self):
+        path = self._path('leaderboard.json')
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def save(self, name: str, response):
+        """Store a response; list responses are merged into what is already recorded"""
+        path = self._path(name)
+        with self._lock:
+            if isinstance(response, list) and os.path.exists(path):
+                with open(path) as f:
+                    existing = json.load(f)
+                if isinstance(existing, list):
+                    merged = {json.dumps(item, sort_keys=True): item for item in existing + response}
+                    response = sorted(merged.values(), key=_time_of)
+            with open(path, 'w') as f:
+                json.dump(response, f)
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self._reply(400, {'error': 'invalid JSON'})
+        if self.path.rstrip('/') != '/info':
+            return self._reply(404, {'error': f'unknown path {self.path}'})
+        self.server.fake.handle(self, payload)
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/leaderboard'):
+            return self.server.fake.handle(self, None)
+        if self.path.rstrip('/') == '/stats':
+            return self._reply(200, self.server.fake.stats())
+        self._reply(404, {'error': f'unknown path {self.path}'})
+
+    def _reply(self, status: int, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeHyperliquidServer:
+    """Threaded local HTTP server imitating the Info API and leaderboard host
+
+    latency_ms/jitter_ms delay every response. rate_limit_weight enforces a
+    rolling per-minute weight budget (as the real API does per IP) and
+    answers 429 once it is spent; throttle_rate additionally returns 429 for
+    that fraction of requests at random.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, market: SyntheticMarket = None,
+                 fixtures_dir: str = None, record: bool = False,
+                 latency_ms: float = 0, jitter_ms: float = 0,
+                 rate_limit_weight: float = 0, throttle_rate: float = 0.0, seed: int = 0):
+        self.market = market or SyntheticMarket(seed=seed)
+        self.fixtures = FixtureStore(fixtures_dir) if fixtures_dir else None
+        self.record = record
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit_weight = rate_limit_weight
+        self.throttle_rate = throttle_rate
+        self._rng = random.Random(seed)
+
+        self._window = deque()  # (timestamp, weight) spent in the last 60s
+        self._window_weight = 0.0
+        self._lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self.throttled = 0
+        self.fixture_hits = 0
+
+        self.httpd = ThreadingHTTPServer((host, port), _FakeHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def leaderboard_url(self) -> str:
+        return f"{self.url}/leaderboard"
+
+    def start(self) -> 'FakeHyperliquidServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='fake-hyperliquid', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _admit(self, weight: float) -> bool:
+        """Charge the rolling weight budget; False means answer 429"""
+        with self._lock:
+            if self.throttle_rate and self._rng.random() < self.throttle_rate:
+                self.throttled += 1
+                return False
+            if not self.rate_limit_weight:
+                return True
+            now = time.monotonic()
+            while self._window and now - self._window[0][0] >= 60:
+                self._window_weight -= self._window.popleft()[1]
+            if self._window_weight + weight > self.rate_limit_weight:
+                self.throttled += 1
+                return False
+            self._window.append((now, weight))
+            self._window_weight += weight
+            return True
+
+    def _charge(self, weight: float):
+        if weight > 0 and self.rate_limit_weight:
+            with self._lock:
+                self._window.append((time.monotonic(), weight))
+                self._window_weight += weight
+
+    def _sleep(self):
+        delay = self.latency_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def handle(self, handler: _FakeHandler, payload: Optional[Dict]):
+        endpoint = payload.get('type', '') if payload is not None else 'leaderboard'
+        with self._lock:
+            self.requests[endpoint] += 1
+
+        self._sleep()
+        if not self._admit(request_weight(endpoint)):
+            return handler._reply(429, None)
+
+        try:
+            body = self._response(endpoint, payload)
+        except requests.RequestException as e:
+            return handler._reply(502, {'error': f'upstream: {e}'})
+        if body is None:
+            return handler._reply(422, {'error': f'unsupported request type {endpoint!r}'})
+
+        self._charge(response_weight(endpoint, body))
+        handler._reply(200, body)
+
+    def _response(self, endpoint: str, payload: Optional[Dict]):
+        is_leaderboard = payload is None
+        if self.fixtures is not None:
+            if self.record:
+                return self._record(endpoint, payload)
+            recorded = self.fixtures.load_leaderboard() if is_leaderboard else self.fixtures.load(payload)
+            if recorded is not None:
+                with self._lock:
+                    self.fixture_hits += 1
+                return recorded
+        return self.market.leaderboard() if is_leaderboard else self.market.answer(payload)
+
+    def _record(self, endpoint: str, payload: Optional[Dict]):
+        """Proxy to the real API and keep the response as a fixture"""
+        if payload is None:
+            response = requests.get(UPSTREAM_LEADERBOARD_URL, timeout=30)
+            name = 'leaderboard.json'
+        else:
+            response = requests.post(f"{UPSTREAM_API_URL}/info", json=payload, timeout=30)
+            name = fixture_name(payload)
+        response.raise_for_status()
+        body = response.json()
+        self.fixtures.save(name, body)
+        return body
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'requests': dict(self.requests),
+                'total_requests': sum(self.requests.values()),
+                'throttled': self.throttled,
+                'fixture_hits': self.fixture_hits,
+                'window_weight': self._window_weight,
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the Hyperliquid Info API and leaderboard')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--fixtures', help='Directory of recorded responses to replay')
+    parser.add_argument('--record', action='store_true', help='Proxy to the real API and save responses to --fixtures')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Delay added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Random extra delay, 0..jitter')
+    parser.add_argument('--rate-limit', type=float, default=0,
+                        help='Request weight per rolling minute before answering 429 (0 = unlimited)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered 429 at random')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--fills-per-user', type=int, default=500)
+    parser.add_argument('--leaderboard-rows', type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.record and not args.fixtures:
+        parser.error('--record needs --fixtures')
+
+    market = SyntheticMarket(seed=args.seed, fills_per_user=args.fills_per_user,
+                             leaderboard_rows=args.leaderboard_rows)
+    server = FakeHyperliquidServer(args.host, args.port, market=market, fixtures_dir=args.fixtures,
+                                   record=args.record, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                                   rate_limit_weight=args.rate_limit, throttle_rate=args.throttle_rate,
+                                   seed=args.seed)
+    mode = 'recording' if args.record else ('replaying ' + args.fixtures if args.fixtures else 'synthetic')
+    print(f"🧪 Fake Hyperliquid API on {server.url} ({mode})")
+    print(f"   HYPERLIQUID_MAINNET_URL={server.url}")
+    print(f"   HYPERLIQUID_LEADERBOARD_URL={server.leaderboard_url}")
+    print(f"   Stats: {server.url}/stats")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping fake API")
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+"""
+Columnar fill storage for heavy accounts
+
+A FillFrame holds an account's fills as one NumPy structured array (one
+record per fill, sorted by time) plus a coin dictionary mapping small integer
+ids to symbols. Analytics read whole columns (frame.closed_pnl, frame.px, ...)
+instead of looping over per-fill Python objects.
+
+Slicing is zero-copy: between() narrows to a time range with searchsorted on
+the sorted time column, and for_coin() returns a view into a coin-major copy
+of the records that is built once per frame on first use.
+
+Funding payments (userFunding) ride along in a second time-sorted array,
+frame.funding, that shares the coin dictionary. with_funding() merges new
+payments in time order (dropping ones already present) and every slice
+narrows both arrays to the same window, so analytics can add funding to
+fill PnL with the same prefix-sum lookups.
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from fills import Fill
+
+FILL_DTYPE = np.dtype([
+    ('time', '<i8'),              # ms since epoch
+    ('tid', '<i8'),               # -1 when the API gave none
+    ('coin', '<i4'),              # index into FillFrame.coins
+    ('side', 'i1'),               # +1 buy, -1 sell
+    ('px', '<f8'),
+    ('sz', '<f8'),
+    ('closed_pnl', '<f8'),
+    ('fee', '<f8'),
+    ('start_position', '<f8'),
+])
+
+FUNDING_DTYPE = np.dtype([
+    ('time', '<i8'),              # ms since epoch
+    ('coin', '<i4'),              # index into FillFrame.coins
+    ('usdc', '<f8'),              # signed: positive when the account received funding
+    ('szi', '<f8'),               # position size the payment was charged on
+    ('rate', '<f8'),              # funding rate
+])
+
+SIDE_BUY = 1
+SIDE_SELL = -1
+
+
+class FillFrame:
+    """Time-sorted structured arrays of fills and funding payments plus their coin dictionary"""
+
+    __slots__ = ('data', 'funding', 'coins', '_coin_ids', '_by_coin', '_coin_bounds')
+
+    def __init__(self, data: np.ndarray, coins: Sequence[str], _sorted: bool = False,
+                 funding: Optional[np.ndarray] = None):
+        if not _sorted and len(data) > 1 and np.any(data['time'][1:] < data['time'][:-1]):
+            data = data[np.argsort(data['time'], kind='stable')]
+        self.data = data
+        self.funding = _sort_funding(funding) if funding is not None else np.empty(0, dtype=FUNDING_DTYPE)
+        self.coins = list(coins)
+        self._coin_ids = {coin: i for i, coin in enumerate(self.coins)}
+        self._by_coin = None
+        self._coin_bounds = None
+
+    # ---- constructors ----------------------------------------------------
+
+    @classmethod
+    def empty(cls) -> 'FillFrame':
+        return cls(np.empty(0, dtype=FILL_DTYPE), [], _sorted=True)
+
+    @classmethod
+    def from_fills(cls, fills: Iterable[Union[Fill, Dict]]) -> 'FillFrame':
+        """Build from Fills or raw API fill dicts (one pass, no intermediate objects)"""
+        coin_ids: Dict[str, int] = {}
+
+        def coin_id(coin):
+            cid = coin_ids.get(coin)
+            if cid is None:
+                cid = coin_ids[coin] = len(coin_ids)
+            return cid
+
+        def rows():
+            for f in fills:
+                if isinstance(f, Fill):
+                    yield (f.time, -1 if f.tid is None else f.tid, coin_id(f.coin),
+                           SIDE_BUY if f.side == 'B' else SIDE_SELL,
+                           f.px, f.sz, f.closed_pnl, f.fee, f.start_position)
+                else:
+                    get = f.get
+                    tid = get('tid')
+                    yield (get('time', 0), -1 if tid is None else tid, coin_id(get('coin', '')),
+                           SIDE_BUY if get('side') == 'B' else SIDE_SELL,
+                           float(get('px', 0)), float(get('sz', 0)), float(get('closedPnl', 0)),
+                           float(get('fee', 0)), float(get('startPosition', 0)))
+
+        data = np.fromiter(rows(), dtype=FILL_DTYPE)
+        return cls(data, list(coin_ids))
+
+    # The API and WebSocket hand over lists of raw dicts
+    from_api = from_fills
+
+    @classmethod
+    def from_db(cls, db, address: str, start_time: Optional[int] = None,
+                end_time: Optional[int] = None, funding_start_time: Optional[int] = None) -> 'FillFrame':
+        """Build from the fills persisted by Database.add_fills()
+
+        Funding payments are merged from funding_start_time (default: start_time).
+        """
+        rows = db.get_fill_rows(address, start_time, end_time)
+        coin_ids: Dict[str, int] = {}
+        data = np.fromiter(
+            ((time, tid if tid is not None else -1, coin_ids.setdefault(coin, len(coin_ids)),
+              SIDE_BUY if side == 'B' else SIDE_SELL, px, sz, closed_pnl, fee, start_position)
+             for time, tid, coin, side, px, sz, closed_pnl, fee, start_position in rows),
+            dtype=FILL_DTYPE
+        )
+        frame = cls(data, list(coin_ids))
+        funding_start = start_time if funding_start_time is None else funding_start_time
+        return frame._merge_funding(db.get_funding_rows(address, funding_start, end_time))
+
+    @classmethod
+    def concat(cls, frames: Iterable['FillFrame']) -> 'FillFrame':
+        """Join frames (e.g. one per fetched page), merging their coin dictionaries"""
+        frames = [f for f in frames if len(f) or len(f.funding)]
+        if not frames:
+            return cls.empty()
+        if len(frames) == 1:
+            return frames[0]
+
+        coin_ids: Dict[str, int] = {}
+        parts, funding = [], []
+        for frame in frames:
+            remap = np.array([coin_ids.setdefault(c, len(coin_ids)) for c in frame.coins], dtype='<i4')
+            part = frame.data.copy()
+            part['coin'] = remap[part['coin']]
+            parts.append(part)
+            payments = frame.funding.copy()
+            payments['coin'] = remap[payments['coin']]
+            funding.append(payments)
+        return cls(np.concatenate(parts), list(coin_ids), funding=np.concatenate(funding))
+
+    # ---- funding ---------------------------------------------------------
+
+    def with_funding(self, payments: Iterable[Dict]) -> 'FillFrame':
+        """This frame with raw userFunding entries merged into its funding, in time order
+
+        Payments already present (same time and coin) are dropped, so
+        overlapping incremental fetches can be merged as they arrive. Fills
+        are shared, not copied.
+        """
+        def rows():
+            for payment in payments:
+                delta = payment.get('delta', {})
+                yield (payment.get('time', 0), delta.get('coin', ''), float(delta.get('usdc', 0)),
+                       float(delta.get('szi', 0)), float(delta.get('fundingRate', 0)))
+        return self._merge_funding(rows())
+
+    def _merge_funding(self, rows: Iterable[tuple]) -> 'FillFrame':
+        """Merge (time, coin, usdc, szi, rate) rows; new coins extend the coin dictionary"""
+        coin_ids = dict(self._coin_ids)
+        new = np.fromiter(((time, coin_ids.setdefault(coin, len(coin_ids)), usdc, szi, rate)
+                           for time, coin, usdc, szi, rate in rows), dtype=FUNDING_DTYPE)
+        if not len(new):
+            return self
+        frame = self._view(self.data, _sort_funding(np.concatenate((self.funding, new))))
+        if len(coin_ids) != len(self.coins):
+            frame.coins = list(coin_ids)
+            frame._coin_ids = coin_ids
+        return frame
+
+    # ---- columns ---------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def time(self) -> np.ndarray:
+        return self.data['time']
+
+    @property
+    def tid(self) -> np.ndarray:
+        return self.data['tid']
+
+    @property
+    def coin_id(self) -> np.ndarray:
+        return self.data['coin']
+
+    @property
+    def side(self) -> np.ndarray:
+        return self.data['side']
+
+    @property
+    def px(self) -> np.ndarray:
+        return self.data['px']
+
+    @property
+    def sz(self) -> np.ndarray:
+        return self.data['sz']
+
+    @property
+    def closed_pnl(self) -> np.ndarray:
+        return self.data['closed_pnl']
+
+    @property
+    def fee(self) -> np.ndarray:
+        return self.data['fee']
+
+    @property
+    def start_position(self) -> np.ndarray:
+        return self.data['start_position']
+
+    @property
+    def funding_time(self) -> np.ndarray:
+        return self.funding['time']
+
+    @property
+    def funding_usdc(self) -> np.ndarray:
+        return self.funding['usdc']
+
+    @property
+    def notional(self) -> np.ndarray:
+        return self.data['px'] * self.data['sz']
+
+    def coin_labels(self, coin_ids: np.ndarray) -> List[str]:
+        coins = self.coins
+        return [coins[i] for i in coin_ids.tolist()]
+
+    # ---- zero-copy slicing -----------------------------------------------
+
+    def _view(self, data: np.ndarray, funding: Optional[np.ndarray] = None) -> 'FillFrame':
+        """Frame over data sharing this coin dictionary (and this funding unless given)"""
+        frame = FillFrame.__new__(FillFrame)
+        frame.data = data
+        frame.funding = self.funding if funding is None else funding
+        frame.coins = self.coins
+        frame._coin_ids = self._coin_ids
+        frame._by_coin = None
+        frame._coin_bounds = None
+        return frame
+
+    def between(self, start_ms: Optional[float] = None, end_ms: Optional[float] = None) -> 'FillFrame':
+        """Fills and funding payments with start_ms <= time <= end_ms, as a view"""
+        lo, hi = _time_range(self.data['time'], start_ms, end_ms)
+        f_lo, f_hi = _time_range(self.funding['time'], start_ms, end_ms)
+        return self._view(self.data[lo:hi], self.funding[f_lo:f_hi])
+
+    def for_coin(self, coin: str) -> 'FillFrame':
+        """Fills of one coin (time-sorted), as a view into the coin-major copy, with its funding"""
+        cid = self._coin_ids.get(coin)
+        if cid is None:
+            return self._view(self.data[:0], self.funding[:0])
+        if self._by_coin is None:
+            ids = self.data['coin']
+            self._by_coin = self.data[np.argsort(ids, kind='stable')]
+            self._coin_bounds = np.searchsorted(self._by_coin['coin'], np.arange(len(self.coins) + 1))
+        lo, hi = self._coin_bounds[cid], self._coin_bounds[cid + 1]
+        return self._view(self._by_coin[lo:hi], self.funding[self.funding['coin'] == cid])
+
+    def __repr__(self) -> str:
+        funding = f", {len(self.funding)} funding payments" if len(self.funding) else ""
+        return f"FillFrame({len(self)} fills, {len(self.coins)} coins{funding})"
+
+
+def _time_range(times: np.ndarray, start_ms: Optional[float], end_ms: Optional[float]):
+    """[lo, hi) of a sorted time column inside [start_ms, end_ms]"""
+    lo = 0 if start_ms is None else int(np.searchsorted(times, math.ceil(start_ms), side='left'))
+    hi = len(times) if end_ms is None else int(np.searchsorted(times, math.floor(end_ms), side='right'))
+    return lo, hi
+
+
+def _sort_funding(funding: np.ndarray) -> np.ndarray:
+    """Funding payments by time, keeping the first of any repeated (time, coin)"""
+    if len(funding) < 2:
+        return funding
+    funding = funding[np.lexsort((funding['coin'], funding['time']))]
+    repeat = (funding['time'][1:] == funding['time'][:-1]) & (funding['coin'][1:] == funding['coin'][:-1])
+    return funding[np.concatenate(([True], ~repeat))] if repeat.any() else funding
+
+
+def as_frame(fills) -> FillFrame:
+    """Accept a FillFrame, Fills or raw API dicts"""
+    if isinstance(fills, FillFrame):
+        return fills
+    return FillFrame.from_fills(fills or [])
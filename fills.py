@@ -0,0 +1,102 @@
+"""
+Typed, compact fill records
+
+The Info API returns fills as dicts of strings ({"px": "97000.5", ...}), and
+every consumer used to convert them again with float(fill.get(...)) - often
+several times for the same fill. Fills are now parsed exactly once, when they
+come off the wire, into a Fill NamedTuple: numbers are floats, and the small
+set of repeated symbols (coin, side, dir, fee token) are interned so every
+fill of a coin shares one string object.
+"""
+
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+_intern = sys.intern
+_new_tuple = tuple.__new__
+
+
+class Fill(NamedTuple):
+    """One executed fill; field names follow the API (snake_case)"""
+    time: int
+    coin: str
+    side: str                 # 'B' = buy, 'A' = sell
+    px: float
+    sz: float
+    closed_pnl: float
+    fee: float
+    start_position: float
+    dir: str                  # 'Open Long', 'Close Short', ...
+    tid: Optional[int] = None
+    oid: Optional[int] = None
+    hash: Optional[str] = None
+    crossed: bool = False
+    fee_token: str = ''
+
+    @classmethod
+    def from_api(cls, raw: Dict) -> 'Fill':
+        get = raw.get
+        # tuple.__new__ skips the generated keyword-handling __new__; this runs per fill
+        return _new_tuple(cls, (
+            get('time', 0),
+            _intern(get('coin', '')),
+            _intern(get('side', '')),
+            float(get('px', 0)),
+            float(get('sz', 0)),
+            float(get('closedPnl', 0)),
+            float(get('fee', 0)),
+            float(get('startPosition', 0)),
+            _intern(get('dir', '')),
+            get('tid'),
+            get('oid'),
+            get('hash'),
+            bool(get('crossed', False)),
+            _intern(get('feeToken', '')),
+        ))
+
+    @property
+    def is_buy(self) -> bool:
+        return self.side == 'B'
+
+    @property
+    def notional(self) -> float:
+        return self.px * self.sz
+
+    @property
+    def key(self):
+        """Identity for de-duplication: tid, or (hash, oid, time) when tid is missing"""
+        if self.tid is not None:
+            return self.tid
+        return (self.hash, self.oid, self.time)
+
+    def to_dict(self) -> Dict:
+        """API-shaped dict (camelCase keys) with numeric values"""
+        return {
+            'time': self.time,
+            'coin': self.coin,
+            'side': self.side,
+            'px': self.px,
+            'sz': self.sz,
+            'closedPnl': self.closed_pnl,
+            'fee': self.fee,
+            'startPosition': self.start_position,
+            'dir': self.dir,
+            'tid': self.tid,
+            'oid': self.oid,
+            'hash': self.hash,
+            'crossed': self.crossed,
+            'feeToken': self.fee_token,
+        }
+
+
+def parse_fills(raw_fills: Iterable[Dict]) -> List[Fill]:
+    """Parse raw API fill dicts into Fills"""
+    from_api = Fill.from_api
+    return [from_api(raw) for raw in raw_fills]
+
+
+def as_fills(fills: Iterable[Union[Fill, Dict]]) -> List[Fill]:
+    """Accept Fills or raw API dicts (e.g. WebSocket pushes); parse only what is still raw"""
+    if isinstance(fills, list) and all(isinstance(f, Fill) for f in fills):
+        return fills
+    return [f if isinstance(f, Fill) else Fill.from_api(f) for f in fills]
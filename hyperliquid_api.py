@@ -1,8 +1,19 @@
 import requests
 import json
-from typing import Dict, List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Optional, Iterable, Iterator, Tuple, Union
 from datetime import datetime, timedelta
 from config import Config
+from rate_limiter import TokenBucket, get_shared_rate_limiter, request_weight, response_weight
+from response_cache import TTLCache, get_shared_cache
+from single_flight import SingleFlight, get_shared_single_flight
+from leaderboard_stream import LeaderboardRecord, parse_leaderboard_stream, STREAM_CHUNK_SIZE
+from fills import parse_fills
+from resilience import (CircuitBreakers, RequestMetrics, RetryBudget, RetryPolicy,
+                        get_shared_circuit_breakers, get_shared_request_metrics, get_shared_retry_budget)
 
 try:
     from hyperliquid.info import Info
@@ -10,52 +21,493 @@ try:
 except ImportError:
     HYPERLIQUID_SDK_AVAILABLE = False
 
+# Max fills the Info API returns per userFillsByTime response
+FILLS_PAGE_LIMIT = 2000
+FUNDING_PAGE_LIMIT = 500
+
+# Read timeouts (seconds) per request type; anything not listed uses Config.HTTP_TIMEOUT.
+# History endpoints return large payloads and get more headroom.
+REQUEST_TIMEOUTS = {
+    'userFills': 20,
+    'userFillsByTime': 20,
+    'userFunding': 20,
+    'userNonFundingLedgerUpdates': 20,
+    'fundingHistory': 20,
+    'candleSnapshot': 20,
+    'leaderboard': 30,
+}
+
+
+class APIError(Exception):
+    """Raised when an Info API request fails
+
+    Subclasses classify the failure; retryable ones are retried with backoff
+    before they reach the caller.
+    """
+    retryable = False
+    outcome = 'client_error'
+
+    def __init__(self, endpoint: str, message: str, status: Optional[int] = None):
+        super().__init__(f"{endpoint}: {message}")
+        self.endpoint = endpoint
+        self.status = status
+
+
+class RateLimitedError(APIError):
+    """HTTP 429: the request weight budget is spent"""
+    retryable = True
+    outcome = 'rate_limited'
+
+    def __init__(self, endpoint: str, message: str, status: Optional[int] = 429,
+                 retry_after: Optional[float] = None):
+        super().__init__(endpoint, message, status)
+        self.retry_after = retry_after
+
+
+class ServerError(APIError):
+    """HTTP 5xx or an unreadable response body"""
+    retryable = True
+    outcome = 'server_error'
+
+
+class NetworkError(APIError):
+    """Connection failure or timeout"""
+    retryable = True
+    outcome = 'network_error'
+
+
+class ClientError(APIError):
+    """HTTP 4xx other than 429: retrying will not help"""
+
+
+class CircuitOpenError(APIError):
+    """Failed fast because the request type's circuit breaker is open"""
+    outcome = 'circuit_open'
+
+
+def _error_for_status(endpoint: str, response: requests.Response) -> Optional[APIError]:
+    """Classify a non-2xx response, or None if it succeeded"""
+    return _error_for(endpoint, response.status_code, response.reason, response.headers)
+
+
+def _error_for(endpoint: str, status: int, reason: Optional[str], headers) -> Optional[APIError]:
+    """Classify an HTTP status (with its reason and headers), or None if it succeeded"""
+    if status < 400:
+        return None
+    message = f"{status} {reason or ''}".strip()
+    if status == 429:
+        retry_after = headers.get('Retry-After')
+        try:
+            retry_after = float(retry_after) if retry_after is not None else None
+        except ValueError:
+            retry_after = None
+        return RateLimitedError(endpoint, message, status, retry_after)
+    if status >= 500:
+        return ServerError(endpoint, message, status)
+    return ClientError(endpoint, message, status)
+
+
+def split_batch_results(results: Dict[str, object]) -> Tuple[Dict[str, object], Dict[str, APIError]]:
+    """Split a batch result dict into (successes, failures) keyed by address"""
+    ok = {k: v for k, v in results.items() if not isinstance(v, APIError)}
+    failed = {k: v for k, v in results.items() if isinstance(v, APIError)}
+    return ok, failed
+
+
+def _fills_request(address: str, start_time: Optional[int] = None) -> Dict:
+    """userFills ignores startTime, so time-bounded queries use userFillsByTime"""
+    if start_time:
+        return {"type": "userFillsByTime", "user": address, "startTime": start_time}
+    return {"type": "userFills", "user": address}
+
+
+def _funding_key(payment: Dict):
+    """Identity of a funding payment: one per coin per funding time"""
+    return payment.get('delta', {}).get('coin')
+
+
+def _fill_key(fill: Dict):
+    """Identity of a fill for de-duplication across page boundaries"""
+    tid = fill.get('tid')
+    if tid is not None:
+        return tid
+    return (fill.get('hash'), fill.get('oid'), fill.get('time'))
+
+
+class HTTPTransport:
+    """Pooled keep-alive HTTP transport
+
+    One requests.Session with a connection pool per host, so repeated Info API
+    calls reuse open TCP+TLS connections instead of paying a handshake each time.
+    Safe to share between threads and API clients.
+    """
+
+    def __init__(self, pool_size: int = None, timeouts: Dict[str, float] = None,
+                 default_timeout: float = None, connect_timeout: float = None):
+        self.pool_size = pool_size or Config.HTTP_POOL_SIZE
+        self.default_timeout = default_timeout or Config.HTTP_TIMEOUT
+        self.connect_timeout = connect_timeout or Config.HTTP_CONNECT_TIMEOUT
+        self.timeouts = {**REQUEST_TIMEOUTS, **(timeouts or {})}
+
+        self.session = requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
+        # pool_connections = number of hosts kept alive, pool_maxsize = sockets per host
+        self.adapter = HTTPAdapter(pool_connections=10, pool_maxsize=self.pool_size)
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+        self._lock = threading.Lock()
+        self.request_count = 0
+        self.error_count = 0
+
+    def timeout_for(self, endpoint: str):
+        """(connect, read) timeout tuple for a request type"""
+        return (self.connect_timeout, self.timeouts.get(endpoint, self.default_timeout))
+
+    def post(self, url: str, endpoint: str, payload: Dict) -> requests.Response:
+        """POST a JSON payload over the pooled session"""
+        return self._send('POST', url, endpoint, json=payload)
+
+    def get(self, url: str, endpoint: str, **kwargs) -> requests.Response:
+        """GET over the pooled session"""
+        return self._send('GET', url, endpoint, **kwargs)
+
+    def _send(self, method: str, url: str, endpoint: str, **kwargs) -> requests.Response:
+        with self._lock:
+            self.request_count += 1
+        try:
+            return self.session.request(method, url, timeout=self.timeout_for(endpoint), **kwargs)
+        except requests.RequestException:
+            with self._lock:
+                self.error_count += 1
+            raise
+
+    def stats(self) -> Dict:
+        """Connection reuse counters aggregated over the live host pools"""
+        opened = 0
+        pooled_requests = 0
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            pooled_requests += pool.num_requests
+
+        reused = max(pooled_requests - opened, 0)
+        return {
+            'requests': self.request_count,
+            'errors': self.error_count,
+            'connections_opened': opened,
+            'connections_reused': reused,
+            'reuse_ratio': reused / pooled_requests if pooled_requests else 0.0,
+            'pool_size': self.pool_size,
+        }
+
+    def close(self):
+        self.session.close()
+
+
+_shared_transport = None
+_shared_transport_lock = threading.Lock()
+
+# Caps in-flight batch requests across every client and batch call in the process
+_batch_semaphore = threading.BoundedSemaphore(Config.API_MAX_CONCURRENCY)
+
+
+def get_shared_transport() -> HTTPTransport:
+    """Process-wide transport so every HyperliquidAPI instance shares one pool"""
+    global _shared_transport
+    with _shared_transport_lock:
+        if _shared_transport is None:
+            _shared_transport = HTTPTransport()
+        return _shared_transport
+
+
 class HyperliquidAPI:
-    def __init__(self, use_testnet=False):
+    def __init__(self, use_testnet=False, transport: HTTPTransport = None,
+                 rate_limiter: TokenBucket = None, cache: TTLCache = None,
+                 single_flight: SingleFlight = None, retry_policy: RetryPolicy = None,
+                 circuit_breakers: CircuitBreakers = None, metrics: RequestMetrics = None,
+                 retry_budget: RetryBudget = None):
         self.base_url = Config.TESTNET_API_URL if use_testnet else Config.MAINNET_API_URL
         self.info_url = f"{self.base_url}/info"
+        self.leaderboard_url = Config.LEADERBOARD_URL
+        self.transport = transport or get_shared_transport()
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.cache = cache or get_shared_cache()
+        self.single_flight = single_flight or get_shared_single_flight()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breakers = circuit_breakers or get_shared_circuit_breakers()
+        self.metrics = metrics or get_shared_request_metrics()
+        self.retry_budget = retry_budget or get_shared_retry_budget()
 
         # Initialize official SDK if available
         if HYPERLIQUID_SDK_AVAILABLE:
             try:
-                self.info = Info(skip_ws=True)
+                self.info = Info(base_url=self.base_url, skip_ws=True)
             except:
                 self.info = None
         else:
             self.info = None
 
-    def _post(self, endpoint: str, data: Dict) -> Dict:
-        """Make a POST request to the Hyperliquid API"""
-        url = f"{self.info_url}"
+    def _request(self, endpoint: str, data: Dict, use_cache: bool = True):
+        """Make a POST request to the Hyperliquid API, raising APIError on failure
+
+        Request types with a cache TTL are served from the response cache while
+        fresh, and concurrent identical requests share one upstream call.
+        use_cache=False always sends its own request (and refreshes the entry).
+        """
+        request_key = (self.info_url, json.dumps(data, sort_keys=True))
+        cache_key = request_key if self.cache.ttl_for(endpoint) else None
+        if not use_cache:
+            return self._fetch(endpoint, data, cache_key)
+
+        if cache_key is not None:
+            hit, value = self.cache.get(endpoint, cache_key)
+            if hit:
+                return value
+        return self.single_flight.do(endpoint, request_key,
+                                     lambda: self._fetch(endpoint, data, cache_key))
+
+    def _send(self, endpoint: str, send) -> requests.Response:
+        """Run send() with rate limiting, retries and the endpoint's circuit breaker
+
+        Returns a successful response or raises a classified APIError. 429, 5xx
+        and network failures are retried with jittered backoff while the retry
+        budget allows; other 4xx responses are raised at once.
+        """
+        self.retry_budget.record_request()
+        attempt = 0
+        while True:
+            if not self.circuit_breakers.allow(endpoint):
+                self.metrics.observe(endpoint, 'circuit_open')
+                raise CircuitOpenError(endpoint, "circuit open after repeated failures")
+
+            self.rate_limiter.acquire(request_weight(endpoint))
+            started = time.perf_counter()
+            try:
+                response = send()
+                error = _error_for_status(endpoint, response)
+            except requests.RequestException as e:
+                response, error = None, NetworkError(endpoint, str(e))
+            elapsed = time.perf_counter() - started
+
+            if error is None:
+                self.metrics.observe(endpoint, 'ok', elapsed)
+                self.circuit_breakers.record_success(endpoint)
+                return response
+
+            if response is not None:
+                response.close()
+            self.metrics.observe(endpoint, error.outcome, elapsed)
+            if error.retryable:
+                self.circuit_breakers.record_failure(endpoint)
+            else:
+                self.circuit_breakers.record_success(endpoint)  # the service answered
+
+            attempt += 1
+            if (not error.retryable or attempt >= self.retry_policy.max_attempts
+                    or not self.retry_budget.try_spend()):
+                raise error
+            self.metrics.record_retry(endpoint)
+            time.sleep(self.retry_policy.delay(attempt - 1, getattr(error, 'retry_after', None)))
+
+    def _fetch(self, endpoint: str, data: Dict, cache_key=None):
+        """Send one Info API request and cache the result"""
+        response = self._send(endpoint, lambda: self.transport.post(self.info_url, endpoint, data))
         try:
-            response = requests.post(url, json=data, headers={'Content-Type': 'application/json'})
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
+            result = response.json()
+        except ValueError as e:
+            raise ServerError(endpoint, f"invalid JSON response: {e}") from e
+
+        # History endpoints cost extra weight per batch of items returned
+        self.rate_limiter.charge(response_weight(endpoint, result))
+
+        if cache_key is not None:
+            self.cache.set(endpoint, cache_key, result)
+        return result
+
+    def _post(self, endpoint: str, data: Dict, use_cache: bool = True, raise_on_error: bool = False) -> Dict:
+        """Make a POST request to the Hyperliquid API
+
+        Returns {} on failure unless raise_on_error is set, in which case the
+        APIError propagates so the caller can tell "empty" from "failed".
+        """
+        try:
+            return self._request(endpoint, data, use_cache=use_cache)
+        except APIError as e:
+            if raise_on_error:
+                raise
             print(f"API Error: {e}")
             return {}
 
-    def get_user_state(self, address: str) -> Dict:
+    def _fan_out(self, func, addresses: Iterable[str]) -> Dict[str, object]:
+        """Run func(address) concurrently, returning {address: result or APIError}"""
+        addresses = list(dict.fromkeys(addresses))
+        if not addresses:
+            return {}
+
+        def call(address):
+            with _batch_semaphore:
+                try:
+                    return func(address)
+                except APIError as e:
+                    return e
+
+        workers = min(len(addresses), Config.API_MAX_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(addresses, executor.map(call, addresses)))
+
+    def get_user_states_many(self, addresses: Iterable[str], use_cache: bool = True) -> Dict[str, object]:
+        """Get clearinghouse state for many addresses concurrently
+
+        Returns {address: state}; failed addresses map to an APIError instead of {}.
+        """
+        return self._fan_out(
+            lambda address: self._request("clearinghouseState", {"type": "clearinghouseState", "user": address},
+                                          use_cache=use_cache),
+            addresses
+        )
+
+    def get_user_fills_many(self, addresses: Iterable[str], start_time: Optional[int] = None,
+                            typed: bool = False) -> Dict[str, object]:
+        """Get fill history for many addresses concurrently
+
+        Returns {address: fills}; failed addresses map to an APIError instead of [].
+        With typed=True each fill is parsed once into a Fill.
+        """
+        def fetch(address):
+            data = _fills_request(address, start_time)
+            result = self._request(data["type"], data)
+            if not isinstance(result, list):
+                return []
+            return parse_fills(result) if typed else result
+
+        return self._fan_out(fetch, addresses)
+
+    def get_user_fills_since_many(self, start_times: Dict[str, int], typed: bool = False) -> Dict[str, object]:
+        """Get every fill since each address's own start time, concurrently
+
+        start_times is {address: startTime ms}. Each account pages with
+        iter_user_fills() until it is caught up, so none is capped at one page.
+        Returns {address: fills}; failed addresses map to an APIError.
+        """
+        def fetch(address):
+            fills = []
+            for chunk in self.iter_user_fills(address, start_time=start_times[address], typed=typed):
+                fills.extend(chunk)
+            return fills
+
+        return self._fan_out(fetch, start_times)
+
+    def get_user_funding_many(self, addresses: Iterable[str], start_time: Union[int, Dict[str, int]] = 0
+                              ) -> Dict[str, object]:
+        """Get every funding payment since start_time for many addresses concurrently
+
+        start_time may be a {address: startTime} dict to give each account its own.
+        Returns {address: payments}; failed addresses map to an APIError.
+        """
+        def fetch(address):
+            start = start_time[address] if isinstance(start_time, dict) else start_time
+            payments = []
+            for chunk in self.iter_user_funding(address, start_time=start):
+                payments.extend(chunk)
+            return payments
+
+        return self._fan_out(fetch, addresses)
+
+    def get_user_state(self, address: str, use_cache: bool = True, raise_on_error: bool = False) -> Dict:
         """Get current state for a user address"""
         data = {
             "type": "clearinghouseState",
             "user": address
         }
-        return self._post("clearinghouseState", data)
+        return self._post("clearinghouseState", data, use_cache=use_cache, raise_on_error=raise_on_error)
 
-    def get_user_fills(self, address: str, start_time: Optional[int] = None) -> List[Dict]:
-        """Get fill history for a user"""
-        data = {
-            "type": "userFills",
-            "user": address
-        }
-        if start_time:
-            data["startTime"] = start_time
+    def get_user_fills(self, address: str, start_time: Optional[int] = None,
+                       raise_on_error: bool = False, typed: bool = False) -> List:
+        """Get fill history for a user (raw dicts, or Fills with typed=True)"""
+        data = _fills_request(address, start_time)
+        result = self._post(data["type"], data, raise_on_error=raise_on_error)
+        if not isinstance(result, list):
+            return []
+        return parse_fills(result) if typed else result
 
-        result = self._post("userFills", data)
-        return result if isinstance(result, list) else []
+    def iter_user_fills(self, address: str, start_time: int = 0, end_time: Optional[int] = None,
+                        page_limit: int = FILLS_PAGE_LIMIT, typed: bool = False) -> Iterator[List]:
+        """Stream a user's full fill history oldest-first, one page per chunk
+
+        Pages forward with userFillsByTime, restarting each page at the last
+        timestamp seen. Fills repeated across a page boundary are dropped by
+        tid (or hash/oid when tid is missing). Only one page is held at a time.
+        Raises APIError if a page fails, so a failure never looks like the end
+        of history. The one gap paging by time cannot close, more than
+        page_limit fills in a single millisecond, is logged when skipped.
+        With typed=True chunks hold Fills instead of raw dicts.
+        """
+        for chunk in self._iter_pages("userFillsByTime", address, start_time, end_time, page_limit, _fill_key):
+            yield parse_fills(chunk) if typed else chunk
+
+    def iter_user_funding(self, address: str, start_time: int = 0, end_time: Optional[int] = None,
+                          page_limit: int = FUNDING_PAGE_LIMIT) -> Iterator[List[Dict]]:
+        """Stream a user's funding payments oldest-first, paging like iter_user_fills()"""
+        return self._iter_pages("userFunding", address, start_time, end_time, page_limit, _funding_key)
+
+    def _iter_pages(self, request_type: str, address: str, start_time: int, end_time: Optional[int],
+                    page_limit: int, key) -> Iterator[List[Dict]]:
+        """Page a time-ordered user history forward, dropping entries repeated across page boundaries"""
+        cursor = start_time
+        boundary_time = None
+        boundary_keys = set()
+
+        while True:
+            data = {"type": request_type, "user": address, "startTime": cursor}
+            if end_time is not None:
+                data["endTime"] = end_time
 
-    def get_user_funding(self, address: str, start_time: Optional[int] = None) -> List[Dict]:
+            page = self._request(request_type, data)
+            if not isinstance(page, list) or not page:
+                return
+            # Sorted copy: cached and coalesced responses are shared with other callers
+            page = sorted(page, key=lambda f: f.get('time', 0))
+
+            chunk = []
+            for entry in page:
+                if entry.get('time', 0) == boundary_time and key(entry) in boundary_keys:
+                    continue
+                chunk.append(entry)
+
+            last_time = page[-1].get('time', 0)
+            if last_time != boundary_time:
+                boundary_keys = set()
+            boundary_time = last_time
+            boundary_keys.update(key(f) for f in page if f.get('time', 0) == last_time)
+
+            if chunk:
+                yield chunk
+
+            if len(page) < page_limit:
+                return
+            if not chunk:
+                # A full page with nothing new means page_limit entries share one millisecond.
+                # The API pages by time only ([t, t] returns this same page), so the rest of
+                # that millisecond is unreachable: say so and step past it.
+                print(f"⚠️  {request_type} {address}: more than {page_limit} entries at time {last_time}; "
+                      f"entries past the first {page_limit} at that millisecond were skipped")
+                cursor = last_time + 1
+            else:
+                cursor = last_time
+
+    def get_all_user_fills(self, address: str, start_time: int = 0, typed: bool = False) -> List:
+        """Get the complete fill history for a user by paging through iter_user_fills"""
+        fills = []
+        for chunk in self.iter_user_fills(address, start_time=start_time, typed=typed):
+            fills.extend(chunk)
+        return fills
+
+    def get_user_funding(self, address: str, start_time: Optional[int] = None,
+                         raise_on_error: bool = False) -> List[Dict]:
         """Get funding payment history for a user"""
         data = {
             "type": "userFunding",
@@ -64,10 +516,11 @@ class HyperliquidAPI:
         if start_time:
             data["startTime"] = start_time
 
-        result = self._post("userFunding", data)
+        result = self._post("userFunding", data, raise_on_error=raise_on_error)
         return result if isinstance(result, list) else []
 
-    def get_user_non_funding_ledger_updates(self, address: str, start_time: Optional[int] = None) -> List[Dict]:
+    def get_user_non_funding_ledger_updates(self, address: str, start_time: Optional[int] = None,
+                                            use_cache: bool = True) -> List[Dict]:
         """Get non-funding ledger updates (deposits, withdrawals, etc.)"""
         data = {
             "type": "userNonFundingLedgerUpdates",
@@ -76,51 +529,124 @@ class HyperliquidAPI:
         if start_time:
             data["startTime"] = start_time
 
-        result = self._post("userNonFundingLedgerUpdates", data)
+        result = self._post("userNonFundingLedgerUpdates", data, use_cache=use_cache)
+        return result if isinstance(result, list) else []
+
+    def transport_stats(self) -> Dict:
+        """Connection pool counters for this client's transport"""
+        return self.transport.stats()
+
+    def rate_limit_stats(self) -> Dict:
+        """Throttling counters for this client's rate limiter"""
+        return self.rate_limiter.stats()
+
+    def cache_stats(self) -> Dict:
+        """Hit/miss/eviction counters for this client's response cache"""
+        return self.cache.stats()
+
+    def coalescing_stats(self) -> Dict:
+        """Executed vs. coalesced counters for concurrent identical requests"""
+        return self.single_flight.stats()
+
+    def request_stats(self) -> Dict:
+        """Latency histograms, outcomes and retries per request type, plus breaker states"""
+        return {
+            'endpoints': self.metrics.stats(),
+            'circuit_breakers': self.circuit_breakers.stats(),
+            'retry_budget_exhausted': self.retry_budget.exhausted,
+        }
+
+    def get_open_orders(self, address: str, raise_on_error: bool = False) -> List[Dict]:
+        """Get open orders for a user"""
+        data = {
+            "type": "openOrders",
+            "user": address
+        }
+        result = self._post("openOrders", data, raise_on_error=raise_on_error)
         return result if isinstance(result, list) else []
 
-    def get_meta(self) -> Dict:
+    def get_meta(self, use_cache: bool = True) -> Dict:
         """Get exchange metadata including available assets"""
         data = {"type": "meta"}
-        return self._post("meta", data)
+        return self._post("meta", data, use_cache=use_cache)
 
-    def get_all_mids(self) -> Dict:
+    def get_all_mids(self, use_cache: bool = True, raise_on_error: bool = False) -> Dict:
         """Get current mid prices for all assets"""
         data = {"type": "allMids"}
-        return self._post("allMids", data)
+        return self._post("allMids", data, use_cache=use_cache, raise_on_error=raise_on_error)
 
-    def get_user_token_balances(self, address: str) -> Dict:
+    def get_user_token_balances(self, address: str, use_cache: bool = True) -> Dict:
         """Get token balances for a user"""
         data = {
             "type": "spotClearinghouseState",
             "user": address
         }
-        return self._post("spotClearinghouseState", data)
+        return self._post("spotClearinghouseState", data, use_cache=use_cache)
 
-    def get_leaderboard(self) -> List[Dict]:
+    def get_leaderboard(self, use_cache: bool = True) -> List[Dict]:
         """Get the real Hyperliquid leaderboard from stats API
 
         Returns list of traders with PnL, ROI, and volume across timeframes
         """
-        leaderboard_url = "https://stats-data.hyperliquid.xyz/Mainnet/leaderboard"
+        cache_key = ('leaderboard', self.leaderboard_url)
+        if use_cache:
+            hit, rows = self.cache.get('leaderboard', cache_key)
+            if hit:
+                return rows
 
         try:
-            response = requests.get(leaderboard_url, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-
-            if 'leaderboardRows' in data:
-                leaderboard_rows = data['leaderboardRows']
-                print(f"✓ Fetched {len(leaderboard_rows)} traders from leaderboard")
-                return leaderboard_rows
-            else:
-                print("❌ Unexpected leaderboard format")
-                return []
-
+            # Concurrent dashboard requests share one download of the full leaderboard
+            return self.single_flight.do('leaderboard', cache_key,
+                                         lambda: self._fetch_leaderboard(cache_key))
         except Exception as e:
             print(f"❌ Error fetching leaderboard: {e}")
             return []
 
+    def _fetch_leaderboard(self, cache_key) -> List[Dict]:
+        response = self._send('leaderboard', lambda: self.transport.get(self.leaderboard_url, 'leaderboard'))
+        data = response.json()
+
+        if 'leaderboardRows' in data:
+            leaderboard_rows = data['leaderboardRows']
+            print(f"✓ Fetched {len(leaderboard_rows)} traders from leaderboard")
+            self.cache.set('leaderboard', cache_key, leaderboard_rows)
+            return leaderboard_rows
+        print("❌ Unexpected leaderboard format")
+        return []
+
+    def iter_leaderboard(self) -> Iterator[LeaderboardRecord]:
+        """Stream the leaderboard as compact records, decoding one row at a time
+
+        Raises APIError if the download fails or the payload is malformed.
+        """
+        response = self._send('leaderboard',
+                              lambda: self.transport.get(self.leaderboard_url, 'leaderboard', stream=True))
+        with response:
+            try:
+                yield from parse_leaderboard_stream(response.iter_content(STREAM_CHUNK_SIZE))
+            except (ValueError, requests.RequestException) as e:
+                raise ServerError('leaderboard', str(e)) from e
+
+    def get_leaderboard_records(self, use_cache: bool = True) -> List[LeaderboardRecord]:
+        """Leaderboard as compact LeaderboardRecords (low-memory alternative to get_leaderboard)"""
+        cache_key = ('leaderboard_records', self.leaderboard_url)
+        if use_cache:
+            hit, records = self.cache.get('leaderboard', cache_key)
+            if hit:
+                return records
+
+        def fetch():
+            records = list(self.iter_leaderboard())
+            print(f"✓ Fetched {len(records)} traders from leaderboard")
+            self.cache.set('leaderboard', cache_key, records)
+            return records
+
+        try:
+            return self.single_flight.do('leaderboard', cache_key, fetch)
+        except APIError as e:
+            print(f"❌ Error fetching leaderboard: {e}")
+            return []
+
     def parse_leaderboard_entry(self, entry: Dict) -> Dict:
         """Parse a leaderboard entry into a standardized format"""
         address = entry.get('ethAddress', '')
@@ -149,10 +675,10 @@ class HyperliquidAPI:
             'raw': entry
         }
 
-    def get_user_fills_by_time(self, address: str, hours: int = 24) -> List[Dict]:
+    def get_user_fills_by_time(self, address: str, hours: int = 24, typed: bool = False) -> List:
         """Get recent fills for a user within specified hours"""
         start_time = int((datetime.now() - timedelta(hours=hours)).timestamp() * 1000)
-        return self.get_user_fills(address, start_time)
+        return self.get_user_fills(address, start_time, typed=typed)
 
     def get_funding_history(self, coin: str, start_time: Optional[int] = None) -> List[Dict]:
         """Get funding rate history for a coin"""
@@ -0,0 +1,389 @@
+"""
+WebSocket subscription manager for Hyperliquid userFills, allMids and orderUpdates
+
+Multiplexes subscriptions for many addresses over a few sockets, reconnects
+with backoff and resubscribes automatically, and backfills userFills over
+REST for the window a socket was down. Unseen fills in the userFills snapshot
+sent after a reconnect are missed fills too, and are delivered as backfill;
+only the first snapshot of a subscription is flagged is_snapshot. Events go
+to per-subscription callbacks and/or an asyncio.Queue.
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import aiohttp
+
+from config import Config
+
+# Hyperliquid allows 1000 subscriptions per IP; keep sockets well below that
+DEFAULT_SUBSCRIPTIONS_PER_SOCKET = 100
+PING_INTERVAL = 50  # server drops sockets idle for 60s
+SEEN_FILLS_PER_USER = 2000
+
+
+class WsEvent(NamedTuple):
+    channel: str              # 'userFills' | 'allMids' | 'orderUpdates'
+    user: Optional[str]
+    data: object              # list of fills / mids dict / list of order updates
+    is_snapshot: bool = False
+    is_backfill: bool = False
+
+
+class Subscription:
+    def __init__(self, subscription: Dict, callback: Callable[[WsEvent], None] = None):
+        self.subscription = subscription
+        self.callback = callback
+        self.user = subscription.get('user')
+
+    @property
+    def identifier(self) -> str:
+        kind = self.subscription['type']
+        if kind == 'userFills':
+            return f"userFills:{self.user.lower()}"
+        return kind
+
+
+def ws_url_for(base_url: str) -> str:
+    """wss://api.hyperliquid.xyz/ws from https://api.hyperliquid.xyz"""
+    return "ws" + base_url[len("http"):] + "/ws"
+
+
+class _Connection:
+    """One socket and the subscriptions multiplexed over it"""
+
+    def __init__(self, manager: 'WebSocketSubscriptionManager', index: int):
+        self.manager = manager
+        self.index = index
+        self.subscriptions: Dict[str, Subscription] = {}
+        self.ws = None
+        self.connected = asyncio.Event()
+        self.task = None
+        self.connects = 0
+        self.disconnected_at = None
+        # user -> start (ms) of the outage window the next userFills snapshot may cover
+        self.resync: Dict[str, int] = {}
+
+    def can_accept(self, sub: Subscription) -> bool:
+        if len(self.subscriptions) >= self.manager.max_subscriptions_per_socket:
+            return False
+        # orderUpdates messages carry no user, so only one may share a socket
+        return sub.identifier not in self.subscriptions
+
+    async def add(self, sub: Subscription):
+        self.subscriptions[sub.identifier] = sub
+        if self.ws is not None and not self.ws.closed:
+            await self.ws.send_json({"method": "subscribe", "subscription": sub.subscription})
+
+    async def run(self):
+        manager = self.manager
+        delay = manager.reconnect_delay
+        while not manager.stopping:
+            was_connected = False
+            try:
+                async with manager.session.ws_connect(manager.ws_url, heartbeat=None) as ws:
+                    self.ws = ws
+                    self.connects += 1
+                    was_connected = True
+                    for sub in list(self.subscriptions.values()):
+                        await ws.send_json({"method": "subscribe", "subscription": sub.subscription})
+                    self.connected.set()
+                    delay = manager.reconnect_delay
+
+                    if self.disconnected_at is not None:
+                        manager.reconnects += 1
+                        self.resync = {
+                            sub.user.lower(): manager._backfill_start(sub.user, self.disconnected_at)
+                            for sub in self.subscriptions.values() if sub.subscription['type'] == 'userFills'
+                        }
+                        manager._spawn(manager._backfill(self, self.disconnected_at))
+                        self.disconnected_at = None
+
+                    ping = asyncio.create_task(self._ping(ws))
+                    try:
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                await manager._dispatch(self, msg.data)
+                            elif msg.type in (aiohttp.WSMsgType.ERROR, aiohttp.WSMsgType.CLOSED):
+                                break
+                    finally:
+                        ping.cancel()
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                if not manager.stopping:
+                    print(f"⚠️  WebSocket #{self.index} error: {e}")
+
+            self.connected.clear()
+            self.ws = None
+            if manager.stopping:
+                break
+            if was_connected:
+                self.disconnected_at = time.time()
+            # Exponential backoff with jitter
+            await asyncio.sleep(delay * (0.5 + random.random() / 2))
+            delay = min(delay * 2, manager.max_reconnect_delay)
+
+    async def _ping(self, ws):
+        while not ws.closed:
+            await asyncio.sleep(self.manager.ping_interval)
+            try:
+                await ws.send_json({"method": "ping"})
+            except (aiohttp.ClientError, ConnectionError):
+                return
+
+
+class WebSocketSubscriptionManager:
+    """Subscribe to userFills / allMids / orderUpdates for many addresses
+
+    Usage (asyncio):
+        manager = WebSocketSubscriptionManager(api, queue=asyncio.Queue())
+        manager.subscribe_user_fills(address)
+        await manager.start()
+        event = await manager.queue.get()
+
+    From synchronous code use start_in_thread()/stop_in_thread(); callbacks
+    then run on the manager's event-loop thread.
+    """
+
+    def __init__(self, api=None, ws_url: str = None, queue: asyncio.Queue = None,
+                 max_subscriptions_per_socket: int = DEFAULT_SUBSCRIPTIONS_PER_SOCKET,
+                 reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0,
+                 ping_interval: float = PING_INTERVAL):
+        self.api = api
+        self.ws_url = ws_url or ws_url_for(api.base_url if api else Config.MAINNET_API_URL)
+        self.queue = queue
+        self.max_subscriptions_per_socket = max_subscriptions_per_socket
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.ping_interval = ping_interval
+
+        self.connections: List[_Connection] = []
+        self.session = None
+        self.stopping = False
+        self.loop = None
+        self._thread = None
+        self._tasks = set()
+
+        # Per-user fill de-duplication between live stream, snapshots and backfill
+        self._seen_fills: Dict[str, OrderedDict] = {}
+        self._last_fill_time: Dict[str, int] = {}
+
+        self.events_delivered = 0
+        self.reconnects = 0
+        self.backfilled_fills = 0
+
+    # ---- subscription API -------------------------------------------------
+
+    def subscribe_user_fills(self, address: str, callback: Callable[[WsEvent], None] = None) -> Subscription:
+        return self._subscribe({"type": "userFills", "user": address}, callback)
+
+    def subscribe_all_mids(self, callback: Callable[[WsEvent], None] = None) -> Subscription:
+        return self._subscribe({"type": "allMids"}, callback)
+
+    def subscribe_order_updates(self, address: str, callback: Callable[[WsEvent], None] = None) -> Subscription:
+        return self._subscribe({"type": "orderUpdates", "user": address}, callback)
+
+    def _subscribe(self, subscription: Dict, callback) -> Subscription:
+        sub = Subscription(subscription, callback)
+        for conn in self.connections:
+            if sub.identifier in conn.subscriptions and conn.subscriptions[sub.identifier].user == sub.user:
+                return conn.subscriptions[sub.identifier]
+
+        conn = next((c for c in self.connections if c.can_accept(sub)), None)
+        if conn is None:
+            conn = _Connection(self, len(self.connections))
+            self.connections.append(conn)
+
+        if self.session is None:
+            # Not started yet: sent when the socket connects
+            conn.subscriptions[sub.identifier] = sub
+        else:
+            self._call_in_loop(self._attach(conn, sub))
+        return sub
+
+    async def _attach(self, conn: _Connection, sub: Subscription):
+        await conn.add(sub)
+        if conn.task is None:
+            conn.task = asyncio.create_task(conn.run())
+
+    def _call_in_loop(self, coro):
+        """Schedule a coroutine on the manager's loop from any thread"""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            return self._spawn(coro)
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    # ---- lifecycle --------------------------------------------------------
+
+    async def start(self):
+        """Open all sockets; returns once each has connected at least once"""
+        self.loop = asyncio.get_running_loop()
+        self.stopping = False
+        self.session = aiohttp.ClientSession()
+        for conn in self.connections:
+            conn.task = asyncio.create_task(conn.run())
+        await self.wait_connected()
+
+    async def wait_connected(self, timeout: float = 10.0):
+        await asyncio.wait_for(
+            asyncio.gather(*(c.connected.wait() for c in self.connections)), timeout
+        )
+
+    async def stop(self):
+        self.stopping = True
+        for conn in self.connections:
+            if conn.ws is not None:
+                await conn.ws.close()
+            if conn.task is not None:
+                conn.task.cancel()
+        await asyncio.gather(*(c.task for c in self.connections if c.task), return_exceptions=True)
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def start_in_thread(self, timeout: float = 10.0):
+        """Run the manager on a private event loop in a daemon thread"""
+        ready = threading.Event()
+        errors = []
+
+        def runner():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.start())
+            except Exception as e:
+                errors.append(e)
+            ready.set()
+            if not errors:
+                loop.run_forever()
+            loop.close()
+
+        self._thread = threading.Thread(target=runner, name='hyperliquid-ws', daemon=True)
+        self._thread.start()
+        ready.wait(timeout)
+        if errors:
+            raise errors[0]
+
+    def stop_in_thread(self):
+        if self.loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self.loop).result(10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if self._thread is not None:
+            self._thread.join(10)
+
+    # ---- message handling -------------------------------------------------
+
+    async def _dispatch(self, conn: _Connection, raw: str):
+        try:
+            msg = json.loads(raw)
+        except ValueError:
+            return  # "Websocket connection established." banner
+        channel = msg.get('channel')
+        data = msg.get('data')
+
+        if channel == 'userFills':
+            user = data.get('user', '')
+            sub = conn.subscriptions.get(f"userFills:{user.lower()}")
+            if sub is None:
+                return
+            fills = data.get('fills', [])
+            start = conn.resync.pop(user.lower(), None) if data.get('isSnapshot') else None
+            if start is not None:
+                # A snapshot after a reconnect: its unseen fills since the outage began were
+                # missed while the socket was down, so they are delivered as backfill
+                fresh = self._new_fills(user, sorted((f for f in fills if f.get('time', 0) >= start),
+                                                     key=lambda f: f.get('time', 0)))
+                if fresh:
+                    self.backfilled_fills += len(fresh)
+                    await self._deliver(sub, WsEvent('userFills', user, fresh, is_backfill=True))
+                return
+            fills = self._new_fills(user, fills)
+            if fills:
+                await self._deliver(sub, WsEvent('userFills', user, fills, bool(data.get('isSnapshot'))))
+        elif channel == 'allMids':
+            sub = conn.subscriptions.get('allMids')
+            if sub:
+                await self._deliver(sub, WsEvent('allMids', None, data.get('mids', {})))
+        elif channel == 'orderUpdates':
+            sub = conn.subscriptions.get('orderUpdates')
+            if sub:
+                await self._deliver(sub, WsEvent('orderUpdates', sub.user, data))
+        elif channel == 'error':
+            print(f"⚠️  WebSocket error message: {data}")
+
+    def _new_fills(self, user: str, fills: List[Dict]) -> List[Dict]:
+        """Drop fills already delivered for this user; remember the rest"""
+        key = user.lower()
+        seen = self._seen_fills.setdefault(key, OrderedDict())
+        fresh = []
+        for fill in fills:
+            fill_id = fill.get('tid', fill.get('hash'))
+            if fill_id in seen:
+                continue
+            seen[fill_id] = True
+            fresh.append(fill)
+            self._last_fill_time[key] = max(self._last_fill_time.get(key, 0), fill.get('time', 0))
+        while len(seen) > SEEN_FILLS_PER_USER:
+            seen.popitem(last=False)
+        return fresh
+
+    def _backfill_start(self, user: str, since: float) -> int:
+        """Where missed fills may start: the user's last delivered fill, or just before the outage"""
+        return self._last_fill_time.get(user.lower()) or int(since * 1000) - 5000
+
+    def _fetch_since(self, user: str, start_time: int) -> List[Dict]:
+        """Every fill since start_time, paged; raises APIError rather than returning a short list"""
+        return [fill for chunk in self.api.iter_user_fills(user, start_time=start_time) for fill in chunk]
+
+    async def _backfill(self, conn: _Connection, since: float):
+        """Fetch fills missed while a socket was down, over REST"""
+        if self.api is None:
+            return
+        loop = asyncio.get_running_loop()
+        for sub in list(conn.subscriptions.values()):
+            if sub.subscription['type'] != 'userFills':
+                continue
+            start_time = self._backfill_start(sub.user, since)
+            try:
+                fills = await loop.run_in_executor(None, self._fetch_since, sub.user, start_time)
+            except Exception as e:
+                print(f"⚠️  Backfill failed for {sub.user[:10]}: {e}")
+                continue
+            fresh = self._new_fills(sub.user, sorted(fills, key=lambda f: f.get('time', 0)))
+            if fresh:
+                self.backfilled_fills += len(fresh)
+                await self._deliver(sub, WsEvent('userFills', sub.user, fresh, is_backfill=True))
+
+    async def _deliver(self, sub: Subscription, event: WsEvent):
+        self.events_delivered += 1
+        if sub.callback is not None:
+            try:
+                sub.callback(event)
+            except Exception as e:
+                print(f"⚠️  WebSocket callback error: {e}")
+        if self.queue is not None:
+            await self.queue.put(event)
+
+    def stats(self) -> Dict:
+        return {
+            'sockets': len(self.connections),
+            'connected': sum(1 for c in self.connections if c.connected.is_set()),
+            'subscriptions': sum(len(c.subscriptions) for c in self.connections),
+            'events_delivered': self.events_delivered,
+            'reconnects': self.reconnects,
+            'backfilled_fills': self.backfilled_fills,
+        }
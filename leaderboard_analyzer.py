@@ -9,6 +9,7 @@ from datetime import datetime
 from typing import List, Dict
 from hyperliquid_api import HyperliquidAPI
 from database import Database
+from ranking import FeatureMatrix, rank_indices, top_accounts
 
 class LeaderboardAnalyzer:
     def __init__(self):
@@ -22,7 +23,8 @@ class LeaderboardAnalyzer:
         print("="*100 + "\n")
 
         # Fetch leaderboard
-        leaderboard = self.api.get_leaderboard()
+        # Streamed straight into compact records; the raw JSON is never held in full
+        leaderboard = self.api.get_leaderboard_records()
 
         if not leaderboard:
             print("❌ Failed to fetch leaderboard")
@@ -33,9 +35,8 @@ class LeaderboardAnalyzer:
 
         # Parse all entries
         analyzed_accounts = []
-        for i, entry in enumerate(leaderboard, 1):
-            parsed = self.api.parse_leaderboard_entry(entry)
-            analyzed_accounts.append(parsed)
+        for i, record in enumerate(leaderboard, 1):
+            analyzed_accounts.append(record.to_dict())
 
             if i % 10 == 0:
                 print(f"  Processed {i}/{len(leaderboard)} accounts...", end='\r')
@@ -63,25 +64,15 @@ class LeaderboardAnalyzer:
 
         api_timeframe = timeframe_map.get(timeframe, timeframe)
 
-        # Filter accounts that have data for this timeframe
-        valid_accounts = [
-            acc for acc in accounts
-            if api_timeframe in acc and acc[api_timeframe].get(metric) is not None
-        ]
+        # Top accounts by metric, skipping those without data for this timeframe
+        ranked = top_accounts(accounts, f'{api_timeframe}.{metric}', limit, default=None)
 
-        if not valid_accounts:
+        if not ranked:
             print(f"❌ No data available for timeframe: {timeframe}")
             return
 
-        # Sort by metric
-        sorted_accounts = sorted(
-            valid_accounts,
-            key=lambda x: x[api_timeframe].get(metric, 0),
-            reverse=True
-        )
-
         # Display report
-        self._print_report(sorted_accounts[:limit], api_timeframe, metric)
+        self._print_report(ranked, api_timeframe, metric)
 
     def _print_report(self, accounts: List[Dict], timeframe: str, metric: str):
         """Print formatted leaderboard report"""
@@ -165,19 +156,12 @@ class LeaderboardAnalyzer:
                           limit: int = 10) -> List[Dict]:
         """Filter top performers by criteria"""
 
-        filtered = []
-        for account in accounts:
-            tf_data = account.get(timeframe, {})
-            roi = tf_data.get('roi', 0)
-            pnl = tf_data.get('pnl', 0)
-
-            if roi >= min_roi and pnl >= min_pnl:
-                filtered.append(account)
-
-        # Sort by PnL descending
-        filtered.sort(key=lambda x: x.get(timeframe, {}).get('pnl', 0), reverse=True)
+        features = FeatureMatrix.from_dicts(accounts, [f'{timeframe}.roi', f'{timeframe}.pnl'])
+        roi, pnl = features.values.T
+        mask = (roi >= min_roi) & (pnl >= min_pnl)
 
-        return filtered[:limit]
+        # Top limit by PnL descending
+        return [accounts[i] for i in rank_indices(pnl, limit, mask).tolist()]
 
     def export_results(self, accounts: List[Dict], filename: str = None):
         """Export leaderboard data to JSON"""
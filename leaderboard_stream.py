@@ -0,0 +1,125 @@
+"""
+Streaming, low-memory parsing of the stats-data leaderboard
+
+The leaderboard is one large JSON object ({"leaderboardRows": [...]}).
+Loading it with response.json() materialises every row as a dict tree,
+and parse_leaderboard_entry() then builds a second dict per row while
+keeping the first under 'raw'. This module decodes the rows one at a time
+from the response byte stream and turns each into a compact
+LeaderboardRecord, so only one raw row is alive at any moment.
+"""
+
+import codecs
+import json
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional
+
+ROWS_KEY = '"leaderboardRows"'
+WINDOWS = ('day', 'week', 'month', 'allTime')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE_AND_COMMAS = ' \t\r\n,'
+
+
+class LeaderboardRecord(NamedTuple):
+    """One leaderboard row; window metrics are None when the window is absent"""
+    address: str
+    display_name: Optional[str]
+    account_value: float
+    day_pnl: Optional[float] = None
+    day_roi: Optional[float] = None
+    day_volume: Optional[float] = None
+    week_pnl: Optional[float] = None
+    week_roi: Optional[float] = None
+    week_volume: Optional[float] = None
+    month_pnl: Optional[float] = None
+    month_roi: Optional[float] = None
+    month_volume: Optional[float] = None
+    allTime_pnl: Optional[float] = None
+    allTime_roi: Optional[float] = None
+    allTime_volume: Optional[float] = None
+
+    @classmethod
+    def from_entry(cls, entry: Dict) -> 'LeaderboardRecord':
+        metrics = {}
+        for window_data in entry.get('windowPerformances', []):
+            if len(window_data) == 2:
+                timeframe, values = window_data
+                if timeframe in WINDOWS:
+                    metrics[f'{timeframe}_pnl'] = float(values.get('pnl', 0))
+                    metrics[f'{timeframe}_roi'] = float(values.get('roi', 0))
+                    metrics[f'{timeframe}_volume'] = float(values.get('vlm', 0))
+        return cls(
+            address=entry.get('ethAddress', ''),
+            display_name=entry.get('displayName'),
+            account_value=float(entry.get('accountValue', 0)),
+            **metrics
+        )
+
+    def window(self, timeframe: str) -> Dict:
+        """{'pnl', 'roi', 'volume'} for a timeframe, or {} if the row has no data for it"""
+        pnl = getattr(self, f'{timeframe}_pnl', None)
+        if pnl is None:
+            return {}
+        return {
+            'pnl': pnl,
+            'roi': getattr(self, f'{timeframe}_roi'),
+            'volume': getattr(self, f'{timeframe}_volume'),
+        }
+
+    def to_dict(self) -> Dict:
+        """Same shape as HyperliquidAPI.parse_leaderboard_entry(), without 'raw'"""
+        parsed = {
+            'address': self.address,
+            'display_name': self.display_name,
+            'account_value': self.account_value,
+        }
+        for timeframe in WINDOWS:
+            parsed[timeframe] = self.window(timeframe)
+        return parsed
+
+
+def iter_leaderboard_rows(chunks: Iterable[bytes]) -> Iterator[Dict]:
+    """Yield raw leaderboard rows one at a time from a stream of byte chunks
+
+    Raises ValueError if the stream ends before the rows array is closed.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    in_rows = False
+
+    for chunk in chunks:
+        buffer = buffer[pos:] + text.decode(chunk)
+        pos = 0
+
+        if not in_rows:
+            start = buffer.find(ROWS_KEY)
+            bracket = buffer.find('[', start + len(ROWS_KEY)) if start >= 0 else -1
+            if bracket < 0:
+                # Keep enough of the tail to match a key split across chunks
+                pos = start if start >= 0 else max(len(buffer) - len(ROWS_KEY), 0)
+                continue
+            pos = bracket + 1
+            in_rows = True
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE_AND_COMMAS:
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == ']':
+                return
+            try:
+                row, pos = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                break  # row continues in the next chunk
+            yield row
+
+    raise ValueError("leaderboard stream ended before leaderboardRows was complete")
+
+
+def parse_leaderboard_stream(chunks: Iterable[bytes]) -> Iterator[LeaderboardRecord]:
+    """Yield compact records straight from the response byte stream"""
+    for row in iter_leaderboard_rows(chunks):
+        yield LeaderboardRecord.from_entry(row)
@@ -26,7 +26,7 @@ def track_mode(args):
     """Run account tracking mode"""
     print("\n[TRACK MODE] Starting account tracker...\n")
 
-    tracker = AccountTracker(use_testnet=args.testnet)
+    tracker = AccountTracker(use_testnet=args.testnet, workers=args.workers)
 
     if args.continuous:
         tracker.continuous_tracking(interval=args.interval)
@@ -39,6 +39,7 @@ def track_mode(args):
             tracker.track_accounts()
 
         tracker.get_best_performers(limit=args.limit)
+        tracker.pool.close()
 
 def copytrade_mode(args):
     """Run copy trading mode"""
@@ -67,7 +68,7 @@ def enhanced_mode(args):
     tracker = EnhancedTracker(use_testnet=args.testnet)
 
     # Analyze all accounts
-    results = tracker.analyze_multiple_accounts(addresses, rate_limit_delay=1.0)
+    results = tracker.analyze_multiple_accounts(addresses, workers=args.workers)
 
     if not results:
         print("\n❌ No results to display")
@@ -145,6 +146,9 @@ Examples:
   # Continuous tracking
   python main.py --mode track --continuous --interval 300
 
+  # Multi-timeframe analysis on 4 worker processes
+  python main.py --mode enhanced --addresses 0x123...,0x456... --workers 4
+
   # Start copy trading (simulation by default)
   python main.py --mode copytrade
 
@@ -193,6 +197,13 @@ Examples:
         help='Number of top accounts to display (default: 10)'
     )
 
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Analytics worker processes for track/enhanced modes (default: 1)'
+    )
+
     parser.add_argument(
         '--details',
         action='store_true',
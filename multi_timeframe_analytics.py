@@ -1,7 +1,196 @@
+import math
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
-from collections import defaultdict
+from typing import Dict, List, Optional, Tuple, Union
+from fills import Fill
+from fill_frame import FillFrame, as_frame
+from ranking import top_accounts
+from round_trips import RoundTrips, reconstruct_round_trips
+
+# Any of: a FillFrame, a list of Fills, or a list of raw API fill dicts
+Fills = Union[FillFrame, List[Fill], List[Dict]]
+
+# Days back from now, None for lifetime, or an explicit (start_ms, end_ms) range
+Window = Union[None, float, Tuple[Optional[float], Optional[float]]]
+
+
+_DURATION_MS = {'m': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 7 * 86_400_000}
+
+
+def parse_duration(value: Union[str, int, float]) -> int:
+    """'15m', '1h', '7d', '2w' (or a number of milliseconds) -> milliseconds"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = value.strip().lower()
+    if len(text) < 2 or text[-1] not in _DURATION_MS:
+        raise ValueError(f"Unknown duration {value!r}; use e.g. 15m, 1h, 7d, 2w")
+    return int(float(text[:-1]) * _DURATION_MS[text[-1]])
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    """Running totals with a leading zero: sum(values[lo:hi]) == p[hi] - p[lo]"""
+    out = np.zeros(len(values) + 1, dtype=np.result_type(values.dtype, np.int64))
+    np.cumsum(values, out=out[1:])
+    return out
+
+
+class WindowIndex:
+    """Prefix sums over one account's fills and closed round trips
+
+    Built in one pass over already-sorted data (frames are time-sorted and
+    closed trips come out by close time). Any [start_ms, end_ms] window is
+    then answered with searchsorted plus prefix-sum differences:
+
+    - fill totals (realised PnL, volume, fees), funding paid/received and
+      trip counts/gross PnL
+    - largest win/loss from suffix extremes (windows running to the latest trip)
+    - per-coin PnL from prefix sums over trips grouped by coin, searched on a
+      (coin, close time) key, so coin breakdowns cost O(coins log n)
+    """
+
+    def __init__(self, frame: FillFrame, trips: RoundTrips = None):
+        self.frame = frame
+        self.trips = trips if trips is not None else reconstruct_round_trips(frame).closed()
+        self._analytics = MultiTimeframeAnalytics()
+
+        # Contiguous copy: searchsorted would otherwise copy the strided column per call
+        self._fill_time = np.ascontiguousarray(frame.time)
+        self._fill_pnl = _prefix(frame.closed_pnl)
+        self._fill_volume = _prefix(frame.px * np.abs(frame.sz))
+        self._fill_fees = _prefix(np.abs(frame.fee))
+        self._funding_time = np.ascontiguousarray(frame.funding_time)
+        self._funding = _prefix(frame.funding_usdc)
+
+        pnl = np.ascontiguousarray(self.trips.pnl)
+        self._trip_time = np.ascontiguousarray(self.trips.close_time)
+        wins, losses = pnl > 0, pnl < 0
+        self._wins = _prefix(wins)
+        self._losses = _prefix(losses)
+        self._gross_profit = _prefix(np.where(wins, pnl, 0.0))
+        self._gross_loss = _prefix(np.where(losses, pnl, 0.0))
+        self._pnl = pnl
+        self._suffix_max = np.maximum.accumulate(pnl[::-1])[::-1]
+        self._suffix_min = np.minimum.accumulate(pnl[::-1])[::-1]
+
+        coin = self.trips.coin_id.astype(np.int64)
+        self._coin_order = np.argsort(coin, kind='stable')
+        self._t0 = int(self._trip_time[0]) if len(pnl) else 0
+        self._span = int(self._trip_time[-1]) - self._t0 + 1 if len(pnl) else 1
+        self._coin_key = coin[self._coin_order] * self._span + (self._trip_time[self._coin_order] - self._t0)
+        self._coin_pnl = _prefix(pnl[self._coin_order])
+
+    def _range(self, times: np.ndarray, start_ms: Optional[float], end_ms: Optional[float]) -> Tuple[int, int]:
+        # Integer bounds: a float key would make searchsorted cast the whole int64 column
+        lo = 0 if start_ms is None else int(np.searchsorted(times, math.ceil(start_ms), side='left'))
+        hi = len(times) if end_ms is None else int(np.searchsorted(times, math.floor(end_ms), side='right'))
+        return lo, max(lo, hi)
+
+    def fill_span(self, start_ms: Optional[float] = None, end_ms: Optional[float] = None) -> Tuple[Optional[int], Optional[int]]:
+        """(first, last) fill time inside the window, or (None, None) when it is empty"""
+        lo, hi = self._range(self._fill_time, start_ms, end_ms)
+        if lo == hi:
+            return None, None
+        return int(self._fill_time[lo]), int(self._fill_time[hi - 1])
+
+    def funding(self, start_ms: Optional[float] = None, end_ms: Optional[float] = None) -> float:
+        """Net funding received (negative when paid) inside the window"""
+        lo, hi = self._range(self._funding_time, start_ms, end_ms)
+        return float(self._funding[hi] - self._funding[lo])
+
+    def _coin_pnls(self, start_ms: Optional[float], end_ms: Optional[float]) -> Dict[str, float]:
+        """Per-coin closed-trip PnL, coins in order of their first trip in the window"""
+        coins = self.frame.coins
+        base = np.arange(len(coins), dtype=np.int64) * self._span
+        rel_lo = 0 if start_ms is None else min(max(math.ceil(start_ms) - self._t0, 0), self._span)
+        rel_hi = self._span - 1 if end_ms is None else min(max(math.floor(end_ms) - self._t0, -1), self._span - 1)
+        lo = np.searchsorted(self._coin_key, base + rel_lo, side='left')
+        hi = np.maximum(lo, np.searchsorted(self._coin_key, base + rel_hi, side='right'))
+
+        traded = np.flatnonzero(hi > lo)
+        totals = self._coin_pnl[hi[traded]] - self._coin_pnl[lo[traded]]
+        first = self._coin_order[lo[traded]]
+        order = np.argsort(first, kind='stable')
+        return {coins[c] or 'UNKNOWN': float(t) for c, t in zip(traded[order].tolist(), totals[order].tolist())}
+
+    def rolling(self, window_ms: int, step_ms: int, start_ms: Optional[float] = None,
+                end_ms: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """Trailing-window series sampled every step_ms, ending at end_ms (default: last fill)
+
+        Each sample at time t covers (t - window_ms, t]. All samples come from
+        one vectorised searchsorted per column plus prefix differences, so a
+        90-day hourly series is ~2k lookups regardless of fill count. win_rate
+        is NaN where a window closed no trades.
+        """
+        if end_ms is None:
+            end_ms = int(self._fill_time[-1]) if len(self._fill_time) else 0
+        if start_ms is None:
+            start_ms = int(self._fill_time[0]) if len(self._fill_time) else end_ms
+        end_ms = math.floor(end_ms)
+        samples = max(int((end_ms - math.ceil(start_ms)) // step_ms) + 1, 0)
+        times = end_ms - step_ms * np.arange(samples - 1, -1, -1, dtype=np.int64)
+
+        f_lo = np.searchsorted(self._fill_time, times - window_ms, side='right')
+        f_hi = np.searchsorted(self._fill_time, times, side='right')
+        t_lo = np.searchsorted(self._trip_time, times - window_ms, side='right')
+        t_hi = np.searchsorted(self._trip_time, times, side='right')
+        funding = (self._funding[np.searchsorted(self._funding_time, times, side='right')]
+                   - self._funding[np.searchsorted(self._funding_time, times - window_ms, side='right')])
+
+        pnl = self._fill_pnl[f_hi] - self._fill_pnl[f_lo]
+        fees = self._fill_fees[f_hi] - self._fill_fees[f_lo]
+        trades = t_hi - t_lo
+        wins = self._wins[t_hi] - self._wins[t_lo]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            win_rate = np.where(trades > 0, wins / trades, np.nan)
+        return {
+            'time': times,
+            'pnl': pnl,
+            'net_pnl': pnl - fees,
+            'net_pnl_after_funding': pnl - fees + funding,
+            'volume': self._fill_volume[f_hi] - self._fill_volume[f_lo],
+            'fees': fees,
+            'funding': funding,
+            'trades': trades,
+            'winning_trades': wins,
+            'losing_trades': self._losses[t_hi] - self._losses[t_lo],
+            'win_rate': win_rate,
+            'gross_profit': self._gross_profit[t_hi] - self._gross_profit[t_lo],
+            'gross_loss': self._gross_loss[t_hi] - self._gross_loss[t_lo],
+        }
+
+    def pnl_metrics(self, start_ms: Optional[float] = None, end_ms: Optional[float] = None) -> Dict:
+        """MultiTimeframeAnalytics.calculate_pnl_metrics() for one window, from prefix sums"""
+        analytics = self._analytics
+        f_lo, f_hi = self._range(self._fill_time, start_ms, end_ms)
+        if f_lo == f_hi:
+            return analytics._empty_pnl_metrics(self.funding(start_ms, end_ms))
+        t_lo, t_hi = self._range(self._trip_time, start_ms, end_ms)
+
+        if t_hi == t_lo:
+            largest_win = largest_loss = 0
+        elif t_hi == len(self._pnl):
+            largest_win, largest_loss = float(self._suffix_max[t_lo]), float(self._suffix_min[t_lo])
+        else:
+            window = self._pnl[t_lo:t_hi]
+            largest_win, largest_loss = float(window.max()), float(window.min())
+
+        winning = int(self._wins[t_hi] - self._wins[t_lo])
+        losing = int(self._losses[t_hi] - self._losses[t_lo])
+        return analytics._pnl_metrics(
+            total_pnl=float(self._fill_pnl[f_hi] - self._fill_pnl[f_lo]),
+            total_volume=float(self._fill_volume[f_hi] - self._fill_volume[f_lo]),
+            total_fees=float(self._fill_fees[f_hi] - self._fill_fees[f_lo]),
+            num_trades=t_hi - t_lo,
+            winning_trades=winning,
+            losing_trades=losing,
+            gross_profit=float(self._gross_profit[t_hi] - self._gross_profit[t_lo]),
+            gross_loss=float(self._gross_loss[t_hi] - self._gross_loss[t_lo]),
+            largest_win=largest_win,
+            largest_loss=largest_loss,
+            coin_pnls=self._coin_pnls(start_ms, end_ms),
+            total_funding=self.funding(start_ms, end_ms),
+        )
+
 
 class MultiTimeframeAnalytics:
     """Enhanced analytics supporting multiple timeframes (7d, 30d, lifetime)"""
@@ -13,50 +202,65 @@ class MultiTimeframeAnalytics:
             'lifetime': None  # No time limit
         }
 
-    def filter_fills_by_timeframe(self, fills: List[Dict], days: int = None) -> List[Dict]:
-        """Filter fills by timeframe"""
+    def filter_fills_by_timeframe(self, fills: Fills, days: int = None) -> FillFrame:
+        """Filter fills by timeframe (a zero-copy view of the frame)"""
+        frame = as_frame(fills)
         if days is None:
-            return fills  # Return all for lifetime
+            return frame  # Return all for lifetime
 
         cutoff_time = (datetime.now() - timedelta(days=days)).timestamp() * 1000
-        return [f for f in fills if f.get('time', 0) >= cutoff_time]
-
-    def calculate_pnl_metrics(self, fills: List[Dict]) -> Dict:
-        """Calculate comprehensive PnL metrics"""
-        if not fills:
-            return self._empty_pnl_metrics()
-
-        # Extract all PnL data
-        realized_pnls = []
-        trades_by_coin = defaultdict(list)
-        total_volume = 0
-        total_fees = 0
-
-        for fill in fills:
-            pnl = float(fill.get('closedPnl', 0))
-            if pnl != 0:  # Only count closed positions
-                realized_pnls.append(pnl)
-                coin = fill.get('coin', 'UNKNOWN')
-                trades_by_coin[coin].append(pnl)
-
-            # Calculate volume
-            px = float(fill.get('px', 0))
-            sz = abs(float(fill.get('sz', 0)))
-            total_volume += px * sz
-
-            # Sum fees
-            fee = float(fill.get('fee', 0))
-            total_fees += abs(fee)
-
-        # Calculate metrics
-        total_pnl = sum(realized_pnls)
-        gross_profit = sum(p for p in realized_pnls if p > 0)
-        gross_loss = sum(p for p in realized_pnls if p < 0)
-
-        num_trades = len(realized_pnls)
-        winning_trades = sum(1 for p in realized_pnls if p > 0)
-        losing_trades = sum(1 for p in realized_pnls if p < 0)
-
+        return frame.between(cutoff_time)
+
+    def calculate_pnl_metrics(self, fills: Fills, trips: RoundTrips = None) -> Dict:
+        """Calculate comprehensive PnL metrics
+
+        PnL, volume and fees cover every fill; trade counts and win/loss figures
+        cover closed round trips (reconstructed from the fills unless given).
+        Funding covers the frame's funding payments.
+        """
+        frame = as_frame(fills)
+        total_funding = float(frame.funding_usdc.sum())
+        if not len(frame):
+            return self._empty_pnl_metrics(total_funding)
+
+        if trips is None:
+            trips = reconstruct_round_trips(frame).closed()
+        realized_pnls = trips.pnl
+        wins = realized_pnls[realized_pnls > 0]
+        losses = realized_pnls[realized_pnls < 0]
+
+        # Coins listed in order of first closed trade
+        coin_totals = np.bincount(trips.coin_id, weights=realized_pnls, minlength=len(frame.coins))
+        traded, first_seen = np.unique(trips.coin_id, return_index=True)
+        coin_pnls = {frame.coins[i] or 'UNKNOWN': float(coin_totals[i])
+                     for i in traded[np.argsort(first_seen)].tolist()}
+
+        return self._pnl_metrics(
+            total_pnl=float(frame.closed_pnl.sum()),
+            total_volume=float(np.sum(frame.px * np.abs(frame.sz))),
+            total_fees=float(np.sum(np.abs(frame.fee))),
+            winning_trades=len(wins),
+            losing_trades=len(losses),
+            num_trades=len(realized_pnls),
+            gross_profit=float(wins.sum()),
+            gross_loss=float(losses.sum()),
+            largest_win=float(realized_pnls.max()) if len(realized_pnls) else 0,
+            largest_loss=float(realized_pnls.min()) if len(realized_pnls) else 0,
+            coin_pnls=coin_pnls,
+            total_funding=total_funding,
+        )
+
+    def _pnl_metrics(self, total_pnl: float, total_volume: float, total_fees: float,
+                     num_trades: int, winning_trades: int, losing_trades: int,
+                     gross_profit: float, gross_loss: float, largest_win: float, largest_loss: float,
+                     coin_pnls: Dict[str, float], total_funding: float = 0.0) -> Dict:
+        """Derive the PnL metric set from window totals
+
+        PnL comes in three variants: total_pnl (gross), net_pnl (after fees)
+        and net_pnl_after_funding (after fees and funding). Trade-level figures
+        (win rate, profit factor, best coin) stay gross: funding accrues to
+        positions over time and is not attributed to round trips.
+        """
         win_rate = winning_trades / num_trades if num_trades > 0 else 0
         avg_win = gross_profit / winning_trades if winning_trades > 0 else 0
         avg_loss = abs(gross_loss / losing_trades) if losing_trades > 0 else 0
@@ -68,28 +272,26 @@ class MultiTimeframeAnalytics:
         estimated_capital = total_volume / 10 if total_volume > 0 else 1
         roi = (total_pnl / estimated_capital) if estimated_capital > 0 else 0
 
-        # Net profit after fees
+        # Net profit after fees, then after funding (received is positive)
         net_pnl = total_pnl - total_fees
+        net_pnl_after_funding = net_pnl + total_funding
 
         # Calculate risk-reward ratio
         risk_reward = avg_win / avg_loss if avg_loss > 0 else 0
 
-        # Largest win and loss
-        largest_win = max(realized_pnls) if realized_pnls else 0
-        largest_loss = min(realized_pnls) if realized_pnls else 0
-
         # Best and worst coin
-        coin_pnls = {coin: sum(pnls) for coin, pnls in trades_by_coin.items()}
         best_coin = max(coin_pnls.items(), key=lambda x: x[1]) if coin_pnls else ("N/A", 0)
         worst_coin = min(coin_pnls.items(), key=lambda x: x[1]) if coin_pnls else ("N/A", 0)
 
         return {
             'total_pnl': total_pnl,
             'net_pnl': net_pnl,
+            'net_pnl_after_funding': net_pnl_after_funding,
             'gross_profit': gross_profit,
             'gross_loss': gross_loss,
             'total_volume': total_volume,
             'total_fees': total_fees,
+            'total_funding': total_funding,
             'num_trades': num_trades,
             'winning_trades': winning_trades,
             'losing_trades': losing_trades,
@@ -103,41 +305,46 @@ class MultiTimeframeAnalytics:
             'largest_loss': largest_loss,
             'best_coin': best_coin,
             'worst_coin': worst_coin,
-            'coins_traded': list(trades_by_coin.keys()),
-            'num_coins': len(trades_by_coin)
+            'coins_traded': list(coin_pnls),
+            'num_coins': len(coin_pnls)
         }
 
-    def calculate_roi_metrics(self, fills: List[Dict], account_value: float = None) -> Dict:
-        """Calculate detailed ROI metrics"""
-        if not fills:
+    def calculate_roi_metrics(self, fills: Fills, account_value: float = None,
+                              pnl_metrics: Dict = None) -> Dict:
+        """Calculate detailed ROI metrics (pnl_metrics is reused when already computed)"""
+        fills = as_frame(fills)
+        if not len(fills):
             return {}
 
-        pnl_metrics = self.calculate_pnl_metrics(fills)
+        if pnl_metrics is None:
+            pnl_metrics = self.calculate_pnl_metrics(fills)
+        return self._roi_metrics(pnl_metrics, account_value, int(fills.time[0]), int(fills.time[-1]))
 
+    def _roi_metrics(self, pnl_metrics: Dict, account_value: float, first_time: int, last_time: int) -> Dict:
         # If account value provided, use it for ROI calculation
         if account_value and account_value > 0:
+            capital = account_value
             roi = pnl_metrics['total_pnl'] / account_value
-            roi_net = pnl_metrics['net_pnl'] / account_value
         else:
+            capital = pnl_metrics['total_volume'] / 10 if pnl_metrics['total_volume'] > 0 else 0
             roi = pnl_metrics['roi']
-            roi_net = pnl_metrics['net_pnl'] / (pnl_metrics['total_volume'] / 10) if pnl_metrics['total_volume'] > 0 else 0
+        roi_net = pnl_metrics['net_pnl'] / capital if capital else 0
+        roi_net_after_funding = pnl_metrics['net_pnl_after_funding'] / capital if capital else 0
 
         return {
             'roi': roi,
             'roi_net': roi_net,
-            'roi_annualized': self._annualize_roi(roi, fills),
+            'roi_net_after_funding': roi_net_after_funding,
+            'roi_annualized': self._annualize_roi(roi, first_time, last_time),
             'total_pnl': pnl_metrics['total_pnl'],
-            'net_pnl': pnl_metrics['net_pnl']
+            'net_pnl': pnl_metrics['net_pnl'],
+            'net_pnl_after_funding': pnl_metrics['net_pnl_after_funding']
         }
 
-    def _annualize_roi(self, roi: float, fills: List[Dict]) -> float:
+    def _annualize_roi(self, roi: float, first_time: int, last_time: int) -> float:
         """Annualize ROI based on data timeframe"""
-        if not fills or len(fills) < 2:
-            return 0
-
         # Get time span in days
-        times = [f.get('time', 0) for f in fills]
-        time_span_days = (max(times) - min(times)) / (1000 * 60 * 60 * 24)
+        time_span_days = (last_time - first_time) / (1000 * 60 * 60 * 24)
 
         if time_span_days <= 0:
             return 0
@@ -146,25 +353,39 @@ class MultiTimeframeAnalytics:
         annualized = roi * (365 / time_span_days)
         return annualized
 
-    def analyze_multi_timeframe(self, fills: List[Dict], account_value: float = None) -> Dict:
-        """Analyze account across all timeframes"""
-        results = {}
+    def analyze_multi_timeframe(self, fills: Fills, account_value: float = None,
+                                windows: Dict[str, Window] = None) -> Dict:
+        """Analyze account across all timeframes
 
-        for timeframe, days in self.timeframes.items():
-            # Filter fills
-            timeframe_fills = self.filter_fills_by_timeframe(fills, days)
+        windows maps a name to a number of days back from now, None (lifetime)
+        or an explicit (start_ms, end_ms) range; defaults to 7d/30d/lifetime.
+        Fills and round trips are indexed once (WindowIndex), so each extra
+        window costs a few binary searches instead of passes over the data.
+        """
+        if windows is None:
+            windows = self.timeframes
+        index = WindowIndex(as_frame(fills))
+        now = datetime.now()
 
-            if not timeframe_fills:
-                results[timeframe] = self._empty_timeframe_result()
+        results = {}
+        for timeframe, window in windows.items():
+            if window is None:
+                start, end = None, None
+            elif isinstance(window, tuple):
+                start, end = window
+            else:
+                start, end = (now - timedelta(days=window)).timestamp() * 1000, None
+
+            first_trade, last_trade = index.fill_span(start, end)
+            if first_trade is None:
+                results[timeframe] = self._empty_timeframe_result(index.funding(start, end))
                 continue
 
             # Calculate metrics
-            pnl_metrics = self.calculate_pnl_metrics(timeframe_fills)
-            roi_metrics = self.calculate_roi_metrics(timeframe_fills, account_value)
+            pnl_metrics = index.pnl_metrics(start, end)
+            roi_metrics = self._roi_metrics(pnl_metrics, account_value, first_trade, last_trade)
 
             # Calculate time-specific metrics
-            first_trade = min(f.get('time', 0) for f in timeframe_fills)
-            last_trade = max(f.get('time', 0) for f in timeframe_fills)
             trading_days = (last_trade - first_trade) / (1000 * 60 * 60 * 24)
             trades_per_day = pnl_metrics['num_trades'] / trading_days if trading_days > 0 else 0
 
@@ -179,23 +400,39 @@ class MultiTimeframeAnalytics:
 
         return results
 
-    def rank_by_pnl(self, accounts: List[Dict], timeframe: str = '30d') -> List[Dict]:
-        """Rank accounts by PnL for a specific timeframe"""
-        return sorted(accounts, key=lambda x: x.get(timeframe, {}).get('total_pnl', 0), reverse=True)
-
-    def rank_by_roi(self, accounts: List[Dict], timeframe: str = '30d') -> List[Dict]:
-        """Rank accounts by ROI for a specific timeframe"""
-        return sorted(accounts, key=lambda x: x.get(timeframe, {}).get('roi', 0), reverse=True)
-
-    def _empty_pnl_metrics(self) -> Dict:
-        """Return empty PnL metrics structure"""
+    def rolling_metrics(self, fills: Fills, window: Union[str, int] = '24h', step: Union[str, int] = '1h',
+                        lookback: Union[str, int] = '90d', end_ms: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """Rolling series, e.g. 24h PnL sampled hourly over 90 days, or window='7d' for rolling win rate
+
+        Durations are strings like '1h', '7d', '365d' or milliseconds. The
+        series ends at end_ms (default: now) and starts lookback earlier; fills
+        should reach back lookback + window for the first samples to be full.
+        """
+        if end_ms is None:
+            end_ms = datetime.now().timestamp() * 1000
+        index = fills if isinstance(fills, WindowIndex) else WindowIndex(as_frame(fills))
+        return index.rolling(parse_duration(window), parse_duration(step),
+                             start_ms=end_ms - parse_duration(lookback), end_ms=end_ms)
+
+    def rank_by_pnl(self, accounts: List[Dict], timeframe: str = '30d', limit: Optional[int] = None) -> List[Dict]:
+        """Rank accounts by PnL for a specific timeframe (top limit, or all)"""
+        return top_accounts(accounts, f'{timeframe}.total_pnl', limit)
+
+    def rank_by_roi(self, accounts: List[Dict], timeframe: str = '30d', limit: Optional[int] = None) -> List[Dict]:
+        """Rank accounts by ROI for a specific timeframe (top limit, or all)"""
+        return top_accounts(accounts, f'{timeframe}.roi', limit)
+
+    def _empty_pnl_metrics(self, total_funding: float = 0) -> Dict:
+        """Return empty PnL metrics structure (a window with no fills can still carry funding)"""
         return {
             'total_pnl': 0,
             'net_pnl': 0,
+            'net_pnl_after_funding': total_funding,
             'gross_profit': 0,
             'gross_loss': 0,
             'total_volume': 0,
             'total_fees': 0,
+            'total_funding': total_funding,
             'num_trades': 0,
             'winning_trades': 0,
             'losing_trades': 0,
@@ -213,12 +450,13 @@ class MultiTimeframeAnalytics:
             'num_coins': 0
         }
 
-    def _empty_timeframe_result(self) -> Dict:
+    def _empty_timeframe_result(self, total_funding: float = 0) -> Dict:
         """Return empty timeframe result"""
         return {
-            **self._empty_pnl_metrics(),
+            **self._empty_pnl_metrics(total_funding),
             'roi': 0,
             'roi_net': 0,
+            'roi_net_after_funding': 0,
             'roi_annualized': 0,
             'trading_days': 0,
             'trades_per_day': 0
@@ -238,6 +476,8 @@ class MultiTimeframeAnalytics:
         metrics_to_show = [
             ('Total PnL', 'total_pnl', '$'),
             ('Net PnL', 'net_pnl', '$'),
+            ('Funding', 'total_funding', '$'),
+            ('Net PnL after Funding', 'net_pnl_after_funding', '$'),
             ('ROI', 'roi', '%'),
             ('Win Rate', 'win_rate', '%'),
             ('Profit Factor', 'profit_factor', 'x'),
@@ -0,0 +1,184 @@
+"""
+Incremental per-account performance state
+
+PerformanceAccumulator folds fills into running totals so a tracking cycle
+only pays for the fills that arrived since the last one. It carries:
+
+- trade counts and PnL sums for win rate, averages and profit factor
+- Welford mean/variance of round-trip PnL for the Sharpe ratio
+- the running cumulative PnL, its peak and the worst drawdown so far
+- current and longest win/loss streaks
+- each coin's open round trip (round_trips.replay_fill), so a position
+  opened in one cycle and closed in a later one is still one trade
+- a cursor (last fill time and the tids seen at it) that drops overlap;
+  fills without a tid are always folded in
+
+metrics() returns the calculate_performance() metric set for every fill the
+accumulator has seen (equal up to floating-point rounding). The state is
+JSON-friendly: to_dict() / from_dict() persist it between runs.
+"""
+
+import math
+from typing import Dict, List, Union
+
+from analytics import PerformanceAnalytics
+from fills import Fill
+from fill_frame import FillFrame, as_frame
+from round_trips import replay_fill, trip_row
+
+
+class PerformanceAccumulator:
+    """Running calculate_performance() state for one account"""
+
+    # Bump when the state layout or metric definitions change; older state is rebuilt
+    VERSION = 1
+
+    def __init__(self):
+        self.fills_seen = 0
+        self.last_time = -1
+        self.last_tids: List[int] = []
+
+        self.total_pnl = 0.0
+        self.total_volume = 0.0
+
+        self.total_trades = 0
+        self.winning_trades = 0
+        self.losing_trades = 0
+        self.sum_wins = 0.0
+        self.sum_losses = 0.0
+
+        # Welford over round-trip PnL
+        self.mean = 0.0
+        self.m2 = 0.0
+
+        self.cumulative_pnl = 0.0
+        self.peak = None
+        self.max_drawdown = 0.0
+
+        self.win_streak = 0
+        self.loss_streak = 0
+        self.max_consecutive_wins = 0
+        self.max_consecutive_losses = 0
+
+        self.open_trips: Dict[str, Dict] = {}
+
+    def update(self, fills: Union[FillFrame, List[Fill], List[Dict]]) -> List[Dict]:
+        """Fold in fills newer than the cursor; returns the round trips they closed (to_dicts() rows)"""
+        frame = as_frame(fills)
+        if not len(frame):
+            return []
+
+        # Skip what an overlapping fetch already delivered (the frame is time-sorted)
+        frame = frame.between(self.last_time)
+        seen = set(self.last_tids)
+        closed = []
+
+        for coin, time, tid, side, px, sz, closed_pnl, fee, start in zip(
+                frame.coin_labels(frame.coin_id), frame.time.tolist(), frame.tid.tolist(),
+                frame.side.tolist(), frame.px.tolist(), frame.sz.tolist(),
+                frame.closed_pnl.tolist(), frame.fee.tolist(), frame.start_position.tolist()):
+            if time != self.last_time:
+                self.last_time = time
+                seen = set()
+            # Fills without a tid (-1) cannot be told apart, so they are never dropped
+            if tid >= 0:
+                if tid in seen:
+                    continue
+                seen.add(tid)
+
+            self.fills_seen += 1
+            self.total_pnl += closed_pnl
+            self.total_volume += px * sz
+
+            trip = replay_fill(self.open_trips, coin, time, tid, side, px, sz, closed_pnl, fee, start)
+            if trip is not None:
+                self._add_trade(trip['pnl'])
+                closed.append(trip_row(trip))
+
+        self.last_tids = sorted(seen)
+        return closed
+
+    def has_new(self, fills: Union[FillFrame, List[Fill], List[Dict]]) -> bool:
+        """Whether update() would fold in any of these fills (none are past the cursor)"""
+        frame = as_frame(fills).between(self.last_time)
+        seen = set(self.last_tids)
+        return any(time != self.last_time or tid < 0 or tid not in seen
+                   for time, tid in zip(frame.time.tolist(), frame.tid.tolist()))
+
+    def _add_trade(self, pnl: float):
+        self.total_trades += 1
+        delta = pnl - self.mean
+        self.mean += delta / self.total_trades
+        self.m2 += delta * (pnl - self.mean)
+
+        if pnl > 0:
+            self.winning_trades += 1
+            self.sum_wins += pnl
+            self.win_streak += 1
+            self.loss_streak = 0
+            self.max_consecutive_wins = max(self.max_consecutive_wins, self.win_streak)
+        else:
+            if pnl < 0:
+                self.losing_trades += 1
+                self.sum_losses += pnl
+            self.loss_streak += 1
+            self.win_streak = 0
+            self.max_consecutive_losses = max(self.max_consecutive_losses, self.loss_streak)
+
+        self.cumulative_pnl += pnl
+        if self.peak is None or self.cumulative_pnl > self.peak:
+            self.peak = self.cumulative_pnl
+        if self.peak != 0:
+            self.max_drawdown = max(self.max_drawdown, (self.peak - self.cumulative_pnl) / abs(self.peak))
+
+    def metrics(self) -> Dict:
+        """Same keys and definitions as PerformanceAnalytics.calculate_performance()"""
+        if not self.fills_seen:
+            return PerformanceAnalytics()._empty_performance()
+
+        n = self.total_trades
+        win_rate = self.winning_trades / n if n > 0 else 0
+        avg_win = self.sum_wins / self.winning_trades if self.winning_trades else 0
+        avg_loss = abs(self.sum_losses / self.losing_trades) if self.losing_trades else 0
+        profit_factor = self.sum_wins / abs(self.sum_losses) if self.losing_trades else float('inf')
+
+        estimated_capital = self.total_volume / 10 if self.total_volume > 0 else 1
+        roi = (self.total_pnl / estimated_capital) if estimated_capital > 0 else 0
+
+        sharpe_ratio = 0.0
+        if n >= 2:
+            std = math.sqrt(self.m2 / n)
+            if std != 0:
+                sharpe_ratio = self.mean / std * math.sqrt(365)
+
+        return {
+            'total_trades': n,
+            'winning_trades': self.winning_trades,
+            'losing_trades': self.losing_trades,
+            'win_rate': win_rate,
+            'total_pnl': self.total_pnl,
+            'total_volume': self.total_volume,
+            'avg_win': avg_win,
+            'avg_loss': avg_loss,
+            'profit_factor': profit_factor,
+            'roi': roi,
+            'sharpe_ratio': sharpe_ratio,
+            'max_drawdown': self.max_drawdown,
+            'max_consecutive_wins': self.max_consecutive_wins,
+            'max_consecutive_losses': self.max_consecutive_losses,
+        }
+
+    # ---- persistence -----------------------------------------------------
+
+    def to_dict(self) -> Dict:
+        return {'version': self.VERSION, **self.__dict__}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'PerformanceAccumulator':
+        """Restore saved state; state from another VERSION starts over"""
+        acc = cls()
+        if state and state.get('version') == cls.VERSION:
+            for key in acc.__dict__:
+                if key in state:
+                    setattr(acc, key, state[key])
+        return acc
@@ -0,0 +1,153 @@
+"""
+Process-pool analytics across accounts
+
+The analytics are CPU-bound Python, so one process analyses one account at a
+time no matter how many cores there are. AnalyticsPool spreads a batch of
+accounts over worker processes:
+
+- every account's FillFrame records are copied once into a single shared
+  memory block; a worker gets (block name, offset, length, coin list) and
+  views its slice in place, so no fill is pickled on the way in (funding
+  payments, a few per hour held, travel with the task as a small array)
+- the largest accounts are submitted first so one heavy account does not
+  finish the batch on its own
+- results come back in input order; an account whose analysis raised gets
+  the exception in its slot instead of sinking the whole batch
+
+With workers <= 1 (or a single account) the same analyses run in-process.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from analytics import PerformanceAnalytics
+from fill_frame import FILL_DTYPE, FillFrame, as_frame
+from multi_timeframe_analytics import MultiTimeframeAnalytics
+from online_analytics import PerformanceAccumulator
+
+# analysis name -> what each account's result slot holds
+ANALYSES = (
+    'performance',       # PerformanceAnalytics.calculate_performance() dict
+    'multi_timeframe',   # MultiTimeframeAnalytics.analyze_multi_timeframe() dict
+    'accumulate',        # (updated PerformanceAccumulator, closed round-trip rows)
+)
+
+_performance = PerformanceAnalytics()
+_multi_timeframe = MultiTimeframeAnalytics()
+
+
+def _analyze(analysis: str, frame: FillFrame, extra):
+    """Run one account's analysis; extra is its account value or accumulator"""
+    if analysis == 'performance':
+        return _performance.calculate_performance(frame)
+    if analysis == 'multi_timeframe':
+        return _multi_timeframe.analyze_multi_timeframe(frame, extra)
+    if analysis == 'accumulate':
+        accumulator = extra if extra is not None else PerformanceAccumulator()
+        closed = accumulator.update(frame)
+        return accumulator, closed
+    raise ValueError(f"Unknown analysis: {analysis}")
+
+
+def _run_shared(analysis: str, name: str, offset: int, length: int, coins: List[str],
+                funding: np.ndarray, extra):
+    """Worker entry point: analyse a slice of the shared fill block in place"""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        data = np.ndarray((length,), dtype=FILL_DTYPE, buffer=block.buf, offset=offset * FILL_DTYPE.itemsize)
+        frame = FillFrame(data, coins, _sorted=True, funding=funding)
+        try:
+            return _analyze(analysis, frame, extra)
+        finally:
+            # Release every view of the buffer before detaching
+            del frame, data
+    finally:
+        block.close()
+
+
+class AnalyticsPool:
+    """Reusable process pool for batch analytics (workers defaults to the CPU count)"""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self._executor = None
+
+    def analyze_many(self, fill_sets: Sequence, analysis: str = 'performance',
+                     extras: Optional[Sequence] = None) -> List:
+        """Analyse many accounts' fills (FillFrames, Fills or raw dicts), one result per input
+
+        extras gives each account's account value ('multi_timeframe') or
+        PerformanceAccumulator ('accumulate'); accumulators come back updated
+        (in the worker's copy), so use the returned ones.
+        """
+        if analysis not in ANALYSES:
+            raise ValueError(f"Unknown analysis: {analysis}")
+        frames = [as_frame(fills) for fills in fill_sets]
+        extras = list(extras) if extras is not None else [None] * len(frames)
+        if len(extras) != len(frames):
+            raise ValueError("extras must have one entry per fill set")
+
+        if self.workers <= 1 or len(frames) <= 1:
+            return [self._guarded(analysis, frame, extra) for frame, extra in zip(frames, extras)]
+        return self._analyze_shared(analysis, frames, extras)
+
+    @staticmethod
+    def _guarded(analysis: str, frame: FillFrame, extra):
+        try:
+            return _analyze(analysis, frame, extra)
+        except Exception as e:
+            return e
+
+    def _analyze_shared(self, analysis: str, frames: List[FillFrame], extras: List) -> List:
+        offsets = np.concatenate(([0], np.cumsum([len(frame) for frame in frames])))
+        total = int(offsets[-1])
+        block = shared_memory.SharedMemory(create=True, size=max(total * FILL_DTYPE.itemsize, 1))
+        try:
+            packed = np.ndarray((total,), dtype=FILL_DTYPE, buffer=block.buf)
+            for frame, lo, hi in zip(frames, offsets[:-1], offsets[1:]):
+                packed[lo:hi] = frame.data
+            del packed
+
+            executor = self._get_executor()
+            results: List = [None] * len(frames)
+            futures = {}
+            # Largest accounts first for better load balance; slots keep input order
+            for i in sorted(range(len(frames)), key=lambda i: len(frames[i]), reverse=True):
+                futures[i] = executor.submit(_run_shared, analysis, block.name, int(offsets[i]),
+                                             len(frames[i]), frames[i].coins, frames[i].funding, extras[i])
+            for i, future in futures.items():
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    results[i] = e
+            return results
+        finally:
+            block.close()
+            block.unlink()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> 'AnalyticsPool':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def analyze_many(fill_sets: Sequence, analysis: str = 'performance', workers: Optional[int] = None,
+                 extras: Optional[Sequence] = None) -> List:
+    """One-off AnalyticsPool(workers).analyze_many(); see there"""
+    with AnalyticsPool(workers) as pool:
+        return pool.analyze_many(fill_sets, analysis, extras)
@@ -0,0 +1,360 @@
+"""
+Mergeable quantile sketches for population-wide percentiles
+
+"This trader is in the 97th percentile of 30d ROI" needs the distribution of
+30d ROI over every trader, not a sort of every metric on every request.
+KLLSketch (Karnin, Lang, Liberty) summarises a stream of values in a stack
+of compactors: level h holds items of weight 2**h, and a level that outgrows
+its capacity is sorted and every other item (random offset) is promoted to
+the next level. Capacities shrink geometrically (factor 2/3) below the top
+level, so a sketch keeps O(k) items however many values went in, and rank
+queries are within about 1.7/k of the exact rank (k=200: ~1%). Below k
+values nothing is compacted and answers are exact.
+
+Sketches merge by concatenating levels and compacting, so populations built
+in chunks, on several workers or from several sources combine into the same
+kind of sketch.
+
+MetricSketches keeps one sketch per (timeframe, metric):
+
+    leaderboard  'day'/'week'/'month'/'allTime' x 'pnl'/'roi'/'volume',
+                 from each leaderboard snapshot (leaderboard_sketches())
+    accounts     per-account analytics rows (PERCENTILE_METRICS), e.g. the
+                 tracker's 'tracked' performance or the multi-timeframe
+                 '7d'/'30d'/'lifetime' results, persisted by name in the
+                 database so the dashboard reads what the trackers built
+"""
+
+import io
+import json
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from leaderboard_stream import WINDOWS, LeaderboardRecord
+from ranking import leaderboard_features
+
+DEFAULT_K = 200
+_MIN_CAPACITY = 8
+
+# Per-account metrics sketched by MetricSketches.add_rows(); avg_trade_size is derived
+PERCENTILE_METRICS = ('roi', 'roi_net_after_funding', 'total_pnl', 'net_pnl_after_funding', 'profit_factor',
+                      'win_rate', 'sharpe_ratio', 'max_drawdown', 'total_volume', 'avg_trade_size')
+LEADERBOARD_METRICS = ('pnl', 'roi', 'volume')
+
+# Quantiles reported by MetricSketches.summary()
+SUMMARY_QUANTILES = (0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99)
+
+
+class KLLSketch:
+    """Bounded-memory, mergeable summary of a stream of floats answering rank and quantile queries"""
+
+    __slots__ = ('k', 'n', 'min', 'max', 'levels', '_rng', '_sorted')
+
+    def __init__(self, k: int = DEFAULT_K, seed: Optional[int] = None):
+        if k < _MIN_CAPACITY:
+            raise ValueError(f"k must be at least {_MIN_CAPACITY}")
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+        self._sorted = None  # (items, cumulative weights), rebuilt after updates
+
+    # ---- updates ---------------------------------------------------------
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(_MIN_CAPACITY, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values) -> 'KLLSketch':
+        """Add one value or an array of values (NaN is skipped)"""
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self._compress()
+        return self
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        """Fold another sketch's values into this one"""
+        if other.k != self.k:
+            raise ValueError(f"cannot merge sketches with k={self.k} and k={other.k}")
+        if not other.n:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate((self.levels[h], items))
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _compress(self):
+        """Compact the lowest over-capacity level until every level fits"""
+        self._sorted = None
+        h = 0
+        while h < len(self.levels):
+            if len(self.levels[h]) <= self._capacity(h):
+                h += 1
+                continue
+            items = np.sort(self.levels[h])
+            # An odd item out stays behind at its weight, so total weight stays n
+            keep, items = (items[-1:], items[:-1]) if len(items) % 2 else (items[:0], items)
+            if h + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            promoted = items[int(self._rng.integers(2))::2]
+            self.levels[h + 1] = np.concatenate((self.levels[h + 1], promoted))
+            self.levels[h] = keep
+            # A new top level shrinks every capacity below it: rescan from the bottom
+            h = 0
+
+    # ---- queries ---------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def retained(self) -> int:
+        """Items held, whatever n is"""
+        return sum(len(items) for items in self.levels)
+
+    def _weighted(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._sorted is None:
+            items = np.concatenate(self.levels)
+            weights = np.concatenate([np.full(len(level), 2 ** h, dtype=np.int64)
+                                      for h, level in enumerate(self.levels)])
+            order = np.argsort(items, kind='stable')
+            self._sorted = (items[order], np.cumsum(weights[order]))
+        return self._sorted
+
+    def rank(self, values):
+        """Estimated fraction of the population <= each value (0 on an empty sketch)"""
+        values = np.asarray(values, dtype=np.float64)
+        if not self.n:
+            return np.zeros_like(values) if values.ndim else 0.0
+        items, cumulative = self._weighted()
+        index = np.searchsorted(items, values, side='right')
+        ranks = np.where(index > 0, cumulative[np.maximum(index - 1, 0)], 0) / self.n
+        return ranks if values.ndim else float(ranks)
+
+    def percentile(self, value: float) -> Optional[float]:
+        """Percentile (0-100) of value in the population, or None on an empty sketch"""
+        if not self.n or value is None or math.isnan(value):
+            return None
+        return 100.0 * self.rank(value)
+
+    def quantile(self, q):
+        """Estimated value at fraction q (scalar or array in [0, 1]); NaN on an empty sketch"""
+        q = np.asarray(q, dtype=np.float64)
+        if not self.n:
+            return np.full(q.shape, np.nan) if q.ndim else math.nan
+        items, cumulative = self._weighted()
+        index = np.searchsorted(cumulative, q * self.n, side='left')
+        values = items[np.clip(index, 0, len(items) - 1)]
+        # The extremes are tracked exactly
+        values = np.where(q <= 0, self.min, np.where(q >= 1, self.max, values))
+        return values if q.ndim else float(values)
+
+    def __repr__(self) -> str:
+        return f"KLLSketch(n={self.n}, retained={self.retained}, k={self.k})"
+
+
+def avg_trade_size(metrics: Dict) -> Optional[float]:
+    """Traded notional per closed trade from a metrics dict, or None without trades"""
+    trades = metrics.get('num_trades', metrics.get('total_trades')) or 0
+    if not trades:
+        return None
+    return metrics.get('total_volume', 0) / trades
+
+
+def sketch_values(metrics: Dict) -> Dict[str, float]:
+    """{metric: value} of the PERCENTILE_METRICS present in a per-account metrics dict"""
+    values = {name: metrics[name] for name in PERCENTILE_METRICS
+              if isinstance(metrics.get(name), (int, float)) and not isinstance(metrics.get(name), bool)}
+    size = avg_trade_size(metrics)
+    if size is not None:
+        values['avg_trade_size'] = size
+    return values
+
+
+class MetricSketches:
+    """One KLLSketch per (timeframe, metric) over a population of traders"""
+
+    # Bump when the sketched metrics or the blob layout change; older blobs are ignored
+    VERSION = 1
+
+    def __init__(self, k: int = DEFAULT_K, seed: Optional[int] = 0):
+        self.k = k
+        self.seed = seed
+        self.sketches: Dict[Tuple[str, str], KLLSketch] = {}
+
+    def _sketch(self, timeframe: str, metric: str) -> KLLSketch:
+        key = (timeframe, metric)
+        if key not in self.sketches:
+            seed = None if self.seed is None else self.seed + len(self.sketches)
+            self.sketches[key] = KLLSketch(self.k, seed)
+        return self.sketches[key]
+
+    # ---- ingestion -------------------------------------------------------
+
+    def add(self, timeframe: str, metric: str, values) -> 'MetricSketches':
+        """Add values (one per trader) to a metric's distribution"""
+        self._sketch(timeframe, metric).update(values)
+        return self
+
+    def add_rows(self, timeframe: str, rows: Iterable[Dict]) -> 'MetricSketches':
+        """Add per-account metrics dicts (performance or one timeframe of an analysis)
+
+        Accounts without trades in the timeframe are left out of its
+        population, so idle accounts do not pile up at zero.
+        """
+        columns: Dict[str, List[float]] = {}
+        for row in rows:
+            if not row or not (row.get('num_trades', row.get('total_trades')) or 0):
+                continue
+            for name, value in sketch_values(row).items():
+                columns.setdefault(name, []).append(value)
+        for name, values in columns.items():
+            self.add(timeframe, name, values)
+        return self
+
+    def add_analyses(self, results: Iterable[Dict],
+                     timeframes: Sequence[str] = ('7d', '30d', 'lifetime')) -> 'MetricSketches':
+        """Add multi-timeframe analysis results, one population per timeframe"""
+        results = [result for result in results if result]
+        for timeframe in timeframes:
+            self.add_rows(timeframe, (result.get(timeframe) for result in results))
+        return self
+
+    def add_records(self, records: Sequence[LeaderboardRecord]) -> 'MetricSketches':
+        """Add a leaderboard snapshot: pnl/roi/volume per window, for rows with data in it"""
+        if not len(records):
+            return self
+        features = leaderboard_features(records)
+        for timeframe in WINDOWS:
+            # LeaderboardRecord.window() is empty when the window has no PnL
+            present = ~np.isnan(features.column(f'{timeframe}_pnl'))
+            for metric in LEADERBOARD_METRICS:
+                self.add(timeframe, metric, features.column(f'{timeframe}_{metric}')[present])
+        return self
+
+    def merge(self, other: 'MetricSketches') -> 'MetricSketches':
+        """Fold another population's sketches into this one"""
+        for (timeframe, metric), sketch in other.sketches.items():
+            self._sketch(timeframe, metric).merge(sketch)
+        return self
+
+    # ---- queries ---------------------------------------------------------
+
+    def get(self, timeframe: str, metric: str) -> Optional[KLLSketch]:
+        return self.sketches.get((timeframe, metric))
+
+    @property
+    def count(self) -> int:
+        """Largest population behind any one sketch"""
+        return max((sketch.n for sketch in self.sketches.values()), default=0)
+
+    def metrics(self) -> Dict[str, List[str]]:
+        """{timeframe: [metric, ...]} with a non-empty sketch"""
+        available: Dict[str, List[str]] = {}
+        for (timeframe, metric), sketch in self.sketches.items():
+            if sketch.n:
+                available.setdefault(timeframe, []).append(metric)
+        return available
+
+    def percentile(self, timeframe: str, metric: str, value: float) -> Optional[float]:
+        """Percentile (0-100) of value among the population, or None without a sketch"""
+        sketch = self.get(timeframe, metric)
+        return sketch.percentile(value) if sketch is not None else None
+
+    def percentiles(self, timeframe: str, metrics: Dict) -> Dict[str, float]:
+        """{metric: percentile} for every value in metrics that has a sketch in the timeframe"""
+        ranks = {}
+        for name, value in metrics.items():
+            if value is None or isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            percentile = self.percentile(timeframe, name, value)
+            if percentile is not None:
+                ranks[name] = percentile
+        return ranks
+
+    def summary(self, timeframe: str, metric: str,
+                quantiles: Sequence[float] = SUMMARY_QUANTILES) -> Optional[Dict]:
+        """Population size, extremes and quantile values for one metric, or None"""
+        sketch = self.get(timeframe, metric)
+        if sketch is None or not sketch.n:
+            return None
+        values = sketch.quantile(np.asarray(quantiles)).tolist()
+        return {
+            'count': sketch.n,
+            'min': sketch.min,
+            'max': sketch.max,
+            'quantiles': {f'p{q * 100:g}': value for q, value in zip(quantiles, values)},
+        }
+
+    # ---- persistence -----------------------------------------------------
+
+    def to_bytes(self) -> bytes:
+        keys = list(self.sketches)
+        header = [{'timeframe': tf, 'metric': metric, 'n': self.sketches[(tf, metric)].n,
+                   'min': self.sketches[(tf, metric)].min, 'max': self.sketches[(tf, metric)].max,
+                   'sizes': [len(level) for level in self.sketches[(tf, metric)].levels]}
+                  for tf, metric in keys]
+        items = [np.concatenate(self.sketches[key].levels) for key in keys]
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, version=self.VERSION, k=self.k, header=json.dumps(header),
+                            items=np.concatenate(items) if items else np.empty(0))
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: Optional[bytes]) -> Optional['MetricSketches']:
+        """Restore saved sketches; None when there are none or they are from another VERSION"""
+        if not data:
+            return None
+        with np.load(io.BytesIO(data)) as saved:
+            if int(saved['version']) != cls.VERSION:
+                return None
+            sketches = cls(int(saved['k']))
+            items, offset = saved['items'], 0
+            for entry in json.loads(str(saved['header'])):
+                sketch = sketches._sketch(entry['timeframe'], entry['metric'])
+                sketch.n, sketch.min, sketch.max = entry['n'], entry['min'], entry['max']
+                sketch.levels = []
+                for size in entry['sizes']:
+                    sketch.levels.append(items[offset:offset + size].copy())
+                    offset += size
+        return sketches
+
+    def __repr__(self) -> str:
+        return f"MetricSketches({len(self.sketches)} sketches, {self.count} traders)"
+
+
+_records_lock = threading.Lock()
+_records_sketches = (None, None)
+
+
+def leaderboard_sketches(records: Sequence[LeaderboardRecord]) -> MetricSketches:
+    """MetricSketches over a leaderboard snapshot, memoised for the most recent records list
+
+    Built once per snapshot (the API client caches the leaderboard as one
+    list object), after which percentile lookups never touch the records.
+    """
+    global _records_sketches
+    with _records_lock:
+        cached_records, sketches = _records_sketches
+        if cached_records is records:
+            return sketches
+    sketches = MetricSketches().add_records(records)
+    with _records_lock:
+        _records_sketches = (records, sketches)
+    return sketches
@@ -0,0 +1,198 @@
+"""
+Vectorised cross-account ranking
+
+Accounts are ranked from a FeatureMatrix: one row per account, one float64
+column per metric, NaN where an account has no value. Scores are a weighted
+sum of capped columns, computed for every account in a few array passes, and
+rank_indices() uses np.argpartition so a top-k over the whole leaderboard
+never sorts more than k rows. Results are row indices into the caller's list,
+so nothing is copied or mutated.
+
+Ties keep input order, like sorted(..., reverse=True).
+"""
+
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from leaderboard_stream import LeaderboardRecord
+
+
+class FeatureMatrix:
+    """accounts x metrics float64 matrix with named columns"""
+
+    __slots__ = ('values', 'columns', '_index')
+
+    def __init__(self, values: np.ndarray, columns: Sequence[str]):
+        self.values = values
+        self.columns = list(columns)
+        self._index = {name: i for i, name in enumerate(self.columns)}
+
+    @classmethod
+    def from_dicts(cls, accounts: Sequence[Dict], columns: Sequence[str], default: float = 0.0) -> 'FeatureMatrix':
+        """Columns are keys, or dotted paths into nested dicts ('30d.total_pnl')
+
+        Missing or None values become default (0.0 matches dict.get(key, 0)).
+        """
+        values = np.empty((len(accounts), len(columns)))
+        for j, column in enumerate(columns):
+            values[:, j] = np.fromiter(map(_path_getter(column, default), accounts),
+                                       dtype=np.float64, count=len(accounts))
+        return cls(values, columns)
+
+    @classmethod
+    def from_records(cls, records: Sequence[LeaderboardRecord]) -> 'FeatureMatrix':
+        """Every numeric LeaderboardRecord field ('account_value', 'week_pnl', ...); absent windows are NaN"""
+        columns = LeaderboardRecord._fields[2:]
+        values = np.array([record[2:] for record in records], dtype=np.float64).reshape(len(records), len(columns))
+        return cls(values, columns)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.values[:, self._index[name]]
+
+    def __repr__(self) -> str:
+        return f"FeatureMatrix({len(self)} accounts x {len(self.columns)} metrics)"
+
+
+def _path_getter(column: str, default: float) -> Callable[[Dict], float]:
+    keys = column.split('.')
+    if len(keys) == 1:
+        def get_key(account):
+            value = account.get(column)
+            return default if value is None else value
+        return get_key
+
+    def get(account):
+        value = account
+        for key in keys:
+            if not isinstance(value, dict):
+                return default
+            value = value.get(key)
+        return default if value is None else value
+
+    return get
+
+
+class ScoreTerm(NamedTuple):
+    """One weighted score component: clip(metric / divisor, lo, hi) * weight * scale"""
+    metric: str
+    weight: float
+    scale: float = 1.0
+    lo: float = -np.inf
+    hi: float = np.inf
+    divisor: float = 1.0
+
+
+class Ranker:
+    """Weighted, capped multi-metric score over a FeatureMatrix"""
+
+    def __init__(self, terms: Sequence[ScoreTerm]):
+        self.terms = list(terms)
+
+    @property
+    def metrics(self) -> List[str]:
+        return [term.metric for term in self.terms]
+
+    def scores(self, features: FeatureMatrix) -> np.ndarray:
+        """One score per account; missing (NaN) metrics contribute nothing"""
+        score = np.zeros(len(features))
+        for term in self.terms:
+            column = features.column(term.metric)
+            if term.divisor != 1.0:
+                column = column / term.divisor
+            part = np.clip(column, term.lo, term.hi) * term.weight * term.scale
+            score += np.where(np.isnan(part), 0.0, part)
+        return score
+
+    def top_k(self, features: FeatureMatrix, k: Optional[int] = None,
+              mask: Optional[np.ndarray] = None) -> np.ndarray:
+        return rank_indices(self.scores(features), k, mask)
+
+
+# PerformanceAnalytics.rank_accounts() scoring; ROI capped at 200%, Sharpe at 0..3,
+# profit factor at 5 and trade count at 100
+DEFAULT_RANKER = Ranker([
+    ScoreTerm('win_rate', 0.3, 100),
+    ScoreTerm('roi', 0.3, 50, hi=2),
+    ScoreTerm('sharpe_ratio', 0.2, 33, lo=0, hi=3),
+    ScoreTerm('profit_factor', 0.1, 20, hi=5),
+    ScoreTerm('total_trades', 0.1, 100, hi=1, divisor=100),
+])
+
+
+def rank_indices(values: np.ndarray, k: Optional[int] = None, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """Indices of the k largest values (all when k is None), best first
+
+    mask restricts the candidates; NaN ranks last. Uses argpartition, so the
+    cost is O(n + k log k) rather than a full sort.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    candidates = np.flatnonzero(mask) if mask is not None else np.arange(len(values))
+    keys = values[candidates]
+    keys = np.where(np.isnan(keys), -np.inf, keys)
+    n = len(keys)
+    if k is None or k >= n:
+        k = n
+    if k <= 0:
+        return candidates[:0]
+
+    if k < n:
+        # k-th largest value; everything above it is in, ties at it fill up in input order
+        kth = keys[np.argpartition(keys, n - k)[n - k]]
+        above = np.flatnonzero(keys > kth)
+        ties = np.flatnonzero(keys == kth)[:k - len(above)]
+        chosen = np.concatenate((above, ties))
+    else:
+        chosen = np.arange(n)
+    order = np.lexsort((chosen, -keys[chosen]))
+    return candidates[chosen[order]]
+
+
+def top_accounts(accounts: Sequence[Dict], metric: str, k: Optional[int] = None,
+                 default: Optional[float] = 0.0) -> List[Dict]:
+    """Accounts ordered by one (dotted-path) metric, best first
+
+    Missing values count as default; with default=None accounts without the
+    metric are left out instead.
+    """
+    values = FeatureMatrix.from_dicts(accounts, [metric], np.nan if default is None else default).values[:, 0]
+    mask = ~np.isnan(values) if default is None else None
+    return [accounts[i] for i in rank_indices(values, k, mask).tolist()]
+
+
+def top_records(records: Sequence[LeaderboardRecord], timeframe: str, metric: str,
+                k: Optional[int] = None) -> List[LeaderboardRecord]:
+    """Leaderboard records with data for timeframe, ordered by its metric ('pnl', 'roi', 'volume')"""
+    features = leaderboard_features(records)
+    column = f'{timeframe}_{metric}'
+    if column not in features.columns:
+        return []
+    values = features.column(column)
+    # LeaderboardRecord.window() is empty when the window has no PnL
+    mask = ~np.isnan(values) & ~np.isnan(features.column(f'{timeframe}_pnl'))
+    return [records[i] for i in rank_indices(values, k, mask).tolist()]
+
+
+_records_lock = threading.Lock()
+_records_features = (None, None)
+
+
+def leaderboard_features(records: Sequence[LeaderboardRecord]) -> FeatureMatrix:
+    """FeatureMatrix.from_records(), memoised for the most recent records list
+
+    The API client caches the leaderboard as one list object, so repeated
+    rankings over the same snapshot reuse a single matrix.
+    """
+    global _records_features
+    with _records_lock:
+        cached_records, features = _records_features
+        if cached_records is records:
+            return features
+    features = FeatureMatrix.from_records(records)
+    with _records_lock:
+        _records_features = (records, features)
+    return features
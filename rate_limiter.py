@@ -0,0 +1,195 @@
+"""
+Weight-aware token bucket rate limiting for Hyperliquid Info API traffic
+
+Hyperliquid budgets REST traffic per IP in request *weight* per minute, not
+in calls. Each request type has a base weight, and history endpoints add
+weight per batch of items returned. One bucket is shared by every
+HyperliquidAPI instance in the process; pointing RATE_LIMIT_DB at a SQLite
+file shares it between processes too (dashboard, tracker and worker).
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict
+
+from config import Config
+
+# Base weight per request type (https://hyperliquid.gitbook.io/hyperliquid-docs/for-developers/api/rate-limits-and-user-limits)
+DEFAULT_REQUEST_WEIGHT = 20
+REQUEST_WEIGHTS = {
+    'clearinghouseState': 2,
+    'spotClearinghouseState': 2,
+    'allMids': 2,
+    'l2Book': 2,
+    'orderStatus': 2,
+    'exchangeStatus': 2,
+    'userRole': 60,
+    # Served by the stats-data host, outside the Info API budget
+    'leaderboard': 0,
+}
+
+# Extra weight: 1 per this many items returned
+ITEMS_PER_EXTRA_WEIGHT = {
+    'userFills': 20,
+    'userFillsByTime': 20,
+    'userFunding': 20,
+    'fundingHistory': 20,
+    'historicalOrders': 20,
+    'recentTrades': 20,
+    'candleSnapshot': 60,
+}
+
+
+def request_weight(endpoint: str) -> int:
+    """Weight charged before sending a request"""
+    return REQUEST_WEIGHTS.get(endpoint, DEFAULT_REQUEST_WEIGHT)
+
+
+def response_weight(endpoint: str, result) -> int:
+    """Extra weight charged after a request, based on items returned"""
+    per = ITEMS_PER_EXTRA_WEIGHT.get(endpoint)
+    if not per or not isinstance(result, list):
+        return 0
+    return len(result) // per
+
+
+class TokenBucket:
+    """Thread-safe in-process token bucket
+
+    reserve() takes tokens immediately, letting the balance go negative, and
+    returns how long the caller must wait before the reservation is covered.
+    Callers are served in arrival order and nobody spins.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.reservations = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+
+    def reserve(self, cost: float) -> float:
+        """Take cost tokens and return the seconds to wait before proceeding"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= cost
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self._record(wait)
+            return wait
+
+    def _record(self, wait: float):
+        self.reservations += 1
+        if wait > 0:
+            self.throttled += 1
+            self.total_wait += wait
+
+    def acquire(self, cost: float):
+        """Block until cost tokens are available"""
+        if cost <= 0:
+            return
+        wait = self.reserve(cost)
+        if wait > 0:
+            time.sleep(wait)
+
+    def charge(self, cost: float):
+        """Deduct tokens without waiting (for weight known only after a response)"""
+        if cost > 0:
+            self.reserve(cost)
+
+    def stats(self) -> Dict:
+        return {
+            'rate_per_sec': self.rate,
+            'capacity': self.capacity,
+            'reservations': self.reservations,
+            'throttled': self.throttled,
+            'total_wait_sec': round(self.total_wait, 3),
+        }
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """Token bucket whose balance lives in a local SQLite file
+
+    Every process pointing at the same file draws from one budget. Each
+    reservation is a single BEGIN IMMEDIATE transaction, which SQLite
+    serialises across processes.
+    """
+
+    def __init__(self, path: str, rate: float, capacity: float, name: str = 'info'):
+        super().__init__(rate, capacity)
+        self.path = path
+        self.name = name
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS token_buckets "
+            "(name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO token_buckets (name, tokens, updated) VALUES (?, ?, ?)",
+            (name, capacity, time.time())
+        )
+
+    def reserve(self, cost: float) -> float:
+        # Wall-clock time: monotonic clocks are not comparable between processes
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                tokens, updated = cur.execute(
+                    "SELECT tokens, updated FROM token_buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                now = time.time()
+                tokens = min(self.capacity, tokens + max(now - updated, 0) * self.rate) - cost
+                cur.execute(
+                    "UPDATE token_buckets SET tokens = ?, updated = ? WHERE name = ?",
+                    (tokens, now, self.name)
+                )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+            wait = -tokens / self.rate if tokens < 0 else 0.0
+            self._record(wait)
+            return wait
+
+
+def create_rate_limiter(weight_per_minute: float = None, burst: float = None,
+                        db_path: str = None) -> TokenBucket:
+    """Build a bucket that stays under weight_per_minute over any 60s window
+
+    A bucket can spend its full burst plus 60s of refill inside one minute,
+    so the refill rate is (limit - burst) / 60.
+    """
+    weight_per_minute = weight_per_minute or Config.RATE_LIMIT_WEIGHT_PER_MINUTE
+    burst = burst if burst is not None else Config.RATE_LIMIT_BURST
+    burst = min(burst, weight_per_minute / 2)
+    rate = (weight_per_minute - burst) / 60.0
+
+    db_path = db_path if db_path is not None else Config.RATE_LIMIT_DB
+    if db_path:
+        return SQLiteTokenBucket(db_path, rate, burst)
+    return TokenBucket(rate, burst)
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_shared_rate_limiter() -> TokenBucket:
+    """Process-wide limiter shared by every HyperliquidAPI instance"""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = create_rate_limiter()
+        return _shared_limiter
@@ -0,0 +1,251 @@
+"""
+Retry, circuit breaking and request metrics for Info API calls
+
+- RetryPolicy: jittered exponential backoff for retryable failures (429, 5xx,
+  timeouts), honouring Retry-After when the server sends one.
+- RetryBudget: retries may only add a fraction of normal traffic, so a
+  struggling API is not hit by a retry storm.
+- CircuitBreakers: one breaker per request type; after repeated failures calls
+  fail fast until a cool-down passes, then a single probe is let through.
+- RequestMetrics: latency histograms and outcome counts per request type.
+"""
+
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from config import Config
+
+# Outcome labels recorded per request type
+OUTCOMES = ('ok', 'rate_limited', 'server_error', 'client_error', 'network_error', 'circuit_open')
+
+# Latency histogram bucket upper bounds, milliseconds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float('inf'))
+
+
+class RetryPolicy:
+    """Full-jitter exponential backoff: attempt n waits uniform(0, base * 2^n), capped"""
+
+    def __init__(self, max_attempts: int = None, base_delay: float = None, max_delay: float = None):
+        self.max_attempts = max_attempts or Config.API_MAX_RETRIES + 1
+        self.base_delay = base_delay if base_delay is not None else Config.API_RETRY_BASE_DELAY
+        self.max_delay = max_delay if max_delay is not None else Config.API_RETRY_MAX_DELAY
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class RetryBudget:
+    """Caps retries at a fraction of first attempts (plus a small per-second floor)"""
+
+    def __init__(self, ratio: float = 0.2, min_per_sec: float = 1.0, capacity: float = 10.0):
+        self.ratio = ratio
+        self.min_per_sec = min_per_sec
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.exhausted = 0
+
+    def _refill(self, deposit: float):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + deposit + (now - self._updated) * self.min_per_sec)
+        self._updated = now
+
+    def record_request(self):
+        with self._lock:
+            self._refill(self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            self._refill(0)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            self.exhausted += 1
+            return False
+
+
+class CircuitBreaker:
+    """closed -> open after failure_threshold consecutive failures -> half-open after reset_timeout"""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == 'closed':
+            return True
+        if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = 'half_open'
+        if self.state == 'half_open' and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state = 'closed'
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == 'half_open' or self.failures >= self.failure_threshold:
+            if self.state != 'open':
+                self.times_opened += 1
+            self.state = 'open'
+            self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+
+class CircuitBreakers:
+    """Thread-safe set of breakers, one per request type"""
+
+    def __init__(self, failure_threshold: int = None, reset_timeout: float = None):
+        self.failure_threshold = failure_threshold or Config.CIRCUIT_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout if reset_timeout is not None else Config.CIRCUIT_RESET_TIMEOUT
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    def allow(self, endpoint: str) -> bool:
+        with self._lock:
+            return self._get(endpoint).allow()
+
+    def record_success(self, endpoint: str):
+        with self._lock:
+            self._get(endpoint).record_success()
+
+    def record_failure(self, endpoint: str):
+        with self._lock:
+            self._get(endpoint).record_failure()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                endpoint: {'state': b.state, 'failures': b.failures, 'times_opened': b.times_opened}
+                for endpoint, b in self._breakers.items()
+            }
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (not thread-safe; RequestMetrics locks around it)"""
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * len(buckets_ms)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        for i, bound in enumerate(self.buckets_ms):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (max for the open bucket)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets_ms, self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 2) if self.count else 0.0,
+            'p50_ms': self.quantile(0.5),
+            'p95_ms': self.quantile(0.95),
+            'p99_ms': self.quantile(0.99),
+            'max_ms': round(self.max_ms, 2),
+            'buckets': {('+Inf' if b == float('inf') else f'le_{b}ms'): c
+                        for b, c in zip(self.buckets_ms, self.counts)},
+        }
+
+
+class RequestMetrics:
+    """Per-request-type latency histograms, outcome counts and retry counters"""
+
+    def __init__(self):
+        self._latency: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self._outcomes: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(OUTCOMES, 0))
+        self._retries: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint: str, outcome: str, seconds: Optional[float] = None):
+        with self._lock:
+            self._outcomes[endpoint][outcome] += 1
+            if seconds is not None:
+                self._latency[endpoint].observe(seconds * 1000)
+
+    def record_retry(self, endpoint: str):
+        with self._lock:
+            self._retries[endpoint] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            endpoints: List[str] = sorted(set(self._outcomes) | set(self._latency))
+            return {
+                endpoint: {
+                    'outcomes': dict(self._outcomes[endpoint]),
+                    'retries': self._retries[endpoint],
+                    'latency': self._latency[endpoint].to_dict(),
+                }
+                for endpoint in endpoints
+            }
+
+
+_shared_lock = threading.Lock()
+_shared_breakers = None
+_shared_metrics = None
+_shared_budget = None
+
+
+def get_shared_circuit_breakers() -> CircuitBreakers:
+    """Process-wide breakers shared by every HyperliquidAPI instance"""
+    global _shared_breakers
+    with _shared_lock:
+        if _shared_breakers is None:
+            _shared_breakers = CircuitBreakers()
+        return _shared_breakers
+
+
+def get_shared_request_metrics() -> RequestMetrics:
+    """Process-wide request metrics shared by every HyperliquidAPI instance"""
+    global _shared_metrics
+    with _shared_lock:
+        if _shared_metrics is None:
+            _shared_metrics = RequestMetrics()
+        return _shared_metrics
+
+
+def get_shared_retry_budget() -> RetryBudget:
+    """Process-wide retry budget shared by every HyperliquidAPI instance"""
+    global _shared_budget
+    with _shared_lock:
+        if _shared_budget is None:
+            _shared_budget = RetryBudget()
+        return _shared_budget
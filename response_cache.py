@@ -0,0 +1,109 @@
+"""
+Size-bounded LRU cache with per-request-type TTLs for Info API responses
+
+Cached values are shared between callers and must be treated as read-only.
+"""
+
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Optional, Tuple
+
+from config import Config
+
+# Seconds a response stays fresh, per request type. Types not listed are never cached
+# (fill/funding history and open orders must always be live).
+CACHE_TTLS = {
+    'meta': 300,
+    'spotMeta': 300,
+    'allMids': 1,
+    'clearinghouseState': 3,
+    'spotClearinghouseState': 3,
+    'userNonFundingLedgerUpdates': 60,
+    'leaderboard': 30,
+}
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a per-entry TTL"""
+
+    def __init__(self, max_entries: int = None, ttls: Dict[str, float] = None):
+        self.max_entries = max_entries or Config.API_CACHE_SIZE
+        self.ttls = {**CACHE_TTLS, **(ttls or {})}
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self.evictions = 0
+        self.expirations = 0
+
+    def ttl_for(self, endpoint: str) -> Optional[float]:
+        return self.ttls.get(endpoint)
+
+    def get(self, endpoint: str, key) -> Tuple[bool, object]:
+        """Return (hit, value) for a key, refreshing its LRU position on a hit"""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits[endpoint] += 1
+                    return True, value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses[endpoint] += 1
+            return False, None
+
+    def set(self, endpoint: str, key, value):
+        ttl = self.ttl_for(endpoint)
+        if not ttl:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when key is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = sum(self.hits.values())
+            misses = sum(self.misses.values())
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'by_endpoint': {
+                    endpoint: {'hits': self.hits[endpoint], 'misses': self.misses[endpoint]}
+                    for endpoint in set(self.hits) | set(self.misses)
+                },
+            }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache() -> TTLCache:
+    """Process-wide response cache shared by every HyperliquidAPI instance"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = TTLCache()
+        return _shared_cache
@@ -0,0 +1,309 @@
+"""
+Round-trip trade reconstruction from fills
+
+A round trip runs from the fill that takes a coin's position off zero to the
+fill that brings it back to zero (or flips it through zero, which closes one
+trip and opens the next). Each fill's startPosition, side and size say
+exactly what it did, so trips are found with array passes over a FillFrame
+instead of a per-fill Python state machine:
+
+- every fill is classified as opening, adding, reducing or flipping
+- a running count of trip starts assigns each fill (or, for a flip, each
+  half of it) to a trip id
+- np.bincount folds quantities, notionals, PnL and fees into per-trip totals
+
+dir is not needed: it is the text form of startPosition and side. When
+history starts mid-position (e.g. only the last 30 days were fetched), the
+first trip for that coin is marked incomplete: its entry VWAP only covers
+the adds that were seen.
+
+replay_fill() is the same rule set one fill at a time, for consumers that
+see fills as they arrive (the incremental accumulator, the parity reference).
+"""
+
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from fill_frame import FillFrame
+
+TRIP_DTYPE = np.dtype([
+    ('coin', '<i4'),              # index into the frame's coin dictionary
+    ('side', 'i1'),               # +1 long, -1 short
+    ('open_time', '<i8'),         # first fill seen (the opening fill when complete)
+    ('close_time', '<i8'),        # -1 while the position is still open
+    ('entry_px', '<f8'),          # entry VWAP (NaN if no entry fill was seen)
+    ('exit_px', '<f8'),           # exit VWAP (NaN if nothing was exited yet)
+    ('size', '<f8'),              # total quantity entered
+    ('exit_size', '<f8'),         # total quantity exited
+    ('pnl', '<f8'),               # realised PnL (sum of closedPnl)
+    ('fees', '<f8'),
+    ('volume', '<f8'),            # entry + exit notional
+    ('fills', '<i4'),
+    ('first_tid', '<i8'),
+    ('last_tid', '<i8'),
+    ('complete', '?'),            # False when the opening fill predates the data
+])
+
+
+class RoundTrips:
+    """Structured array of round trips sharing a FillFrame's coin dictionary
+
+    Trips are ordered by their latest fill, so closed() is sorted by close time.
+    """
+
+    __slots__ = ('data', 'coins')
+
+    def __init__(self, data: np.ndarray, coins: List[str]):
+        self.data = data
+        self.coins = coins
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def pnl(self) -> np.ndarray:
+        return self.data['pnl']
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.data['volume']
+
+    @property
+    def fees(self) -> np.ndarray:
+        return self.data['fees']
+
+    @property
+    def coin_id(self) -> np.ndarray:
+        return self.data['coin']
+
+    @property
+    def close_time(self) -> np.ndarray:
+        return self.data['close_time']
+
+    @property
+    def holding_ms(self) -> np.ndarray:
+        return np.where(self.data['close_time'] >= 0, self.data['close_time'] - self.data['open_time'], -1)
+
+    def closed(self) -> 'RoundTrips':
+        """Finished trips, ordered by close time"""
+        return RoundTrips(self.data[self.data['close_time'] >= 0], self.coins)
+
+    def open(self) -> 'RoundTrips':
+        """Positions still open at the last fill"""
+        return RoundTrips(self.data[self.data['close_time'] < 0], self.coins)
+
+    def between(self, start_ms: Optional[float] = None, end_ms: Optional[float] = None) -> 'RoundTrips':
+        """Closed trips whose close time is in [start_ms, end_ms], as a view (call on closed())"""
+        times = self.data['close_time']
+        lo = 0 if start_ms is None else int(np.searchsorted(times, math.ceil(start_ms), side='left'))
+        hi = len(times) if end_ms is None else int(np.searchsorted(times, math.floor(end_ms), side='right'))
+        return RoundTrips(self.data[lo:hi], self.coins)
+
+    def to_dicts(self) -> List[Dict]:
+        """JSON-friendly rows (NaN prices become None)"""
+        rows = []
+        for trip, holding in zip(self.data.tolist(), self.holding_ms.tolist()):
+            (coin, side, open_time, close_time, entry_px, exit_px, size, exit_size,
+             pnl, fees, volume, fills, first_tid, last_tid, complete) = trip
+            rows.append({
+                'coin': self.coins[coin],
+                'side': 'long' if side > 0 else 'short',
+                'open_time': open_time,
+                'close_time': close_time if close_time >= 0 else None,
+                'holding_ms': holding if holding >= 0 else None,
+                'entry_px': None if entry_px != entry_px else entry_px,
+                'exit_px': None if exit_px != exit_px else exit_px,
+                'size': size,
+                'exit_size': exit_size,
+                'pnl': pnl,
+                'fees': fees,
+                'volume': volume,
+                'fills': fills,
+                'first_tid': first_tid,
+                'last_tid': last_tid,
+                'complete': complete,
+            })
+        return rows
+
+
+def reconstruct_round_trips(frame: FillFrame) -> RoundTrips:
+    """All round trips (closed and still open) in a frame, in O(n) array passes"""
+    if not len(frame):
+        return RoundTrips(np.empty(0, dtype=TRIP_DTYPE), frame.coins)
+
+    # Coin-major, time-ordered within each coin (the frame is already time-sorted).
+    # Narrow ids let the stable sort use radix sort; gathering from contiguous
+    # copies of each column beats gathering from the strided record fields.
+    coin_ids = frame.data['coin']
+    if len(frame.coins) <= np.iinfo(np.int16).max:
+        coin_ids = coin_ids.astype(np.int16)
+    order = np.argsort(coin_ids, kind='stable')
+    coin, time, tid, side, px, sz, fee, closed_pnl, start = (
+        np.ascontiguousarray(frame.data[name])[order]
+        for name in ('coin', 'time', 'tid', 'side', 'px', 'sz', 'fee', 'closed_pnl', 'start_position'))
+    n = len(order)
+
+    signed = side * sz
+    end = start + signed
+    end[np.abs(end) <= 1e-9 * np.maximum(np.abs(start), sz)] = 0.0  # float residue of a full close
+    start_sign, end_sign = np.sign(start), np.sign(end)
+
+    first = np.empty(n, dtype=bool)
+    first[0] = True
+    first[1:] = coin[1:] != coin[:-1]
+    prev_end_sign = np.empty_like(end_sign)
+    prev_end_sign[0] = 0
+    prev_end_sign[1:] = end_sign[:-1]
+
+    reducing = (start_sign != 0) & (side != start_sign)
+    flip = reducing & (end_sign == -start_sign)
+    closes = reducing & ((end_sign == 0) | flip)
+    opens = ((start_sign == 0) & (end_sign != 0)) | flip
+    # Position already open when this coin's history (or a gap in it) starts
+    seeded = (start_sign != 0) & (first | (prev_end_sign != start_sign))
+    live = (start_sign != 0) | (end_sign != 0)
+
+    starts = np.cumsum(seeded.astype(np.int64) + opens)
+    trip_after = starts - 1                 # trip holding the position after the fill
+    trip_before = trip_after - opens        # trip holding it before the fill
+    n_trips = int(starts[-1])
+
+    close_qty = np.where(reducing, np.minimum(sz, np.abs(start)), 0.0)
+    open_qty = np.where(reducing, np.where(flip, sz - close_qty, 0.0), sz)
+    close_share = np.divide(close_qty, sz, out=np.zeros_like(sz), where=sz > 0)
+
+    to_before = reducing & live
+    to_after = (~reducing & live) | flip
+    ids = np.concatenate((trip_before[to_before], trip_after[to_after]))
+
+    def fold(before_values, after_values):
+        weights = np.concatenate((before_values[to_before], after_values[to_after]))
+        return np.bincount(ids, weights=weights, minlength=n_trips)
+
+    zeros = np.zeros(n)
+    entry_qty = fold(zeros, open_qty)
+    entry_notional = fold(zeros, open_qty * px)
+    exit_qty = fold(close_qty, zeros)
+    exit_notional = fold(close_qty * px, zeros)
+    # A flip's closedPnl belongs to the trip it closes; fees split by quantity
+    pnl = fold(closed_pnl, np.where(flip, 0.0, closed_pnl))
+    fees = fold(fee * close_share, np.where(reducing, fee * (1 - close_share), fee))
+
+    trips = np.zeros(n_trips, dtype=TRIP_DTYPE)
+    trips['fills'] = np.bincount(ids, minlength=n_trips)
+    trips['size'] = entry_qty
+    trips['exit_size'] = exit_qty
+    trips['pnl'] = pnl
+    trips['fees'] = fees
+    trips['volume'] = entry_notional + exit_notional
+    with np.errstate(divide='ignore', invalid='ignore'):
+        trips['entry_px'] = np.where(entry_qty > 0, entry_notional / entry_qty, np.nan)
+        trips['exit_px'] = np.where(exit_qty > 0, exit_notional / exit_qty, np.nan)
+
+    trips['close_time'] = -1
+    seed_ids = trip_before[seeded]
+    trips['coin'][seed_ids] = coin[seeded]
+    trips['side'][seed_ids] = start_sign[seeded]
+    trips['open_time'][seed_ids] = time[seeded]
+    trips['first_tid'][seed_ids] = tid[seeded]
+    open_ids = trip_after[opens]
+    trips['coin'][open_ids] = coin[opens]
+    trips['side'][open_ids] = end_sign[opens]
+    trips['open_time'][open_ids] = time[opens]
+    trips['first_tid'][open_ids] = tid[opens]
+    trips['complete'][open_ids] = True
+    close_ids = trip_before[closes]
+    trips['close_time'][close_ids] = time[closes]
+
+    # Last fill touching each trip (a closing fill is always its trip's last)
+    positions = np.concatenate((np.flatnonzero(to_before), np.flatnonzero(to_after)))
+    last = np.full(n_trips, -1, dtype=np.int64)
+    np.maximum.at(last, ids, positions)
+    trips['last_tid'] = tid[last]
+
+    # Order by the frame position of that fill, so closed trips come out by close time
+    return RoundTrips(trips[np.argsort(order[last])], frame.coins)
+
+
+def _new_trip(coin: str, side: int, time: int, tid: int, complete: bool) -> Dict:
+    return {'coin': coin, 'side': side, 'open_time': time, 'close_time': None,
+            'entry_qty': 0.0, 'entry_notional': 0.0, 'exit_qty': 0.0, 'exit_notional': 0.0,
+            'pnl': 0.0, 'fees': 0.0, 'fills': 0, 'first_tid': tid, 'last_tid': tid, 'complete': complete}
+
+
+def replay_fill(open_trips: Dict[str, Dict], coin: str, time: int, tid: int, side: int, px: float,
+                sz: float, closed_pnl: float, fee: float, start: float) -> Optional[Dict]:
+    """Apply one fill to its coin's open trip; returns the trip it closed, if any
+
+    open_trips maps coin -> trip dict (JSON-friendly) and is updated in place.
+    Fills must arrive in time order per coin.
+    """
+    end = start + side * sz
+    if abs(end) <= 1e-9 * max(abs(start), sz):
+        end = 0.0
+    if start == 0 and end == 0:
+        open_trips.pop(coin, None)
+        return None
+    start_sign = (start > 0) - (start < 0)
+    end_sign = (end > 0) - (end < 0)
+
+    trip = open_trips.get(coin)
+    if start_sign and (trip is None or trip['side'] != start_sign):
+        # Position was already open before this coin's history (or a gap in it)
+        trip = open_trips[coin] = _new_trip(coin, start_sign, time, tid, False)
+
+    closed = None
+    if start_sign != 0 and side != start_sign:
+        qty = min(sz, abs(start))
+        share = qty / sz if sz > 0 else 0.0
+        trip['exit_qty'] += qty
+        trip['exit_notional'] += qty * px
+        trip['pnl'] += closed_pnl
+        trip['fees'] += fee * share
+        trip['fills'] += 1
+        trip['last_tid'] = tid
+        if end_sign == 0 or end_sign == -start_sign:
+            trip['close_time'] = time
+            closed = open_trips.pop(coin)
+        if end_sign == -start_sign:
+            # Flip: the remainder opens the next trip
+            trip = open_trips[coin] = _new_trip(coin, end_sign, time, tid, True)
+            trip['entry_qty'] += sz - qty
+            trip['entry_notional'] += (sz - qty) * px
+            trip['fees'] += fee * (1 - share)
+            trip['fills'] += 1
+    else:
+        if start_sign == 0:
+            trip = open_trips[coin] = _new_trip(coin, end_sign, time, tid, True)
+        trip['entry_qty'] += sz
+        trip['entry_notional'] += sz * px
+        trip['pnl'] += closed_pnl
+        trip['fees'] += fee
+        trip['fills'] += 1
+        trip['last_tid'] = tid
+    return closed
+
+
+def trip_row(trip: Dict) -> Dict:
+    """A replay_fill trip in the RoundTrips.to_dicts() row shape"""
+    close_time = trip['close_time']
+    return {
+        'coin': trip['coin'],
+        'side': 'long' if trip['side'] > 0 else 'short',
+        'open_time': trip['open_time'],
+        'close_time': close_time,
+        'holding_ms': close_time - trip['open_time'] if close_time is not None else None,
+        'entry_px': trip['entry_notional'] / trip['entry_qty'] if trip['entry_qty'] > 0 else None,
+        'exit_px': trip['exit_notional'] / trip['exit_qty'] if trip['exit_qty'] > 0 else None,
+        'size': trip['entry_qty'],
+        'exit_size': trip['exit_qty'],
+        'pnl': trip['pnl'],
+        'fees': trip['fees'],
+        'volume': trip['entry_notional'] + trip['exit_notional'],
+        'fills': trip['fills'],
+        'first_tid': trip['first_tid'],
+        'last_tid': trip['last_tid'],
+        'complete': trip['complete'],
+    }
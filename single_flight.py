@@ -0,0 +1,94 @@
+"""
+Single-flight coalescing of concurrent identical API calls
+
+When several threads ask for the same thing at once (e.g. dashboard threads
+serving /api/leaderboard, /api/stats and /api/top together), only the first
+caller goes upstream; the rest wait for it and share its result or its
+exception. Nothing is kept once the call finishes - freshness is the
+response cache's job. Coalescing is per process.
+"""
+
+import threading
+from collections import defaultdict
+from typing import Callable, Dict
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Thread-safe duplicate call suppression keyed by request identity"""
+
+    def __init__(self):
+        self._calls: Dict[object, _Call] = {}
+        self._lock = threading.Lock()
+
+        self.executed = defaultdict(int)
+        self.coalesced = defaultdict(int)
+
+    def do(self, endpoint: str, key, func: Callable[[], object]):
+        """Run func() unless an identical call is already in flight, then share its outcome
+
+        Followers receive the same result object as the leader, so results
+        must be treated as read-only (as with cached responses).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced[endpoint] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed[endpoint] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> Dict:
+        with self._lock:
+            executed = sum(self.executed.values())
+            coalesced = sum(self.coalesced.values())
+            return {
+                'in_flight': len(self._calls),
+                'executed': executed,
+                'coalesced': coalesced,
+                'coalesced_ratio': coalesced / (executed + coalesced) if executed + coalesced else 0.0,
+                'by_endpoint': {
+                    endpoint: {'executed': self.executed[endpoint], 'coalesced': self.coalesced[endpoint]}
+                    for endpoint in set(self.executed) | set(self.coalesced)
+                },
+            }
+
+
+_shared_flight = None
+_shared_flight_lock = threading.Lock()
+
+
+def get_shared_single_flight() -> SingleFlight:
+    """Process-wide coalescer shared by every HyperliquidAPI instance"""
+    global _shared_flight
+    with _shared_flight_lock:
+        if _shared_flight is None:
+            _shared_flight = SingleFlight()
+        return _shared_flight
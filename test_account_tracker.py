@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for AccountTracker cycles against the fake Info API
+"""
+
+import pytest
+
+from account_tracker import AccountTracker
+from analytics_memo import AnalyticsMemo
+from coin_cube import CoinDayCube
+from config import Config
+from fake_hyperliquid import FakeHyperliquidServer, SyntheticMarket
+from fills import as_fills
+from rate_limiter import TokenBucket
+
+EMPTY = '0x' + '0' * 40
+
+
+@pytest.fixture
+def tracked(tmp_path, monkeypatch):
+    # ~3000 fills in the last 30 days: more than one 2000-fill page
+    market = SyntheticMarket(seed=5, fills_per_user=9000)
+    heavy = market.address(0)
+    market._users[EMPTY] = {**market._user(heavy), 'fills': []}
+    server = FakeHyperliquidServer(market=market).start()
+    monkeypatch.setattr(Config, 'MAINNET_API_URL', server.url)
+    monkeypatch.setattr(Config, 'DATABASE_URL', f"sqlite:///{tmp_path / 'tracker.db'}")
+    tracker = AccountTracker(memo=AnalyticsMemo(db_path='', ttl=0))
+    tracker.api.rate_limiter = TokenBucket(1e9, 1e9)
+    yield tracker, heavy, market._user(heavy)['fills']
+    tracker.db.close()
+    server.stop()
+
+
+def test_each_account_pages_from_its_own_cursor(tracked):
+    tracker, heavy, fills = tracked
+    # The empty account never sets a cursor; it must not pin the heavy one 30 days back
+    tracker.track_accounts([heavy, EMPTY])
+    state = tracker.db.get_analytics_state(heavy)
+    assert state['fills_seen'] > 2000 and state['last_time'] == fills[-1]['time']
+    assert state['fills_seen'] == len(tracker.db.get_fill_rows(heavy))
+    assert tracker.db.get_analytics_state(EMPTY) is None
+
+    tracker.track_accounts([heavy, EMPTY])
+    assert tracker.db.get_analytics_state(heavy)['fills_seen'] == state['fills_seen']
+    assert tracker.memo.stats()['by_kind']['performance']['hits'] == 1
+
+
+def test_failed_fill_write_keeps_the_cursor(tracked, monkeypatch):
+    tracker, heavy, fills = tracked
+    store = tracker.db.add_fills
+
+    def fail(address, new_fills):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(tracker.db, 'add_fills', fail)
+    tracker.track_accounts([heavy])
+    assert tracker.db.get_analytics_state(heavy) is None  # nothing to skip the fills next cycle
+
+    monkeypatch.setattr(tracker.db, 'add_fills', store)
+    tracker.track_accounts([heavy])
+    state = tracker.db.get_analytics_state(heavy)
+    assert state['last_time'] == fills[-1]['time']
+    assert state['fills_seen'] == len(tracker.db.get_fill_rows(heavy))
+
+
+def test_coin_cube_reloads_only_fills_past_its_cursor(tracked, monkeypatch):
+    tracker, heavy, fills = tracked
+    fills = as_fills(fills)
+    tracker.db.add_fills(EMPTY, fills[:-10])
+    tracker._update_coin_cube(EMPTY, fills[:-10], [])
+    cube = CoinDayCube.from_bytes(tracker.db.get_coin_cube(EMPTY))
+    assert cube.last_funding_time == -1  # no funding: it must not pull the fill load back to 0
+
+    starts, rows = [], tracker.db.get_fill_rows
+    monkeypatch.setattr(tracker.db, 'get_fill_rows',
+                        lambda address, start=None, end=None: starts.append(start) or rows(address, start, end))
+    tracker.db.add_fills(EMPTY, fills[-10:])
+    tracker._update_coin_cube(EMPTY, fills[-10:], [])
+    assert starts == [cube.last_time]
+    assert CoinDayCube.from_bytes(tracker.db.get_coin_cube(EMPTY)).daily()['fills'].sum() == len(fills)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Parity tests: the vectorised calculate_performance against the Python reference
+(a per-fill position replay)
+"""
+
+import random
+
+import pytest
+
+from analytics import PerformanceAnalytics
+from fill_frame import FillFrame
+from fills import Fill
+
+
+def _fills(n, seed, win_bias=0.5, zero_share=0.3, shuffle=True):
+    """Position-consistent fills: each coin opens, adds, partly exits, closes and flips"""
+    rng = random.Random(seed)
+    positions = {'BTC': 0.0, 'ETH': 0.0}
+    fills = []
+    for i in range(n):
+        coin = rng.choice(['BTC', 'ETH'])
+        start = positions[coin]
+        if start == 0 or rng.random() < 0.4:
+            side = rng.choice('AB') if start == 0 else ('B' if start > 0 else 'A')
+            sz = round(rng.uniform(0.01, 10), 2)
+        else:
+            side = 'A' if start > 0 else 'B'
+            sz = rng.choice([round(abs(start) / 2, 2) or abs(start), abs(start), abs(start) + 1.5])
+        closes = start != 0 and (side == 'B') != (start > 0)
+        pnl = 0.0
+        if closes and rng.random() >= zero_share:
+            pnl = round(rng.uniform(0.01, 500), 4) * (1 if rng.random() < win_bias else -1)
+        positions[coin] = round(start + (sz if side == 'B' else -sz), 2)
+        t = 1_700_000_000_000 + (rng.randint(0, n // 2) if shuffle else i) * 1000
+        fills.append(Fill(time=t, coin=coin, side=side, px=rng.uniform(1, 1e5), sz=sz,
+                          closed_pnl=pnl, fee=0.1, start_position=start, dir='', tid=i))
+    if shuffle:
+        rng.shuffle(fills)
+    return fills
+
+
+@pytest.mark.parametrize('n,seed,win_bias,zero_share,shuffle', [
+    (0, 1, 0.5, 0.3, True),
+    (1, 2, 0.5, 0.0, True),
+    (2, 3, 1.0, 0.0, True),      # no losses: profit factor is inf
+    (5, 4, 0.0, 0.0, True),      # no wins
+    (7, 5, 0.5, 1.0, True),      # trips close flat
+    (500, 6, 0.5, 0.3, True),    # out-of-order times with ties break position continuity
+    (2000, 7, 0.6, 0.5, False),
+])
+def test_vectorised_matches_reference_exactly(n, seed, win_bias, zero_share, shuffle):
+    analytics = PerformanceAnalytics()
+    fills = _fills(n, seed, win_bias, zero_share, shuffle)
+    expected = analytics._calculate_performance_loop(fills)
+    assert analytics.calculate_performance(fills) == expected
+
+    frame = FillFrame.from_fills(fills)
+    assert analytics.calculate_performance(frame) == analytics._calculate_performance_loop(frame)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the watermark-keyed analytics memo
+"""
+
+import time
+
+from analytics_memo import AnalyticsMemo, probe_unchanged, watermark
+from fill_frame import FillFrame
+
+
+def _fill(time, tid):
+    return {'coin': 'BTC', 'time': time, 'tid': tid, 'px': '1', 'sz': '1', 'side': 'B'}
+
+
+class _History:
+    """Just the two paged endpoints the probe reads"""
+
+    def __init__(self, fills, funding):
+        self.fills, self.funding, self.calls = fills, funding, 0
+
+    def iter_user_fills(self, address, start_time=0):
+        self.calls += 1
+        page = [f for f in self.fills if f['time'] >= start_time]
+        return iter([page] if page else [])
+
+    def iter_user_funding(self, address, start_time=0):
+        self.calls += 1
+        page = [p for p in self.funding if p['time'] >= start_time]
+        return iter([page] if page else [])
+
+
+def test_tiers_versions_and_expiry(tmp_path):
+    path = str(tmp_path / 'memo.db')
+    memo = AnalyticsMemo(max_entries=1, db_path=path, ttl=0)
+    memo.put('perf', '0xa', (10, 3, -1), {'pnl': 1.0})
+    memo.put('perf', '0xb', (20, 4, 7), {'pnl': 2.0})  # evicts 0xa from memory, not from disk
+
+    assert memo.get('perf', '0xa', (10, 3, -1)) == (True, {'pnl': 1.0})
+    assert memo.get('perf', '0xa', (11, 5, -1)) == (False, None)  # a new fill moved the watermark
+    assert memo.get('other', '0xa', (10, 3, -1)) == (False, None)
+    assert memo.get('perf', '0xa', None) == (False, None)  # caller knows it changed
+    stats = memo.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 3 and stats['disk_reads'] == 1
+    assert stats['hit_ratio'] == 1 / 4 and stats['evictions'] >= 1
+    memo.close()
+
+    # A new process reads the disk tier; another analytics version does not
+    assert AnalyticsMemo(db_path=path, ttl=0).get('perf', '0xb', (20, 4, 7)) == (True, {'pnl': 2.0})
+    assert AnalyticsMemo(db_path=path, ttl=0, version=99).get('perf', '0xb', (20, 4, 7))[0] is False
+
+    memo = AnalyticsMemo(db_path='', ttl=0.01)
+    memo.put('perf', '0xa', (1, 1, 1), 'x')
+    time.sleep(0.02)
+    assert memo.get('perf', '0xa', (1, 1, 1)) == (False, None) and memo.stats()['expirations'] == 1
+
+    memo = AnalyticsMemo(db_path=path, ttl=0)
+    memo.invalidate('0xb')
+    assert memo.latest('perf', '0xb') is None and memo.latest('perf', '0xa') is not None
+
+
+def test_lookup_probes_past_the_watermark(tmp_path):
+    fills = [_fill(100, 1), _fill(200, 2), _fill(200, 3)]
+    funding = [{'time': 150, 'delta': {'coin': 'BTC', 'usdc': '-1'}}]
+    frame = FillFrame.from_api(fills).with_funding(funding)
+    mark = watermark(frame)
+    assert mark == (200, 3, 150)
+    assert watermark([]) == (-1, -1, -1)
+
+    api = _History(fills, funding)
+    memo = AnalyticsMemo(db_path=str(tmp_path / 'memo.db'), ttl=0)
+    assert memo.lookup('mtf', '0xa', api) == (False, None) and api.calls == 0  # nothing stored yet
+    memo.put('mtf', '0xa', mark, {'lifetime': 1})
+
+    assert memo.lookup('mtf', '0xa', api) == (True, {'lifetime': 1})
+    assert api.calls == 2  # one page of fills and one of funding, not the history
+
+    api.funding.append({'time': 3_600_150, 'delta': {'coin': 'BTC', 'usdc': '-1'}})
+    assert not probe_unchanged(api, '0xa', mark)
+    api.funding.pop()
+    api.fills.append(_fill(200, 4))  # same millisecond, later tid
+    assert memo.lookup('mtf', '0xa', api) == (False, None)
+    assert memo.stats()['by_kind']['mtf'] == {'hits': 1, 'misses': 2}
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-trader coin x day aggregate cube
+"""
+
+import numpy as np
+import pytest
+
+from coin_cube import DAY_MS, CoinDayCube, coin_leaderboard
+from config import Config
+from database import Database
+from fake_hyperliquid import SyntheticMarket
+from fill_frame import FillFrame
+from multi_timeframe_analytics import MultiTimeframeAnalytics
+from online_analytics import PerformanceAccumulator
+
+
+@pytest.fixture(scope='module')
+def frames():
+    market = SyntheticMarket(seed=21, fills_per_user=2500)
+    return [FillFrame.from_api(market._user(market.address(i))['fills']) for i in range(3)]
+
+
+def test_incremental_cube_matches_full_build(frames):
+    frame = frames[0]
+    full = CoinDayCube.from_frame(frame)
+
+    cube, acc = CoinDayCube(), PerformanceAccumulator()
+    cuts = [0, 1, 400, 1200, 2499, len(frame)]
+    for lo, hi in zip(cuts, cuts[1:]):
+        # Overlapping fetches, as the tracker's cursor-inclusive fetches produce
+        chunk = frame._view(frame.data[max(lo - 7, 0):hi])
+        closed = acc.update(chunk)
+        assert cube.update(chunk, closed) == hi - lo
+    assert cube.update(frame) == 0
+
+    order = [cube.coins.index(coin) for coin in full.coins]
+    np.testing.assert_allclose(cube.values[:, order], full.values)
+    assert cube.first_day == full.first_day and cube.last_time == int(frame.time[-1])
+
+    totals = full.totals()
+    assert totals['fills'].sum() == len(frame)
+    assert totals['pnl'].sum() == pytest.approx(float(frame.closed_pnl.sum()))
+
+
+def test_rollups_match_fill_rescans(frames):
+    frame = frames[1]
+    cube = CoinDayCube.from_frame(frame)
+    start = (int(frame.time[0]) // DAY_MS + 3) * DAY_MS
+    end = (int(frame.time[-1]) // DAY_MS - 2) * DAY_MS - 1
+    window = frame.between(start, end)
+
+    rows = {row['coin']: row for row in cube.by_coin(start, end)}
+    for coin in frame.coins:
+        fills = window.for_coin(coin)
+        if len(fills):
+            assert rows[coin]['fills'] == len(fills)
+            assert rows[coin]['pnl'] == pytest.approx(float(fills.closed_pnl.sum()))
+            assert rows[coin]['volume'] == pytest.approx(float((fills.px * np.abs(fills.sz)).sum()))
+    assert [row['pnl'] for row in rows.values()] == sorted((row['pnl'] for row in rows.values()), reverse=True)
+
+    # Whole-history best/worst coin agree with calculate_pnl_metrics()
+    metrics = MultiTimeframeAnalytics().calculate_pnl_metrics(frame)
+    assert cube.best_coin() == (metrics['best_coin'][0], pytest.approx(metrics['best_coin'][1]))
+    assert cube.worst_coin() == (metrics['worst_coin'][0], pytest.approx(metrics['worst_coin'][1]))
+    assert CoinDayCube().best_coin() == ("N/A", 0)
+
+    daily = cube.daily(frame.coins[0], start, end)
+    assert daily['time'][0] == start and len(daily['time']) == (end + 1 - start) // DAY_MS
+    assert daily['fills'].sum() == len(window.for_coin(frame.coins[0]))
+
+
+def test_cube_persists_and_ranks_traders(frames, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DATABASE_URL', f"sqlite:///{tmp_path / 'cube.db'}")
+    db = Database()
+    cubes = {f'0x{i}': CoinDayCube.from_frame(frame) for i, frame in enumerate(frames)}
+    for address, cube in cubes.items():
+        db.save_coin_cube(address, cube.to_bytes(), cube.VERSION, cube.last_time)
+
+    restored = {address: CoinDayCube.from_bytes(data) for address, data in db.get_coin_cubes().items()}
+    assert CoinDayCube.from_bytes(db.get_coin_cube('0x1')).by_coin() == cubes['0x1'].by_coin()
+    assert db.get_coin_cube('0xmissing') is None and CoinDayCube.from_bytes(None) is None
+
+    coin = frames[0].coins[0]
+    ranked = coin_leaderboard(restored, coin)
+    expected = sorted(((a, float(c.daily(coin)['pnl'].sum())) for a, c in cubes.items() if coin in c.coins),
+                      key=lambda x: x[1], reverse=True)
+    assert ranked == expected
+    assert coin_leaderboard(restored, 'NOPE') == []
+    db.close()
+
+
+def test_fills_without_a_tid_are_not_dropped():
+    fill = {'coin': 'BTC', 'time': 5 * DAY_MS, 'side': 'B', 'px': '100', 'sz': '1', 'closedPnl': '0', 'fee': '1'}
+    cube = CoinDayCube()
+    cube.update(FillFrame.from_api([fill]))
+    # A second tid-less fill at the cursor's millisecond is a new fill, not overlap
+    assert cube.update(FillFrame.from_api([fill])) == 1
+    assert cube.daily()['fills'].sum() == 2
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the equity-curve builder and time-based risk metrics
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from analytics import PerformanceAnalytics
+from coin_cube import CoinDayCube
+from equity_curve import build_equity_curves, daily_equity_curves, funding_arrays
+from fake_hyperliquid import SyntheticMarket
+from fill_frame import FillFrame
+
+DAY = 86_400_000
+T0 = 1_700_006_400_000 // DAY * DAY
+
+
+def _fill(day, pnl, fee=1.0, tid=0):
+    return {'time': T0 + day * DAY + 5, 'coin': 'BTC', 'side': 'B', 'px': '100', 'sz': '1',
+            'closedPnl': str(pnl), 'fee': str(fee), 'startPosition': '0', 'tid': tid}
+
+
+def test_metrics_match_a_hand_built_curve():
+    fills = [_fill(d, p, tid=d) for d, p in [(0, 0), (1, 50), (3, -100), (4, 30), (6, 80)]]
+    funding = [{'time': T0 + 2 * DAY + 1, 'delta': {'usdc': '-5'}}]
+    curves = build_equity_curves([fills], [1000.0], '1d', [funding], end_ms=T0 + 7 * DAY)
+    metrics = curves.risk_metrics()[0]
+
+    flows = [-1, 49, -5, -101, 29, 0, 79, 0]
+    equity, returns = [1000 - sum(flows)], []
+    for flow in flows:
+        returns.append(flow / equity[-1])
+        equity.append(equity[-1] + flow)
+    r = np.array(returns)
+    peak = np.maximum.accumulate(equity)[1:]
+    drawdown = (peak - equity[1:]) / peak
+
+    assert curves.equity[0].tolist() == equity[1:]
+    assert metrics['sharpe_ratio'] == pytest.approx(r.mean() / r.std() * math.sqrt(365))
+    assert metrics['sortino_ratio'] == pytest.approx(r.mean() / math.sqrt((np.minimum(r, 0) ** 2).mean()) * math.sqrt(365))
+    assert metrics['max_drawdown'] == pytest.approx(drawdown.max())
+    # Underwater on day 0, then from day 2 until the new high on day 6
+    assert metrics['max_drawdown_duration_ms'] == 4 * DAY and metrics['current_drawdown_duration_ms'] == 0
+    assert metrics['end_equity'] == 1000.0 and metrics['periods'] == 8
+    growth = 1000.0 / equity[0]
+    assert metrics['calmar_ratio'] == pytest.approx((growth ** (365 / 8) - 1) / drawdown.max())
+
+    rows = curves.to_dicts(0)
+    assert rows[2] == {'time': T0 + 2 * DAY, 'pnl': 0.0, 'fees': 0.0, 'funding': -5.0, 'equity': equity[3],
+                       'return': pytest.approx(returns[2]), 'drawdown': pytest.approx(drawdown[2])}
+
+
+def test_batch_matches_single_account_builds():
+    market = SyntheticMarket(seed=8, fills_per_user=600)
+    frames = [FillFrame.from_api(market._user(market.address(i))['fills']) for i in range(4)] + [FillFrame.empty()]
+    values = [50_000.0, None, 1e6, 0.0, 10.0]
+    end_ms = int(max(frame.time[-1] for frame in frames if len(frame)))
+    start_ms = int(min(frame.time[0] for frame in frames if len(frame)))
+
+    batch = build_equity_curves(frames, values, '1h', start_ms=start_ms, end_ms=end_ms)
+    for i, (frame, value) in enumerate(zip(frames, values)):
+        single = build_equity_curves([frame], [value], '1h', start_ms=start_ms, end_ms=end_ms)
+        np.testing.assert_allclose(batch.equity[i], single.equity[0])
+        assert batch.risk_metrics()[i] == pytest.approx(single.risk_metrics()[0])
+
+    # No account value: start from calculate_performance()'s estimated capital
+    assert batch.start_equity[1] == pytest.approx(float(frames[1].notional.sum()) / 10)
+    empty = batch.risk_metrics()[4]
+    assert empty['periods'] == 0 and empty['sharpe_ratio'] == 0.0 and empty['max_drawdown'] == 0.0
+
+
+def test_single_account_helper_and_funding_inputs():
+    fills = [_fill(0, 10), _fill(2, -4)]
+    metrics = PerformanceAnalytics().calculate_risk_metrics(fills, 500.0)
+    assert metrics['end_equity'] == 500.0 and metrics['start_equity'] == pytest.approx(500.0 - 4)
+
+    times, amounts = funding_arrays([{'time': 5, 'delta': {'usdc': '1.5'}}])
+    assert times.tolist() == [5] and amounts.tolist() == [1.5]
+    assert funding_arrays((times, amounts))[1].tolist() == [1.5]
+    with pytest.raises(ValueError):
+        build_equity_curves([fills], [1.0, 2.0])
+
+
+def test_daily_curves_from_coin_cubes_match_a_fill_rebuild():
+    market = SyntheticMarket(seed=8, fills_per_user=600)
+    frames = [FillFrame.from_api(market._user(market.address(i))['fills']) for i in range(3)]
+    # A maker rebate and funding payments must flow through the cube unchanged
+    frames[0] = FillFrame.concat([frames[0], FillFrame.from_api([_fill(0, 0, fee=-2.5, tid=-7)])])
+    frames[1] = frames[1].with_funding([{'time': int(frames[1].time[0]) - 3 * DAY, 'coin': 'ETH',
+                                         'delta': {'coin': 'ETH', 'usdc': '-12.5'}},
+                                        {'time': int(frames[1].time[-1]), 'coin': 'BTC',
+                                         'delta': {'coin': 'BTC', 'usdc': '4'}}])
+    frames.append(FillFrame.empty())
+    values = [50_000.0, None, 1e6, None]
+    end_ms = int(max(frame.time[-1] for frame in frames if len(frame))) + 2 * DAY
+
+    expected = build_equity_curves(frames, values, '1d', end_ms=end_ms)
+    curves = daily_equity_curves([CoinDayCube.from_frame(frame) for frame in frames], values, end_ms=end_ms)
+    assert curves.start_ms == expected.start_ms
+    np.testing.assert_allclose(curves.equity, expected.equity)
+    for got, want in zip(curves.risk_metrics(), expected.risk_metrics()):
+        assert got == pytest.approx(want)
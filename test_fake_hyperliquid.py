@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for the local Hyperliquid stand-in, driven through the real API client
+"""
+
+import json
+import time
+
+import pytest
+
+from config import Config
+from fake_hyperliquid import FakeHyperliquidServer, SyntheticMarket, fixture_name
+from hyperliquid_api import HyperliquidAPI, HTTPTransport, RateLimitedError
+from rate_limiter import TokenBucket
+from resilience import CircuitBreakers, RequestMetrics, RetryBudget, RetryPolicy
+from response_cache import TTLCache
+from single_flight import SingleFlight
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    server = FakeHyperliquidServer(market=SyntheticMarket(fills_per_user=4500, leaderboard_rows=300)).start()
+    monkeypatch.setattr(Config, 'MAINNET_API_URL', server.url)
+    monkeypatch.setattr(Config, 'LEADERBOARD_URL', server.leaderboard_url)
+    yield server
+    server.stop()
+
+
+def _client():
+    # Everything but the endpoints comes from private instances so tests stay isolated
+    return HyperliquidAPI(transport=HTTPTransport(), rate_limiter=TokenBucket(1e9, 1e9),
+                          cache=TTLCache(), single_flight=SingleFlight(),
+                          retry_policy=RetryPolicy(max_attempts=3, base_delay=0.001),
+                          circuit_breakers=CircuitBreakers(), metrics=RequestMetrics(),
+                          retry_budget=RetryBudget())
+
+
+def test_client_points_at_fake_through_config(fake):
+    api = _client()
+    assert api.info_url == f"{fake.url}/info"
+
+    state = api.get_user_state('0xAbC')
+    assert float(state['marginSummary']['accountValue']) > 0
+    # Same address, same book (marks move with the clock)
+    def sizes(user_state):
+        return [(p['position']['coin'], p['position']['szi']) for p in user_state['assetPositions']]
+    assert sizes(api.get_user_state('0xabc', use_cache=False)) == sizes(state)
+
+    fills = api.get_all_user_fills('0xabc')
+    assert len(fills) == 4500
+    assert [f['time'] for f in fills] == sorted(f['time'] for f in fills)
+    assert fake.stats()['requests']['userFillsByTime'] == 3  # 2000-fill pages
+
+    assert set(api.get_all_mids()) >= {'BTC', 'ETH'}
+    assert len(api.get_meta()['universe']) > 0
+    assert isinstance(api.get_open_orders('0xabc'), list)
+    assert api.get_user_funding('0xabc', start_time=int(time.time() * 1000) - 86_400_000)
+    assert len(api.get_leaderboard_records()) == 300
+
+
+def test_rate_limit_injection_returns_429(fake):
+    api = _client()
+    fake.rate_limit_weight = 30  # one 20-weight request fits, the second does not
+    api.get_user_fills('0xabc')
+    with pytest.raises(RateLimitedError):
+        api._request('userFills', {'type': 'userFills', 'user': '0xabc'})
+    assert fake.stats()['throttled'] == 3  # every attempt of the retried request
+    assert api.request_stats()['endpoints']['userFills']['outcomes']['rate_limited'] == 3
+
+
+def test_latency_injection(fake):
+    fake.latency_ms = 50
+    api = _client()
+    start = time.monotonic()
+    api.get_all_mids(use_cache=False)
+    assert time.monotonic() - start >= 0.05
+
+
+def test_fixtures_replay_with_time_windows(tmp_path, monkeypatch):
+    recorded = [{'tid': i, 'time': 1000 * i, 'coin': 'BTC'} for i in range(10)]
+    (tmp_path / fixture_name({'type': 'userFills', 'user': '0xAbC'})).write_text(json.dumps(recorded))
+    (tmp_path / 'leaderboard.json').write_text(json.dumps({'leaderboardRows': []}))
+
+    with FakeHyperliquidServer(fixtures_dir=str(tmp_path)) as server:
+        monkeypatch.setattr(Config, 'MAINNET_API_URL', server.url)
+        monkeypatch.setattr(Config, 'LEADERBOARD_URL', server.leaderboard_url)
+        api = _client()
+        assert [f['tid'] for f in api.get_user_fills('0xabc', start_time=7000)] == [7, 8, 9]
+        assert [f['tid'] for f in api.get_user_fills('0xabc')][:2] == [9, 8]  # newest first
+        assert api.get_leaderboard_records() == []
+        # Unrecorded requests fall back to the synthetic market
+        assert 'marginSummary' in api.get_user_state('0xdef')
+        assert server.stats()['fixture_hits'] == 3
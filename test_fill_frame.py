@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar FillFrame and analytics over it
+"""
+
+import numpy as np
+import pytest
+
+from analytics import PerformanceAnalytics
+from config import Config
+from database import Database
+from fake_hyperliquid import SyntheticMarket
+from fill_frame import FillFrame, SIDE_BUY, SIDE_SELL
+from fills import parse_fills
+from multi_timeframe_analytics import MultiTimeframeAnalytics
+
+
+@pytest.fixture(scope='module')
+def raw_fills():
+    market = SyntheticMarket(seed=3, fills_per_user=400)
+    # userFills order: newest first
+    return list(reversed(market._user(market.address(1))['fills']))
+
+
+def test_from_api_matches_typed_fills(raw_fills):
+    frame = FillFrame.from_api(raw_fills)
+    typed = sorted(parse_fills(raw_fills), key=lambda f: f.time)
+
+    assert len(frame) == len(typed)
+    assert frame.time.tolist() == [f.time for f in typed]
+    assert frame.coin_labels(frame.coin_id) == [f.coin for f in typed]
+    assert frame.px.tolist() == [f.px for f in typed]
+    assert frame.closed_pnl.tolist() == [f.closed_pnl for f in typed]
+    assert frame.side.tolist() == [SIDE_BUY if f.is_buy else SIDE_SELL for f in typed]
+    assert FillFrame.from_fills(parse_fills(raw_fills)).data.tobytes() == frame.data.tobytes()
+
+
+def test_slices_are_zero_copy_views(raw_fills):
+    frame = FillFrame.from_api(raw_fills)
+    t0, t1 = int(frame.time[100]), int(frame.time[200])
+
+    window = frame.between(t0, t1)
+    assert np.shares_memory(window.data, frame.data)
+    assert window.time.min() >= t0 and window.time.max() <= t1
+    assert len(window) == int(((frame.time >= t0) & (frame.time <= t1)).sum())
+
+    coin = frame.coins[0]
+    btc = frame.for_coin(coin)
+    assert set(btc.coin_labels(btc.coin_id)) == {coin}
+    assert len(btc) == int((frame.coin_id == 0).sum())
+    assert np.all(np.diff(btc.time) >= 0)
+    assert np.shares_memory(frame.for_coin(coin).data, btc.data)  # coin-major copy built once
+    assert len(frame.for_coin('NOPE')) == 0
+
+
+def test_concat_merges_coin_dictionaries():
+    a = FillFrame.from_api([{'coin': 'BTC', 'time': 1, 'px': '1', 'sz': '1'},
+                            {'coin': 'ETH', 'time': 2, 'px': '2', 'sz': '1'}])
+    b = FillFrame.from_api([{'coin': 'SOL', 'time': 3, 'px': '3', 'sz': '1'},
+                            {'coin': 'BTC', 'time': 4, 'px': '4', 'sz': '1'}])
+    joined = FillFrame.concat([a, b])
+    assert joined.coins == ['BTC', 'ETH', 'SOL']
+    assert joined.coin_labels(joined.coin_id) == ['BTC', 'ETH', 'SOL', 'BTC']
+
+
+def test_db_round_trip(raw_fills, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DATABASE_URL', f"sqlite:///{tmp_path / 'fills.db'}")
+    db = Database()
+    fills = parse_fills(raw_fills)
+    assert db.add_fills('0xabc', fills) == len(fills)
+    assert db.add_fills('0xabc', fills[:50]) == 0  # already stored
+
+    stored = FillFrame.from_db(db, '0xabc')
+    frame = FillFrame.from_api(raw_fills)
+    assert stored.time.tolist() == frame.time.tolist()
+    assert stored.coin_labels(stored.coin_id) == frame.coin_labels(frame.coin_id)
+    assert np.array_equal(stored.closed_pnl, frame.closed_pnl)
+    assert len(FillFrame.from_db(db, '0xabc', start_time=int(frame.time[-10]))) == 10
+    db.close()
+
+
+def test_analytics_accept_frames(raw_fills):
+    frame = FillFrame.from_api(raw_fills)
+
+    by_list = PerformanceAnalytics().calculate_performance(raw_fills)
+    by_frame = PerformanceAnalytics().calculate_performance(frame)
+    assert by_frame == pytest.approx(by_list)
+
+    mtf = MultiTimeframeAnalytics()
+    pnl_list, pnl_frame = mtf.calculate_pnl_metrics(parse_fills(raw_fills)), mtf.calculate_pnl_metrics(frame)
+    for key, value in pnl_list.items():
+        if isinstance(value, float):
+            assert pnl_frame[key] == pytest.approx(value), key
+        else:
+            assert pnl_frame[key] == value, key
+
+    results = mtf.analyze_multi_timeframe(frame, account_value=10_000)
+    assert results['lifetime']['num_trades'] == pnl_frame['num_trades']
+    assert results['7d']['num_trades'] <= results['30d']['num_trades'] <= results['lifetime']['num_trades']
+
+
+def _payment(time, coin, usdc):
+    return {'time': time, 'delta': {'type': 'funding', 'coin': coin, 'usdc': str(usdc), 'szi': '1',
+                                    'fundingRate': '0.0001'}}
+
+
+def test_funding_merges_in_time_order(tmp_path, monkeypatch):
+    fills = FillFrame.from_api([{'coin': 'BTC', 'time': 10, 'px': '1', 'sz': '1'},
+                                {'coin': 'ETH', 'time': 30, 'px': '2', 'sz': '1'}])
+    frame = fills.with_funding([_payment(20, 'ETH', -1), _payment(20, 'BTC', 2)])
+    # Overlapping fetches repeat payments; a new coin extends the dictionary
+    frame = frame.with_funding([_payment(20, 'BTC', 2), _payment(40, 'SOL', -3), _payment(5, 'BTC', 4)])
+
+    assert len(fills.funding) == 0 and frame.data is fills.data
+    assert frame.coins == ['BTC', 'ETH', 'SOL']
+    assert frame.funding_time.tolist() == [5, 20, 20, 40]
+    assert frame.funding_usdc.tolist() == [4.0, 2.0, -1.0, -3.0]
+    assert frame.between(10, 30).funding_usdc.tolist() == [2.0, -1.0]
+    assert frame.for_coin('BTC').funding_usdc.tolist() == [4.0, 2.0]
+    assert len(frame.for_coin('SOL')) == 0 and frame.for_coin('SOL').funding_usdc.tolist() == [-3.0]
+
+    other = FillFrame.from_api([{'coin': 'SOL', 'time': 50, 'px': '3', 'sz': '1'}]).with_funding([_payment(60, 'SOL', 1)])
+    joined = FillFrame.concat([frame, other])
+    assert joined.coin_labels(joined.funding['coin']) == ['BTC', 'BTC', 'ETH', 'SOL', 'SOL']
+
+    monkeypatch.setattr(Config, 'DATABASE_URL', f"sqlite:///{tmp_path / 'funding.db'}")
+    db = Database()
+    db.add_fills('0xabc', parse_fills([{'coin': 'BTC', 'time': 10, 'px': '1', 'sz': '1', 'tid': 1}]))
+    payments = [_payment(20, 'ETH', -1), _payment(5, 'BTC', 4), _payment(20, 'BTC', 2)]
+    assert db.add_funding('0xabc', payments) == 3
+    assert db.add_funding('0xabc', payments[:2] + [_payment(40, 'SOL', -3)]) == 1
+    assert db.get_last_funding_time('0xabc') == 40 and db.get_last_funding_time('0xnone') is None
+
+    stored = FillFrame.from_db(db, '0xabc')
+    assert stored.funding_time.tolist() == [5, 20, 20, 40]
+    assert stored.coin_labels(stored.funding['coin']) == ['BTC', 'BTC', 'ETH', 'SOL']
+    assert sorted(FillFrame.from_db(db, '0xabc', start_time=20).funding_usdc.tolist()) == [-3.0, -1.0, 2.0]
+    db.close()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the typed Fill record and its consumers
+"""
+
+from analytics import PerformanceAnalytics
+from config import Config
+from fake_hyperliquid import FakeHyperliquidServer, SyntheticMarket
+from fills import Fill, as_fills, parse_fills
+from hyperliquid_api import HyperliquidAPI, HTTPTransport
+from multi_timeframe_analytics import MultiTimeframeAnalytics
+from rate_limiter import TokenBucket
+from resilience import CircuitBreakers, RequestMetrics, RetryBudget, RetryPolicy
+from response_cache import TTLCache
+from single_flight import SingleFlight
+
+
+def _raw(i, coin='BTC', closed_pnl='0.0', **extra):
+    fill = {'coin': ''.join(coin), 'px': '100.5', 'sz': '2', 'side': 'B', 'time': 1000 + i,
+            'startPosition': '0.0', 'dir': 'Open Long', 'closedPnl': closed_pnl,
+            'hash': '0xabc', 'oid': 10 + i, 'crossed': True, 'fee': '0.07', 'tid': 100 + i,
+            'feeToken': 'USDC'}
+    fill.update(extra)
+    return fill
+
+
+def test_from_api_parses_numbers_and_interns_symbols():
+    a = Fill.from_api(_raw(0, coin=['E', 'T', 'H']))
+    b = Fill.from_api(_raw(1, coin=['E', 'T', 'H']))
+    assert (a.px, a.sz, a.fee, a.closed_pnl, a.start_position) == (100.5, 2.0, 0.07, 0.0, 0.0)
+    assert a.coin == 'ETH' and a.coin is b.coin
+    assert a.notional == 201.0 and a.is_buy and a.key == 100
+    assert Fill.from_api({'hash': '0xh', 'oid': 1, 'time': 5}).key == ('0xh', 1, 5)
+    assert a.to_dict()['closedPnl'] == 0.0 and a.to_dict()['feeToken'] == 'USDC'
+
+
+def test_as_fills_passes_typed_lists_through():
+    typed = parse_fills([_raw(0), _raw(1)])
+    assert as_fills(typed) is typed
+    mixed = as_fills([typed[0], _raw(1)])
+    assert mixed == typed
+
+
+def test_analytics_accept_raw_and_typed_fills():
+    # Long 2, scale out in two fills, then a short round trip
+    raw = [_raw(0), _raw(1, side='A', sz='1', startPosition='2', closed_pnl='12.5'),
+           _raw(2, side='A', sz='1', startPosition='1', closed_pnl='-4'),
+           _raw(3, side='A', startPosition='0'), _raw(4, startPosition='-2', closed_pnl='7')]
+    perf = PerformanceAnalytics()
+    assert perf.calculate_performance(raw) == perf.calculate_performance(parse_fills(raw))
+    # A trade is a round trip back to flat, not a fill
+    assert perf.calculate_performance(raw)['total_trades'] == 2
+    assert perf.calculate_performance(raw)['total_pnl'] == 15.5
+
+    mtf = MultiTimeframeAnalytics()
+    assert mtf.calculate_pnl_metrics(raw) == mtf.calculate_pnl_metrics(parse_fills(raw))
+    assert mtf.calculate_pnl_metrics(raw)['num_trades'] == 2
+    assert mtf.calculate_pnl_metrics(raw)['winning_trades'] == 2
+
+
+def test_api_returns_typed_fills_on_request(monkeypatch):
+    with FakeHyperliquidServer(market=SyntheticMarket(fills_per_user=50)) as server:
+        monkeypatch.setattr(Config, 'MAINNET_API_URL', server.url)
+        api = HyperliquidAPI(transport=HTTPTransport(), rate_limiter=TokenBucket(1e9, 1e9),
+                             cache=TTLCache(), single_flight=SingleFlight(),
+                             retry_policy=RetryPolicy(max_attempts=1), circuit_breakers=CircuitBreakers(),
+                             metrics=RequestMetrics(), retry_budget=RetryBudget())
+
+        raw = api.get_user_fills('0xabc')
+        typed = api.get_user_fills('0xabc', typed=True)
+        assert typed == parse_fills(raw)
+        assert api.get_all_user_fills('0xabc', typed=True) == sorted(typed, key=lambda f: f.time)
+        assert api.get_user_fills_many(['0xabc'], typed=True)['0xabc'] == typed
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the HyperliquidAPI client against a local HTTP server
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from hyperliquid_api import (HyperliquidAPI, HTTPTransport, APIError, ClientError, CircuitOpenError,
+                             split_batch_results)
+from rate_limiter import TokenBucket
+from resilience import CircuitBreakers, RequestMetrics, RetryBudget, RetryPolicy
+from response_cache import TTLCache
+from single_flight import SingleFlight
+
+
+def _unlimited():
+    return TokenBucket(rate=1e9, capacity=1e9)
+
+
+class _InfoHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        self.server.requests.append(payload)
+        status = 500 if payload.get('user') in self.server.fail_users else 200
+        if self.server.statuses:
+            status = self.server.statuses.pop(0)
+        response = self.server.responses.get(payload.get('type'), {})
+        if callable(response):
+            response = response(payload)
+        body = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        body = json.dumps(self.server.responses.get('GET', {})).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_server(responses=None):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _InfoHandler)
+    server.requests = []
+    server.responses = responses or {}
+    server.fail_users = set()
+    server.statuses = []  # forced status codes for the next requests
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _client(server, circuit_breakers=None, **transport_kwargs):
+    api = HyperliquidAPI(transport=HTTPTransport(**transport_kwargs), rate_limiter=_unlimited(),
+                         cache=TTLCache(), single_flight=SingleFlight(),
+                         retry_policy=RetryPolicy(max_attempts=3, base_delay=0.001),
+                         circuit_breakers=circuit_breakers or CircuitBreakers(),
+                         metrics=RequestMetrics(), retry_budget=RetryBudget())
+    api.info_url = f"http://127.0.0.1:{server.server_address[1]}/info"
+    return api
+
+
+def test_transport_reuses_connections():
+    server = _start_server({'allMids': {'BTC': '50000'}})
+    try:
+        api = _client(server, pool_size=2)
+        for _ in range(5):
+            assert api.get_all_mids(use_cache=False) == {'BTC': '50000'}
+
+        stats = api.transport_stats()
+        assert stats['requests'] == 5
+        assert stats['connections_opened'] == 1
+        assert stats['connections_reused'] == 4
+    finally:
+        server.shutdown()
+
+
+def test_transport_per_endpoint_timeouts():
+    transport = HTTPTransport(default_timeout=7, connect_timeout=2, timeouts={'meta': 3})
+    assert transport.timeout_for('meta') == (2, 3)
+    assert transport.timeout_for('userFills') == (2, 20)
+    assert transport.timeout_for('clearinghouseState') == (2, 7)
+
+
+def test_async_client_fetch_many():
+    from async_hyperliquid_api import AsyncHyperliquidAPI, run_sync
+
+    server = _start_server({'clearinghouseState': {'marginSummary': {'accountValue': '100'}}})
+    server.fail_users.add('0xbad')
+    try:
+        sync_api = _client(server)
+
+        async def _run():
+            async with AsyncHyperliquidAPI.from_client(sync_api, max_concurrency=2) as api:
+                return await api.fetch_many('get_user_state', ['0xa', '0xb', '0xbad', '0xc'])
+
+        results = run_sync(_run())
+        assert list(results) == ['0xa', '0xb', '0xbad', '0xc']
+        assert results['0xb']['marginSummary']['accountValue'] == '100'
+        # A failure is an APIError after the shared retry policy, never an empty state
+        assert isinstance(results['0xbad'], APIError) and results['0xbad'].status == 500
+        assert sorted(r['user'] for r in server.requests) == ['0xa', '0xb', '0xbad', '0xbad', '0xbad', '0xc']
+        assert sync_api.request_stats()['endpoints']['clearinghouseState']['retries'] == 2
+    finally:
+        server.shutdown()
+
+
+def test_batch_methods_report_failures_per_address():
+    server = _start_server({'clearinghouseState': {'assetPositions': []}, 'userFills': [{'tid': 1}]})
+    server.fail_users.add('0xbad')
+    try:
+        api = _client(server)
+        states = api.get_user_states_many(['0xa', '0xbad', '0xb'])
+        ok, failed = split_batch_results(states)
+        assert set(ok) == {'0xa', '0xb'}
+        assert isinstance(failed['0xbad'], APIError)
+
+        fills = api.get_user_fills_many(['0xa', '0xbad'])
+        assert fills['0xa'] == [{'tid': 1}]
+        assert isinstance(fills['0xbad'], APIError)
+    finally:
+        server.shutdown()
+
+
+def test_iter_user_fills_pages_and_dedupes():
+    # Two fills share each timestamp so every page boundary splits a pair
+    history = [{'tid': i, 'time': 1000 + i // 2, 'px': '1', 'sz': '1'} for i in range(25)]
+
+    def fills_by_time(payload):
+        page = [f for f in history if f['time'] >= payload['startTime']]
+        return page[:4]
+
+    server = _start_server({'userFillsByTime': fills_by_time})
+    try:
+        api = _client(server)
+        chunks = list(api.iter_user_fills('0xa', page_limit=4))
+        tids = [f['tid'] for chunk in chunks for f in chunk]
+        assert tids == list(range(25))
+        assert all(len(chunk) <= 4 for chunk in chunks)
+    finally:
+        server.shutdown()
+
+
+def test_iter_pages_leaves_shared_responses_untouched():
+    # Cached and coalesced responses are one object shared by every caller
+    response = [{'tid': 2, 'time': 1002}, {'tid': 1, 'time': 1001}]
+    api = HyperliquidAPI(rate_limiter=_unlimited(), cache=TTLCache(), single_flight=SingleFlight())
+    api._request = lambda endpoint, data: response
+    assert [f['tid'] for chunk in api.iter_user_fills('0xa', page_limit=4) for f in chunk] == [1, 2]
+    assert [f['tid'] for f in response] == [2, 1]
+
+
+def test_iter_user_fills_reports_an_undrainable_millisecond(capsys):
+    # Six fills in one millisecond with a page limit of four: two cannot be reached by time
+    history = ([{'tid': i, 'time': 1000, 'px': '1', 'sz': '1'} for i in range(6)]
+               + [{'tid': 6, 'time': 1001, 'px': '1', 'sz': '1'}])
+
+    def fills_by_time(payload):
+        return [f for f in history if f['time'] >= payload['startTime']][:4]
+
+    server = _start_server({'userFillsByTime': fills_by_time})
+    try:
+        tids = [f['tid'] for chunk in _client(server).iter_user_fills('0xa', page_limit=4) for f in chunk]
+        assert tids == [0, 1, 2, 3, 6]
+        assert 'more than 4 entries at time 1000' in capsys.readouterr().out
+    finally:
+        server.shutdown()
+
+
+def test_iter_user_funding_pages_by_time_and_coin():
+    # Each funding time pays two coins, so page boundaries split a time's payments
+    history = [{'time': 1000 + i // 2, 'delta': {'coin': 'BTC' if i % 2 else 'ETH', 'usdc': str(i)}}
+               for i in range(15)]
+
+    def user_funding(payload):
+        return [p for p in history if p['time'] >= payload['startTime']][:4]
+
+    server = _start_server({'userFunding': user_funding})
+    try:
+        api = _client(server)
+        chunks = list(api.iter_user_funding('0xa', page_limit=4))
+        assert [p['delta']['usdc'] for chunk in chunks for p in chunk] == [str(i) for i in range(15)]
+        assert api.get_user_funding_many(['0xa'], start_time=1006) == {'0xa': history[12:]}
+    finally:
+        server.shutdown()
+
+
+def test_response_cache_ttl_and_bypass():
+    server = _start_server({'meta': {'universe': []}, 'openOrders': []})
+    try:
+        api = _client(server)
+        api.get_meta()
+        api.get_meta()
+        api.get_meta(use_cache=False)
+        api.get_open_orders('0xa')
+        api.get_open_orders('0xa')
+
+        types = [r['type'] for r in server.requests]
+        assert types.count('meta') == 2        # second call was a hit, third bypassed
+        assert types.count('openOrders') == 2  # never cached
+        stats = api.cache_stats()
+        assert stats['by_endpoint']['meta'] == {'hits': 1, 'misses': 1}
+    finally:
+        server.shutdown()
+
+
+def test_ttl_cache_expiry_and_lru_eviction():
+    cache = TTLCache(max_entries=2, ttls={'a': 60, 'b': 0.01})
+    cache.set('b', 'k0', 0)
+    cache.set('a', 'k1', 1)
+    cache.set('a', 'k2', 2)
+    assert cache.get('b', 'k0') == (False, None)  # evicted as least recently used
+    assert cache.stats()['evictions'] == 1
+
+    cache.set('b', 'k3', 3)
+    time.sleep(0.02)
+    assert cache.get('b', 'k3') == (False, None)
+    assert cache.stats()['expirations'] == 1
+
+
+def test_concurrent_identical_requests_are_coalesced():
+    def slow_meta(payload):
+        time.sleep(0.2)
+        return {'universe': []}
+
+    server = _start_server({'meta': slow_meta})
+    try:
+        api = _client(server)
+        barrier = threading.Barrier(5)
+        results = []
+
+        def call():
+            barrier.wait()
+            results.append(api.get_meta())
+
+        threads = [threading.Thread(target=call) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == [{'universe': []}] * 5
+        assert len(server.requests) == 1
+        stats = api.coalescing_stats()
+        assert (stats['executed'], stats['coalesced'], stats['in_flight']) == (1, 4, 0)
+    finally:
+        server.shutdown()
+
+
+def test_single_flight_shares_errors():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        release.wait()
+        raise APIError('meta', 'boom')
+
+    def call(func):
+        try:
+            flight.do('meta', 'k', func)
+        except APIError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call, args=(failing,))
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=call, args=(lambda: 'unused',))
+    follower.start()
+    while flight.stats()['coalesced'] == 0:
+        time.sleep(0.005)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(errors) == 2 and errors[0] is errors[1]
+
+
+def test_leaderboard_records_are_streamed_and_cached():
+    rows = [{'ethAddress': f'0x{i}', 'accountValue': str(i), 'windowPerformances': []} for i in range(50)]
+    server = _start_server({'GET': {'leaderboardRows': rows}})
+    try:
+        api = _client(server)
+        api.leaderboard_url = f"http://127.0.0.1:{server.server_address[1]}/leaderboard"
+        records = api.get_leaderboard_records()
+        assert [r.address for r in records] == [row['ethAddress'] for row in rows]
+        assert api.get_leaderboard_records() is records
+        assert api.transport_stats()['requests'] == 1
+    finally:
+        server.shutdown()
+
+
+def test_retries_transient_errors_and_records_metrics():
+    server = _start_server({'clearinghouseState': {'assetPositions': []}})
+    server.statuses = [429, 503]
+    try:
+        api = _client(server)
+        assert api.get_user_state('0xa', raise_on_error=True) == {'assetPositions': []}
+        assert len(server.requests) == 3
+
+        stats = api.request_stats()['endpoints']['clearinghouseState']
+        assert stats['retries'] == 2
+        assert stats['outcomes']['rate_limited'] == 1
+        assert stats['outcomes']['server_error'] == 1
+        assert stats['outcomes']['ok'] == 1
+        assert stats['latency']['count'] == 3
+    finally:
+        server.shutdown()
+
+
+def test_failed_is_distinguishable_from_empty():
+    server = _start_server({'openOrders': []})
+    try:
+        api = _client(server)
+        assert api.get_open_orders('0xa', raise_on_error=True) == []  # genuinely empty
+
+        server.statuses = [400]
+        with pytest.raises(ClientError):
+            api.get_open_orders('0xa', raise_on_error=True)
+        assert len(server.requests) == 2  # 4xx is not retried
+
+        server.statuses = [500, 500, 500]
+        assert api.get_open_orders('0xa') == []  # legacy callers still get an empty default
+    finally:
+        server.shutdown()
+
+
+def test_circuit_breaker_fails_fast_then_probes():
+    server = _start_server({'meta': {'universe': []}})
+    server.statuses = [500] * 2
+    try:
+        api = _client(server, circuit_breakers=CircuitBreakers(failure_threshold=2, reset_timeout=0.05))
+        # The breaker opens on the second failure, cutting the retries short
+        with pytest.raises(CircuitOpenError):
+            api._request('meta', {'type': 'meta'}, use_cache=False)
+        assert len(server.requests) == 2
+
+        with pytest.raises(CircuitOpenError):
+            api._request('meta', {'type': 'meta'}, use_cache=False)
+        assert len(server.requests) == 2
+
+        time.sleep(0.06)
+        server.statuses = []
+        assert api._request('meta', {'type': 'meta'}, use_cache=False) == {'universe': []}
+        assert api.request_stats()['circuit_breakers']['meta']['state'] == 'closed'
+    finally:
+        server.shutdown()
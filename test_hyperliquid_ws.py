@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the WebSocket subscription manager against a local aiohttp server
+"""
+
+import asyncio
+import json
+
+from aiohttp import web
+
+from hyperliquid_ws import WebSocketSubscriptionManager, ws_url_for
+
+
+class _FakeInfoAPI:
+    """Stands in for HyperliquidAPI during REST backfill"""
+
+    def __init__(self, fills):
+        self.fills = fills
+        self.calls = []
+
+    def iter_user_fills(self, address, start_time=0, page_limit=2):
+        self.calls.append((address, start_time))
+        fills = [f for f in self.fills if f['time'] >= start_time]
+        for i in range(0, len(fills), page_limit):
+            yield fills[i:i + page_limit]
+
+
+async def _start_ws_server():
+    state = {'subscribes': [], 'sockets': []}
+
+    async def handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        ws.channels = set()
+        state['sockets'].append(ws)
+        await ws.send_str("Websocket connection established.")
+        async for msg in ws:
+            payload = json.loads(msg.data)
+            if payload.get('method') == 'subscribe':
+                state['subscribes'].append(payload['subscription'])
+                ws.channels.add(payload['subscription']['type'])
+        return ws
+
+    app = web.Application()
+    app.router.add_get('/ws', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"ws://127.0.0.1:{port}/ws", state
+
+
+def _socket_for(state, channel):
+    return [ws for ws in state['sockets'] if channel in ws.channels and not ws.closed][-1]
+
+
+async def _push(state, channel, data):
+    await _socket_for(state, channel).send_str(json.dumps({'channel': channel, 'data': data}))
+
+
+async def _wait_for(predicate, timeout=5.0):
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+def test_ws_url_for():
+    assert ws_url_for('https://api.hyperliquid.xyz') == 'wss://api.hyperliquid.xyz/ws'
+
+
+def test_streams_dedupes_reconnects_and_backfills():
+    fill = lambda tid, t: {'tid': tid, 'time': t, 'coin': 'BTC', 'px': '1', 'sz': '1'}
+    api = _FakeInfoAPI([fill(1, 100), fill(2, 200), fill(3, 300), fill(4, 400)])
+
+    async def _run():
+        runner, url, state = await _start_ws_server()
+        manager = WebSocketSubscriptionManager(api=api, ws_url=url, queue=asyncio.Queue(),
+                                               max_subscriptions_per_socket=2,
+                                               reconnect_delay=0.01)
+        mids = []
+        try:
+            manager.subscribe_user_fills('0xA')
+            manager.subscribe_user_fills('0xB')
+            manager.subscribe_all_mids(callback=lambda event: mids.append(event.data))
+            await manager.start()
+            assert manager.stats()['sockets'] == 2
+            await _wait_for(lambda: len(state['subscribes']) == 3)
+
+            # Live fill, then a repeat of it: delivered once
+            for _ in range(2):
+                await _push(state, 'userFills', {'user': '0xa', 'fills': [fill(1, 100)]})
+            event = await asyncio.wait_for(manager.queue.get(), 5)
+            assert (event.user, [f['tid'] for f in event.data]) == ('0xa', [1])
+
+            await _push(state, 'allMids', {'mids': {'BTC': '50000'}})
+            await _wait_for(lambda: mids == [{'BTC': '50000'}])
+            assert (await manager.queue.get()).channel == 'allMids'
+
+            # Drop the userFills socket; it reconnects, resubscribes and backfills over REST
+            await _socket_for(state, 'userFills').close()
+            await _wait_for(lambda: manager.reconnects == 1)
+            event = await asyncio.wait_for(manager.queue.get(), 5)
+            assert event.is_backfill
+            assert event.user == '0xA'
+            assert [f['tid'] for f in event.data] == [2, 3, 4]  # every page, not just the first
+            assert api.calls[0] == ('0xA', 100)
+
+            await _wait_for(lambda: len(state['subscribes']) == 5)
+            assert manager.queue.empty()
+        finally:
+            await manager.stop()
+            await runner.cleanup()
+
+    asyncio.run(_run())
+
+
+def test_snapshot_after_reconnect_delivers_missed_fills():
+    fill = lambda tid, t: {'tid': tid, 'time': t, 'coin': 'BTC', 'px': '1', 'sz': '1'}
+
+    async def _run():
+        runner, url, state = await _start_ws_server()
+        manager = WebSocketSubscriptionManager(ws_url=url, queue=asyncio.Queue(), reconnect_delay=0.01)
+        try:
+            manager.subscribe_user_fills('0xA')
+            await manager.start()
+            await _wait_for(lambda: len(state['subscribes']) == 1)
+
+            # The first snapshot is history, flagged so consumers can skip it
+            await _push(state, 'userFills', {'user': '0xa', 'fills': [fill(1, 100)], 'isSnapshot': True})
+            event = await asyncio.wait_for(manager.queue.get(), 5)
+            assert event.is_snapshot and [f['tid'] for f in event.data] == [1]
+
+            # Fill 2 lands while the socket is down; the resubscribe snapshot is its only source
+            await _socket_for(state, 'userFills').close()
+            await _wait_for(lambda: len(state['subscribes']) == 2)
+            for _ in range(2):
+                await _push(state, 'userFills', {'user': '0xa', 'fills': [fill(1, 100), fill(2, 200)],
+                                                 'isSnapshot': True})
+            event = await asyncio.wait_for(manager.queue.get(), 5)
+            assert event.is_backfill and not event.is_snapshot
+            assert [f['tid'] for f in event.data] == [2]
+
+            await _push(state, 'userFills', {'user': '0xa', 'fills': [fill(2, 200), fill(3, 300)]})
+            event = await asyncio.wait_for(manager.queue.get(), 5)
+            assert [f['tid'] for f in event.data] == [3] and manager.queue.empty()
+        finally:
+            await manager.stop()
+            await runner.cleanup()
+
+    asyncio.run(_run())
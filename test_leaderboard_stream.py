@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming leaderboard parser
+"""
+
+import json
+
+import pytest
+
+from hyperliquid_api import HyperliquidAPI
+from leaderboard_stream import LeaderboardRecord, iter_leaderboard_rows, parse_leaderboard_stream
+
+ROWS = [
+    {'ethAddress': '0xa', 'accountValue': '100.5', 'displayName': 'ünï',
+     'windowPerformances': [['day', {'pnl': '1', 'roi': '0.1', 'vlm': '10'}],
+                            ['allTime', {'pnl': '-2', 'roi': '-0.2', 'vlm': '20'}]]},
+    {'ethAddress': '0xb', 'accountValue': '0', 'displayName': None, 'windowPerformances': []},
+    {'ethAddress': '0xc', 'accountValue': '3', 'displayName': 'x ] , {',
+     'windowPerformances': [['week', {'pnl': '5', 'roi': '0.5', 'vlm': '50'}]]},
+]
+
+
+def _chunks(payload: bytes, size: int):
+    return [payload[i:i + size] for i in range(0, len(payload), size)]
+
+
+@pytest.mark.parametrize('size', [1, 3, 7, 64, 100000])
+def test_rows_survive_any_chunk_boundary(size):
+    payload = json.dumps({'leaderboardRows': ROWS}, ensure_ascii=False, indent=1).encode()
+    assert list(iter_leaderboard_rows(_chunks(payload, size))) == ROWS
+
+
+def test_records_match_parse_leaderboard_entry():
+    payload = json.dumps({'leaderboardRows': ROWS}).encode()
+    records = list(parse_leaderboard_stream(_chunks(payload, 5)))
+    assert all(isinstance(r, LeaderboardRecord) for r in records)
+    for record, row in zip(records, ROWS):
+        expected = HyperliquidAPI.parse_leaderboard_entry(None, row)
+        del expected['raw']
+        assert record.to_dict() == expected
+
+
+def test_truncated_stream_raises():
+    payload = json.dumps({'leaderboardRows': ROWS}).encode()[:-10]
+    with pytest.raises(ValueError):
+        list(iter_leaderboard_rows(_chunks(payload, 16)))
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for prefix-sum window analytics
+"""
+
+import random
+
+import numpy as np
+
+import pytest
+
+from fake_hyperliquid import FUNDING_RESPONSE_LIMIT, SyntheticMarket
+from fill_frame import FillFrame
+from multi_timeframe_analytics import MultiTimeframeAnalytics, WindowIndex, parse_duration
+from round_trips import reconstruct_round_trips
+
+
+def _all_funding(market, address):
+    """Every userFunding page; each page restarts inside the last hour, so payments repeat"""
+    payments, start = [], None
+    while True:
+        page = market.user_funding(address, start)
+        payments += page
+        if len(page) < FUNDING_RESPONSE_LIMIT:
+            return payments
+        start = page[-1]['time'] - 1
+
+
+@pytest.fixture(scope='module')
+def frame():
+    market = SyntheticMarket(seed=21, fills_per_user=2500)
+    address = market.address(7)
+    return FillFrame.from_api(market._user(address)['fills']).with_funding(_all_funding(market, address))
+
+
+def _assert_same(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, float):
+            assert actual[key] == pytest.approx(value, rel=1e-9, abs=1e-6), key
+        elif isinstance(value, tuple):
+            assert actual[key][0] == value[0] and actual[key][1] == pytest.approx(value[1], abs=1e-6), key
+        else:
+            assert actual[key] == value, key
+
+
+def test_any_window_matches_direct_computation(frame):
+    mtf = MultiTimeframeAnalytics()
+    trips = reconstruct_round_trips(frame).closed()
+    index = WindowIndex(frame, trips)
+    t0, t1 = int(frame.time[0]), int(frame.time[-1])
+    rng = random.Random(3)
+
+    windows = [(None, None), (t0, None), (None, t1), (t1 + 1, None), (None, t0 - 1), (t0 + 0.5, t1 - 0.5)]
+    windows += [tuple(sorted(rng.uniform(t0, t1) for _ in range(2))) for _ in range(25)]
+    windows += [(rng.uniform(t0, t1), None) for _ in range(10)]
+    for start, end in windows:
+        expected = mtf.calculate_pnl_metrics(frame.between(start, end), trips.between(start, end))
+        _assert_same(index.pnl_metrics(start, end), expected)
+
+
+def test_custom_windows(frame):
+    mtf = MultiTimeframeAnalytics()
+    t0, t1 = int(frame.time[0]), int(frame.time[-1])
+    mid = (t0 + t1) // 2
+    results = mtf.analyze_multi_timeframe(frame, account_value=5_000,
+                                          windows={'1d': 1, '90d': 90, 'all': None,
+                                                   'first_half': (None, mid), 'second_half': (mid + 1, None)})
+
+    assert list(results) == ['1d', '90d', 'all', 'first_half', 'second_half']
+    assert results['all']['num_trades'] == mtf.calculate_pnl_metrics(frame)['num_trades']
+    halves = results['first_half']['total_pnl'] + results['second_half']['total_pnl']
+    assert halves == pytest.approx(results['all']['total_pnl'])
+    assert results['first_half']['num_trades'] + results['second_half']['num_trades'] == results['all']['num_trades']
+    assert results['all']['roi'] == pytest.approx(results['all']['total_pnl'] / 5_000)
+    assert set(mtf.analyze_multi_timeframe(frame)) == {'7d', '30d', 'lifetime'}
+    assert mtf.analyze_multi_timeframe(FillFrame.empty())['lifetime']['num_trades'] == 0
+
+
+def test_rolling_series_matches_window_queries(frame):
+    index = WindowIndex(frame)
+    day = 86_400_000
+    end = int(frame.time[-1])
+    series = MultiTimeframeAnalytics().rolling_metrics(index, window='1d', step='6h', lookback='20d', end_ms=end)
+
+    assert len(series['time']) == 20 * 4 + 1 and series['time'][-1] == end
+    assert all(v.shape == series['time'].shape for v in series.values())
+    for i in range(0, len(series['time']), 7):
+        t = int(series['time'][i])
+        expected = index.pnl_metrics(t - day + 1, t)
+        assert series['pnl'][i] == pytest.approx(expected['total_pnl'], abs=1e-6)
+        assert series['net_pnl_after_funding'][i] == pytest.approx(expected['net_pnl_after_funding'], abs=1e-6)
+        assert series['trades'][i] == expected['num_trades']
+        assert series['winning_trades'][i] == expected['winning_trades']
+        if expected['num_trades']:
+            assert series['win_rate'][i] == pytest.approx(expected['win_rate'])
+        else:
+            assert series['win_rate'][i] != series['win_rate'][i]  # NaN
+
+
+def test_pnl_variants_net_of_fees_and_funding(frame):
+    mtf = MultiTimeframeAnalytics()
+    assert len(frame.funding) and np.all(np.diff(frame.funding_time) >= 0)
+    lifetime = mtf.analyze_multi_timeframe(frame, account_value=5_000)['lifetime']
+
+    total_funding = float(frame.funding_usdc.sum())
+    assert lifetime['total_funding'] == pytest.approx(total_funding)
+    assert lifetime['net_pnl'] == pytest.approx(lifetime['total_pnl'] - lifetime['total_fees'])
+    assert lifetime['net_pnl_after_funding'] == pytest.approx(lifetime['net_pnl'] + total_funding)
+    assert lifetime['roi_net_after_funding'] == pytest.approx(lifetime['net_pnl_after_funding'] / 5_000)
+
+    # A gap between fills has no trades but still pays funding
+    gap = int(np.argmax(np.diff(frame.time)))
+    window = (int(frame.time[gap]) + 1, int(frame.time[gap + 1]) - 1)
+    quiet = mtf.analyze_multi_timeframe(frame, windows={'gap': window})['gap']
+    assert quiet['num_trades'] == 0 and len(frame.between(*window).funding)
+    assert quiet['total_funding'] == pytest.approx(float(frame.between(*window).funding_usdc.sum()))
+    assert quiet['net_pnl_after_funding'] == quiet['total_funding'] != 0
+
+
+def test_parse_duration():
+    assert [parse_duration(v) for v in ('15m', '1h', '7d', '2w', '0.5d', 1234)] == \
+        [900_000, 3_600_000, 604_800_000, 1_209_600_000, 43_200_000, 1234]
+    with pytest.raises(ValueError):
+        parse_duration('7y')
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental PerformanceAccumulator
+"""
+
+import json
+
+import pytest
+
+from analytics import PerformanceAnalytics
+from config import Config
+from database import Database
+from fake_hyperliquid import SyntheticMarket
+from fill_frame import FillFrame
+from online_analytics import PerformanceAccumulator
+from round_trips import reconstruct_round_trips
+
+
+@pytest.fixture(scope='module')
+def frame():
+    market = SyntheticMarket(seed=11, fills_per_user=3000)
+    return FillFrame.from_api(market._user(market.address(4))['fills'])
+
+
+def _assert_same_metrics(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        assert actual[key] == pytest.approx(value, rel=1e-9, abs=1e-9), key
+
+
+def test_incremental_updates_match_full_recompute(frame):
+    acc = PerformanceAccumulator()
+    closed = []
+    cuts = [0, 1, 700, 701, 1500, 2999, len(frame)]
+    for lo, hi in zip(cuts, cuts[1:]):
+        # Overlapping fetches (from the cursor, inclusive) are de-duplicated
+        chunk = frame._view(frame.data[max(lo - 5, 0):hi])
+        closed += acc.update(chunk)
+        _assert_same_metrics(acc.metrics(), PerformanceAnalytics().calculate_performance(frame._view(frame.data[:hi])))
+
+    assert acc.fills_seen == len(frame)
+    expected = reconstruct_round_trips(frame).closed().to_dicts()
+    assert [(t['coin'], t['close_time'], t['first_tid'], t['last_tid']) for t in closed] == \
+        [(t['coin'], t['close_time'], t['first_tid'], t['last_tid']) for t in expected]
+    for got, want in zip(closed, expected):
+        for key in ('pnl', 'fees', 'entry_px', 'exit_px', 'size', 'volume'):
+            assert got[key] == pytest.approx(want[key]), key
+
+
+def test_state_survives_json_round_trip(frame):
+    half = len(frame) // 2
+    acc = PerformanceAccumulator()
+    acc.update(frame._view(frame.data[:half]))
+
+    restored = PerformanceAccumulator.from_dict(json.loads(json.dumps(acc.to_dict())))
+    assert not acc.has_new(frame._view(frame.data[half - 3:half])) and acc.has_new(frame)
+    acc.update(frame)
+    restored.update(frame)
+    assert restored.metrics() == acc.metrics()
+
+    assert PerformanceAccumulator.from_dict({**acc.to_dict(), 'version': 0}).fills_seen == 0
+    assert PerformanceAccumulator().metrics() == PerformanceAnalytics()._empty_performance()
+
+
+def test_state_is_persisted_per_account(frame, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DATABASE_URL', f"sqlite:///{tmp_path / 'state.db'}")
+    db = Database()
+    assert db.get_analytics_state('0xabc') is None
+
+    acc = PerformanceAccumulator()
+    acc.update(frame._view(frame.data[:100]))
+    db.save_analytics_state('0xabc', acc.to_dict())
+    acc.update(frame)
+    db.save_analytics_state('0xabc', acc.to_dict())
+
+    restored = PerformanceAccumulator.from_dict(db.get_analytics_state('0xabc'))
+    assert restored.metrics() == acc.metrics() and restored.last_time == int(frame.time[-1])
+    db.close()
+
+
+def test_fills_without_a_tid_are_not_dropped():
+    fill = lambda time, side, closed_pnl: {'coin': 'BTC', 'time': time, 'side': side, 'px': '100', 'sz': '1',
+                                           'closedPnl': closed_pnl, 'fee': '0', 'startPosition': '0'}
+    acc = PerformanceAccumulator()
+    acc.update([fill(1000, 'B', '0')])
+    # A second tid-less fill at the cursor's millisecond is a new fill, not overlap
+    closing = [{**fill(1000, 'A', '5'), 'startPosition': '1'}]
+    assert acc.has_new(closing)
+    acc.update(closing)
+    assert acc.fills_seen == 2 and acc.total_trades == 1 and acc.total_pnl == 5.0
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for process-pool batch analytics
+"""
+
+import pytest
+
+from analytics import PerformanceAnalytics
+from fake_hyperliquid import SyntheticMarket
+from fill_frame import FillFrame
+from multi_timeframe_analytics import MultiTimeframeAnalytics
+from online_analytics import PerformanceAccumulator
+from parallel_analytics import AnalyticsPool, analyze_many
+
+
+@pytest.fixture(scope='module')
+def frames():
+    market = SyntheticMarket(seed=5, fills_per_user=800)
+    # Uneven sizes so the largest-first submission order differs from input order
+    sizes = [200, 800, 0, 50, 600]
+    return [FillFrame.from_api(market._user(market.address(i))['fills'][:n]) for i, n in enumerate(sizes)]
+
+
+def test_pool_results_match_serial_and_keep_order(frames):
+    expected = [PerformanceAnalytics().calculate_performance(frame) for frame in frames]
+    with AnalyticsPool(workers=2) as pool:
+        assert pool.analyze_many(frames) == expected
+        # The pool is reused across batches
+        assert pool.analyze_many(frames[::-1]) == expected[::-1]
+    assert analyze_many(frames, workers=1) == expected
+
+    values = [1000.0, None, 5.0, 0.0, 250.0]
+    multi = analyze_many(frames, 'multi_timeframe', workers=2, extras=values)
+    for frame, value, result in zip(frames, values, multi):
+        want = MultiTimeframeAnalytics().analyze_multi_timeframe(frame, value)
+        assert result['lifetime'] == want['lifetime']
+
+
+def test_accumulators_come_back_updated(frames):
+    accumulators = [PerformanceAccumulator() for _ in frames]
+    accumulators[1].update(frames[1]._view(frames[1].data[:300]))
+    results = analyze_many(frames, 'accumulate', workers=2, extras=accumulators)
+
+    for i, (frame, (accumulator, closed)) in enumerate(zip(frames, results)):
+        reference = PerformanceAccumulator()
+        reference_closed = reference.update(frame)
+        assert accumulator.fills_seen == len(frame) and accumulator.last_time == reference.last_time
+        assert accumulator.metrics() == pytest.approx(reference.metrics())
+        if i == 1:
+            # Only the trips closed after the restored cursor are reported
+            assert closed == reference_closed[-len(closed):] and len(closed) < len(reference_closed)
+        else:
+            assert closed == reference_closed
+
+
+def test_failures_stay_in_their_slot(frames):
+    results = analyze_many(frames[:3], 'multi_timeframe', workers=2, extras=[None, 'bad', None])
+    assert isinstance(results[1], TypeError)
+    assert isinstance(results[0], dict) and isinstance(results[2], dict)
+
+    with pytest.raises(ValueError):
+        analyze_many(frames, 'nope')
+    with pytest.raises(ValueError):
+        analyze_many(frames, extras=[None])
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the mergeable quantile sketches behind population percentiles
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from analytics import PerformanceAnalytics
+from config import Config
+from database import Database
+from leaderboard_stream import LeaderboardRecord
+from quantile_sketch import KLLSketch, MetricSketches, leaderboard_sketches
+
+
+def _exact_rank(values, probes):
+    return np.searchsorted(np.sort(values), probes, side='right') / len(values)
+
+
+def test_ranks_stay_accurate_in_bounded_memory():
+    values = np.random.default_rng(4).standard_t(3, size=400_000)
+    probes = np.quantile(values, np.linspace(0.01, 0.99, 99))
+
+    streamed = KLLSketch(seed=1)
+    for chunk in np.array_split(values, 400):
+        streamed.update(chunk)
+    assert streamed.n == len(values) and streamed.retained < 3 * streamed.k
+    assert np.abs(streamed.rank(probes) - _exact_rank(values, probes)).max() < 0.02
+
+    # Halves sketched separately merge into an equally accurate sketch
+    merged = KLLSketch(seed=2).update(values[::2]).merge(KLLSketch(seed=3).update(values[1::2]))
+    assert merged.n == len(values) and merged.retained < 3 * merged.k
+    assert np.abs(merged.rank(probes) - _exact_rank(values, probes)).max() < 0.02
+    assert merged.quantile(0) == values.min() and merged.quantile(1) == values.max()
+    assert merged.quantile(0.5) == pytest.approx(np.median(values), abs=0.05)
+
+    # Below k values nothing is compacted: answers are exact
+    small = KLLSketch().update([3.0, 1.0, math.nan, 2.0, math.inf])
+    assert small.n == 4 and small.percentile(2.0) == 50.0 and small.quantile(0.75) == 3.0
+    assert KLLSketch().percentile(1.0) is None and math.isnan(KLLSketch().quantile(0.5))
+    with pytest.raises(ValueError):
+        KLLSketch(k=200).merge(KLLSketch(k=100).update([1.0]))
+
+
+def test_population_sketches_from_snapshots_and_accounts(tmp_path, monkeypatch):
+    rng = np.random.default_rng(9)
+    records = [LeaderboardRecord(f'0x{i:x}', None, 1000.0, month_pnl=float(pnl), month_roi=float(roi),
+                                 month_volume=1e6, **({'day_pnl': 1.0, 'day_roi': 0.1, 'day_volume': 5.0}
+                                                      if i % 2 else {}))
+               for i, (pnl, roi) in enumerate(zip(rng.normal(0, 1e4, 5000), rng.normal(0, 0.3, 5000)))]
+    sketches = leaderboard_sketches(records)
+    assert leaderboard_sketches(records) is sketches  # one build per snapshot
+    roi = np.array([r.month_roi for r in records])
+    assert sketches.percentile('month', 'roi', 0.3) == pytest.approx(100 * _exact_rank(roi, 0.3), abs=2)
+    assert sketches.get('day', 'pnl').n == 2500 and sketches.get('week', 'pnl').n == 0
+    assert sketches.summary('month', 'roi')['count'] == 5000 and sketches.summary('week', 'roi') is None
+
+    # Account metrics: idle accounts are left out, trade size is notional per trade
+    rows = [{'num_trades': 4, 'total_volume': 400.0, 'profit_factor': float(i), 'roi': 0.01 * i}
+            for i in range(1, 100)] + [{'num_trades': 0, 'roi': 0.0}, None]
+    accounts = MetricSketches().add_analyses([{'30d': row} for row in rows], timeframes=('30d',))
+    assert accounts.get('30d', 'roi').n == 99
+    assert accounts.percentile('30d', 'avg_trade_size', 100.0) == 100.0
+    assert accounts.metrics() == {'30d': ['roi', 'profit_factor', 'total_volume', 'avg_trade_size']}
+
+    percentiles = PerformanceAnalytics().population_percentiles(
+        {'num_trades': 2, 'total_volume': 100.0, 'profit_factor': 90.0, 'roi': 0.5}, accounts, '30d')
+    assert percentiles['profit_factor'] == pytest.approx(100 * 90 / 99)
+    assert percentiles['roi'] == pytest.approx(100 * 50 / 99) and percentiles['avg_trade_size'] == 0.0
+
+    # Persisted under a population name, read back by another process
+    monkeypatch.setattr(Config, 'DATABASE_URL', f"sqlite:///{tmp_path / 'sketches.db'}")
+    db = Database()
+    merged = MetricSketches().merge(sketches).merge(accounts)
+    db.save_metric_sketches('tracked', merged.to_bytes(), merged.VERSION, merged.count)
+    restored = MetricSketches.from_bytes(db.get_metric_sketches('tracked'))
+    assert restored.summary('month', 'roi') == merged.summary('month', 'roi')
+    assert restored.percentile('30d', 'profit_factor', 50.0) == merged.percentile('30d', 'profit_factor', 50.0)
+    assert db.get_metric_sketches('analysed') is None and MetricSketches.from_bytes(None) is None
+    db.close()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for the vectorised top-k ranking engine
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from analytics import PerformanceAnalytics
+from leaderboard_analyzer import LeaderboardAnalyzer
+from leaderboard_stream import LeaderboardRecord, WINDOWS
+from multi_timeframe_analytics import MultiTimeframeAnalytics
+from ranking import FeatureMatrix, Ranker, ScoreTerm, rank_indices, top_records
+
+
+def _legacy_scores(accounts):
+    scores = []
+    for account in accounts:
+        score = 0
+        score += account.get('win_rate', 0) * 0.3 * 100
+        score += min(account.get('roi', 0), 2) * 0.3 * 50
+        score += min(max(account.get('sharpe_ratio', 0), 0), 3) * 0.2 * 33
+        score += min(account.get('profit_factor', 0), 5) * 0.1 * 20
+        score += min(account.get('total_trades', 0) / 100, 1) * 0.1 * 100
+        scores.append(score)
+    return scores
+
+
+def _accounts(n, seed=3):
+    rng = random.Random(seed)
+    accounts = []
+    for i in range(n):
+        account = {'address': f'0x{i:04x}',
+                   'win_rate': rng.choice([0.0, 0.5, rng.random()]),
+                   'roi': rng.choice([0.0, 2.0, 5.0, rng.uniform(-1, 3)]),
+                   'sharpe_ratio': rng.choice([-1.0, 0.0, rng.uniform(-2, 5)]),
+                   'profit_factor': rng.choice([float('inf'), 1.0, rng.uniform(0, 8)]),
+                   'total_trades': rng.choice([0, 100, rng.randrange(300)]),
+                   '30d': {'total_pnl': rng.choice([0.0, 10.0, rng.uniform(-50, 50)]),
+                           'roi': rng.choice([0.0, rng.uniform(-1, 1)])}}
+        for key in rng.sample(['win_rate', 'roi', 'sharpe_ratio', '30d'], rng.randrange(2)):
+            del account[key]
+        accounts.append(account)
+    return accounts
+
+
+def test_rank_indices_matches_stable_sort():
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 20, 500).astype(float)
+    values[::37] = np.nan
+    expected = sorted(range(len(values)), key=lambda i: -np.inf if np.isnan(values[i]) else values[i], reverse=True)
+    for k in (None, 0, 1, 7, 50, 499, 500, 900):
+        assert rank_indices(values, k).tolist() == expected[:k]
+
+    mask = values >= 10
+    assert rank_indices(values, 25, mask).tolist() == [i for i in expected if mask[i]][:25]
+    assert rank_indices(np.array([]), 5).tolist() == []
+
+
+def test_rank_accounts_matches_legacy_scoring():
+    accounts = _accounts(400)
+    legacy = _legacy_scores(accounts)
+    expected = [accounts[i]['address'] for i in sorted(range(len(accounts)), key=lambda i: legacy[i], reverse=True)]
+
+    ranked = PerformanceAnalytics().rank_accounts(accounts)
+    assert [a['address'] for a in ranked] == expected
+    assert [a['score'] for a in accounts] == legacy
+    assert [a['address'] for a in PerformanceAnalytics().rank_accounts(accounts, limit=10)] == expected[:10]
+
+    trades_only = Ranker([ScoreTerm('total_trades', 1.0, hi=50)])
+    top = PerformanceAnalytics().rank_accounts(accounts, limit=5, ranker=trades_only)
+    assert [a['score'] for a in top] == sorted((min(a['total_trades'], 50) for a in accounts), reverse=True)[:5]
+
+
+def test_timeframe_and_leaderboard_rankings_match_sorted():
+    accounts = _accounts(300)
+    mta = MultiTimeframeAnalytics()
+    expected = sorted(accounts, key=lambda x: x.get('30d', {}).get('total_pnl', 0), reverse=True)
+    assert mta.rank_by_pnl(accounts) == expected
+    assert mta.rank_by_roi(accounts, limit=20) == \
+        sorted(accounts, key=lambda x: x.get('30d', {}).get('roi', 0), reverse=True)[:20]
+
+    board = [{'address': a['address'], 'week': {'pnl': a.get('30d', {}).get('total_pnl', 0), 'roi': a['total_trades'] / 100}}
+             for a in accounts]
+    filtered = [a for a in board if a['week']['roi'] >= 0.5 and a['week']['pnl'] >= 0]
+    filtered.sort(key=lambda x: x['week']['pnl'], reverse=True)
+    assert LeaderboardAnalyzer.get_top_performers(None, board, 'week', 0.5, 0.0, 15) == filtered[:15]
+
+
+def test_top_records_skips_missing_windows():
+    rng = random.Random(9)
+    records = []
+    for i in range(200):
+        windows = []
+        for _ in WINDOWS:
+            pnl = rng.choice([None, 0.0, rng.uniform(-10, 10)])
+            windows += [pnl, None if pnl is None else rng.choice([None, rng.random()]), 1.0]
+        records.append(LeaderboardRecord(f'0x{i}', None, 1.0, *windows))
+
+    features = FeatureMatrix.from_records(records)
+    assert features.values.shape == (200, len(LeaderboardRecord._fields) - 2)
+    for metric in ('pnl', 'roi', 'volume'):
+        valid = [r for r in records if r.window('day').get(metric) is not None]
+        expected = sorted(valid, key=lambda r: r.window('day')[metric], reverse=True)[:25]
+        assert top_records(records, 'day', metric, 25) == expected
+    assert top_records(records, 'week', 'score', 10) == []
+    assert top_records([], 'week', 'pnl', 10) == []
+
+
+def test_from_dicts_reads_dotted_paths():
+    features = FeatureMatrix.from_dicts([{'a': {'b': 2}}, {'a': None}, {'a': {'b': None}}, {}], ['a.b'], default=np.nan)
+    assert np.isnan(features.column('a.b')[1:]).all() and features.column('a.b')[0] == 2
+    with pytest.raises(KeyError):
+        features.column('missing')
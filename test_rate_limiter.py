@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests for the weight-aware token bucket rate limiter
+"""
+
+from rate_limiter import (TokenBucket, SQLiteTokenBucket, create_rate_limiter,
+                          request_weight, response_weight)
+
+
+def test_request_and_response_weights():
+    assert request_weight('clearinghouseState') == 2
+    assert request_weight('meta') == 20
+    assert request_weight('leaderboard') == 0
+    assert response_weight('userFills', [{}] * 45) == 2
+    assert response_weight('candleSnapshot', [{}] * 45) == 0
+    assert response_weight('clearinghouseState', {'a': 1}) == 0
+
+
+def test_token_bucket_reserves_in_order():
+    bucket = TokenBucket(rate=10, capacity=20)
+    assert bucket.reserve(20) == 0
+    # Balance is now empty: the next 10 tokens take ~1s, the 10 after that ~2s
+    assert 0.9 < bucket.reserve(10) <= 1.0
+    assert 1.9 < bucket.reserve(10) <= 2.0
+    assert bucket.stats()['throttled'] == 2
+
+
+def test_sqlite_bucket_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'limits.db')
+    first = SQLiteTokenBucket(path, rate=10, capacity=20)
+    second = SQLiteTokenBucket(path, rate=10, capacity=20)
+
+    assert first.reserve(15) == 0
+    # The second handle sees the balance the first one spent
+    assert second.reserve(15) > 0.4
+
+
+def test_create_rate_limiter_stays_under_budget():
+    bucket = create_rate_limiter(weight_per_minute=1200, burst=100, db_path='')
+    # Burst plus one minute of refill never exceeds the per-minute budget
+    assert bucket.capacity + bucket.rate * 60 <= 1200
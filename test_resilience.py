@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Unit tests for retry budget, circuit breaker and latency histogram
+"""
+
+import time
+
+from resilience import CircuitBreaker, LatencyHistogram, RetryBudget, RetryPolicy
+
+
+def test_backoff_is_capped_and_honours_retry_after():
+    policy = RetryPolicy(max_attempts=5, base_delay=0.5, max_delay=2.0)
+    assert all(0 <= policy.delay(attempt) <= 2.0 for attempt in range(10))
+    assert policy.delay(0, retry_after=1.5) == 1.5
+    assert policy.delay(0, retry_after=60) == 2.0
+
+
+def test_retry_budget_limits_retries_to_a_fraction_of_traffic():
+    budget = RetryBudget(ratio=0.25, min_per_sec=0, capacity=2)
+    assert budget.try_spend() and budget.try_spend()
+    assert not budget.try_spend()
+    for _ in range(4):
+        budget.record_request()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    assert budget.exhausted == 2
+
+
+def test_circuit_breaker_transitions():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.02)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow()
+
+    time.sleep(0.03)
+    assert breaker.allow()        # one half-open probe
+    assert not breaker.allow()    # ...and only one
+    breaker.record_failure()
+    assert breaker.state == 'open' and breaker.times_opened == 2
+
+    time.sleep(0.03)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.allow()
+
+
+def test_latency_histogram_quantiles():
+    histogram = LatencyHistogram()
+    for ms in [3] * 90 + [40] * 9 + [7000]:
+        histogram.observe(ms)
+    stats = histogram.to_dict()
+    assert stats['count'] == 100
+    assert stats['p50_ms'] == 5
+    assert stats['p95_ms'] == 50
+    assert stats['p99_ms'] == 50
+    assert stats['max_ms'] == 7000
+    assert stats['buckets']['le_10000ms'] == 1
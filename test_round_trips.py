@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for round-trip reconstruction
+"""
+
+import numpy as np
+import pytest
+
+from analytics import PerformanceAnalytics
+from config import Config
+from database import Database, Trade
+from fake_hyperliquid import SyntheticMarket
+from fill_frame import FillFrame
+from round_trips import reconstruct_round_trips
+
+
+def _fill(t, coin, side, px, sz, start, pnl=0.0, tid=None):
+    return {'time': t, 'coin': coin, 'side': side, 'px': str(px), 'sz': str(sz),
+            'startPosition': str(start), 'closedPnl': str(pnl), 'fee': '0.1', 'tid': tid if tid is not None else t}
+
+
+def test_scaled_entry_and_exit_is_one_trip():
+    fills = [
+        _fill(1, 'BTC', 'B', 100, 1, 0),
+        _fill(2, 'BTC', 'B', 110, 1, 1),              # add
+        _fill(3, 'BTC', 'A', 120, 1, 2, pnl=15),      # partial exit
+        _fill(4, 'BTC', 'A', 90, 1, 1, pnl=-15),      # flat
+    ]
+    trips = reconstruct_round_trips(FillFrame.from_api(fills))
+    assert len(trips) == 1 and len(trips.open()) == 0
+    [trip] = trips.closed().to_dicts()
+    assert trip['side'] == 'long' and trip['complete']
+    assert (trip['open_time'], trip['close_time'], trip['holding_ms']) == (1, 4, 3)
+    assert trip['entry_px'] == pytest.approx(105) and trip['exit_px'] == pytest.approx(105)
+    assert (trip['size'], trip['exit_size'], trip['pnl'], trip['fills']) == (2, 2, 0, 4)
+    assert trip['volume'] == pytest.approx(420) and trip['fees'] == pytest.approx(0.4)
+    assert (trip['first_tid'], trip['last_tid']) == (1, 4)
+
+
+def test_flip_closes_one_trip_and_opens_the_next():
+    fills = [
+        _fill(1, 'ETH', 'A', 10, 2, 0),               # short 2
+        _fill(2, 'ETH', 'B', 8, 5, -2, pnl=4),        # cover 2, long 3
+        _fill(3, 'ETH', 'A', 9, 3, 3, pnl=3),         # flat
+        _fill(4, 'ETH', 'B', 9, 1, 0),                # still open
+    ]
+    trips = reconstruct_round_trips(FillFrame.from_api(fills))
+    short, long_ = trips.closed().to_dicts()
+    assert (short['side'], short['pnl'], short['close_time'], short['exit_px']) == ('short', 4, 2, 8)
+    assert short['fees'] == pytest.approx(0.1 + 0.1 * 2 / 5)
+    assert (long_['side'], long_['open_time'], long_['size'], long_['entry_px'], long_['pnl']) == ('long', 2, 3, 8, 3)
+    assert long_['fees'] == pytest.approx(0.1 * 3 / 5 + 0.1)
+    [still_open] = trips.open().to_dicts()
+    assert still_open['close_time'] is None and still_open['exit_px'] is None and still_open['size'] == 1
+
+
+def test_history_starting_mid_position_is_marked_incomplete():
+    fills = [
+        _fill(5, 'SOL', 'A', 20, 4, 4, pnl=8),        # opened before the data
+        _fill(6, 'BTC', 'B', 100, 1, 0),
+        _fill(7, 'BTC', 'A', 101, 1, 1, pnl=1),
+    ]
+    trips = reconstruct_round_trips(FillFrame.from_api(fills)).closed().to_dicts()
+    assert [(t['coin'], t['complete'], t['close_time']) for t in trips] == [('SOL', False, 5), ('BTC', True, 7)]
+    assert trips[0]['entry_px'] is None and trips[0]['pnl'] == 8
+
+
+def test_synthetic_history_matches_position_replay():
+    market = SyntheticMarket(seed=5, fills_per_user=2000)
+    user = market._user(market.address(2))
+    frame = FillFrame.from_api(user['fills'])
+    trips = reconstruct_round_trips(frame)
+
+    # Every realised dollar lands in exactly one trip, and closed trips come out by close time
+    assert trips.pnl.sum() == pytest.approx(frame.closed_pnl.sum())
+    closed = trips.closed()
+    assert np.all(np.diff(closed.close_time) >= 0)
+    assert np.allclose(closed.data['size'], closed.data['exit_size']) and closed.data['complete'].all()
+
+    reference = PerformanceAnalytics()._group_fills_by_position(frame)
+    assert closed.pnl.tolist() == [p['pnl'] for p in reference]
+    assert closed.close_time.tolist() == [p['time'] for p in reference]
+    assert sorted(t['coin'] for t in trips.open().to_dicts()) == sorted(user['positions'])
+
+
+def test_round_trips_stored_as_trades(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DATABASE_URL', f"sqlite:///{tmp_path / 'trips.db'}")
+    db = Database()
+    fills = [_fill(1000, 'BTC', 'B', 100, 1, 0), _fill(2000, 'BTC', 'A', 110, 1, 1, pnl=10),
+             _fill(3000, 'ETH', 'A', 5, 1, 2, pnl=1)]
+    trips = reconstruct_round_trips(FillFrame.from_api(fills))
+
+    assert db.add_round_trips('0xabc', trips) == 1   # the ETH trip is incomplete
+    assert db.add_round_trips('0xabc', trips) == 0
+    [trade] = db.session.query(Trade).all()
+    assert (trade.symbol, trade.side, trade.entry_price, trade.exit_price, trade.pnl, trade.is_winner) == \
+        ('BTC', 'long', 100, 110, 10, True)
+    db.close()
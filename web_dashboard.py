@@ -9,7 +9,17 @@ from flask_cors import CORS
 from hyperliquid_api import HyperliquidAPI
 from database import Database, CopyTradeConfig, CopyTradePerformance
 from config import Config
+from fill_frame import FillFrame
+from round_trips import reconstruct_round_trips
+from multi_timeframe_analytics import MultiTimeframeAnalytics, parse_duration
+from ranking import top_records
+from equity_curve import build_equity_curves
+from coin_cube import DAY_MS, FIELDS as CUBE_FIELDS, CoinDayCube, coin_leaderboard
+from analytics_memo import get_shared_memo, watermark
+from analytics import PerformanceAnalytics
+from quantile_sketch import MetricSketches, leaderboard_sketches
 import json
+from collections import deque
 from datetime import datetime, timedelta
 import numpy as np
 
@@ -19,23 +29,42 @@ CORS(app)
 # Initialize API and Database
 api = HyperliquidAPI()
 db = Database()
-
-# Cache for leaderboard data (to reduce API calls)
-leaderboard_cache = {
-    'data': None,
-    'timestamp': None,
-    'ttl': 30  # Cache for 30 seconds
+memo = get_shared_memo()
+
+# Dashboard timeframe names -> leaderboard windows
+LEADERBOARD_TIMEFRAMES = {
+    'day': 'day',
+    'week': 'week',
+    'month': 'month',
+    'lifetime': 'allTime'
 }
 
 def get_cached_leaderboard():
-    """Get leaderboard with caching"""
-    now = datetime.now()
-    if (leaderboard_cache['data'] is None or
-        leaderboard_cache['timestamp'] is None or
-        (now - leaderboard_cache['timestamp']).seconds > leaderboard_cache['ttl']):
-        leaderboard_cache['data'] = api.get_leaderboard()
-        leaderboard_cache['timestamp'] = now
-    return leaderboard_cache['data']
+    """Get leaderboard as compact records (streamed, cached by the API client)"""
+    return api.get_leaderboard_records()
+
+def find_leaderboard_account(address):
+    """Parsed leaderboard entry for an address, or None if it is not ranked"""
+    address = address.lower()
+    for record in get_cached_leaderboard():
+        if record.address.lower() == address:
+            return record.to_dict()
+    return None
+
+def _account_value(user_state):
+    """Account value from a clearinghouse state, or None if unavailable/failed"""
+    if not isinstance(user_state, dict) or 'marginSummary' not in user_state:
+        return None
+    return float(user_state['marginSummary'].get('accountValue', 0))
+
+def _fetch_frame(address, start_ms, funding=True):
+    """Fills and (unless funding=False) funding payments since start_ms, merged into one FillFrame"""
+    frame = FillFrame.concat(FillFrame.from_api(chunk)
+                             for chunk in api.iter_user_fills(address, start_time=start_ms))
+    if not funding:
+        return frame
+    return frame.with_funding(payment for chunk in api.iter_user_funding(address, start_time=start_ms)
+                              for payment in chunk)
 
 @app.route('/')
 def index():
@@ -52,25 +81,15 @@ def get_leaderboard():
         metric = request.args.get('metric', 'pnl')
 
         # Fetch leaderboard
-        leaderboard = api.get_leaderboard()
+        leaderboard = get_cached_leaderboard()
 
         if not leaderboard:
             return jsonify({'error': 'Failed to fetch leaderboard'}), 500
 
         # Parse entries
-        parsed_accounts = []
-        for entry in leaderboard[:limit]:
-            parsed = api.parse_leaderboard_entry(entry)
-            parsed_accounts.append(parsed)
-
-        # Map timeframes
-        timeframe_map = {
-            'day': 'day',
-            'week': 'week',
-            'month': 'month',
-            'lifetime': 'allTime'
-        }
-        api_timeframe = timeframe_map.get(timeframe, 'week')
+        parsed_accounts = [record.to_dict() for record in leaderboard[:limit]]
+
+        api_timeframe = LEADERBOARD_TIMEFRAMES.get(timeframe, 'week')
 
         # Sort by metric
         if metric in ['pnl', 'roi', 'volume']:
@@ -95,15 +114,8 @@ def get_leaderboard():
 def get_account_detail(address):
     """Get detailed account information"""
     try:
-        # Fetch leaderboard
-        leaderboard = api.get_leaderboard()
-
-        # Find account
-        account = None
-        for entry in leaderboard:
-            if entry.get('ethAddress', '').lower() == address.lower():
-                account = api.parse_leaderboard_entry(entry)
-                break
+        # Find account on the leaderboard
+        account = find_leaderboard_account(address)
 
         if not account:
             return jsonify({'error': 'Account not found'}), 404
@@ -120,13 +132,13 @@ def get_account_detail(address):
 def get_global_stats():
     """Get global statistics"""
     try:
-        leaderboard = api.get_leaderboard()
+        leaderboard = get_cached_leaderboard()
 
         # Calculate stats
         total_accounts = len(leaderboard)
 
         # Parse all accounts for stats
-        parsed = [api.parse_leaderboard_entry(e) for e in leaderboard]
+        parsed = [record.to_dict() for record in leaderboard]
 
         # Calculate averages and totals
         stats = {
@@ -166,32 +178,16 @@ def get_top_performers(timeframe, metric):
     try:
         limit = int(request.args.get('limit', 10))
 
-        leaderboard = api.get_leaderboard()
-        parsed_accounts = [api.parse_leaderboard_entry(e) for e in leaderboard]
-
-        # Map timeframes
-        timeframe_map = {
-            'day': 'day',
-            'week': 'week',
-            'month': 'month',
-            'lifetime': 'allTime'
-        }
-        api_timeframe = timeframe_map.get(timeframe, 'week')
+        leaderboard = get_cached_leaderboard()
 
-        # Filter and sort
-        valid_accounts = [
-            a for a in parsed_accounts
-            if api_timeframe in a and a[api_timeframe].get(metric) is not None
-        ]
+        api_timeframe = LEADERBOARD_TIMEFRAMES.get(timeframe, 'week')
 
-        valid_accounts.sort(
-            key=lambda x: x[api_timeframe].get(metric, 0),
-            reverse=True
-        )
+        # Top-k over the whole leaderboard's feature matrix; only the winners are parsed
+        top = top_records(leaderboard, api_timeframe, metric, limit)
 
         return jsonify({
             'success': True,
-            'data': valid_accounts[:limit],
+            'data': [record.to_dict() for record in top],
             'timeframe': timeframe,
             'metric': metric
         })
@@ -199,10 +195,55 @@ def get_top_performers(timeframe, metric):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def get_population(name):
+    """Population sketches: 'leaderboard' (current snapshot), or 'tracked'/'analysed' as saved by the trackers"""
+    if name == 'leaderboard':
+        return leaderboard_sketches(get_cached_leaderboard())
+    return MetricSketches.from_bytes(db.get_metric_sketches(name))
+
+@app.route('/api/percentiles/<population>/<timeframe>/<metric>')
+def get_metric_percentiles(population, timeframe, metric):
+    """Distribution of one metric over a population, and the percentile of ?value= in it"""
+    try:
+        if population not in ('leaderboard', 'tracked', 'analysed'):
+            return jsonify({'error': f'Unknown population: {population}'}), 400
+        sketches = get_population(population)
+        if population == 'leaderboard':
+            timeframe = LEADERBOARD_TIMEFRAMES.get(timeframe, timeframe)
+        summary = sketches.summary(timeframe, metric) if sketches is not None else None
+        if summary is None:
+            return jsonify({'error': f'No {population} distribution for {timeframe} {metric}'}), 404
+
+        # Infinite profit factors (no losing trades) are not valid JSON
+        finite = lambda v: v if np.isfinite(v) else None
+        summary.update(min=finite(summary['min']), max=finite(summary['max']),
+                       quantiles={k: finite(v) for k, v in summary['quantiles'].items()})
+        value = request.args.get('value', type=float)
+        return jsonify({
+            'success': True,
+            'population': population,
+            'timeframe': timeframe,
+            'metric': metric,
+            'data': summary,
+            'value': value,
+            'percentile': sketches.percentile(timeframe, metric, value) if value is not None else None
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/health')
 def health():
     """Health check endpoint"""
-    return jsonify({'status': 'ok', 'timestamp': datetime.now().isoformat()})
+    return jsonify({
+        'status': 'ok',
+        'timestamp': datetime.now().isoformat(),
+        'transport': api.transport_stats(),
+        'cache': api.cache_stats(),
+        'coalescing': api.coalescing_stats(),
+        'requests': api.request_stats(),
+        'analytics_memo': memo.stats()
+    })
 
 
 # =====================================================
@@ -214,12 +255,7 @@ def get_trader_details(address):
     """Get comprehensive trader details including live data"""
     try:
         # Get leaderboard data for basic stats
-        leaderboard = get_cached_leaderboard()
-        account = None
-        for entry in leaderboard:
-            if entry.get('ethAddress', '').lower() == address.lower():
-                account = api.parse_leaderboard_entry(entry)
-                break
+        account = find_leaderboard_account(address)
 
         if not account:
             return jsonify({'error': 'Account not found in leaderboard'}), 404
@@ -271,6 +307,70 @@ def get_trader_details(address):
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/trader/<address>/analysis')
+def get_trader_analysis(address):
+    """Lifetime/30d/7d metrics (gross, net of fees, net of funding), memoised until new fills or funding arrive"""
+    try:
+        hit, results = memo.lookup('multi_timeframe', address, api)
+        if not hit:
+            frame = _fetch_frame(address, 0)
+            account_value = _account_value(api.get_user_state(address))
+            results = MultiTimeframeAnalytics().analyze_multi_timeframe(frame, account_value)
+            results.update({'address': address, 'account_value': account_value,
+                            'analysis_time': datetime.now(), 'total_fills': len(frame)})
+            memo.put('multi_timeframe', address, watermark(frame), results)
+
+        # Infinite profit factors (no losing trades) are not valid JSON
+        data = {key: {k: None if isinstance(v, float) and not np.isfinite(v) else v for k, v in value.items()}
+                if isinstance(value, dict) else value for key, value in results.items()}
+        return jsonify({
+            'success': True,
+            'data': data,
+            'source': 'cached' if hit else 'computed'
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/trader/<address>/percentiles')
+def get_trader_percentiles(address):
+    """Where a trader stands (percentile 0-100) in the leaderboard and tracked/analysed populations"""
+    try:
+        percentiles = {}
+        record = next((r for r in get_cached_leaderboard() if r.address.lower() == address.lower()), None)
+        if record is not None:
+            sketches = get_population('leaderboard')
+            percentiles['leaderboard'] = {
+                timeframe: sketches.percentiles(window, record.window(window))
+                for timeframe, window in LEADERBOARD_TIMEFRAMES.items() if record.window(window)
+            }
+
+        # Tracked/analysed metrics come from the analytics memo the trackers fill
+        analytics = PerformanceAnalytics()
+        performance = memo.latest('performance', address)
+        tracked = get_population('tracked') if performance is not None else None
+        if tracked is not None:
+            percentiles['tracked'] = analytics.population_percentiles(performance[1], tracked, 'tracked')
+
+        analysis = memo.latest('multi_timeframe', address)
+        analysed = get_population('analysed') if analysis is not None else None
+        if analysed is not None:
+            percentiles['analysed'] = {
+                timeframe: analytics.population_percentiles(analysis[1].get(timeframe), analysed, timeframe)
+                for timeframe in ('7d', '30d', 'lifetime')
+            }
+
+        return jsonify({
+            'success': True,
+            'address': address,
+            'data': percentiles
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/trader/<address>/trades')
 def get_trader_trades(address):
     """Get recent trades (fills) for a trader"""
@@ -278,23 +378,26 @@ def get_trader_trades(address):
         hours = int(request.args.get('hours', 24))
         limit = int(request.args.get('limit', 100))
 
-        fills = api.get_user_fills_by_time(address, hours=hours)
+        # Pages arrive oldest-first: keep the last `limit` fills, then list them newest first
+        start_ms = int((datetime.now() - timedelta(hours=hours)).timestamp() * 1000)
+        recent = deque((fill for chunk in api.iter_user_fills(address, start_time=start_ms, typed=True)
+                        for fill in chunk), maxlen=limit)
 
-        # Parse and format fills
+        # Format fills
         trades = []
-        for fill in fills[:limit]:
+        for fill in reversed(recent):
             trades.append({
-                'trade_id': fill.get('tid', ''),
-                'coin': fill.get('coin', ''),
-                'side': fill.get('side', ''),
-                'price': float(fill.get('px', 0)),
-                'size': float(fill.get('sz', 0)),
-                'value': float(fill.get('px', 0)) * float(fill.get('sz', 0)),
-                'time': fill.get('time', ''),
-                'fee': float(fill.get('fee', 0)),
-                'start_position': fill.get('startPosition', ''),
-                'direction': fill.get('dir', ''),
-                'closed_pnl': float(fill.get('closedPnl', 0)),
+                'trade_id': fill.tid,
+                'coin': fill.coin,
+                'side': fill.side,
+                'price': fill.px,
+                'size': fill.sz,
+                'value': fill.notional,
+                'time': fill.time,
+                'fee': fill.fee,
+                'start_position': fill.start_position,
+                'direction': fill.dir,
+                'closed_pnl': fill.closed_pnl,
             })
 
         return jsonify({
@@ -308,6 +411,159 @@ def get_trader_trades(address):
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/trader/<address>/round-trips')
+def get_trader_round_trips(address):
+    """Get reconstructed round-trip trades (entry to flat) for a trader, newest first"""
+    try:
+        hours = int(request.args.get('hours', 24 * 30))
+        limit = int(request.args.get('limit', 100))
+
+        start_ms = int((datetime.now() - timedelta(hours=hours)).timestamp() * 1000)
+        trips = reconstruct_round_trips(_fetch_frame(address, start_ms, funding=False))
+        closed = trips.closed().to_dicts()[::-1][:limit]
+
+        return jsonify({
+            'success': True,
+            'data': closed,
+            'count': len(closed),
+            'open_positions': trips.open().to_dicts(),
+            'hours': hours
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/trader/<address>/rolling')
+def get_trader_rolling(address):
+    """Rolling-window series for charts (default: 24h PnL and win rate, hourly over 90 days)"""
+    try:
+        window = request.args.get('window', '24h')
+        step = request.args.get('step', '1h')
+        lookback = request.args.get('lookback', '90d')
+        metrics = request.args.get('metrics', 'pnl,win_rate').split(',')
+
+        window_ms, step_ms, lookback_ms = (parse_duration(v) for v in (window, step, lookback))
+        if lookback_ms // step_ms > 20_000:
+            return jsonify({'error': 'Too many samples; use a larger step or shorter lookback'}), 400
+
+        # Fetch enough history for the first sample's window to be complete
+        end_ms = int(datetime.now().timestamp() * 1000)
+        start_ms = end_ms - lookback_ms - window_ms
+        frame = _fetch_frame(address, start_ms)
+
+        series = MultiTimeframeAnalytics().rolling_metrics(frame, window_ms, step_ms, lookback_ms, end_ms=end_ms)
+        unknown = [m for m in metrics if m not in series]
+        if unknown:
+            return jsonify({'error': f"Unknown metrics: {', '.join(unknown)}", 'available': list(series)}), 400
+
+        data = {'time': series['time'].tolist()}
+        for metric in metrics:
+            values = series[metric]
+            data[metric] = [None if v != v else v for v in values.tolist()]  # NaN -> null
+
+        return jsonify({
+            'success': True,
+            'data': data,
+            'window': window,
+            'step': step,
+            'lookback': lookback,
+            'points': len(data['time'])
+        })
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/trader/<address>/equity')
+def get_trader_equity(address):
+    """Daily/hourly equity curve anchored on account value, with time-based risk metrics"""
+    try:
+        bucket = request.args.get('bucket', '1d')
+        lookback = request.args.get('lookback', '90d')
+
+        bucket_ms, lookback_ms = parse_duration(bucket), parse_duration(lookback)
+        if lookback_ms // bucket_ms > 20_000:
+            return jsonify({'error': 'Too many buckets; use a larger bucket or shorter lookback'}), 400
+
+        end_ms = int(datetime.now().timestamp() * 1000)
+        start_ms = end_ms - lookback_ms
+        frame = _fetch_frame(address, start_ms)
+        account_value = _account_value(api.get_user_state(address))
+
+        curves = build_equity_curves([frame], [account_value], bucket_ms, start_ms=start_ms, end_ms=end_ms)
+
+        return jsonify({
+            'success': True,
+            'data': curves.to_dicts(0),
+            'metrics': curves.risk_metrics()[0],
+            'account_value': account_value,
+            'bucket': bucket,
+            'lookback': lookback
+        })
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/trader/<address>/coins')
+def get_trader_coins(address):
+    """Per-coin PnL/volume/fees/trade breakdown (tracked accounts read their saved coin x day cube)"""
+    try:
+        days = int(request.args.get('days', 30))
+        end_ms = int(datetime.now().timestamp() * 1000)
+        start_ms = end_ms - days * DAY_MS
+
+        cube = CoinDayCube.from_bytes(db.get_coin_cube(address))
+        source = 'tracked'
+        if cube is None:
+            cube = CoinDayCube.from_frame(_fetch_frame(address, start_ms))
+            source = 'fetched'
+
+        return jsonify({
+            'success': True,
+            'data': cube.by_coin(start_ms, end_ms),
+            'best_coin': cube.best_coin(start_ms, end_ms),
+            'worst_coin': cube.worst_coin(start_ms, end_ms),
+            'days': days,
+            'source': source
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/coins/<coin>/leaderboard')
+def get_coin_leaderboard(coin):
+    """Tracked traders ranked by one coin's PnL (or volume, fees, trades, trade_pnl) over the last N days"""
+    try:
+        days = int(request.args.get('days', 30))
+        metric = request.args.get('metric', 'pnl')
+        limit = int(request.args.get('limit', 20))
+        if metric not in CUBE_FIELDS:
+            return jsonify({'error': f"Unknown metric: {metric}", 'available': list(CUBE_FIELDS)}), 400
+
+        end_ms = int(datetime.now().timestamp() * 1000)
+        cubes = {address: CoinDayCube.from_bytes(data) for address, data in db.get_coin_cubes().items()}
+        cubes = {address: cube for address, cube in cubes.items() if cube is not None}
+        ranked = coin_leaderboard(cubes, coin, metric, end_ms - days * DAY_MS, end_ms, limit)
+
+        return jsonify({
+            'success': True,
+            'data': [{'address': address, metric: value} for address, value in ranked],
+            'coin': coin,
+            'metric': metric,
+            'days': days
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/trader/<address>/orders')
 def get_trader_orders(address):
     """Get open orders for a trader"""
@@ -323,21 +579,18 @@ def get_trader_orders(address):
 
         # Try to get open orders via the info API
         try:
-            data = {"type": "openOrders", "user": address}
-            result = api._post("openOrders", data)
-            if isinstance(result, list):
-                for order in result:
-                    orders.append({
-                        'order_id': order.get('oid', ''),
-                        'coin': order.get('coin', ''),
-                        'side': order.get('side', ''),
-                        'limit_price': float(order.get('limitPx', 0)),
-                        'size': float(order.get('sz', 0)),
-                        'original_size': float(order.get('origSz', 0)),
-                        'order_type': order.get('orderType', ''),
-                        'reduce_only': order.get('reduceOnly', False),
-                        'timestamp': order.get('timestamp', ''),
-                    })
+            for order in api.get_open_orders(address):
+                orders.append({
+                    'order_id': order.get('oid', ''),
+                    'coin': order.get('coin', ''),
+                    'side': order.get('side', ''),
+                    'limit_price': float(order.get('limitPx', 0)),
+                    'size': float(order.get('sz', 0)),
+                    'original_size': float(order.get('origSz', 0)),
+                    'order_type': order.get('orderType', ''),
+                    'reduce_only': order.get('reduceOnly', False),
+                    'timestamp': order.get('timestamp', ''),
+                })
         except Exception as e:
             print(f"Error fetching open orders: {e}")
 
@@ -418,12 +671,7 @@ def start_copy_trade():
             return jsonify({'error': 'trader_address is required'}), 400
 
         # Get trader info
-        leaderboard = get_cached_leaderboard()
-        trader_info = None
-        for entry in leaderboard:
-            if entry.get('ethAddress', '').lower() == trader_address.lower():
-                trader_info = api.parse_leaderboard_entry(entry)
-                break
+        trader_info = find_leaderboard_account(trader_address)
 
         # Create copy trade config
         config = db.create_copy_trade_config({
@@ -528,12 +776,7 @@ def list_copy_trades():
             performance = db.get_copy_trade_performance(config.id)
 
             # Get trader's current leaderboard stats
-            leaderboard = get_cached_leaderboard()
-            trader_stats = None
-            for entry in leaderboard:
-                if entry.get('ethAddress', '').lower() == config.trader_address.lower():
-                    trader_stats = api.parse_leaderboard_entry(entry)
-                    break
+            trader_stats = find_leaderboard_account(config.trader_address)
 
             result.append({
                 'config_id': config.id,
@@ -576,6 +819,10 @@ def get_copy_trading_performance():
 
         trader_performances = []
 
+        # Live account values for active traders, fetched in one concurrent batch
+        active_addresses = [c.trader_address for c in configs if c.is_active]
+        live_states = api.get_user_states_many(active_addresses)
+
         for config in configs:
             perf = db.get_copy_trade_performance(config.id)
             if perf:
@@ -592,7 +839,8 @@ def get_copy_trading_performance():
                     'roi': perf.get('roi', 0),
                     'trades': perf.get('total_trades', 0),
                     'win_rate': perf.get('win_rate', 0),
-                    'is_active': config.is_active
+                    'is_active': config.is_active,
+                    'trader_account_value': _account_value(live_states.get(config.trader_address))
                 })
 
         overall_roi = (total_pnl / total_allocated * 100) if total_allocated > 0 else 0
@@ -626,7 +874,7 @@ def get_trader_recommendations():
         limit = int(request.args.get('limit', 10))
 
         leaderboard = get_cached_leaderboard()
-        parsed_accounts = [api.parse_leaderboard_entry(e) for e in leaderboard]
+        parsed_accounts = [record.to_dict() for record in leaderboard]
 
         # Score each trader based on multiple factors
         scored_traders = []